@@ -1,11 +1,28 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from flask_cors import CORS
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, g, Response
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import database as db
+import autocompletar
+import catalogo
+import cercania
+import fotos
+import horarios
+import estaticos
+import exportacion
+import paquetes
+import compresion
+import enrutador
+import fragmentos
+import metricas
+import bitacora
+import consultas_lentas
+import presupuesto_consultas
+import respaldo
 import os
 import json
 import shutil
+import time
+import re
 # ========== IMPORTS DE SEGURIDAD ==========
 from security import (
     validar_email,
@@ -21,9 +38,10 @@ from security import (
 )
 # ==========================================
 
+log = bitacora.obtener_logger('app')
+
 app = Flask(__name__)
 app.secret_key = 'kinderfiesta_secret_key_2025'
-CORS(app)
 # ========== CREDENCIALES DE ADMINISTRADOR ==========
 ADMIN_EMAIL = "admin@kinderfiesta.com"
 ADMIN_PASSWORD = "123" 
@@ -37,8 +55,48 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs('data/solicitudes', exist_ok=True)
+# ============ FÁBRICA DE LA APP ============
+# Importar app.py solo define rutas: carpetas, paquetes, CORS y middlewares
+# se arman en crear_app(), que llaman el servidor (gunicorn 'app:crear_app()',
+# asgi.py) o `python app.py`. Ver benchmarks/tiempo_importacion.py.
+_iniciada = False
+
+def crear_app():
+    """Inicializa la app una sola vez y la devuelve (idempotente)"""
+    global _iniciada
+    if _iniciada:
+        return app
+    _iniciada = True
+
+    # Antes que cualquier hilo (instantánea, respaldo, los del servidor)
+    db.cargar_dependencias()
+
+    from flask_cors import CORS
+    CORS(app)
+
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs('data/solicitudes', exist_ok=True)
+
+    # Paquetes CSS/JS (assets/ -> static/) y huellas de contenido (/recursos/...)
+    paquetes.compilar_todos()
+    estaticos.iniciar()
+    app.jinja_env.globals['url_estatico'] = estaticos.url_estatico
+    app.jinja_env.globals['paquete'] = paquetes.paquete
+
+    # {% cache %} en las plantillas (fragmentos ya renderizados)
+    app.jinja_env.add_extension(fragmentos.ExtensionFragmentos)
+    app.jinja_env.globals['version_catalogo'] = catalogo.version
+
+    # Compresión gzip/brotli de HTML y JSON (los /recursos ya van precomprimidos)
+    app.wsgi_app = compresion.MiddlewareCompresion(app.wsgi_app)
+
+    # Aciertos/fallos de las cachés en /admin/metrics
+    metricas.registrar_cache('compresion', app.wsgi_app.cache)
+    metricas.registrar_cache('fragmentos', app.jinja_env.cache_fragmentos)
+    return app
+
+# Token para que Prometheus lea /admin/metrics sin sesión de admin
+METRICAS_TOKEN = os.environ.get('KINDERFIESTA_METRICAS_TOKEN')
 
 
 ADMIN_EMAIL = 'admin@kinderfiesta.com'
@@ -68,18 +126,25 @@ PALABRAS_PROHIBIDAS = [
 ]
 
 
+# Una sola regex con todas las palabras (se compila en el primer uso):
+# un search() por palabra en vez de recorrer la lista entera
+_patron_prohibidas = None
+
+def _prohibidas():
+    global _patron_prohibidas
+    if _patron_prohibidas is None:
+        _patron_prohibidas = re.compile('|'.join(map(re.escape, PALABRAS_PROHIBIDAS)))
+    return _patron_prohibidas
+
+
 def filtrar_palabras(texto):
-    palabras = texto.split()
+    patron = _prohibidas()
     texto_filtrado = []
-    for palabra in palabras:
-        palabra_lower = palabra.lower()
-        censurada = False
-        for prohibida in PALABRAS_PROHIBIDAS:
-            if prohibida in palabra_lower:
-                texto_filtrado.append('*' * len(palabra))
-                censurada = True
-                break
-        if not censurada:
+    for palabra in texto.split():
+        if patron.search(palabra.lower()):
+            texto_filtrado.append('*' * len(palabra))
+            metricas.FILTRO_PALABRAS.inc()
+        else:
             texto_filtrado.append(palabra)
     return ' '.join(texto_filtrado)
 
@@ -88,6 +153,46 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+# ============ MÉTRICAS ============
+
+@app.before_request
+def iniciar_medicion():
+    g.inicio_request = time.perf_counter()
+    presupuesto_consultas.iniciar(estricto=app.testing)
+    respaldo.iniciar()
+    # Quien escribió hace poco lee de la primaria (ver enrutador.py)
+    enrutador.iniciar(request.cookies.get(enrutador.COOKIE))
+
+
+@app.after_request
+def registrar_medicion(response):
+    inicio = g.pop('inicio_request', None)
+    if inicio is not None:
+        endpoint = request.endpoint or 'sin_ruta'
+        metricas.HTTP_DURACION.observar(time.perf_counter() - inicio, endpoint, request.method)
+        metricas.HTTP_RESPUESTAS.inc(endpoint, response.status_code)
+    presupuesto_consultas.terminar(request.url_rule.rule if request.url_rule else request.path)
+    # Respondido con la última copia buena porque MySQL no estaba (ver respaldo.py)
+    for nombre, valor in respaldo.cabeceras():
+        response.headers[nombre] = valor
+    pegado = enrutador.cookie()
+    if pegado:
+        valor, segundos = pegado
+        response.set_cookie(enrutador.COOKIE, valor, max_age=segundos, httponly=True, samesite='Lax')
+    return response
+
+
+@app.route('/admin/metrics')
+def admin_metrics():
+    """Métricas en formato Prometheus (sesión de admin o token Bearer)"""
+    autorizacion = request.headers.get('Authorization', '')
+    token_valido = METRICAS_TOKEN and autorizacion == f"Bearer {METRICAS_TOKEN}"
+    if not session.get('admin_logged_in') and not token_valido:
+        return jsonify({'error': 'No autorizado'}), 401
+
+    return Response(metricas.exponer(), mimetype='text/plain; version=0.0.4')
+
+
 # ============ RUTAS PÚBLICAS ============
 
 
@@ -96,13 +201,13 @@ def index():
     """Página de inicio con estadísticas dinámicas"""
     try:
         # Obtener estadísticas de la base de datos
-        stats = db.obtener_estadisticas()
+        stats = catalogo.obtener_estadisticas()
         
-        print(f"📊 Estadísticas: Familias={stats['familias']}, Salones={stats['salones']}, Satisfacción={stats['satisfaccion']}%")
+        log.debug("📊 Estadísticas: Familias=%s, Salones=%s, Satisfacción=%s%%", stats['familias'], stats['salones'], stats['satisfaccion'])
         
         return render_template('index.html', stats=stats)
     except Exception as e:
-        print(f"❌ Error al cargar inicio: {e}")
+        log.error("❌ Error al cargar inicio: %s", e)
         # Valores por defecto si hay error
         stats = {
             'familias': 1,
@@ -116,10 +221,10 @@ def index():
 def salones_page():
     """Página de Salones"""
     try:
-        stats = db.obtener_estadisticas()
+        stats = catalogo.obtener_estadisticas()
         return render_template('salones.html', stats=stats)
     except Exception as e:
-        print(f"❌ Error al cargar salones: {e}")
+        log.error("❌ Error al cargar salones: %s", e)
         stats = {
             'familias': 1,
             'salones': 5,
@@ -134,60 +239,62 @@ def buscar_salon():
         # Obtener el término de búsqueda
         query = request.args.get('q', '').strip()
         
-        print(f"🔍 Búsqueda realizada: '{query}'")
+        log.info("🔍 Búsqueda realizada: '%s'", query)
         
         # Si no hay término, redirigir a todos los salones
         if not query:
-            return redirect(url_for('salones'))
+            return redirect(url_for('salones_page'))
         
         # Buscar en la base de datos
-        salones = db.buscar_salones(query)
+        salones = catalogo.buscar(query)
         
         if salones:
-            print(f"✅ Se encontraron {len(salones)} salones")
+            log.info("✅ Se encontraron %s salones", len(salones))
             return render_template('buscar_resultados.html', query=query, salones=salones)
         else:
-            print(f"❌ No se encontraron salones para: {query}")
+            log.info("❌ No se encontraron salones para: %s", query)
             return render_template('buscar_resultados.html', query=query, salones=[])
     
     except Exception as e:
-        print(f"❌ Error en búsqueda: {e}")
-        return redirect(url_for('salones'))
+        log.error("❌ Error en búsqueda: %s", e)
+        return redirect(url_for('salones_page'))
 
 @app.route('/salon/<int:salon_id>')
 def detalle_salon(salon_id):
     """Página de detalle de un salón específico"""
     try:
         # Obtener datos del salón
-        salon = db.obtener_salon_por_id(salon_id)
+        salon = catalogo.obtener_salon(salon_id, campos=catalogo.CAMPOS_DETALLE)
         
         if not salon:
             flash('Salón no encontrado', 'error')
-            return redirect(url_for('salones'))
+            return redirect(url_for('salones_page'))
+        
+        salon = catalogo.como_salones([salon])[0]
         
-        print(f"✅ Mostrando detalles del salón: {salon.get('nombre', 'Sin nombre')}")
+        log.info("✅ Mostrando detalles del salón: %s", salon.nombre)
         
-        # Obtener horarios
-        horarios = db.obtener_horarios_salon(salon_id)
+        # Horarios ya formateados (instantánea del catálogo o horarios.py)
+        textos_horarios = catalogo.textos_horarios(salon_id)
         
         # Renderizar página de detalle
         return render_template('salon_detalle.html', 
                              salon=salon,
-                             horarios=horarios)
+                             horarios=textos_horarios)
         
     except Exception as e:
-        print(f"❌ Error al cargar salón: {e}")
+        log.error("❌ Error al cargar salón: %s", e)
         flash('Error al cargar el salón', 'error')
-        return redirect(url_for('salones'))
+        return redirect(url_for('salones_page'))
     
 @app.route('/nosotros')
 def nosotros_page():
     """Página de Nosotros"""
     try:
-        stats = db.obtener_estadisticas()
+        stats = catalogo.obtener_estadisticas()
         return render_template('nosotros.html', stats=stats)
     except Exception as e:
-        print(f"❌ Error al cargar nosotros: {e}")
+        log.error("❌ Error al cargar nosotros: %s", e)
         stats = {
             'familias': 1,
             'salones': 5,
@@ -200,10 +307,10 @@ def nosotros_page():
 def contacto_page():
     """Página de Contacto"""
     try:
-        stats = db.obtener_estadisticas()
+        stats = catalogo.obtener_estadisticas()
         return render_template('contacto.html', stats=stats)
     except Exception as e:
-        print(f"❌ Error al cargar contacto: {e}")
+        log.error("❌ Error al cargar contacto: %s", e)
         stats = {
             'familias': 1,
             'salones': 5,
@@ -212,6 +319,12 @@ def contacto_page():
         return render_template('contacto.html', stats=stats)
 
 
+@app.route('/recursos/<path:archivo>')
+def recurso_estatico(archivo):
+    """Estáticos con huella: caché inmutable y variantes .br/.gz"""
+    return estaticos.servir(archivo, request)
+
+
 @app.route('/registrar-local', methods=['GET'])
 def registrar_local_page():
     """Página para registrar un nuevo local"""
@@ -219,58 +332,78 @@ def registrar_local_page():
 
 @app.route('/api/salones')
 def get_salones():
-    """API pública - Solo salones visibles con TODAS las fotos (5 imágenes)"""
+    """
+    API pública - Solo salones visibles con sus fotos y reviews
+    Acepta ?fields=id,name,rating,... para recibir solo esas columnas
+    y ?abierto_ahora=1 o ?abierto_en=sábado,15:00 para filtrar por horario
+    """
     try:
-        # ✅ CONSULTA SQL DIRECTA PARA OBTENER EL CAMPO 'fotos'
-        conn = db.conectar()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT s.id, s.name, s.phone, s.address, s.locationCode, 
-                   s.category, s.rating, s.visible, s.folder, s.fotos
-            FROM salones s
-            WHERE s.visible = 1
-            ORDER BY s.rating DESC, s.name ASC
-        """)
-        
-        salones = cursor.fetchall()
-        
-        # Procesar cada salón para incluir sus reviews
-        for salon in salones:
-            salon_id = salon['id']
-            
-            # ✅ Si no tiene fotos definidas, usar valores por defecto (5 fotos)
-            if not salon['fotos']:
-                salon['fotos'] = '1.jpg, 2.jpg, 3.jpg, 4.jpg, 5.jpg'
-            
-            # Si no tiene rating, asignar 0
-            if salon['rating'] is None:
-                salon['rating'] = 0.0
-            
-            # Obtener reviews del salón
-            cursor.execute("""
-                SELECT id, nombre, comentario, rating, fecha
-                FROM reviews
-                WHERE salon_id = %s
-                ORDER BY fecha DESC
-            """, (salon_id,))
-            
-            reviews = cursor.fetchall()
-            
-            # Convertir datetime a string para JSON
-            for review in reviews:
-                review['fecha'] = review['fecha'].isoformat()
-            
-            salon['reviews'] = reviews
-        
-        cursor.close()
-        conn.close()
-        
-        print(f"✅ API /salones: {len(salones)} salones retornados con fotos completas")
+        try:
+            campos = catalogo.parsear_campos(request.args.get('fields'))
+            franja = catalogo.parsear_horario(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        salones = catalogo.listar_salones(campos, franja=franja)
+
+        log.info("✅ API /salones: %s salones retornados", len(salones))
         return jsonify(salones)
-        
+
+    except Exception as e:
+        log.error("❌ Error en /api/salones: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/salones/cerca')
+def get_salones_cerca():
+    """
+    API pública - Salones visibles más cercanos a un punto
+    ?lat=&lng= obligatorios, ?radio= en km (5), ?limite= (10), ?fields= como /api/salones
+    """
+    try:
+        try:
+            lat, lng, radio_km, limite = catalogo.parsear_cercania(request.args)
+            campos = catalogo.parsear_campos(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        salones = catalogo.salones_cerca(lat, lng, radio_km, limite, campos)
+
+        log.info("✅ API /salones/cerca: %s salones a menos de %s km", len(salones), radio_km)
+        return jsonify(salones)
+
+    except Exception as e:
+        log.error("❌ Error en /api/salones/cerca: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/autocomplete')
+def get_autocomplete():
+    """
+    API pública - Sugerencias del buscador mientras se escribe
+    ?q= lo escrito hasta ahora, ?limite= (8): salones, zonas y categorías, mejores primero
+    """
+    try:
+        try:
+            consulta, limite = autocompletar.parsear(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        sugerencias = autocompletar.sugerir(consulta, limite)
+        for sugerencia in sugerencias:
+            if sugerencia['tipo'] == 'salon':
+                sugerencia['url'] = url_for('detalle_salon', salon_id=sugerencia['id'])
+            else:
+                sugerencia['url'] = url_for('buscar_salon', q=sugerencia['texto'])
+
+        # Una por tecla: debug, no info
+        log.debug("🔤 API /autocomplete: '%s' -> %s sugerencias", consulta, len(sugerencias))
+        respuesta = jsonify(sugerencias)
+        respuesta.headers['Cache-Control'] = autocompletar.CACHE_CONTROL
+        return respuesta
+
     except Exception as e:
-        print(f"❌ Error en /api/salones: {str(e)}")
+        log.error("❌ Error en /api/autocomplete: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -278,53 +411,15 @@ def get_salones():
 def get_stats():
     """Obtener estadísticas reales y coherentes"""
     try:
-        # 1. Contar salones verificados
-        salones = db.obtener_todos_salones()
-        total_salones = len([s for s in salones if s.get('visible', 1) == 1])
+        stats = catalogo.obtener_estadisticas()
+
+        log.info("✅ Stats: %s usuarios, %s salones, %s%% satisfacción",
+                 stats['familias'], stats['salones'], stats['satisfaccion'])
         
-        # 2. Contar usuarios registrados (familias conectadas)
-        try:
-            conn = db.conectar()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT COUNT(*) as total FROM usuarios WHERE activo = 1")
-            resultado = cursor.fetchone()
-            total_usuarios = resultado['total'] if resultado else 0
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            print(f"⚠️ Error al contar usuarios: {e}")
-            total_usuarios = 0
-        
-        # 3. Calcular satisfacción (promedio de estrellas de testimonios)
-        try:
-            conn = db.conectar()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT AVG(rating) as promedio FROM testimonios WHERE aprobado = 1")
-            resultado = cursor.fetchone()
-            promedio_rating = resultado['promedio'] if resultado and resultado['promedio'] else 0
-            satisfaccion = int((promedio_rating / 5) * 100) if promedio_rating > 0 else 98
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            print(f"⚠️ Error al calcular satisfacción: {e}")
-            satisfaccion = 98
-        
-        print(f"✅ Stats: {total_usuarios} usuarios, {total_salones} salones, {satisfaccion}% satisfacción")
-        
-        return jsonify({
-            'familias': f"{total_usuarios}+" if total_usuarios > 0 else "0",
-            'salones': f"{total_salones}+",
-            'satisfaccion': f"{satisfaccion}%",
-            'tiempo': '24h'
-        })
+        return jsonify(catalogo.formato_estadisticas(stats))
     except Exception as e:
-        print(f"❌ Error en /api/stats: {str(e)}")
-        return jsonify({
-            'familias': '0',
-            'salones': '0+',
-            'satisfaccion': '98%',
-            'tiempo': '24h'
-        }), 500
+        log.error("❌ Error en /api/stats: %s", e)
+        return jsonify(catalogo.ESTADISTICAS_API_ERROR), 500
 
 
 # ============ RUTAS DE USUARIOS Y TESTIMONIOS ============
@@ -338,11 +433,12 @@ def login():
         password = request.form.get('password', '').strip()
         ip_address = obtener_ip_cliente(request)
         
-        print(f"🔐 Intento de login - IP: {ip_address}, Email: {email}")
+        log.info("🔐 Intento de login - IP: %s, Email: %s", ip_address, email)
         
         # 1. VERIFICAR RATE LIMITING
         permitido, tiempo_restante = rate_limiter.verificar_intento(ip_address)
         if not permitido:
+            metricas.RATE_LIMIT_BLOQUEOS.inc('usuario')
             log_login_fallido(ip_address, email, f'Bloqueado por {tiempo_restante} minutos')
             return render_template('login.html', 
                 error=f'Demasiados intentos fallidos. Intenta en {tiempo_restante} minutos.')
@@ -351,7 +447,7 @@ def login():
         if not validar_email(email):
             rate_limiter.registrar_intento(ip_address)
             log_login_fallido(ip_address, email, 'Email inválido')
-            print(f"❌ Email inválido: {email}")
+            log.warning("❌ Email inválido: %s", email)
             return render_template('login.html', error='Email inválido')
         
         # 3. DETECTAR SQL INJECTION
@@ -361,7 +457,7 @@ def login():
                 'password': '***'
             })
             rate_limiter.registrar_intento(ip_address)
-            print(f"🚨 SQL Injection detectado - IP: {ip_address}")
+            log.warning("🚨 SQL Injection detectado - IP: %s", ip_address)
             return render_template('login.html', 
                 error='Datos inválidos. El intento ha sido registrado.')
         
@@ -372,7 +468,7 @@ def login():
             return render_template('login.html', error='Contraseña inválida')
         
         # 5. VERIFICAR CREDENCIALES
-        usuario = db.verificar_login(email, password)
+        usuario, _ = db.verificar_login(email, password)
         
         if usuario and isinstance(usuario, dict):  # ← VERIFICACIÓN IMPORTANTE
             session['user_logged_in'] = True
@@ -383,7 +479,7 @@ def login():
             rate_limiter.limpiar_intentos(ip_address)
             log_login_exitoso(ip_address, email, 'usuario')
             
-            print(f"✅ Login exitoso: {email}")
+            log.info("✅ Login exitoso: %s", email)
             return redirect(url_for('index'))
         else:
             rate_limiter.registrar_intento(ip_address)
@@ -443,15 +539,13 @@ def logout_user():
 def api_testimonios():
     """API: Obtener testimonios aprobados"""
     try:
-        testimonios = db.obtener_testimonios_aprobados(limite=10)
+        testimonios = catalogo.obtener_testimonios(limite=10)
         
-        print(f"✅ API /api/testimonios: Enviando {len(testimonios)} testimonios")
+        log.info("✅ API /api/testimonios: Enviando %s testimonios", len(testimonios))
         return jsonify(testimonios)
         
     except Exception as e:
-        print(f"❌ Error en API /api/testimonios: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Error en API /api/testimonios: %s", e)
         return jsonify([]), 500
 
 
@@ -497,7 +591,7 @@ def agregar_testimonio_route():
             return jsonify({'success': False, 'message': mensaje}), 500
         
     except Exception as e:
-        print(f"❌ Error al agregar testimonio: {str(e)}")
+        log.error("❌ Error al agregar testimonio: %s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
@@ -513,57 +607,24 @@ def limpiar_modal_testimonio():
 
 @app.route('/api/salon/<int:salon_id>')
 def get_salon(salon_id):
-    """Obtener salón específico con todas sus fotos"""
+    """Obtener salón específico con todas sus fotos (acepta ?fields=)"""
     try:
-        conn = db.conectar()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT s.id, s.name, s.phone, s.address, s.locationCode, 
-                   s.category, s.rating, s.visible, s.folder, s.fotos
-            FROM salones s
-            WHERE s.id = %s AND s.visible = 1
-        """, (salon_id,))
-        
-        salon = cursor.fetchone()
-        
+        try:
+            campos = catalogo.parsear_campos(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        salon = catalogo.obtener_salon(salon_id, campos)
+
         if salon:
-            # Si no tiene fotos, usar valores por defecto
-            if not salon['fotos']:
-                salon['fotos'] = '1.jpg, 2.jpg, 3.jpg, 4.jpg, 5.jpg'
-            
-            if salon['rating'] is None:
-                salon['rating'] = 0.0
-            
-            # Obtener reviews
-            cursor.execute("""
-                SELECT id, nombre, comentario, rating, fecha
-                FROM reviews
-                WHERE salon_id = %s
-                ORDER BY fecha DESC
-            """, (salon_id,))
-            
-            reviews = cursor.fetchall()
-            
-            for review in reviews:
-                review['fecha'] = review['fecha'].isoformat()
-            
-            salon['reviews'] = reviews
-            
-            cursor.close()
-            conn.close()
-            
-            print(f"✅ Salón obtenido: {salon['name']}")
+            log.info("✅ Salón obtenido: %s", salon_id)
             return jsonify(salon)
-        
-        cursor.close()
-        conn.close()
-        
-        print(f"❌ Salón no encontrado o no visible: {salon_id}")
+
+        log.info("❌ Salón no encontrado o no visible: %s", salon_id)
         return jsonify({'error': 'Salón no encontrado'}), 404
         
     except Exception as e:
-        print(f"❌ Error en /api/salon/{salon_id}: {str(e)}")
+        log.error("❌ Error en /api/salon/%s: %s", salon_id, e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -588,12 +649,14 @@ def agregar_comentario():
         review, nuevo_rating = db.agregar_review(salon_id, nombre, comentario_filtrado, rating)
         
         if review:
-            print(f"✅ Comentario agregado al salón {salon_id}")
+            catalogo.invalidar()
+            autocompletar.actualizar_salon(salon_id)
+            log.info("✅ Comentario agregado al salón %s", salon_id)
             return jsonify({'success': True, 'review': review, 'nuevo_rating': nuevo_rating})
         else:
             return jsonify({'error': 'No se pudo agregar el comentario'}), 500
     except Exception as e:
-        print(f"❌ Error al agregar comentario: {str(e)}")
+        log.error("❌ Error al agregar comentario: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -683,12 +746,12 @@ def registrar_local():
         with open(solicitudes_file, 'w', encoding='utf-8') as f:
             json.dump(solicitudes, f, indent=4, ensure_ascii=False)
         
-        print(f"✅ Nueva solicitud registrada: {solicitud_id}")
+        log.info("✅ Nueva solicitud registrada: %s", solicitud_id)
         
         return jsonify({'success': True, 'message': 'Solicitud enviada correctamente. Un administrador la revisará pronto.', 'solicitud_id': solicitud_id})
         
     except Exception as e:
-        print(f"❌ Error al procesar solicitud: {str(e)}")
+        log.error("❌ Error al procesar solicitud: %s", e)
         return jsonify({'success': False, 'message': f'Error al procesar la solicitud: {str(e)}'}), 500
 
 
@@ -711,13 +774,14 @@ def admin_login():
         password = request.form.get('password', '').strip()
         ip_address = obtener_ip_cliente(request)
         
-        print(f"👑 Intento de login ADMIN - IP: {ip_address}, Email: {email}")
+        log.info("👑 Intento de login ADMIN - IP: %s, Email: %s", ip_address, email)
         
         # 1. VERIFICAR RATE LIMITING (más estricto para admin)
         permitido, tiempo_restante = rate_limiter.verificar_intento(ip_address, max_intentos=3, ventana_minutos=10)
         if not permitido:
+            metricas.RATE_LIMIT_BLOQUEOS.inc('admin')
             log_login_fallido(ip_address, email, f'Admin bloqueado por {tiempo_restante} minutos')
-            print(f"🚫 BLOQUEADO POR RATE LIMIT: {tiempo_restante} minutos")
+            log.warning("🚫 BLOQUEADO POR RATE LIMIT: %s minutos", tiempo_restante)
             return render_template('admin_login.html', 
                 error=f'Demasiados intentos fallidos. Intenta en {tiempo_restante} minutos.')
         
@@ -725,7 +789,7 @@ def admin_login():
         if not validar_email(email):
             rate_limiter.registrar_intento(ip_address)
             log_login_fallido(ip_address, email, 'Admin - Email inválido')
-            print(f"❌ Admin - Email inválido: {email}")
+            log.warning("❌ Admin - Email inválido: %s", email)
             return render_template('admin_login.html', error='Email inválido')
         
         # 3. DETECTAR SQL INJECTION
@@ -736,7 +800,7 @@ def admin_login():
                 'tipo': 'ADMIN LOGIN'
             })
             rate_limiter.registrar_intento(ip_address)
-            print(f"🚨🚨 SQL Injection en ADMIN LOGIN - IP: {ip_address}")
+            log.warning("🚨🚨 SQL Injection en ADMIN LOGIN - IP: %s", ip_address)
             return render_template('admin_login.html', 
                 error='Intento de acceso sospechoso detectado y registrado.')
         
@@ -748,12 +812,12 @@ def admin_login():
             rate_limiter.limpiar_intentos(ip_address)
             log_login_exitoso(ip_address, email, 'ADMIN')
             
-            print(f"✅ Admin login exitoso: {email}")
+            log.info("✅ Admin login exitoso: %s", email)
             return redirect(url_for('admin_dashboard'))
         else:
             rate_limiter.registrar_intento(ip_address)
             log_login_fallido(ip_address, email, 'Admin - Credenciales incorrectas')
-            print(f"❌ Admin - Credenciales incorrectas")
+            log.warning("❌ Admin - Credenciales incorrectas")
             return render_template('admin_login.html', error='Credenciales incorrectas')
     
     return render_template('admin_login.html')
@@ -766,7 +830,7 @@ def admin_dashboard():
         return redirect(url_for('admin_login'))
     
     try:
-        salones = db.obtener_todos_salones()
+        salones = catalogo.listar_salones(catalogo.CAMPOS_DASHBOARD, incluir_ocultos=True)
         total_salones = len(salones)
         salones_visibles = len([s for s in salones if s.get('visible', 1) == 1])
         salones_ocultos = total_salones - salones_visibles
@@ -792,10 +856,10 @@ def admin_dashboard():
             'solicitudes_pendientes': solicitudes_pendientes
         }
         
-        print(f"✅ Dashboard stats: {stats}")
+        log.info("✅ Dashboard stats: %s", stats)
         return render_template('admin_dashboard.html', stats=stats)
     except Exception as e:
-        print(f"❌ Error en dashboard: {str(e)}")
+        log.error("❌ Error en dashboard: %s", e)
         return render_template('admin_dashboard.html', stats={'total_salones': 0, 'salones_visibles': 0, 'salones_ocultos': 0, 'total_reviews': 0, 'solicitudes_pendientes': 0})
 
 
@@ -806,28 +870,14 @@ def admin_panel():
         return redirect(url_for('admin_login'))
     
     try:
-        salones = db.obtener_todos_salones()
-        
-        # Formatear datos para el panel
-        salones_fmt = []
-        for salon in salones:
-            salon_fmt = {
-                'id': salon.get('id') or salon.get('salon_id'),
-                'name': salon.get('nombre') or salon.get('name') or 'Sin nombre',
-                'category': salon.get('categoria') or salon.get('category') or 'Salón',
-                'address': salon.get('direccion') or salon.get('address') or 'Sin dirección',
-                'phone': salon.get('telefono') or salon.get('phone') or 'N/A',
-                'rating': salon.get('promedio') or salon.get('rating') or 0,
-                'visible': salon.get('visible', 1),
-                'reviews': salon.get('reviews') or [],
-                'folder': salon.get('carpeta_fotos') or salon.get('folder') or f"salon{salon.get('id')}"
-            }
-            salones_fmt.append(salon_fmt)
+        # Salon ya trae los valores por defecto (nombre, categoría, ...): ver modelos.py
+        salones = catalogo.como_salones(
+            catalogo.listar_salones(catalogo.CAMPOS_PANEL_ADMIN, incluir_ocultos=True))
         
-        print(f"✅ Panel: {len(salones_fmt)} salones cargados")
-        return render_template('admin_panel.html', salones=salones_fmt)
+        log.info("✅ Panel: %s salones cargados", len(salones))
+        return render_template('admin_panel.html', salones=salones)
     except Exception as e:
-        print(f"❌ Error en admin_panel: {str(e)}")
+        log.error("❌ Error en admin_panel: %s", e)
         return render_template('admin_panel.html', salones=[])
     
 @app.route('/admin/solicitudes')
@@ -859,11 +909,20 @@ def obtener_solicitudes():
         else:
             solicitudes = []
         
-        print(f"✅ Solicitudes: {len(solicitudes)} encontradas")
+        # URLs con huella de las fotos subidas
+        for solicitud in solicitudes:
+            datos = solicitud.get('datos', {})
+            carpeta = datos.get('carpeta_fotos', solicitud.get('id'))
+            datos['urls_fotos'] = [
+                estaticos.url_estatico(f"solicitudes/{carpeta}/{foto}")
+                for foto in datos.get('fotos', [])
+            ]
+        
+        log.info("✅ Solicitudes: %s encontradas", len(solicitudes))
         return jsonify(solicitudes)
         
     except Exception as e:
-        print(f"❌ Error al obtener solicitudes: {str(e)}")
+        log.error("❌ Error al obtener solicitudes: %s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
@@ -897,9 +956,16 @@ def aprobar_solicitud(solicitud_id):
                     if os.path.exists(destino):
                         shutil.rmtree(destino)
                     shutil.copytree(origen, destino)
-                    print(f"✅ Fotos movidas a: {destino}")
+                    log.info("✅ Fotos movidas a: %s", destino)
+                # Versiones reducidas para srcset + refrescar el manifiesto
+                fotos.generar_variantes(carpeta_fotos)
+                estaticos.registrar_carpeta(f"imagenes/{carpeta_fotos}")
             except Exception as e:
-                print(f"⚠️ Error al mover fotos: {e}")
+                log.warning("⚠️ Error al mover fotos: %s", e)
+            catalogo.invalidar()
+            cercania.actualizar_salon(salon_id)
+            horarios.actualizar_salon(salon_id)
+            autocompletar.actualizar_salon(salon_id)
             
             solicitud['estado'] = 'aprobado'
             solicitud['fecha_aprobacion'] = datetime.now().isoformat()
@@ -908,14 +974,14 @@ def aprobar_solicitud(solicitud_id):
             with open(solicitudes_file, 'w', encoding='utf-8') as f:
                 json.dump(solicitudes, f, indent=4, ensure_ascii=False)
             
-            print(f"✅ Solicitud aprobada: {solicitud_id} -> Salón ID: {salon_id}")
+            log.info("✅ Solicitud aprobada: %s -> Salón ID: %s", solicitud_id, salon_id)
             
             return jsonify({'success': True, 'message': f'Solicitud aprobada. Salón creado con ID: {salon_id}', 'salon_id': salon_id})
         else:
             return jsonify({'success': False, 'message': 'Error al crear el salón en la base de datos'}), 500
         
     except Exception as e:
-        print(f"❌ Error al aprobar solicitud: {str(e)}")
+        log.error("❌ Error al aprobar solicitud: %s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
@@ -944,12 +1010,12 @@ def rechazar_solicitud(solicitud_id):
         with open(solicitudes_file, 'w', encoding='utf-8') as f:
             json.dump(solicitudes, f, indent=4, ensure_ascii=False)
         
-        print(f"❌ Solicitud rechazada: {solicitud_id}")
+        log.info("❌ Solicitud rechazada: %s", solicitud_id)
         
         return jsonify({'success': True, 'message': 'Solicitud rechazada'})
         
     except Exception as e:
-        print(f"❌ Error al rechazar solicitud: {str(e)}")
+        log.error("❌ Error al rechazar solicitud: %s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
@@ -961,7 +1027,9 @@ def eliminar_comentario(salon_id, review_id):
 
     if db.eliminar_review(salon_id, review_id):
         nuevo_promedio = db.recalcular_promedio_salon(salon_id)
-        print(f"✅ Comentario eliminado de salón {salon_id}")
+        catalogo.invalidar()
+        autocompletar.actualizar_salon(salon_id)
+        log.info("✅ Comentario eliminado de salón %s", salon_id)
         return jsonify({'success': True, 'nuevo_promedio': nuevo_promedio})
     else:
         return jsonify({'error': 'No se pudo eliminar el comentario'}), 500
@@ -991,7 +1059,9 @@ def editar_comentario(salon_id, review_id):
     review = db.actualizar_review(salon_id, review_id, nuevo_comentario, nuevo_rating, nuevo_nombre)
 
     if review:
-        print(f"✅ Comentario actualizado en salón {salon_id}")
+        catalogo.invalidar()
+        autocompletar.actualizar_salon(salon_id)
+        log.info("✅ Comentario actualizado en salón %s", salon_id)
         return jsonify({'success': True, 'review': review})
     else:
         return jsonify({'error': 'No se pudo actualizar el comentario'}), 500
@@ -1008,13 +1078,16 @@ def cambiar_visibilidad(salon_id):
         visible = data.get('visible', True)
         
         if db.cambiar_visibilidad_salon(salon_id, visible):
+            catalogo.invalidar()
+            cercania.actualizar_salon(salon_id)
+            autocompletar.actualizar_salon(salon_id)
             estado = "visible" if visible else "oculto"
-            print(f"✅ Salón {salon_id} ahora está {estado}")
+            log.info("✅ Salón %s ahora está %s", salon_id, estado)
             return jsonify({'success': True, 'message': f'El salón ahora está {estado}', 'visible': visible})
         else:
             return jsonify({'success': False, 'message': 'No se pudo cambiar la visibilidad'}), 500
     except Exception as e:
-        print(f"❌ Error al cambiar visibilidad: {str(e)}")
+        log.error("❌ Error al cambiar visibilidad: %s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
@@ -1026,68 +1099,97 @@ def eliminar_salon_route(salon_id):
     
     try:
         if db.eliminar_salon(salon_id):
-            print(f"✅ Salón {salon_id} eliminado")
+            catalogo.invalidar()
+            cercania.quitar(salon_id)
+            autocompletar.quitar(salon_id)
+            horarios.quitar(salon_id)
+            log.info("✅ Salón %s eliminado", salon_id)
             return jsonify({'success': True, 'message': 'El salón fue eliminado correctamente'})
         else:
             return jsonify({'success': False, 'message': 'No se pudo eliminar el salón'}), 500
     except Exception as e:
-        print(f"❌ Error al eliminar salón: {str(e)}")
+        log.error("❌ Error al eliminar salón: %s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
-# ============================================
-# RUTAS API (para JavaScript)
-# ============================================
 
-@app.route('/api/salones')
-def api_salones():
-    """API: Obtener todos los salones visibles"""
-    try:
-        salones = db.obtener_todos_salones()
-        
-        # Filtrar solo salones visibles
-        salones_visibles = [s for s in salones if s.get('visible', 0) == 1]
-        
-        # Formatear para JavaScript
-        resultados = []
-        for salon in salones_visibles:
-            resultados.append({
-                'id': salon['id'],
-                'name': salon.get('nombre', salon.get('name', 'Sin nombre')),
-                'address': salon.get('direccion', salon.get('address', 'Sin dirección')),
-                'category': salon.get('categoria', salon.get('category', 'Salón Infantil')),
-                'rating': float(salon.get('promedio', salon.get('rating', 0))),
-                'folder': salon.get('carpeta_fotos', salon.get('folder', f"salon{salon['id']}")),
-            })
-        
-        print(f"✅ API: Enviando {len(resultados)} salones")
-        return jsonify(resultados)
-        
-    except Exception as e:
-        print(f"❌ Error en API salones: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify([]), 500
 
+# ============ EXPORTACIÓN (ADMIN) ============
+
+def _respuesta_exportacion(exportar, columnas):
+    """Respuesta en streaming: ni la tabla ni el archivo pasan enteros por memoria"""
+    formato = request.args.get('formato', 'ndjson').lower()
+    if formato not in exportacion.FORMATOS:
+        return jsonify({'error': f"Formato desconocido: '{formato}'. Válidos: {', '.join(exportacion.FORMATOS)}"}), 400
+
+    lotes = exportar()
+    if lotes is None:
+        return jsonify({'error': 'Base de datos no disponible'}), 503
+
+    log.info("📤 Exportando %s (%s)", lotes.tabla, formato)
+    nombre = f"kinderfiesta-{lotes.tabla}-{datetime.now():%Y%m%d}.{formato}"
+    respuesta = Response(
+        exportacion.generar(lotes, formato, columnas),
+        content_type=exportacion.FORMATOS[formato],
+        headers={
+            'Content-Disposition': f'attachment; filename="{nombre}"',
+            'Cache-Control': 'no-store',
+        },
+    )
+    # La conexión vuelve al pool aunque el cuerpo no se lea entero
+    respuesta.call_on_close(lotes.close)
+    return respuesta
+
+
+@app.route('/api/admin/export/salones')
+def exportar_salones():
+    """Todos los salones (también los ocultos) en NDJSON o CSV"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'No autorizado'}), 401
+    return _respuesta_exportacion(db.exportar_salones, db.COLUMNAS_SALON)
+
+
+@app.route('/api/admin/export/reviews')
+def exportar_reviews():
+    """Todas las reviews en NDJSON o CSV"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'No autorizado'}), 401
+    return _respuesta_exportacion(db.exportar_reviews, db.COLUMNAS_EXPORTAR_REVIEWS)
+
+
+# ============ IMPORTACIÓN MASIVA (ADMIN) ============
+
+@app.route('/api/admin/importar', methods=['POST'])
+def importar_salones():
+    """Salones desde un CSV/JSON/NDJSON de socios (probar=1: solo valida). Ver importacion.py"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'No autorizado'}), 401
+
+    import importacion
+
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        return jsonify({'success': False, 'message': 'Falta el archivo'}), 400
+    probar = request.form.get('probar', '').lower() in ('1', 'true', 'si', 'sí', 'on')
 
-@app.route('/api/stats')
-def api_stats():
-    """API: Obtener estadísticas para la página de inicio"""
     try:
-        stats = db.obtener_estadisticas()
-        
-        print(f"✅ API: Enviando estadísticas - Familias: {stats['familias']}, Salones: {stats['salones']}")
-        return jsonify(stats)
-        
+        formato = importacion.formato_de(archivo.filename)
+        # archivo.stream: werkzeug lo pasa a un temporal si es grande, se lee por filas
+        reporte = importacion.importar(archivo.stream, formato, probar=probar)
+    except importacion.ArchivoInvalido as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except ConnectionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
     except Exception as e:
-        print(f"❌ Error en API stats: {e}")
-        # Valores por defecto si hay error
-        return jsonify({
-            'familias': 1,
-            'salones': 5,
-            'satisfaccion': 98,
-            'tiempo_respuesta': '24h'
-        })
+        log.error("❌ Error al importar salones: %s", e)
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+    return jsonify({'success': True, **reporte})
+
 
 if __name__ == '__main__':
+    # En desarrollo se ve todo lo que antes salía por print()
+    bitacora.configurar('INFO')
+    # y cada SQL distinto pasa por EXPLAIN (ver logs/consultas_lentas.log)
+    consultas_lentas.activar_modo_desarrollo()
     print("\n" + "=" * 60)
     print("🚀 INICIANDO KINDERFIESTA")
     print("=" * 60)
@@ -1097,7 +1199,7 @@ if __name__ == '__main__':
         print("=" * 60)
         print("🌐 Servidor corriendo en http://127.0.0.1:5000")
         print("=" * 60 + "\n")
-        app.run(debug=True, port=5000)
+        crear_app().run(debug=True, port=5000)
     else:
         print("❌ Error: No se pudo conectar a la base de datos")
         print("Verifica tu configuración en database.py")
@@ -0,0 +1,195 @@
+"""
+KINDERFIESTA - Modo async (ASGI)
+Opcional: la app normal sigue siendo `gunicorn 'app:crear_app()'`.
+
+    uvicorn asgi:app --workers 2
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+
+Las APIs de lectura que más se piden desde celulares se atienden con
+handlers async y un pool de aiomysql (database_async.py): mientras MySQL
+responde, el mismo proceso sigue atendiendo a otros clientes lentos.
+    /api/salones, /api/salon/<id>, /api/testimonios, /api/stats
+
+Todo lo demás (páginas, login, admin, formularios) pasa sin cambios a la
+app Flask de siempre, que corre en un pool de hilos (asgiref.WsgiToAsgi).
+
+Las respuestas async son idénticas a las de Flask: mismo JSON, misma
+compresión (compresion.py), mismas métricas y presupuesto de consultas.
+
+Dependencias opcionales: pip install aiomysql asgiref uvicorn
+"""
+
+import asyncio
+import re
+import time
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+
+import bitacora
+import catalogo
+import compresion
+import database_async
+import metricas
+import presupuesto_consultas
+import respaldo
+from app import crear_app
+
+log = bitacora.obtener_logger('asgi')
+
+# Por encima de esto la compresión va a un hilo para no frenar el event loop
+COMPRIMIR_EN_HILO = 64 * 1024
+
+
+# ============ HANDLERS ASYNC ============
+# Cada uno devuelve (código, datos) igual que su versión Flask en app.py
+
+async def get_salones(parametros):
+    try:
+        try:
+            campos = catalogo.parsear_campos(parametros.get('fields'))
+            franja = catalogo.parsear_horario(parametros)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+
+        salones = await catalogo.listar_salones_async(campos, franja=franja)
+
+        log.info("✅ API /salones: %s salones retornados", len(salones))
+        return 200, salones
+    except Exception as e:
+        log.error("❌ Error en /api/salones: %s", e)
+        return 500, {'error': str(e)}
+
+
+async def get_salon(parametros, salon_id):
+    salon_id = int(salon_id)
+    try:
+        try:
+            campos = catalogo.parsear_campos(parametros.get('fields'))
+        except ValueError as e:
+            return 400, {'error': str(e)}
+
+        salon = await catalogo.obtener_salon_async(salon_id, campos)
+
+        if salon:
+            log.info("✅ Salón obtenido: %s", salon_id)
+            return 200, salon
+
+        log.info("❌ Salón no encontrado o no visible: %s", salon_id)
+        return 404, {'error': 'Salón no encontrado'}
+    except Exception as e:
+        log.error("❌ Error en /api/salon/%s: %s", salon_id, e)
+        return 500, {'error': str(e)}
+
+
+async def api_testimonios(parametros):
+    try:
+        testimonios = await catalogo.obtener_testimonios_async(limite=10)
+
+        log.info("✅ API /api/testimonios: Enviando %s testimonios", len(testimonios))
+        return 200, testimonios
+    except Exception as e:
+        log.exception("❌ Error en API /api/testimonios: %s", e)
+        return 500, []
+
+
+async def get_stats(parametros):
+    try:
+        stats = await catalogo.obtener_estadisticas_async()
+
+        log.info("✅ Stats: %s usuarios, %s salones, %s%% satisfacción",
+                 stats['familias'], stats['salones'], stats['satisfaccion'])
+        return 200, catalogo.formato_estadisticas(stats)
+    except Exception as e:
+        log.error("❌ Error en /api/stats: %s", e)
+        return 500, catalogo.ESTADISTICAS_API_ERROR
+
+
+# (patrón, regla de Flask, endpoint de Flask, handler). La regla y el
+# endpoint son los de app.py, así métricas y presupuestos no se duplican.
+RUTAS = (
+    (re.compile(r'^/api/salones$'), '/api/salones', 'get_salones', get_salones),
+    (re.compile(r'^/api/salon/(\d+)$'), '/api/salon/<int:salon_id>', 'get_salon', get_salon),
+    (re.compile(r'^/api/testimonios$'), '/api/testimonios', 'api_testimonios', api_testimonios),
+    (re.compile(r'^/api/stats$'), '/api/stats', 'get_stats', get_stats),
+)
+
+
+# ============ APLICACIÓN ASGI ============
+
+def _cabecera(scope, nombre):
+    for clave, valor in scope.get('headers', ()):
+        if clave == nombre:
+            return valor.decode('latin-1')
+    return ''
+
+
+class AppASGI:
+    """Despacha las rutas async y delega el resto en la app Flask"""
+
+    def __init__(self, wsgi_app):
+        self.flask_app = wsgi_app
+        self._wsgi = WsgiToAsgi(wsgi_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            for patron, regla, endpoint, handler in RUTAS:
+                coincidencia = patron.match(scope['path'])
+                if coincidencia:
+                    await self._atender(scope, send, regla, endpoint, handler, coincidencia.groups())
+                    return
+        await self._wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                # Si MySQL no está, el pool se reintenta en la primera consulta
+                await database_async.iniciar_pool()
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                await database_async.cerrar_pool()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _atender(self, scope, send, regla, endpoint, handler, argumentos):
+        inicio = time.perf_counter()
+        presupuesto_consultas.iniciar(estricto=self.flask_app.testing)
+        respaldo.iniciar()
+        parametros = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+
+        codigo, datos = await handler(parametros, *argumentos)
+
+        # Igual que jsonify() fuera de debug: JSON compacto + salto de línea
+        cuerpo = (self.flask_app.json.dumps(datos, separators=(',', ':')) + '\n').encode('utf-8')
+        cabeceras = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding')]
+        for nombre, valor in respaldo.cabeceras():
+            cabeceras.append((nombre.lower().encode('latin-1'), valor.encode('latin-1')))
+
+        codificacion = None
+        if len(cuerpo) >= compresion.TAMANO_MINIMO:
+            codificacion = compresion.negociar(_cabecera(scope, b'accept-encoding'))
+        if codificacion:
+            if len(cuerpo) > COMPRIMIR_EN_HILO:
+                cuerpo = await asyncio.to_thread(compresion.comprimir, cuerpo, codificacion)
+            else:
+                cuerpo = compresion.comprimir(cuerpo, codificacion)
+            cabeceras.append((b'content-encoding', codificacion.encode('latin-1')))
+
+        # Como flask_cors con la configuración por defecto de app.py
+        if _cabecera(scope, b'origin'):
+            cabeceras.append((b'access-control-allow-origin', b'*'))
+        cabeceras.append((b'content-length', str(len(cuerpo)).encode('latin-1')))
+
+        await send({'type': 'http.response.start', 'status': codigo, 'headers': cabeceras})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else cuerpo})
+
+        metricas.HTTP_DURACION.observar(time.perf_counter() - inicio, endpoint, scope['method'])
+        metricas.HTTP_RESPUESTAS.inc(endpoint, codigo)
+        presupuesto_consultas.terminar(regla)
+
+
+app = AppASGI(crear_app())
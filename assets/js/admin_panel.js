@@ -0,0 +1,414 @@
+let salones = [];
+let salonSeleccionado = null;
+let salonesFiltrados = [];
+let editandoSalonId = null;
+let editandoReviewId = null;
+
+// Cargar salones
+async function cargarSalones() {
+    try {
+        // Los datos vienen en el HTML; el código está en el paquete cacheable
+        salones = JSON.parse(document.getElementById('datos-salones').textContent);
+        salonesFiltrados = salones;
+
+        console.log('✅ Salones cargados:', salones.length);
+
+        actualizarStats();
+        mostrarListaSalones();
+
+        if (salones.length > 0) {
+            seleccionarSalon(salones[0].id);
+        }
+    } catch (error) {
+        console.error('❌ Error al cargar salones:', error);
+        document.getElementById('salonesListContainer').innerHTML = `
+            <div class="no-comentarios">
+                <i class="fas fa-exclamation-triangle"></i>
+                <p>Error al cargar salones</p>
+                <button class="btn-action btn-primary" onclick="location.reload()" style="margin-top: 15px;">
+                    <i class="fas fa-sync-alt"></i> Reintentar
+                </button>
+            </div>
+        `;
+    }
+}
+
+// Actualizar estadísticas
+function actualizarStats() {
+    const visibles = salones.filter(s => s.visible === 1).length;
+    const ocultos = salones.length - visibles;
+    const totalComentarios = salones.reduce((sum, s) => sum + (s.reviews ? s.reviews.length : 0), 0);
+
+    document.getElementById('totalSalones').textContent = salones.length;
+    document.getElementById('salonesVisibles').textContent = visibles;
+    document.getElementById('salonesOcultos').textContent = ocultos;
+    document.getElementById('totalComentarios').textContent = totalComentarios;
+}
+
+// Mostrar lista de salones
+function mostrarListaSalones() {
+    const container = document.getElementById('salonesListContainer');
+    document.getElementById('salonCount').textContent = salonesFiltrados.length;
+
+    if (salonesFiltrados.length === 0) {
+        container.innerHTML = `
+            <div class="no-comentarios">
+                <i class="fas fa-search"></i>
+                <p>No se encontraron salones</p>
+            </div>
+        `;
+        return;
+    }
+
+    container.innerHTML = salonesFiltrados.map(salon => {
+        const rating = salon.rating ? parseFloat(salon.rating) : 0;
+        const reviewCount = salon.reviews ? salon.reviews.length : 0;
+
+        return `
+            <div class="salon-item ${salonSeleccionado === salon.id ? 'active' : ''}" onclick="seleccionarSalon(${salon.id})">
+                <div class="salon-item-header">
+                    <h4>${salon.name}</h4>
+                    <span class="salon-badge ${salon.visible === 1 ? 'badge-visible' : 'badge-oculto'}">
+                        ${salon.visible === 1 ? 'Visible' : 'Oculto'}
+                    </span>
+                </div>
+                <div class="salon-item-info">
+                    <span><i class="fas fa-star"></i> ${rating.toFixed(1)}</span>
+                    <span><i class="fas fa-comments"></i> ${reviewCount}</span>
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
+// Seleccionar salón
+function seleccionarSalon(salonId) {
+    salonSeleccionado = salonId;
+    const salon = salones.find(s => s.id === salonId);
+
+    if (!salon) return;
+
+    const rating = salon.rating ? parseFloat(salon.rating) : 0;
+    const estrellas = '★'.repeat(Math.floor(rating)) + '☆'.repeat(5 - Math.floor(rating));
+
+    document.getElementById('salonDetailContainer').innerHTML = `
+        <div class="salon-detail-header">
+            <div class="salon-detail-title">
+                <h2>${salon.name}</h2>
+                <p>${salon.category}</p>
+            </div>
+            <div class="salon-actions">
+                <button class="btn-icon btn-toggle" onclick="toggleVisibilidad(${salon.id})" title="${salon.visible === 1 ? 'Ocultar' : 'Mostrar'}">
+                    <i class="fas fa-${salon.visible === 1 ? 'eye-slash' : 'eye'}"></i>
+                </button>
+                <button class="btn-icon btn-delete" onclick="eliminarSalon(${salon.id})" title="Eliminar">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </div>
+
+        <div class="info-grid">
+            <div class="info-item">
+                <i class="fas fa-map-marker-alt"></i>
+                <div class="info-item-content">
+                    <h4>Dirección</h4>
+                    <p>${salon.address}</p>
+                </div>
+            </div>
+            <div class="info-item">
+                <i class="fas fa-phone"></i>
+                <div class="info-item-content">
+                    <h4>Teléfono</h4>
+                    <p>${salon.phone}</p>
+                </div>
+            </div>
+            <div class="info-item">
+                <i class="fas fa-star"></i>
+                <div class="info-item-content">
+                    <h4>Calificación</h4>
+                    <p>${estrellas} ${rating.toFixed(1)}/5.0</p>
+                </div>
+            </div>
+            <div class="info-item">
+                <i class="fas fa-comments"></i>
+                <div class="info-item-content">
+                    <h4>Comentarios</h4>
+                    <p>${salon.reviews ? salon.reviews.length : 0} reseñas</p>
+                </div>
+            </div>
+        </div>
+
+        <div class="comentarios-section">
+            <h3><i class="fas fa-comments"></i> Comentarios</h3>
+            ${mostrarComentarios(salon)}
+        </div>
+    `;
+
+    mostrarListaSalones();
+}
+
+// Mostrar comentarios
+function mostrarComentarios(salon) {
+    if (!salon.reviews || salon.reviews.length === 0) {
+        return '<div class="no-comentarios"><i class="fas fa-comment-slash"></i><p>No hay comentarios</p></div>';
+    }
+
+    return salon.reviews.map(review => {
+        const iniciales = review.nombre.split(' ').map(n => n[0]).join('').substring(0, 2);
+        const estrellas = '★'.repeat(review.rating) + '☆'.repeat(5 - review.rating);
+        const fecha = new Date(review.fecha).toLocaleDateString('es-ES');
+
+        return `
+            <div class="comentario-card">
+                <div class="comentario-header">
+                    <div class="comentario-user">
+                        <div class="comentario-avatar">${iniciales}</div>
+                        <div class="comentario-info">
+                            <h5>${review.nombre}</h5>
+                            <div class="comentario-rating">${estrellas}</div>
+                        </div>
+                    </div>
+                    <div class="comentario-actions">
+                        <button class="btn-small btn-edit" onclick="editarComentario(${salon.id}, ${review.id})">
+                            <i class="fas fa-edit"></i> Editar
+                        </button>
+                        <button class="btn-small btn-remove" onclick="eliminarComentario(${salon.id}, ${review.id})">
+                            <i class="fas fa-trash"></i> Eliminar
+                        </button>
+                    </div>
+                </div>
+                <p class="comentario-texto">"${review.comentario}"</p>
+                <p class="comentario-fecha">${fecha}</p>
+            </div>
+        `;
+    }).join('');
+}
+
+// Filtrar salones
+function filtrarSalones() {
+    const search = document.getElementById('searchInput').value.toLowerCase();
+    const visibility = document.getElementById('visibilityFilter').value;
+    const rating = document.getElementById('ratingFilter').value;
+
+    salonesFiltrados = salones.filter(salon => {
+        const matchSearch = !search || 
+            salon.name.toLowerCase().includes(search) ||
+            salon.address.toLowerCase().includes(search) ||
+            salon.category.toLowerCase().includes(search);
+
+        const matchVisibility = !visibility || salon.visible === parseInt(visibility);
+
+        const salonRating = salon.rating ? parseFloat(salon.rating) : 0;
+        const matchRating = !rating || salonRating >= parseInt(rating);
+
+        return matchSearch && matchVisibility && matchRating;
+    });
+
+    mostrarListaSalones();
+}
+
+// Limpiar filtros
+function limpiarFiltros() {
+    document.getElementById('searchInput').value = '';
+    document.getElementById('visibilityFilter').value = '';
+    document.getElementById('ratingFilter').value = '';
+    salonesFiltrados = salones;
+    mostrarListaSalones();
+}
+
+// Toggle visibilidad
+async function toggleVisibilidad(salonId) {
+    const salon = salones.find(s => s.id === salonId);
+    const nuevoEstado = salon.visible === 1 ? 0 : 1;
+
+    try {
+        const response = await fetch(`/api/admin/salon/${salonId}/visibilidad`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ visible: nuevoEstado === 1 })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            salon.visible = nuevoEstado;
+            actualizarStats();
+            seleccionarSalon(salonId);
+            alert(`✅ Salón ${nuevoEstado === 1 ? 'visible' : 'oculto'} exitosamente`);
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('❌ Error al cambiar visibilidad');
+    }
+}
+
+// Eliminar salón
+async function eliminarSalon(salonId) {
+    if (!confirm('¿Estás seguro de eliminar este salón? Esta acción no se puede deshacer.')) return;
+
+    try {
+        const response = await fetch(`/api/admin/salon/${salonId}`, {
+            method: 'DELETE'
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            salones = salones.filter(s => s.id !== salonId);
+            salonesFiltrados = salonesFiltrados.filter(s => s.id !== salonId);
+            actualizarStats();
+            mostrarListaSalones();
+            document.getElementById('salonDetailContainer').innerHTML = `
+                <div class="empty-state">
+                    <i class="fas fa-hand-pointer"></i>
+                    <h3>Selecciona un salón</h3>
+                </div>
+            `;
+            alert('✅ Salón eliminado exitosamente');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('❌ Error al eliminar salón');
+    }
+}
+
+// Eliminar comentario
+async function eliminarComentario(salonId, reviewId) {
+    if (!confirm('¿Eliminar este comentario?')) return;
+
+    try {
+        const response = await fetch(`/api/admin/comentario/${salonId}/${reviewId}`, {
+            method: 'DELETE'
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            const salon = salones.find(s => s.id === salonId);
+            salon.reviews = salon.reviews.filter(r => r.id !== reviewId);
+            salon.rating = data.nuevo_promedio;
+            seleccionarSalon(salonId);
+            actualizarStats();
+            alert('✅ Comentario eliminado');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('❌ Error al eliminar comentario');
+    }
+}
+
+// MODAL EDITAR - Abrir
+function editarComentario(salonId, reviewId) {
+    const salon = salones.find(s => s.id === salonId);
+    const review = salon.reviews.find(r => r.id === reviewId);
+
+    editandoSalonId = salonId;
+    editandoReviewId = reviewId;
+
+    // Llenar formulario
+    document.getElementById('editNombre').value = review.nombre;
+    document.getElementById('editRating').value = review.rating;
+    document.getElementById('editComentario').value = review.comentario;
+    document.getElementById('charCount').textContent = review.comentario.length;
+
+    // Marcar rating
+    document.querySelectorAll('.rating-option').forEach(opt => {
+        opt.classList.remove('active');
+        if (parseInt(opt.dataset.rating) === review.rating) {
+            opt.classList.add('active');
+        }
+    });
+
+    // Mostrar modal
+    document.getElementById('modalEditarComentario').classList.add('active');
+}
+
+// MODAL EDITAR - Cerrar
+function cerrarModalEditar() {
+    document.getElementById('modalEditarComentario').classList.remove('active');
+    editandoSalonId = null;
+    editandoReviewId = null;
+}
+
+// MODAL EDITAR - Seleccionar rating
+function seleccionarRating(rating) {
+    document.getElementById('editRating').value = rating;
+    document.querySelectorAll('.rating-option').forEach(opt => {
+        opt.classList.remove('active');
+        if (parseInt(opt.dataset.rating) === rating) {
+            opt.classList.add('active');
+        }
+    });
+}
+
+// MODAL EDITAR - Guardar
+function guardarEdicion(event) {
+    event.preventDefault();
+
+    const nuevoNombre = document.getElementById('editNombre').value.trim();
+    const nuevoRating = parseInt(document.getElementById('editRating').value);
+    const nuevoComentario = document.getElementById('editComentario').value.trim();
+
+    if (!nuevoNombre || !nuevoRating || !nuevoComentario) {
+        alert('⚠️ Todos los campos son obligatorios');
+        return;
+    }
+
+    if (nuevoRating < 1 || nuevoRating > 5) {
+        alert('⚠️ La calificación debe estar entre 1 y 5');
+        return;
+    }
+
+    fetch(`/api/admin/comentario/${editandoSalonId}/${editandoReviewId}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            nombre: nuevoNombre,
+            comentario: nuevoComentario,
+            rating: nuevoRating
+        })
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            const salon = salones.find(s => s.id === editandoSalonId);
+            const review = salon.reviews.find(r => r.id === editandoReviewId);
+            review.nombre = nuevoNombre;
+            review.comentario = nuevoComentario;
+            review.rating = nuevoRating;
+
+            seleccionarSalon(editandoSalonId);
+            cerrarModalEditar();
+            alert('✅ Comentario actualizado exitosamente');
+        } else {
+            alert('❌ Error: ' + (data.error || 'No se pudo actualizar'));
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('❌ Error al actualizar el comentario');
+    });
+}
+
+// Contador de caracteres
+document.addEventListener('DOMContentLoaded', function() {
+    const textarea = document.getElementById('editComentario');
+    if (textarea) {
+        textarea.addEventListener('input', function() {
+            document.getElementById('charCount').textContent = this.value.length;
+        });
+    }
+
+    // Cerrar modal al hacer clic fuera
+    const modal = document.getElementById('modalEditarComentario');
+    if (modal) {
+        modal.addEventListener('click', function(e) {
+            if (e.target === modal) {
+                cerrarModalEditar();
+            }
+        });
+    }
+});
+
+// Cargar al inicio
+cargarSalones();
@@ -0,0 +1,237 @@
+// Navbar scroll effect
+window.addEventListener('scroll', function() {
+    const navbar = document.querySelector('.navbar');
+    if (window.scrollY > 50) {
+        navbar.classList.add('scrolled');
+    } else {
+        navbar.classList.remove('scrolled');
+    }
+});
+
+
+// Cargar salones destacados
+async function cargarSalonesDestacados() {
+    try {
+        // Solo los campos que pinta la tarjeta (sin reviews)
+        const response = await fetch('/api/salones?fields=id,name,address,folder,galeria');
+        const salones = await response.json();
+        const destacados = salones.slice(0, 3); // Primeros 3
+
+        const container = document.getElementById('salonesDestacados');
+
+        if (destacados.length === 0) {
+            container.innerHTML = `
+                <div style="text-align: center; padding: 60px 20px; grid-column: 1/-1;">
+                    <i class="fas fa-search" style="font-size: 3em; color: #DDD;"></i>
+                    <p style="margin-top: 20px; color: #999;">No hay salones disponibles</p>
+                </div>
+            `;
+            return;
+        }
+
+        container.innerHTML = destacados.map(salon => {
+            const portada = (salon.galeria && salon.galeria[0]) || { url: `/static/imagenes/${salon.folder}/1.jpg` };
+            return `
+            <div class="salon-card" onclick="window.location.href='/salones'">
+                <div class="verified-badge">
+                    <i class="fas fa-check-circle"></i> Verificado
+                </div>
+                <img src="${portada.url}" 
+                     ${portada.srcset ? `srcset="${portada.srcset}" sizes="(max-width: 768px) 100vw, 400px"` : ''}
+                     ${portada.ancho && portada.alto ? `width="${portada.ancho}" height="${portada.alto}"` : ''}
+                     alt="${salon.name}" 
+                     class="salon-image"
+                     loading="lazy" decoding="async"
+                     onerror="this.removeAttribute('srcset'); this.src='https://via.placeholder.com/400x250/FF6B6B/FFFFFF?text=${encodeURIComponent(salon.name)}'">
+                <div class="salon-content">
+                    <h3 class="salon-name">${salon.name}</h3>
+                    <div class="salon-location">
+                        <i class="fas fa-map-marker-alt"></i>
+                        ${salon.address}
+                    </div>
+                </div>
+            </div>
+        `;
+        }).join('');
+    } catch (error) {
+        console.error('Error al cargar salones:', error);
+        document.getElementById('salonesDestacados').innerHTML = `
+            <div style="text-align: center; padding: 60px 20px; grid-column: 1/-1;">
+                <i class="fas fa-exclamation-triangle" style="font-size: 3em; color: var(--primary-color);"></i>
+                <p style="margin-top: 20px; color: #666;">Error al cargar salones</p>
+            </div>
+        `;
+    }
+}
+
+// ============ TESTIMONIOS ============
+
+let ratingSeleccionado = 0;
+
+// Abrir modal
+function abrirModalTestimonio() {
+    document.getElementById('modalTestimonio').style.display = 'block';
+
+    // Limpiar bandera de sesión
+    fetch('/api/limpiar-modal-testimonio', {method: 'POST'})
+        .catch(err => console.log('No se pudo limpiar la bandera'));
+}
+
+// Cerrar modal
+function cerrarModalTestimonio() {
+    document.getElementById('modalTestimonio').style.display = 'none';
+    document.getElementById('formTestimonio').reset();
+    document.getElementById('contador-caracteres').textContent = '0';
+    ratingSeleccionado = 0;
+    document.querySelectorAll('.estrellas-rating i').forEach(star => {
+        star.classList.remove('active');
+    });
+}
+
+// Sistema de estrellas
+document.querySelectorAll('.estrellas-rating i').forEach(star => {
+    star.addEventListener('click', function() {
+        ratingSeleccionado = parseInt(this.getAttribute('data-rating'));
+        document.getElementById('rating-value').value = ratingSeleccionado;
+
+        // Actualizar estrellas visuales
+        document.querySelectorAll('.estrellas-rating i').forEach((s, index) => {
+            if (index < ratingSeleccionado) {
+                s.classList.add('active');
+            } else {
+                s.classList.remove('active');
+            }
+        });
+    });
+});
+
+// Contador de caracteres
+document.getElementById('comentario-testimonio').addEventListener('input', function() {
+    document.getElementById('contador-caracteres').textContent = this.value.length;
+});
+
+// Enviar testimonio
+document.getElementById('formTestimonio').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const rating = parseInt(document.getElementById('rating-value').value);
+    const comentario = document.getElementById('comentario-testimonio').value.trim();
+    const errorDiv = document.getElementById('error-testimonio');
+
+    // Validaciones
+    if (rating === 0) {
+        errorDiv.textContent = 'Por favor selecciona una calificación';
+        errorDiv.style.display = 'block';
+        return;
+    }
+
+    if (!comentario) {
+        errorDiv.textContent = 'Por favor escribe un comentario';
+        errorDiv.style.display = 'block';
+        return;
+    }
+
+    if (comentario.length > 500) {
+        errorDiv.textContent = 'El comentario no puede superar los 500 caracteres';
+        errorDiv.style.display = 'block';
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/agregar-testimonio', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                rating: rating,
+                comentario: comentario
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            alert('¡Gracias por tu testimonio! 🎉');
+            cerrarModalTestimonio();
+            cargarTestimonios(); // Recargar testimonios
+        } else {
+            errorDiv.textContent = data.message;
+            errorDiv.style.display = 'block';
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        errorDiv.textContent = 'Error al enviar el testimonio';
+        errorDiv.style.display = 'block';
+    }
+});
+
+// Cargar testimonios
+async function cargarTestimonios() {
+    try {
+        const response = await fetch('/api/testimonios');
+        const testimonios = await response.json();
+
+        const container = document.getElementById('testimoniosGrid');
+
+        if (testimonios.length === 0) {
+            container.innerHTML = `
+                <div style="text-align: center; padding: 60px 20px; grid-column: 1/-1;">
+                    <i class="fas fa-comments" style="font-size: 3em; color: #DDD;"></i>
+                    <p style="margin-top: 20px; color: #999;">Sé el primero en dejar un testimonio</p>
+                </div>
+            `;
+            return;
+        }
+
+        container.innerHTML = testimonios.map(t => {
+            const iniciales = t.nombre_usuario.split(' ').map(n => n[0]).join('').substring(0, 2).toUpperCase();
+            const estrellas = '<i class="fas fa-star"></i>'.repeat(t.rating);
+
+            return `
+                <div class="testimonio-card">
+                    <div class="testimonio-stars">${estrellas}</div>
+                    <p class="testimonio-texto">"${t.comentario}"</p>
+                    <div class="testimonio-autor">
+                        <div class="testimonio-avatar">${iniciales}</div>
+                        <div class="testimonio-info">
+                            <h4>${t.nombre_usuario}</h4>
+                            <p>Usuario verificado</p>
+                        </div>
+                    </div>
+                </div>
+            `;
+        }).join('');
+    } catch (error) {
+        console.error('Error al cargar testimonios:', error);
+        document.getElementById('testimoniosGrid').innerHTML = `
+            <div style="text-align: center; padding: 60px 20px; grid-column: 1/-1;">
+                <i class="fas fa-exclamation-triangle" style="font-size: 3em; color: var(--primary-color);"></i>
+                <p style="margin-top: 20px; color: #666;">Error al cargar testimonios</p>
+            </div>
+        `;
+    }
+}
+
+// Cerrar modal al hacer clic fuera
+window.onclick = function(event) {
+    const modal = document.getElementById('modalTestimonio');
+    if (event.target === modal) {
+        cerrarModalTestimonio();
+    }
+}
+
+// ============ INICIALIZAR TODO ============
+
+window.addEventListener('DOMContentLoaded', function() {
+    // Cargar salones y testimonios
+    cargarSalonesDestacados();
+    cargarTestimonios();
+
+    // Abrir modal automáticamente después de registro
+    if (document.body.dataset.modalTestimonio === '1') {
+        setTimeout(function() {
+            abrirModalTestimonio();
+        }, 500);
+    }
+});
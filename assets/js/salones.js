@@ -0,0 +1,475 @@
+    let salones = [];
+    let salonActual = null;
+    let imagenesActuales = [];
+    let imagenActualIndex = 0;
+    let modalImagenIndex = 0;
+    let ratingSeleccionado = 0;
+
+    // Cargar salones desde la API
+    async function cargarSalones() {
+        try {
+            const response = await fetch('/api/salones');
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            const data = await response.json();
+
+            // ✅ AGREGAR VALORES POR DEFECTO PARA EVITAR NULL
+            salones = data.map(salon => ({
+                ...salon,
+                whatsapp: salon.whatsapp || null,
+                google_maps: salon.google_maps || null,
+                phone: salon.phone || 'No disponible',
+                address: salon.address || 'Sin dirección',
+                category: salon.category || 'Salón Infantil',
+                rating: salon.rating || 0,
+                fotos: salon.fotos || ''
+            }));
+
+            console.log('✅ Salones cargados:', salones.length);
+
+            document.getElementById('totalSalones').textContent = salones.length;
+            mostrarSalones(salones);
+
+        } catch (error) {
+            console.error('❌ Error al cargar salones:', error);
+
+            document.getElementById('salonesContainer').innerHTML = `
+                <div style="text-align: center; padding: 60px 20px; grid-column: 1/-1; color: #FF6B6B;">
+                    <i class="fas fa-exclamation-triangle" style="font-size: 3em;"></i>
+                    <p style="margin-top: 20px;"><strong>Error al cargar los salones</strong></p>
+                    <p style="color: #666; font-size: 0.9em; margin-top: 10px;">${error.message}</p>
+                    <button onclick="location.reload()" style="margin-top: 20px; padding: 12px 30px; background: var(--primary-color); color: white; border: none; border-radius: 10px; cursor: pointer; font-weight: 700;">
+                        <i class="fas fa-sync-alt"></i> Recargar Página
+                    </button>
+                </div>
+            `;
+        }
+    }
+
+    // Mostrar salones en el grid
+    function mostrarSalones(salonesAMostrar) {
+        const container = document.getElementById('salonesContainer');
+
+        if (salonesAMostrar.length === 0) {
+            container.innerHTML = `
+                <div style="text-align: center; padding: 60px 20px; grid-column: 1/-1;">
+                    <i class="fas fa-search" style="font-size: 3em; color: #DDD;"></i>
+                    <p style="margin-top: 20px; color: #999;">No se encontraron salones</p>
+                </div>
+            `;
+            return;
+        }
+
+        container.innerHTML = salonesAMostrar.map((salon, posicion) => {
+            const fotos = obtenerFotos(salon);
+            // Solo la primera fila de tarjetas se descarga de inmediato
+            const eager = posicion < 3;
+            const ratingValue = salon.rating ? parseFloat(salon.rating) : 0;
+            const estrellas = generarEstrellas(ratingValue);
+            const totalReviews = salon.reviews ? salon.reviews.length : 0;
+
+            return `
+                <div class="salon-card">
+                    <div class="verified-badge">
+                        <i class="fas fa-check-circle"></i> Verificado
+                    </div>
+                    <div class="salon-carousel" id="carousel-${salon.id}">
+                        ${fotos.map((foto, index) => imagenCarrusel(foto, index, salon, eager, TAMANOS_TARJETA, '400x280')).join('')}
+                        <button class="carousel-btn prev" onclick="event.stopPropagation(); cambiarImagen(${salon.id}, -1)">
+                            <i class="fas fa-chevron-left"></i>
+                        </button>
+                        <button class="carousel-btn next" onclick="event.stopPropagation(); cambiarImagen(${salon.id}, 1)">
+                            <i class="fas fa-chevron-right"></i>
+                        </button>
+                        <div class="carousel-indicators">
+                            ${fotos.map((_, index) => `
+                                <div class="carousel-indicator ${index === 0 ? 'active' : ''}" 
+                                     onclick="event.stopPropagation(); irAImagen(${salon.id}, ${index})"></div>
+                            `).join('')}
+                        </div>
+                    </div>
+                    <div class="salon-content">
+                        <p class="salon-category">${salon.category}</p>
+                        <h3 class="salon-name">${salon.name}</h3>
+                        <div class="salon-location">
+                            <i class="fas fa-map-marker-alt"></i>
+                            ${salon.address}
+                        </div>
+                        <div class="salon-rating">
+                            <div class="stars">${estrellas}</div>
+                            <span class="rating-number">${ratingValue.toFixed(1)}</span>
+                            <span class="rating-count">(${totalReviews} reseñas)</span>
+                        </div>
+                        <div class="salon-phone">
+                            <i class="fas fa-phone"></i>
+                            ${salon.phone}
+                        </div>
+                        <div class="action-buttons">
+                            <button class="btn-action btn-ver-detalles" onclick="abrirDetalles(${salon.id})">
+                                <i class="fas fa-info-circle"></i> Ver Detalles
+                            </button>
+                            <button class="btn-action btn-ver-ubicacion" onclick="abrirUbicacion(${salon.id})">
+                                <i class="fas fa-map-marker-alt"></i> Ver Ubicación
+                            </button>
+                        </div>
+                    </div>
+                </div>
+            `;
+        }).join('');
+    }
+
+    // Tamaño en pantalla de las fotos (para que el navegador elija del srcset)
+    const TAMANOS_TARJETA = '(max-width: 768px) 100vw, 400px';
+    const TAMANOS_MODAL = '(max-width: 900px) 100vw, 800px';
+
+    // Fotos reales del salón (manifiesto del servidor), sin rellenar hasta 5
+    function obtenerFotos(salon) {
+        if (Array.isArray(salon.galeria) && salon.galeria.length > 0) {
+            return salon.galeria.slice(0, 5);
+        }
+        let nombres = [];
+        if (salon.fotos && typeof salon.fotos === 'string') {
+            nombres = salon.fotos.split(',').map(f => f.trim()).filter(f => f);
+        }
+        if (nombres.length === 0) {
+            nombres = ['1.jpg'];
+        }
+        return nombres.slice(0, 5).map(nombre => ({ url: `/static/imagenes/${salon.folder}/${nombre}` }));
+    }
+
+    // <img> de un carrusel: solo la primera tiene src; las demás esperan en data-src
+    function imagenCarrusel(foto, index, salon, eager, sizes, placeholder) {
+        const srcset = foto.srcset ? foto.srcset : '';
+        const fuente = index === 0
+            ? `src="${foto.url}" ${srcset ? `srcset="${srcset}" sizes="${sizes}"` : ''}`
+            : `data-src="${foto.url}" ${srcset ? `data-srcset="${srcset}" sizes="${sizes}"` : ''}`;
+        const dimensiones = foto.ancho && foto.alto ? `width="${foto.ancho}" height="${foto.alto}"` : '';
+        return `
+            <img ${fuente} ${dimensiones}
+                 alt="${salon.name}" 
+                 class="${index === 0 ? 'active' : ''}"
+                 loading="${index === 0 && eager ? 'eager' : 'lazy'}" decoding="async"
+                 onerror="this.removeAttribute('srcset'); this.src='https://via.placeholder.com/${placeholder}/FF6B6B/FFFFFF?text=${encodeURIComponent(salon.name)}'">
+        `;
+    }
+
+    // Descarga diferida: una imagen del carrusel se pide la primera vez que se muestra
+    function cargarImagenDiferida(img) {
+        if (img.dataset.srcset) {
+            img.srcset = img.dataset.srcset;
+            delete img.dataset.srcset;
+        }
+        if (img.dataset.src) {
+            img.src = img.dataset.src;
+            delete img.dataset.src;
+        }
+    }
+
+    // Generar estrellas HTML
+    function generarEstrellas(rating) {
+        const fullStars = Math.floor(rating);
+        const hasHalfStar = rating % 1 >= 0.5;
+        let html = '';
+
+        for (let i = 0; i < fullStars; i++) {
+            html += '<i class="fas fa-star"></i>';
+        }
+        if (hasHalfStar) {
+            html += '<i class="fas fa-star-half-alt"></i>';
+        }
+        const emptyStars = 5 - fullStars - (hasHalfStar ? 1 : 0);
+        for (let i = 0; i < emptyStars; i++) {
+            html += '<i class="far fa-star"></i>';
+        }
+
+        return html;
+    }
+
+    // Cambiar imagen del carrusel
+    function cambiarImagen(salonId, direccion) {
+        const carousel = document.getElementById(`carousel-${salonId}`);
+        const imagenes = carousel.querySelectorAll('img');
+        const indicators = carousel.querySelectorAll('.carousel-indicator');
+
+        let actualIndex = Array.from(imagenes).findIndex(img => img.classList.contains('active'));
+        imagenes[actualIndex].classList.remove('active');
+        indicators[actualIndex].classList.remove('active');
+
+        actualIndex = (actualIndex + direccion + imagenes.length) % imagenes.length;
+
+        cargarImagenDiferida(imagenes[actualIndex]);
+        imagenes[actualIndex].classList.add('active');
+        indicators[actualIndex].classList.add('active');
+    }
+
+    // Ir a imagen específica
+    function irAImagen(salonId, index) {
+        const carousel = document.getElementById(`carousel-${salonId}`);
+        const imagenes = carousel.querySelectorAll('img');
+        const indicators = carousel.querySelectorAll('.carousel-indicator');
+
+        imagenes.forEach(img => img.classList.remove('active'));
+        indicators.forEach(ind => ind.classList.remove('active'));
+
+        cargarImagenDiferida(imagenes[index]);
+        imagenes[index].classList.add('active');
+        indicators[index].classList.add('active');
+    }
+
+    // ✅ ABRIR MODAL DE DETALLES - CORREGIDO
+    function abrirDetalles(salonId) {
+        salonActual = salones.find(s => s.id === salonId);
+        if (!salonActual) return;
+
+        const ratingValue = salonActual.rating ? parseFloat(salonActual.rating) : 0;
+
+        // Cargar información básica
+        document.getElementById('modalNombre').textContent = salonActual.name;
+        document.getElementById('modalCategoria').textContent = salonActual.category;
+        document.getElementById('modalDireccion').textContent = salonActual.address;
+        document.getElementById('modalTelefono').textContent = salonActual.phone;
+        document.getElementById('modalStars').innerHTML = generarEstrellas(ratingValue);
+        document.getElementById('modalRating').textContent = ratingValue.toFixed(1);
+        document.getElementById('modalReviewCount').textContent = `(${salonActual.reviews ? salonActual.reviews.length : 0} reseñas)`;
+
+        // Cargar carrusel de imágenes
+        imagenesActuales = obtenerFotos(salonActual);
+        modalImagenIndex = 0;
+        cargarCarruselModal();
+
+        // ✅ CONFIGURAR WHATSAPP Y TELÉFONO
+        const whatsappContainer = document.getElementById('whatsappContainer');
+        const whatsappBtn = document.getElementById('whatsappBtn');
+        const whatsappText = document.getElementById('whatsappText');
+
+        if (salonActual.whatsapp && salonActual.whatsapp !== 'null' && salonActual.whatsapp !== '') {
+            whatsappContainer.style.display = 'block';
+            whatsappBtn.href = `https://wa.me/591${salonActual.whatsapp}`;
+            whatsappText.textContent = salonActual.whatsapp;
+        } else {
+            whatsappContainer.style.display = 'none';
+        }
+
+        const telefonoBtn = document.getElementById('telefonoBtn');
+        const telefonoText = document.getElementById('telefonoText');
+
+        if (salonActual.phone && salonActual.phone !== 'null' && salonActual.phone !== '' && salonActual.phone !== 'No disponible') {
+            telefonoBtn.href = `tel:+591${salonActual.phone}`;
+            telefonoBtn.style.background = 'var(--primary-color)';
+            telefonoBtn.style.cursor = 'pointer';
+            telefonoText.textContent = salonActual.phone;
+        } else {
+            telefonoBtn.href = '#';
+            telefonoBtn.style.background = '#999';
+            telefonoBtn.style.cursor = 'not-allowed';
+            telefonoBtn.onclick = function(e) { e.preventDefault(); };
+            telefonoText.innerHTML = '<i class="fas fa-phone-slash"></i> No disponible';
+        }
+
+        // Cargar comentarios
+        cargarComentarios();
+
+        // Resetear tabs
+        document.querySelectorAll('.tab-btn').forEach(btn => btn.classList.remove('active'));
+        document.querySelectorAll('.tab-content').forEach(content => content.classList.remove('active'));
+        document.querySelectorAll('.tab-btn')[0].classList.add('active');
+        document.getElementById('tab-detalles').classList.add('active');
+
+        // Mostrar modal
+        document.getElementById('modalDetalles').style.display = 'block';
+        document.body.style.overflow = 'hidden';
+    }
+
+    // ✅ ABRIR GOOGLE MAPS REAL
+// ✅ ABRIR GOOGLE MAPS REAL - VERSIÓN FINAL
+// ✅ ABRIR GOOGLE MAPS REAL - VERSIÓN FINAL
+function abrirUbicacion(salonId) {
+    const salon = salones.find(s => s.id === salonId);
+    if (!salon) {
+        console.error('❌ Salón no encontrado');
+        return;
+    }
+
+    console.log('🗺️ Abriendo ubicación para:', salon.name);
+    console.log('🔗 Google Maps URL:', salon.google_maps);
+
+    // Verificar si tiene google_maps válido
+    if (salon.google_maps && 
+        salon.google_maps !== 'null' && 
+        salon.google_maps !== '' && 
+        salon.google_maps.startsWith('http')) {
+
+        console.log('✅ Abriendo enlace directo de Google Maps');
+        window.open(salon.google_maps, '_blank');
+    } else {
+        console.log('⚠️ No hay enlace de Google Maps, buscando por dirección');
+        const searchQuery = encodeURIComponent(`${salon.name}, ${salon.address}, El Alto, Bolivia`);
+        const searchUrl = `https://www.google.com/maps/search/?api=1&query=${searchQuery}`;
+        window.open(searchUrl, '_blank');
+    }
+}
+
+
+    // Cargar carrusel del modal
+    function cargarCarruselModal() {
+        const modalCarousel = document.getElementById('modalCarousel');
+        const modalIndicators = document.getElementById('modalIndicators');
+
+        modalCarousel.innerHTML = imagenesActuales.map((foto, index) =>
+            imagenCarrusel(foto, index, salonActual, true, TAMANOS_MODAL, '800x500')
+        ).join('');
+
+        modalIndicators.innerHTML = imagenesActuales.map((_, index) => `
+            <div class="carousel-indicator ${index === 0 ? 'active' : ''}" onclick="irAImagenModal(${index})"></div>
+        `).join('');
+    }
+
+    // Cambiar imagen modal
+    function cambiarImagenModal(direccion) {
+        const imagenes = document.querySelectorAll('#modalCarousel img');
+        const indicators = document.querySelectorAll('#modalIndicators .carousel-indicator');
+
+        imagenes[modalImagenIndex].classList.remove('active');
+        indicators[modalImagenIndex].classList.remove('active');
+
+        modalImagenIndex = (modalImagenIndex + direccion + imagenesActuales.length) % imagenesActuales.length;
+
+        cargarImagenDiferida(imagenes[modalImagenIndex]);
+        imagenes[modalImagenIndex].classList.add('active');
+        indicators[modalImagenIndex].classList.add('active');
+    }
+
+    // Ir a imagen específica del modal
+    function irAImagenModal(index) {
+        const imagenes = document.querySelectorAll('#modalCarousel img');
+        const indicators = document.querySelectorAll('#modalIndicators .carousel-indicator');
+
+        imagenes[modalImagenIndex].classList.remove('active');
+        indicators[modalImagenIndex].classList.remove('active');
+
+        modalImagenIndex = index;
+
+        cargarImagenDiferida(imagenes[modalImagenIndex]);
+        imagenes[modalImagenIndex].classList.add('active');
+        indicators[modalImagenIndex].classList.add('active');
+    }
+
+    // Cerrar modal
+    function cerrarModal() {
+        document.getElementById('modalDetalles').style.display = 'none';
+        document.body.style.overflow = 'auto';
+    }
+
+    // Cambiar tabs
+    function cambiarTab(event, tabName) {
+        document.querySelectorAll('.tab-btn').forEach(btn => btn.classList.remove('active'));
+        document.querySelectorAll('.tab-content').forEach(content => content.classList.remove('active'));
+
+        event.currentTarget.classList.add('active');
+        document.getElementById(`tab-${tabName}`).classList.add('active');
+    }
+
+    // Cargar comentarios
+    function cargarComentarios() {
+        const comentariosList = document.getElementById('comentariosList');
+        const reviews = salonActual.reviews || [];
+
+        if (reviews.length === 0) {
+            comentariosList.innerHTML = `
+                <div style="text-align: center; padding: 40px; color: #999;">
+                    <i class="fas fa-comments" style="font-size: 3em; margin-bottom: 15px;"></i>
+                    <p>No hay comentarios todavía. ¡Sé el primero en comentar!</p>
+                </div>
+            `;
+            return;
+        }
+
+        comentariosList.innerHTML = reviews.map(review => {
+            const inicial = review.nombre ? review.nombre.charAt(0).toUpperCase() : 'U';
+            const estrellas = generarEstrellas(review.rating || 0);
+
+            return `
+                <div class="comentario-card">
+                    <div class="comentario-header">
+                        <div class="comentario-avatar">${inicial}</div>
+                        <div class="comentario-info">
+                            <h4>${review.nombre || 'Usuario'}</h4>
+                            <div class="stars" style="font-size: 0.9em; color: var(--accent-color);">${estrellas}</div>
+                            <p class="comentario-fecha">${new Date(review.fecha).toLocaleDateString('es-BO')}</p>
+                        </div>
+                    </div>
+                    <p class="comentario-texto">${review.comentario}</p>
+                </div>
+            `;
+        }).join('');
+    }
+
+    // Toggle formulario comentario
+    function toggleFormComentario() {
+        const form = document.getElementById('formComentario');
+        form.classList.toggle('active');
+    }
+
+// Aplicar filtros
+function aplicarFiltros() {
+    const busqueda = document.getElementById('searchInput').value.toLowerCase();
+    const zona = document.getElementById('zonaFilter').value;
+    const ratingMinimo = parseFloat(document.getElementById('ratingFilter').value);
+
+    console.log('Filtros aplicados:', { busqueda, zona, ratingMinimo });
+
+    const filtrados = salones.filter(salon => {
+        // Búsqueda por nombre
+        const matchBusqueda = !busqueda || 
+            (salon.name && salon.name.toLowerCase().includes(busqueda));
+
+        // Filtro por zona (locationCode en BD)
+        const matchZona = !zona || 
+            (salon.locationCode && salon.locationCode === zona) ||
+            (salon.address && salon.address.toLowerCase().includes(zona.toLowerCase()));
+
+        // Filtro por rating
+        const salonRating = salon.rating ? parseFloat(salon.rating) : 0;
+        const matchRating = !ratingMinimo || salonRating >= ratingMinimo;
+
+        return matchBusqueda && matchZona && matchRating;
+    });
+
+    console.log(`Resultados: ${filtrados.length} de ${salones.length} salones`);
+
+    document.getElementById('totalSalones').textContent = filtrados.length;
+    mostrarSalones(filtrados);
+}
+
+
+    // Inicializar estrellas
+    document.querySelectorAll('#estrellas-input i').forEach((estrella, index) => {
+        estrella.addEventListener('click', function() {
+            ratingSeleccionado = index + 1;
+            document.getElementById('comentarioRating').value = ratingSeleccionado;
+
+            document.querySelectorAll('#estrellas-input i').forEach((e, i) => {
+                if (i < ratingSeleccionado) {
+                    e.classList.add('active');
+                } else {
+                    e.classList.remove('active');
+                }
+            });
+        });
+    });
+
+    // Contador de caracteres
+    const comentarioTexto = document.getElementById('comentarioTexto');
+    const contador = document.getElementById('contador');
+
+    if (comentarioTexto) {
+        comentarioTexto.addEventListener('input', function() {
+            contador.textContent = this.value.length;
+        });
+    }
+
+    // Cargar salones al iniciar
+    window.addEventListener('DOMContentLoaded', cargarSalones);
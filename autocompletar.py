@@ -0,0 +1,365 @@
+"""
+KINDERFIESTA - Sugerencias mientras se escribe (/api/autocomplete?q=)
+Trie en memoria con las palabras (sin acentos y en minúsculas) de los
+nombres de los salones visibles, de sus zonas y de sus categorías. Cada
+nodo guarda, ya ordenadas, las CANDIDATOS mejores sugerencias de todo lo
+que cuelga de él: sugerir() baja por las letras de la consulta y lee esa
+lista, cueste lo que cueste el catálogo.
+
+- Orden: rating bayesiano (con pocas reviews el promedio se acerca a
+  RATING_PREVIO), así cuentan el rating y la cantidad de reviews. Una
+  zona o una categoría suma las reviews de todos sus salones.
+- Varias palabras ("villa ad"): cada una tiene que ser el principio de
+  alguna palabra de la sugerencia. Se parte de la palabra con menos
+  sugerencias; si tiene más de CANDIDATOS, se filtran solo sus CANDIDATOS
+  mejores (para sugerir alcanza con las más populares).
+- Como cercania.py: se carga entero en la primera consulta (de la
+  instantánea, o una consulta) y después se actualiza de a un salón:
+  actualizar_salon() al aprobar, cambiar la visibilidad o cambiar su
+  rating, quitar() al eliminar. Cada worker recarga el suyo cada REFRESCO
+  segundos para ver los cambios hechos desde otros workers.
+"""
+
+import heapq
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+import bitacora
+import database as db
+import disyuntor
+import instantanea
+
+log = bitacora.obtener_logger('autocompletar')
+
+REFRESCO = int(os.environ.get('KINDERFIESTA_AUTOCOMPLETAR_REFRESCO', '300'))
+LIMITE, LIMITE_MAXIMO = 8, 20
+CANDIDATOS = 50          # sugerencias guardadas por nodo (>= LIMITE_MAXIMO)
+LARGO_MAXIMO = 100       # de la consulta: el resto se ignora
+RATING_PREVIO, REVIEWS_PREVIAS = 3.0, 5
+
+# Los navegadores repiten la misma consulta al borrar y volver a escribir
+CACHE_CONTROL = 'public, max-age=30'
+
+# No se indexan: casi todos los nombres y direcciones las tienen
+PALABRAS_VACIAS = frozenset({'a', 'al', 'con', 'de', 'del', 'e', 'el', 'en', 'la', 'las', 'lo', 'los',
+                             'para', 'por', 'y'})
+
+
+def plegar(texto):
+    """'Salón ÑANDÚ' -> 'salon nandu'"""
+    return unicodedata.normalize('NFKD', (texto or '').lower()).encode('ascii', 'ignore').decode()
+
+
+def palabras(texto):
+    """Las palabras de `texto` plegado, sin signos"""
+    return ''.join(c if c.isalnum() else ' ' for c in plegar(texto)).split()
+
+
+def zonas(direccion):
+    """
+    Las zonas de una dirección 'Calle 152, Ventilla, El Alto': las partes
+    sin números, menos la última (la ciudad)
+    """
+    partes = [parte.strip() for parte in (direccion or '').split(',')]
+    if len(partes) > 1:
+        partes = partes[:-1]
+    return [parte for parte in partes if len(parte) >= 3 and not any(c.isdigit() for c in parte)]
+
+
+def _bayesiano(rating_por_reviews):
+    """[(rating, reviews)] -> promedio ponderado, con REVIEWS_PREVIAS reviews de RATING_PREVIO"""
+    suma = RATING_PREVIO * REVIEWS_PREVIAS
+    cantidad = REVIEWS_PREVIAS
+    for rating, reviews in rating_por_reviews:
+        suma += (rating or 0) * reviews
+        cantidad += reviews
+    return suma / cantidad
+
+
+# ============ ÍNDICE ============
+
+class Sugerencia:
+    __slots__ = ('clave', 'tipo', 'texto', 'salon_id', 'palabras', 'orden')
+
+    def __init__(self, clave, tipo, texto, salon_id, puntaje):
+        self.clave = clave
+        self.tipo = tipo
+        self.texto = texto
+        self.salon_id = salon_id
+        self.palabras = tuple(dict.fromkeys(p for p in palabras(texto) if p not in PALABRAS_VACIAS))
+        # Mejor puntaje primero; a igual puntaje, orden alfabético (único: se busca con bisect)
+        self.orden = (-round(puntaje, 6), plegar(texto), tipo, salon_id or 0)
+
+    def como_dict(self):
+        datos = {'tipo': self.tipo, 'texto': self.texto}
+        if self.salon_id is not None:
+            datos['id'] = self.salon_id
+        return datos
+
+
+class _Nodo:
+    __slots__ = ('hijos', 'propias', 'mejores', 'cantidad')
+
+    def __init__(self):
+        self.hijos = {}
+        self.propias = []      # sugerencias con una palabra que termina acá, por orden
+        self.mejores = []      # las CANDIDATOS mejores del subárbol, por orden
+        self.cantidad = 0      # sugerencias en el subárbol
+
+
+def _orden(sugerencia):
+    return sugerencia.orden
+
+
+class _Grupo:
+    """Una zona o categoría: el texto que se muestra y (rating, reviews) de cada salón"""
+    __slots__ = ('texto', 'salones')
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.salones = {}
+
+
+class IndiceSugerencias:
+    """Trie de palabras -> sugerencias (salones, zonas y categorías)"""
+
+    def __init__(self, candidatos=CANDIDATOS):
+        self.candidatos = candidatos
+        self._raiz = _Nodo()
+        self._sugerencias = {}   # clave -> Sugerencia
+        self._salones = {}       # salon_id -> (claves de sus grupos)
+        self._grupos = {}        # ('zona' | 'categoria', texto plegado) -> _Grupo
+
+    def __len__(self):
+        return len(self._sugerencias)
+
+    @classmethod
+    def cargar(cls, filas, candidatos=CANDIDATOS):
+        """Índice de [(salon_id, nombre, dirección, categoría, rating, reviews)], cada grupo insertado una vez"""
+        indice = cls(candidatos)
+        for fila in filas:
+            indice._registrar(*fila, ordenar=False)
+        for clave, grupo in indice._grupos.items():
+            indice._poner(Sugerencia(clave, clave[0], grupo.texto, None, _bayesiano(grupo.salones.values())),
+                          ordenar=False)
+        for nodo in indice._raiz.hijos.values():   # la raíz no se consulta
+            indice._ordenar(nodo)
+        return indice
+
+    # ---------- salones ----------
+
+    def _registrar(self, salon_id, nombre, direccion, categoria, rating, reviews, ordenar=True):
+        """Sugerencia del salón y su lugar en los grupos; devuelve las claves de los grupos"""
+        rating = float(rating) if rating is not None else None
+        self._poner(Sugerencia(('salon', salon_id), 'salon', nombre or 'Sin nombre', salon_id,
+                               _bayesiano([(rating, reviews)])), ordenar)
+        claves = []
+        for tipo, texto in [('zona', zona) for zona in zonas(direccion)] + [('categoria', categoria)]:
+            clave = (tipo, ' '.join(palabras(texto)))
+            if not texto or not clave[1] or clave in claves:
+                continue
+            self._grupos.setdefault(clave, _Grupo(texto.strip())).salones[salon_id] = (rating, reviews)
+            claves.append(clave)
+        self._salones[salon_id] = tuple(claves)
+        return claves
+
+    def agregar_salon(self, salon_id, nombre, direccion, categoria, rating, reviews):
+        """Agrega o reemplaza un salón (y rehace el puntaje de sus zonas y categoría)"""
+        anteriores = self._quitar_salon(salon_id)
+        claves = self._registrar(salon_id, nombre, direccion, categoria, rating, reviews)
+        for clave in dict.fromkeys(anteriores + claves):
+            self._rehacer_grupo(clave)
+
+    def quitar_salon(self, salon_id):
+        for clave in self._quitar_salon(salon_id):
+            self._rehacer_grupo(clave)
+
+    def _quitar_salon(self, salon_id):
+        claves = self._salones.pop(salon_id, None)
+        if claves is None:
+            return []
+        self._sacar(('salon', salon_id))
+        for clave in claves:
+            grupo = self._grupos[clave]
+            del grupo.salones[salon_id]
+            if not grupo.salones:
+                del self._grupos[clave]
+        return list(claves)
+
+    def _rehacer_grupo(self, clave):
+        self._sacar(clave)
+        grupo = self._grupos.get(clave)
+        if grupo is not None:
+            self._poner(Sugerencia(clave, clave[0], grupo.texto, None, _bayesiano(grupo.salones.values())))
+
+    # ---------- trie ----------
+
+    def _camino(self, sugerencia, crear):
+        """[(profundidad, padre, letra, nodo, termina)] de cada nodo de sus palabras, una vez cada uno"""
+        vistos = {}
+        for palabra in sugerencia.palabras:
+            nodo = self._raiz
+            for i, letra in enumerate(palabra, 1):
+                padre = nodo
+                nodo = nodo.hijos.setdefault(letra, _Nodo()) if crear else nodo.hijos[letra]
+                anterior = vistos.get(id(nodo))
+                vistos[id(nodo)] = (i, padre, letra, nodo, i == len(palabra) or (anterior and anterior[4]))
+        return vistos.values()
+
+    def _poner(self, sugerencia, ordenar=True):
+        """ordenar=False: solo la cuenta y las propias (al cargar, _ordenar() al final)"""
+        self._sugerencias[sugerencia.clave] = sugerencia
+        for _, _, _, nodo, termina in self._camino(sugerencia, crear=True):
+            nodo.cantidad += 1
+            if termina:
+                if ordenar:
+                    insort(nodo.propias, sugerencia, key=_orden)
+                else:
+                    nodo.propias.append(sugerencia)
+            mejores = nodo.mejores
+            if ordenar and (len(mejores) < self.candidatos or sugerencia.orden < mejores[-1].orden):
+                insort(mejores, sugerencia, key=_orden)
+                del mejores[self.candidatos:]
+
+    def _rehacer(self, nodo):
+        """Lo mejor del subárbol está en lo mejor de cada hijo o en las mejores propias"""
+        posibles = set(nodo.propias[:self.candidatos])
+        for hijo in nodo.hijos.values():
+            posibles.update(hijo.mejores)
+        nodo.mejores = heapq.nsmallest(self.candidatos, posibles, key=_orden)
+
+    def _ordenar(self, nodo):
+        """Después de cargar con ordenar=False: propias ordenadas y mejores de abajo hacia arriba"""
+        for hijo in nodo.hijos.values():
+            self._ordenar(hijo)
+        nodo.propias.sort(key=_orden)
+        self._rehacer(nodo)
+
+    def _sacar(self, clave):
+        sugerencia = self._sugerencias.pop(clave, None)
+        if sugerencia is None:
+            return
+        # Del más profundo al más cercano a la raíz: cada nodo se rehace con sus hijos ya rehechos
+        for _, padre, letra, nodo, termina in sorted(self._camino(sugerencia, crear=False),
+                                                     key=lambda paso: paso[0], reverse=True):
+            nodo.cantidad -= 1
+            if termina:
+                propias = nodo.propias
+                del propias[bisect_left(propias, sugerencia.orden, key=_orden)]
+            if nodo.cantidad == 0:
+                del padre.hijos[letra]
+            elif sugerencia in nodo.mejores:
+                self._rehacer(nodo)
+
+    def _nodo(self, prefijo):
+        nodo = self._raiz
+        for letra in prefijo:
+            nodo = nodo.hijos.get(letra)
+            if nodo is None:
+                return None
+        return nodo
+
+    # ---------- consulta ----------
+
+    def sugerir(self, consulta, limite=LIMITE):
+        """Las `limite` mejores sugerencias que tienen una palabra que empieza con cada palabra de la consulta"""
+        buscadas = list(dict.fromkeys(palabras(consulta[:LARGO_MAXIMO])))
+        # Una palabra vacía completa ("de ") no filtra nada; la última puede ser el principio de otra
+        buscadas = [p for i, p in enumerate(buscadas) if p not in PALABRAS_VACIAS or i == len(buscadas) - 1]
+        if not buscadas or limite <= 0:
+            return []
+
+        nodos = []
+        for prefijo in buscadas:
+            nodo = self._nodo(prefijo)
+            if nodo is None:
+                return []
+            nodos.append((nodo.cantidad, prefijo, nodo))
+        _, base, nodo = min(nodos, key=lambda n: n[0])
+
+        otras = [p for p in buscadas if p != base]
+        if not otras:
+            return nodo.mejores[:limite]
+        encontradas = []
+        for sugerencia in nodo.mejores:
+            if all(any(palabra.startswith(p) for palabra in sugerencia.palabras) for p in otras):
+                encontradas.append(sugerencia)
+                if len(encontradas) == limite:
+                    break
+        return encontradas
+
+
+# ============ ÍNDICE DEL PROCESO ============
+
+_indice = None
+_cargado_en = None   # None = hay que (re)intentar la carga
+_lock = threading.Lock()
+
+
+def _cargar():
+    """Arma el índice con todos los salones visibles (de la instantánea, o una consulta)"""
+    global _indice, _cargado_en
+    foto = instantanea.actual()
+    with disyuntor.observar() as observacion:
+        filas = foto.sugerencias() if foto is not None else db.obtener_sugerencias_salones()
+    if observacion.fallo:
+        # Queda el índice anterior (vencido: se reintenta en la próxima consulta)
+        if _indice is None:
+            _indice = IndiceSugerencias()
+        return
+    nuevo = IndiceSugerencias.cargar(filas)
+    _indice, _cargado_en = nuevo, time.monotonic()
+    log.info("🔤 Índice de sugerencias: %s salones, %s sugerencias", len(filas), len(nuevo))
+
+
+def parsear(args):
+    """(consulta, límite) de ?q=&limite=; ValueError con el mensaje para el 400"""
+    consulta = args.get('q', '')[:LARGO_MAXIMO]
+    try:
+        limite = int(args.get('limite', LIMITE))
+    except ValueError:
+        raise ValueError('limite debe ser un número entero')
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ValueError(f"limite debe estar entre 1 y {LIMITE_MAXIMO}")
+    return consulta, limite
+
+
+def sugerir(consulta, limite=LIMITE):
+    """[{'tipo', 'texto', 'id' (solo salones)}] mejores primero"""
+    with _lock:
+        if _indice is None or _cargado_en is None or time.monotonic() - _cargado_en > REFRESCO:
+            _cargar()
+        return [sugerencia.como_dict() for sugerencia in _indice.sugerir(consulta, limite)]
+
+
+def actualizar_salon(salon_id):
+    """Después de crear un salón, cambiar su visibilidad o su rating (reviews)"""
+    if _indice is None:
+        return   # se carga entero en la primera consulta
+    salon_id = int(salon_id)
+    with disyuntor.observar() as observacion:
+        filas = db.obtener_sugerencias_salones(salon_id)
+    if observacion.fallo:
+        return   # lo corrige la próxima recarga entera
+    with _lock:
+        if filas:
+            _indice.agregar_salon(*filas[0])
+        else:
+            _indice.quitar_salon(salon_id)
+
+
+def quitar(salon_id):
+    """Después de eliminar un salón"""
+    if _indice is None:
+        return
+    with _lock:
+        _indice.quitar_salon(int(salon_id))
+
+
+def invalidar():
+    global _indice, _cargado_en
+    with _lock:
+        _indice, _cargado_en = None, None
@@ -0,0 +1,15 @@
+"""
+KINDERFIESTA - La app sobre la base SQLite de benchmarks
+Para levantar un servidor real sin MySQL (ver gunicorn_perfil.py):
+
+    python benchmarks/sembrado.py --escala 1k
+    gunicorn -c gunicorn.conf.py benchmarks.app_sqlite:app
+"""
+
+from benchmarks import sembrado, sqlite_mysql
+
+sqlite_mysql.usar(sembrado.RUTA_SQLITE)
+
+from app import crear_app  # noqa: E402  (después de apuntar mysql.connector a SQLite)
+
+app = crear_app()
@@ -0,0 +1,339 @@
+"""
+KINDERFIESTA - Prueba de carga
+Siembra una base (ver sembrado.py) y golpea las rutas principales con
+varios hilos a la vez. Por ruta reporta peticiones/s, latencia p50/p95/p99
+y consultas SQL por petición, y guarda todo en benchmarks/resultados/*.json.
+
+    python benchmarks/carga.py --escala 1k --concurrencia 8 --peticiones 500
+    python benchmarks/carga.py --escala 100k --backend mysql
+    python benchmarks/carga.py --url http://127.0.0.1:8000 --reusar     # servidor ya levantado
+
+Sin --url la app corre en este mismo proceso (test client de Flask), así
+que se pueden contar las consultas con las métricas de metricas.py. Con
+--url se mide el servidor real (gunicorn) y las consultas quedan en null.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+import geo
+import metricas
+from benchmarks import sembrado, sqlite_mysql
+
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+# Como un navegador: la respuesta pasa por el middleware de compresión
+CABECERAS_BASE = {'Accept-Encoding': 'gzip, br'}
+TERMINOS_BUSQUEDA = ('merlín', 'villa', 'satélite', 'ceja', 'bufé', 'salón', 'xyz', 'el alto')
+
+
+# ============ ESCENARIOS ============
+# Cada escenario arma la petición n-ésima: (método, ruta, cabeceras, cuerpo)
+
+def _pagina(ruta):
+    return lambda azar, n, config: ('GET', ruta, {}, None)
+
+
+def _buscar(azar, n, config):
+    return 'GET', '/buscar?' + urlencode({'q': azar.choice(TERMINOS_BUSQUEDA)}), {}, None
+
+
+def _autocompletar(azar, n, config):
+    # Lo que va mandando el buscador mientras se escribe: un término cortado en cualquier letra
+    termino = azar.choice(TERMINOS_BUSQUEDA)
+    return 'GET', '/api/autocomplete?' + urlencode({'q': termino[:azar.randint(1, len(termino))]}), {}, None
+
+
+def _api_salon(azar, n, config):
+    return 'GET', f"/api/salon/{azar.randint(1, config['salones'])}", {}, None
+
+
+def _cerca(azar, n, config):
+    # Un punto cualquiera de la zona donde sembrado.py reparte los salones
+    lat, lng = geo.REFERENCIA
+    parametros = {'lat': round(lat + azar.uniform(-0.05, 0.05), 5), 'lng': round(lng + azar.uniform(-0.05, 0.05), 5),
+                  'radio': azar.choice((1, 2, 5)), 'fields': 'id,name,rating,lat,lng'}
+    return 'GET', '/api/salones/cerca?' + urlencode(parametros), {}, None
+
+
+def _abiertos(azar, n, config):
+    momento = f"{azar.choice(sembrado.DIAS)},{azar.randint(7, 22)}:{azar.choice(('00', '30'))}"
+    return 'GET', '/api/salones?' + urlencode({'abierto_en': momento, 'fields': 'id,name,rating'}), {}, None
+
+
+def _comentario(azar, n, config):
+    cuerpo = json.dumps({
+        'salon_id': azar.randint(1, config['salones']),
+        'nombre': f"Carga {n}",
+        'comentario': azar.choice(sembrado.FRASES),
+        'rating': azar.randint(1, 5),
+    })
+    return 'POST', '/api/comentario', {'Content-Type': 'application/json'}, cuerpo.encode('utf-8')
+
+
+def _login(azar, n, config):
+    cuerpo = urlencode({'email': sembrado.USUARIO_EMAIL, 'password': sembrado.USUARIO_PASSWORD})
+    # Una IP distinta por petición: si no, el rate limiter bloquea al 6º intento
+    cabeceras = {'Content-Type': 'application/x-www-form-urlencoded',
+                 'X-Forwarded-For': f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"}
+    return 'POST', '/login', cabeceras, cuerpo.encode('utf-8')
+
+
+ESCENARIOS = {
+    'index': _pagina('/'),
+    'salones': _pagina('/salones'),
+    'api_salones': _pagina('/api/salones'),
+    'buscar': _buscar,
+    'autocompletar': _autocompletar,
+    'api_salon': _api_salon,
+    'api_cerca': _cerca,
+    'api_abiertos': _abiertos,
+    'api_comentario': _comentario,
+    'login': _login,
+}
+
+
+# ============ CLIENTES ============
+
+class ClienteFlask:
+    """La app en este proceso; un test client por hilo"""
+
+    def __init__(self, app):
+        self._cliente = app.test_client()
+
+    def pedir(self, metodo, ruta, cabeceras, cuerpo):
+        respuesta = self._cliente.open(ruta, method=metodo, headers={**CABECERAS_BASE, **cabeceras},
+                                       data=cuerpo)
+        datos = respuesta.get_data()
+        respuesta.close()
+        return respuesta.status_code, len(datos)
+
+
+class ClienteHTTP:
+    """Un servidor real; una conexión keep-alive por hilo"""
+
+    def __init__(self, url):
+        partes = urlsplit(url)
+        self._host = partes.hostname
+        self._puerto = partes.port or 80
+        self._conexion = None
+
+    def pedir(self, metodo, ruta, cabeceras, cuerpo):
+        if self._conexion is None:
+            self._conexion = http.client.HTTPConnection(self._host, self._puerto, timeout=30)
+        try:
+            self._conexion.request(metodo, ruta, body=cuerpo, headers={**CABECERAS_BASE, **cabeceras})
+            respuesta = self._conexion.getresponse()
+            datos = respuesta.read()
+            return respuesta.status, len(datos)
+        except (http.client.HTTPException, OSError):
+            self._conexion.close()
+            self._conexion = None
+            raise
+
+
+# ============ EJECUCIÓN ============
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return None
+    indice = min(len(ordenadas) - 1, max(0, round(p / 100 * len(ordenadas)) - 1))
+    return ordenadas[indice]
+
+
+def correr_escenario(nombre, crear_cliente, config, peticiones, concurrencia, calentamiento, semilla,
+                     en_proceso=True):
+    """
+    Lanza `peticiones` del escenario repartidas entre `concurrencia` hilos.
+    Las consultas por petición solo se pueden contar con la app en proceso.
+    """
+    armar = ESCENARIOS[nombre]
+    latencias = []
+    codigos = {}
+    errores = []
+    bytes_totales = [0]
+    siguiente = iter(range(peticiones))
+    lock = threading.Lock()
+
+    def trabajador(indice):
+        cliente = crear_cliente()
+        azar = random.Random(semilla * 1000 + indice)
+        # Calentamiento: conexiones, cachés y plantillas compiladas no cuentan
+        for n in range(calentamiento):
+            try:
+                cliente.pedir(*armar(azar, peticiones + indice * calentamiento + n, config))
+            except Exception:
+                pass
+        barrera.wait()
+        propias = []
+        while True:
+            with lock:
+                n = next(siguiente, None)
+            if n is None:
+                break
+            peticion = armar(azar, n, config)
+            inicio = time.perf_counter()
+            try:
+                codigo, tamano = cliente.pedir(*peticion)
+            except Exception as e:
+                with lock:
+                    errores.append(repr(e))
+                continue
+            propias.append(time.perf_counter() - inicio)
+            with lock:
+                codigos[codigo] = codigos.get(codigo, 0) + 1
+                bytes_totales[0] += tamano
+        with lock:
+            latencias.extend(propias)
+
+    barrera = threading.Barrier(concurrencia + 1)
+    hilos = [threading.Thread(target=trabajador, args=(i,), daemon=True) for i in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    barrera.wait()
+    consultas_antes = metricas.DB_CONSULTA.total()
+    conexiones_antes = metricas.DB_CONEXION.total()
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+    consultas = metricas.DB_CONSULTA.total() - consultas_antes
+    conexiones = metricas.DB_CONEXION.total() - conexiones_antes
+
+    latencias.sort()
+    completadas = len(latencias)
+    return {
+        'peticiones': completadas,
+        'errores': len(errores),
+        'primer_error': errores[0] if errores else None,
+        'codigos': {str(c): n for c, n in sorted(codigos.items())},
+        'duracion_s': round(duracion, 3),
+        'rps': round(completadas / duracion, 1) if duracion else None,
+        'latencia_ms': {
+            'p50': _ms(_percentil(latencias, 50)),
+            'p95': _ms(_percentil(latencias, 95)),
+            'p99': _ms(_percentil(latencias, 99)),
+            'media': _ms(statistics.fmean(latencias)) if latencias else None,
+            'max': _ms(latencias[-1]) if latencias else None,
+        },
+        'bytes_por_peticion': round(bytes_totales[0] / completadas) if completadas else None,
+        'consultas_por_peticion': round(consultas / completadas, 2) if en_proceso and completadas else None,
+        'conexiones_por_peticion': round(conexiones / completadas, 2) if en_proceso and completadas else None,
+    }
+
+
+def _ms(segundos):
+    return None if segundos is None else round(segundos * 1000, 2)
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _app_en_proceso(backend):
+    """Importa la app apuntando database.py a la base de benchmarks"""
+    os.environ.setdefault('KINDERFIESTA_LOG_NIVEL', 'ERROR')
+    if backend == 'sqlite':
+        sqlite_mysql.usar(sembrado.RUTA_SQLITE)
+    import database
+    if backend == 'mysql':
+        database.DB_CONFIG['database'] = sembrado.BASE_MYSQL
+    from app import crear_app
+    return crear_app()
+
+
+def imprimir(resultados):
+    print(f"\n{'ruta':<16}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}{'errores':>9}")
+    for nombre, r in resultados.items():
+        latencia = r['latencia_ms']
+        consultas = '-' if r['consultas_por_peticion'] is None else r['consultas_por_peticion']
+        print(f"{nombre:<16}{r['rps'] or 0:>9}{latencia['p50'] or 0:>9}{latencia['p95'] or 0:>9}"
+              f"{latencia['p99'] or 0:>9}{consultas:>11}{r['errores']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prueba de carga de KinderFiesta')
+    parser.add_argument('--escala', choices=sorted(sembrado.ESCALAS), default='1k')
+    parser.add_argument('--backend', choices=('sqlite', 'mysql'), default='sqlite')
+    parser.add_argument('--url', help='Servidor ya levantado (si no, la app corre en proceso)')
+    parser.add_argument('--reusar', action='store_true', help='No volver a sembrar la base')
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--peticiones', type=int, default=200, help='Por ruta')
+    parser.add_argument('--calentamiento', type=int, default=3, help='Peticiones por hilo que no cuentan')
+    parser.add_argument('--rutas', default=','.join(ESCENARIOS),
+                        help='Separadas por coma: ' + ','.join(ESCENARIOS))
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help='Archivo JSON (por defecto benchmarks/resultados/...)')
+    args = parser.parse_args(argv)
+
+    rutas = [r.strip() for r in args.rutas.split(',') if r.strip()]
+    desconocidas = [r for r in rutas if r not in ESCENARIOS]
+    if desconocidas:
+        parser.error(f"Rutas desconocidas: {', '.join(desconocidas)}")
+
+    # La app usa rutas relativas (static/, data/)
+    os.chdir(RAIZ)
+    sembrada = None
+    if not args.reusar:
+        inicio = time.perf_counter()
+        sembrada = sembrado.preparar(args.backend, args.escala, args.semilla)
+        print(f"🌱 Base sembrada en {time.perf_counter() - inicio:.1f} s: {sembrada}")
+
+    if args.url:
+        crear_cliente = lambda: ClienteHTTP(args.url)
+    else:
+        app = _app_en_proceso(args.backend)
+        crear_cliente = lambda: ClienteFlask(app)
+
+    config = sembrado.ESCALAS[args.escala]
+    resultados = {}
+    for nombre in rutas:
+        print(f"▶️  {nombre} ...", flush=True)
+        resultados[nombre] = correr_escenario(nombre, crear_cliente, config, args.peticiones,
+                                              args.concurrencia, args.calentamiento, args.semilla,
+                                              en_proceso=not args.url)
+    imprimir(resultados)
+
+    informe = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_actual(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'config': {
+            'backend': args.backend, 'escala': args.escala, 'url': args.url,
+            'concurrencia': args.concurrencia, 'peticiones': args.peticiones,
+            'calentamiento': args.calentamiento, 'semilla': args.semilla,
+        },
+        'filas': sembrada,
+        'rutas': resultados,
+    }
+    salida = args.salida or os.path.join(
+        DIRECTORIO_RESULTADOS,
+        f"{datetime.now():%Y%m%d-%H%M%S}_{'http' if args.url else args.backend}_{args.escala}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados en {salida}")
+    return informe
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+KINDERFIESTA - gunicorn por defecto vs gunicorn.conf.py
+Levanta la app dos veces sobre la base SQLite de benchmarks:
+- por_defecto: `gunicorn 'app:crear_app()'` sin configuración (1 worker sync)
+- perfil: `gunicorn -c gunicorn.conf.py 'app:crear_app()'` (lo que usa el Procfile)
+y corre la misma prueba de carga (carga.py --url) contra cada uno.
+
+    python benchmarks/gunicorn_perfil.py --escala 1k --concurrencia 16 --peticiones 300
+
+El resultado queda en benchmarks/resultados/<fecha>_gunicorn.json con los
+dos informes y la relación de peticiones/s por ruta.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from benchmarks import carga, sembrado
+
+PUERTO = 8799
+PERFILES = {
+    # -c /dev/null: si no, gunicorn carga ./gunicorn.conf.py solo
+    'por_defecto': ['-c', '/dev/null'],
+    'perfil': ['-c', 'gunicorn.conf.py'],
+}
+
+
+def _esperar_puerto(puerto, limite=30):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            with socket.create_connection(('127.0.0.1', puerto), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def correr_perfil(nombre, args):
+    """Siembra de nuevo (las rutas POST escriben), levanta gunicorn y mide"""
+    sembrado.preparar_sqlite(args.escala, args.semilla)
+    entorno = dict(os.environ, PORT=str(PUERTO), KINDERFIESTA_LOG_NIVEL='ERROR')
+    comando = [sys.executable, '-m', 'gunicorn', *PERFILES[nombre],
+               '--bind', f"127.0.0.1:{PUERTO}", 'benchmarks.app_sqlite:app']
+    servidor = subprocess.Popen(comando, cwd=RAIZ, env=entorno,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    salida = os.path.join(carga.DIRECTORIO_RESULTADOS, f".{nombre}.json")
+    try:
+        if not _esperar_puerto(PUERTO):
+            servidor.terminate()
+            raise RuntimeError(f"gunicorn ({nombre}) no arrancó: {servidor.stderr.read().decode()[-2000:]}")
+        print(f"\n🚀 {nombre}: {' '.join(comando[2:])}")
+        return carga.main(['--url', f"http://127.0.0.1:{PUERTO}", '--reusar',
+                           '--escala', args.escala, '--concurrencia', str(args.concurrencia),
+                           '--peticiones', str(args.peticiones), '--rutas', args.rutas,
+                           '--salida', salida])
+    finally:
+        servidor.terminate()
+        try:
+            servidor.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            servidor.kill()
+        if os.path.exists(salida):
+            os.remove(salida)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compara gunicorn por defecto con gunicorn.conf.py')
+    parser.add_argument('--escala', choices=sorted(sembrado.ESCALAS), default='1k')
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--peticiones', type=int, default=300)
+    parser.add_argument('--rutas', default=','.join(carga.ESCENARIOS))
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    os.chdir(RAIZ)
+    informes = {nombre: correr_perfil(nombre, args) for nombre in PERFILES}
+
+    comparacion = {}
+    print(f"\n{'ruta':<16}{'por_defecto':>13}{'perfil':>10}{'x':>7}")
+    for ruta, defecto in informes['por_defecto']['rutas'].items():
+        perfil = informes['perfil']['rutas'][ruta]
+        relacion = round(perfil['rps'] / defecto['rps'], 2) if defecto['rps'] and perfil['rps'] else None
+        comparacion[ruta] = {'rps_por_defecto': defecto['rps'], 'rps_perfil': perfil['rps'],
+                             'relacion': relacion}
+        print(f"{ruta:<16}{defecto['rps'] or 0:>13}{perfil['rps'] or 0:>10}{relacion or 0:>7}")
+
+    salida = os.path.join(carga.DIRECTORIO_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}_gunicorn.json")
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump({'comparacion': comparacion, 'informes': informes}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
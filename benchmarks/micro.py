@@ -0,0 +1,220 @@
+"""
+KINDERFIESTA - Micro-benchmarks de las validaciones
+Mide (con timeit) las funciones que corren sobre CADA entrada del usuario:
+validar_email, sanitizar_texto, detectar_sql_injection,
+validar_numero_telefono, RateLimiter.verificar_intento y filtrar_palabras.
+
+Cada caso tiene un corpus realista y otro adversario (entradas largas,
+inundación de IPs, textos armados para que las regex retrocedan) y un
+umbral en microsegundos por llamada. Si un caso supera su umbral el script
+termina con código 1: quien cambie estas funciones trae los números.
+
+    python benchmarks/micro.py
+    python benchmarks/micro.py --filtro sql --salida /tmp/micro.json
+
+Los umbrales son ~5x lo medido en una máquina de desarrollo modesta; si
+se mejora una función, bajar su umbral en el mismo commit.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+os.environ.setdefault('KINDERFIESTA_LOG_NIVEL', 'ERROR')
+
+from security import (RateLimiter, detectar_sql_injection, sanitizar_texto, validar_email,
+                      validar_numero_telefono)
+
+REPETICIONES = 5
+IPS_INUNDACION = 100_000
+
+# ============ CORPUS ============
+
+EMAILS_REALES = ['maria.quispe@gmail.com', 'juan_mamani85@hotmail.com', 'salon.merlin@kinderfiesta.com',
+                 'ana+fiestas@yahoo.es', 'contacto@eventos-el-alto.bo', 'no-es-un-email', '',
+                 "admin'--@x.com", 'carlos@dominio']
+EMAIL_LARGO = 'a' * 90 + '@gmail.com'                       # 100 chars: el máximo aceptado
+EMAIL_RETROCESO = 'a@' + 'a.' * 48 + '!'                    # el dominio obliga a probar cada '.'
+EMAIL_ENORME = 'x' * 100_000 + '@gmail.com'                  # debe cortarse por largo, sin regex
+
+COMENTARIOS = ['Muy buen servicio, los niños se divirtieron mucho.',
+               'La comida estaba rica pero la atención fue un poco lenta; volveremos.',
+               'Excelente!!! 10/10 <3',
+               'El salón es amplio, limpio y tiene juegos inflables en buen estado. ' * 5]
+COMENTARIO_500 = ('Fiesta de cumpleaños para mi hija, todo salió bien. ' * 10)[:500]
+HTML_HOSTIL = '<script>alert("x")</script>--/* & "\' ' * 2000
+TEXTO_100K = 'á' * 100_000
+
+SQL_ATAQUES = ["' OR '1'='1", "admin'--", '1; DROP TABLE salones', "' UNION SELECT password FROM usuarios --",
+               "1' AND SLEEP(5)#", "'; EXEC xp_cmdshell('dir')", "x' WAITFOR DELAY '0:0:5'--"]
+SQL_BENIGNOS = ['Salón Merlín', 'maria.quispe@gmail.com', 'Zona Elizardo, Alejandro Pérez', 'contraseña123']
+SQL_LARGO_BENIGNO = 'Una fiesta inolvidable para toda la familia en El Alto ' * 200   # ~11 KB, sin match
+SQL_RETROCESO_COMILLAS = "'" + ' ' * 5000 + 'OR' + ' ' * 5000 + "'" + '1' * 5000   # sin '=' al final
+SQL_MUCHAS_COMILLAS = "' OR 1" * 2000
+
+TELEFONOS = ['65567153', '(591) 2-2845678', '78 915 146', '+591 70551410', '12', 'abc']
+TELEFONO_20 = '7' * 20
+TELEFONO_ENORME = '7' * 100_000 + 'x'                        # la regex recorre todo antes de fallar
+
+PALABRAS_CORTAS = ' '.join('a' for _ in range(250))         # 500 chars, 250 palabras
+
+
+# ============ CASOS ============
+
+def _sobre(funcion, corpus):
+    """Una llamada = la función aplicada a todo el corpus (se divide después)"""
+    def correr():
+        for valor in corpus:
+            funcion(valor)
+    return correr, len(corpus)
+
+
+def _rate_limiter_casos():
+    casos = {}
+
+    limitador = RateLimiter()
+    casos['rate_limiter/ip_limpia'] = (lambda: limitador.verificar_intento('190.129.1.10'), 1)
+
+    con_intentos = RateLimiter()
+    for _ in range(4):
+        con_intentos.registrar_intento('190.129.1.11')
+    casos['rate_limiter/ip_con_4_intentos'] = (lambda: con_intentos.verificar_intento('190.129.1.11'), 1)
+
+    bloqueado = RateLimiter()
+    for _ in range(5):
+        bloqueado.registrar_intento('190.129.1.12')
+    bloqueado.verificar_intento('190.129.1.12')
+    casos['rate_limiter/ip_bloqueada'] = (lambda: bloqueado.verificar_intento('190.129.1.12'), 1)
+
+    # Inundación: cada llamada es una IP que nunca se vio (el dict crece con cada una)
+    ips = [f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}" for n in range(IPS_INUNDACION)]
+
+    def inundar():
+        inundado = RateLimiter()
+        for ip in ips:
+            inundado.verificar_intento(ip)
+    casos['rate_limiter/inundacion_100k_ips'] = (inundar, len(ips))
+    return casos
+
+
+def filtrar_palabras(texto):
+    # Importar app es pesado: se hace recién cuando se mide este caso
+    from app import filtrar_palabras
+    return filtrar_palabras(texto)
+
+
+def construir_casos():
+    """nombre -> (callable, llamadas que representa una ejecución)"""
+    casos = {
+        'validar_email/reales': _sobre(validar_email, EMAILS_REALES),
+        'validar_email/100_chars': _sobre(validar_email, [EMAIL_LARGO]),
+        'validar_email/retroceso': _sobre(validar_email, [EMAIL_RETROCESO]),
+        'validar_email/100k_chars': _sobre(validar_email, [EMAIL_ENORME]),
+
+        'sanitizar_texto/comentarios': _sobre(sanitizar_texto, COMENTARIOS),
+        'sanitizar_texto/500_chars': _sobre(sanitizar_texto, [COMENTARIO_500]),
+        'sanitizar_texto/html_hostil': _sobre(sanitizar_texto, [HTML_HOSTIL]),
+        'sanitizar_texto/100k_chars': _sobre(sanitizar_texto, [TEXTO_100K]),
+
+        'detectar_sql/benignos': _sobre(detectar_sql_injection, SQL_BENIGNOS),
+        'detectar_sql/ataques': _sobre(detectar_sql_injection, SQL_ATAQUES),
+        'detectar_sql/11kb_benigno': _sobre(detectar_sql_injection, [SQL_LARGO_BENIGNO]),
+        'detectar_sql/retroceso_comillas': _sobre(detectar_sql_injection, [SQL_RETROCESO_COMILLAS]),
+        'detectar_sql/muchas_comillas': _sobre(detectar_sql_injection, [SQL_MUCHAS_COMILLAS]),
+
+        'validar_telefono/reales': _sobre(validar_numero_telefono, TELEFONOS),
+        'validar_telefono/20_digitos': _sobre(validar_numero_telefono, [TELEFONO_20]),
+        'validar_telefono/100k_digitos': _sobre(validar_numero_telefono, [TELEFONO_ENORME]),
+    }
+    casos.update(_rate_limiter_casos())
+
+    casos['filtrar_palabras/comentarios'] = _sobre(filtrar_palabras, COMENTARIOS)
+    casos['filtrar_palabras/500_chars'] = _sobre(filtrar_palabras, [COMENTARIO_500])
+    casos['filtrar_palabras/250_palabras_cortas'] = _sobre(filtrar_palabras, [PALABRAS_CORTAS])
+    return casos
+
+
+# Microsegundos por llamada. Ver el docstring del módulo antes de tocarlos.
+UMBRALES_US = {
+    'validar_email/reales': 10,
+    'validar_email/100_chars': 15,
+    'validar_email/retroceso': 150,
+    'validar_email/100k_chars': 5,
+    'sanitizar_texto/comentarios': 15,
+    'sanitizar_texto/500_chars': 30,
+    'sanitizar_texto/html_hostil': 50,
+    'sanitizar_texto/100k_chars': 30,
+    'detectar_sql/benignos': 60,
+    'detectar_sql/ataques': 60,
+    'detectar_sql/11kb_benigno': 7500,
+    # Cuadrático: '\s*(OR|AND) reintenta desde cada espacio (~56 ms medidos). Candidato a corregir.
+    'detectar_sql/retroceso_comillas': 250000,
+    'detectar_sql/muchas_comillas': 10000,
+    'validar_telefono/reales': 10,
+    'validar_telefono/20_digitos': 15,
+    'validar_telefono/100k_digitos': 10000,
+    'rate_limiter/ip_limpia': 15,
+    'rate_limiter/ip_con_4_intentos': 20,
+    'rate_limiter/ip_bloqueada': 15,
+    'rate_limiter/inundacion_100k_ips': 25,
+    'filtrar_palabras/comentarios': 350,
+    'filtrar_palabras/500_chars': 1500,
+    'filtrar_palabras/250_palabras_cortas': 300,
+}
+
+
+# ============ EJECUCIÓN ============
+
+def medir(funcion, llamadas):
+    """Mejor de REPETICIONES corridas, en microsegundos por llamada"""
+    temporizador = timeit.Timer(funcion)
+    numero, _ = temporizador.autorange()
+    mejor = min(temporizador.repeat(repeat=REPETICIONES, number=numero))
+    return mejor / numero / llamadas * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmarks de security.py y filtrar_palabras')
+    parser.add_argument('--filtro', default='', help='Solo los casos que contienen este texto')
+    parser.add_argument('--salida', help='Guardar los resultados en este JSON')
+    parser.add_argument('--sin-umbrales', action='store_true', help='Medir sin fallar')
+    args = parser.parse_args(argv)
+
+    os.chdir(RAIZ)
+    resultados = {}
+    excedidos = []
+    print(f"{'caso':<42}{'µs/llamada':>12}{'umbral':>10}")
+    for nombre, (funcion, llamadas) in construir_casos().items():
+        if args.filtro not in nombre:
+            continue
+        microsegundos = medir(funcion, llamadas)
+        umbral = UMBRALES_US.get(nombre)
+        excedido = umbral is not None and microsegundos > umbral
+        if excedido:
+            excedidos.append(nombre)
+        resultados[nombre] = {'us_por_llamada': round(microsegundos, 3), 'umbral_us': umbral}
+        print(f"{nombre:<42}{microsegundos:>12.2f}{umbral or '-':>10}{'  ❌' if excedido else ''}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({'fecha': datetime.now().isoformat(timespec='seconds'),
+                       'python': platform.python_version(), 'casos': resultados},
+                      f, ensure_ascii=False, indent=2)
+
+    if excedidos and not args.sin_umbrales:
+        print(f"\n❌ {len(excedidos)} caso(s) por encima del umbral: {', '.join(excedidos)}")
+        return 1
+    print("\n✅ Todos los casos dentro del umbral")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
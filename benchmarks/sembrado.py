@@ -0,0 +1,268 @@
+"""
+KINDERFIESTA - Datos sintéticos para benchmarks
+Llena una base con salones, horarios, reviews, usuarios y testimonios
+inventados, en tres escalas (por cantidad de reviews):
+
+    python benchmarks/sembrado.py --escala 1k                 # SQLite en benchmarks/bench.db
+    python benchmarks/sembrado.py --escala 100k --backend mysql   # base kinderfiesta_bench
+
+Con la misma semilla los datos son siempre los mismos, así dos corridas
+de carga.py miden lo mismo.
+
+Todos los usuarios comparten la contraseña USUARIO_PASSWORD (el hash se
+calcula una sola vez, con el mismo costo de bcrypt que usa la app).
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+import bcrypt
+
+import geo
+from benchmarks import sqlite_mysql
+
+# ============ CONFIGURACIÓN ============
+
+ESCALAS = {
+    '10': {'salones': 5, 'reviews': 10, 'usuarios': 10, 'testimonios': 5},
+    '1k': {'salones': 50, 'reviews': 1000, 'usuarios': 200, 'testimonios': 100},
+    '100k': {'salones': 500, 'reviews': 100000, 'usuarios': 5000, 'testimonios': 2000},
+}
+
+RUTA_SQLITE = os.path.join(RAIZ, 'benchmarks', 'bench.db')
+RUTA_ESQUEMA = os.path.join(RAIZ, 'database_setup.sql')
+BASE_MYSQL = 'kinderfiesta_bench'
+
+USUARIO_EMAIL = 'bench@kinderfiesta.com'
+USUARIO_PASSWORD = 'bench12345'
+LOTE = 1000
+
+DIAS = ('lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo')
+ZONAS = ('Ciudad Satélite', 'Villa Adela', 'Ceja', 'Río Seco', 'Senkata', 'Villa Dolores',
+         'Alto Lima', 'Ballivián', '16 de Julio', 'Santiago II', 'Villa Ingenio', 'Ventilla')
+NOMBRES_SALON = ('Merlín', 'Pequeño Gigante', 'Angelito', 'Leoncito', 'Sakura', 'Arcoíris',
+                 'Burbujas', 'Carrusel', 'Dulce Sueño', 'Estrellita', 'Fantasía', 'Globito')
+CATEGORIAS = ('Salón infantil', 'Bufé para fiestas infantiles', 'Salón de eventos', None)
+NOMBRES = ('María', 'Juan', 'Ana', 'Carlos', 'Lucía', 'Pedro', 'Rosa', 'Luis', 'Carmen',
+           'Jorge', 'Elena', 'Miguel', 'Sofía', 'Diego', 'Valeria', 'Fernando')
+APELLIDOS = ('Mamani', 'Quispe', 'Condori', 'Choque', 'Flores', 'Gutiérrez', 'Rojas', 'Vargas')
+FRASES = ('Muy buen servicio', 'Los niños se divirtieron mucho', 'La comida estaba rica',
+          'El lugar es amplio y limpio', 'Atención un poco lenta', 'Buena música y animación',
+          'Recomendado para cumpleaños', 'El precio es razonable', 'Faltó decoración',
+          'Volveremos el próximo año', 'Los juegos inflables están en buen estado')
+
+
+# ============ GENERACIÓN ============
+
+def _nombre(azar):
+    return f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)}"
+
+
+def _comentario(azar, frases=3):
+    return '. '.join(azar.sample(FRASES, azar.randint(1, frases))) + '.'
+
+
+def _fecha(azar, ahora, dias=730):
+    return (ahora - timedelta(seconds=azar.randint(0, dias * 86400))).replace(microsecond=0)
+
+
+def generar_salones(azar, cantidad):
+    for salon_id in range(1, cantidad + 1):
+        telefono = str(azar.randint(60000000, 79999999))
+        nombre = f"Salón {azar.choice(NOMBRES_SALON)} {salon_id}"
+        zona = azar.choice(ZONAS)
+        # Plus codes válidos repartidos en ~5 x 10 km alrededor de El Alto
+        codigo = f"{azar.choice('FG')}R{''.join(azar.choices(geo.ALFABETO, k=2))}+" \
+                 f"{''.join(azar.choices(geo.ALFABETO, k=2))} El Alto"
+        lat, lng = geo.coordenadas(codigo)
+        yield (salon_id, nombre, telefono, telefono if azar.random() < 0.7 else None,
+               f"Calle {azar.randint(1, 200)}, {zona}, El Alto", codigo, lat, lng,
+               azar.choice(CATEGORIAS), azar.random() < 0.9, f"salon_{salon_id}")
+
+
+def generar_horarios(azar, cantidad_salones):
+    for salon_id in range(1, cantidad_salones + 1):
+        apertura = azar.choice(('08:00:00', '09:00:00', '10:00:00', '14:00:00'))
+        cierre = azar.choice(('17:00:00', '18:00:00', '20:00:00', '22:00:00'))
+        for dia in DIAS:
+            cerrado = azar.random() < 0.15
+            yield (salon_id, dia, None if cerrado else apertura, None if cerrado else cierre, cerrado)
+
+
+def generar_reviews(azar, cantidad, cantidad_salones, ahora):
+    # Pocos salones concentran muchas reviews, como en la vida real
+    pesos = [1 / (i + 1) for i in range(cantidad_salones)]
+    salones = azar.choices(range(1, cantidad_salones + 1), weights=pesos, k=cantidad)
+    for salon_id in salones:
+        yield (salon_id, _nombre(azar), _comentario(azar), azar.choices((1, 2, 3, 4, 5), (1, 1, 2, 4, 6))[0],
+               _fecha(azar, ahora))
+
+
+def generar_usuarios(azar, cantidad, password_hash, ahora):
+    yield (1, 'Usuario Benchmark', USUARIO_EMAIL, password_hash, True, _fecha(azar, ahora))
+    for usuario_id in range(2, cantidad + 1):
+        yield (usuario_id, _nombre(azar), f"familia{usuario_id}@ejemplo.com", password_hash,
+               azar.random() < 0.95, _fecha(azar, ahora))
+
+
+def generar_testimonios(azar, cantidad, cantidad_usuarios, ahora):
+    # Un testimonio por usuario como máximo (la app lo verifica)
+    for usuario_id in azar.sample(range(1, cantidad_usuarios + 1), min(cantidad, cantidad_usuarios)):
+        yield (usuario_id, _nombre(azar), azar.choices((3, 4, 5), (1, 3, 6))[0],
+               _comentario(azar, 2), _fecha(azar, ahora, 365), azar.random() < 0.8)
+
+
+# ============ INSERCIÓN ============
+
+INSERTS = {
+    'salones': """INSERT INTO salones (id, name, phone, whatsapp, address, locationCode, lat, lng, category,
+                                     visible, folder)
+                  VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+    'horarios': """INSERT INTO horarios (salon_id, dia, hora_apertura, hora_cierre, cerrado)
+                   VALUES (%s, %s, %s, %s, %s)""",
+    'reviews': """INSERT INTO reviews (salon_id, nombre, comentario, rating, fecha)
+                  VALUES (%s, %s, %s, %s, %s)""",
+    'usuarios': """INSERT INTO usuarios (id, nombre, email, password, activo, created_at)
+                   VALUES (%s, %s, %s, %s, %s, %s)""",
+    'testimonios': """INSERT INTO testimonios (usuario_id, nombre_usuario, rating, comentario, fecha, aprobado)
+                      VALUES (%s, %s, %s, %s, %s, %s)""",
+}
+
+ACTUALIZAR_RATINGS = """
+    UPDATE salones SET rating = (
+        SELECT ROUND(AVG(rating), 1) FROM reviews WHERE reviews.salon_id = salones.id
+    )
+"""
+
+
+def _insertar(conexion, tabla, filas):
+    """executemany por lotes; devuelve la cantidad de filas insertadas"""
+    cursor = conexion.cursor()
+    total = 0
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            cursor.executemany(INSERTS[tabla], lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        cursor.executemany(INSERTS[tabla], lote)
+        total += len(lote)
+    conexion.commit()
+    cursor.close()
+    return total
+
+
+def sembrar(conexion, escala='1k', semilla=42):
+    """Inserta los datos de `escala` en una base vacía. Devuelve las cantidades."""
+    config = ESCALAS[escala]
+    azar = random.Random(semilla)
+    ahora = datetime(2025, 1, 1)
+    password_hash = bcrypt.hashpw(USUARIO_PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+    cantidades = {
+        'salones': _insertar(conexion, 'salones', generar_salones(azar, config['salones'])),
+        'horarios': _insertar(conexion, 'horarios', generar_horarios(azar, config['salones'])),
+        'reviews': _insertar(conexion, 'reviews',
+                             generar_reviews(azar, config['reviews'], config['salones'], ahora)),
+        'usuarios': _insertar(conexion, 'usuarios',
+                              generar_usuarios(azar, config['usuarios'], password_hash, ahora)),
+    }
+    cantidades['testimonios'] = _insertar(conexion, 'testimonios',
+                                          generar_testimonios(azar, config['testimonios'],
+                                                              config['usuarios'], ahora))
+
+    # Los triggers se instalan después: recalcular el promedio fila por fila es lo lento
+    cursor = conexion.cursor()
+    cursor.execute(ACTUALIZAR_RATINGS)
+    conexion.commit()
+    cursor.close()
+    return cantidades
+
+
+# ============ BACKENDS ============
+
+def preparar_sqlite(escala, semilla=42, ruta=RUTA_SQLITE):
+    """Recrea benchmarks/bench.db con el esquema de database_setup.sql y la escala pedida"""
+    for sufijo in ('', '-wal', '-shm'):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+    sqlite_mysql.crear_base(ruta, RUTA_ESQUEMA, datos_iniciales=False, triggers=False)
+    conexion = sqlite_mysql.Conexion(ruta)
+    try:
+        cantidades = sembrar(conexion, escala, semilla)
+    finally:
+        conexion.close()
+    sqlite_mysql.instalar_triggers(ruta)
+    return cantidades
+
+
+def preparar_mysql(escala, semilla=42, base=BASE_MYSQL):
+    """
+    Recrea la base `base` (NUNCA la de la app) en el servidor de
+    database.DB_CONFIG, con el esquema de database_setup.sql.
+    """
+    import mysql.connector
+    import database
+
+    if base == database.DB_CONFIG.get('database'):
+        raise ValueError(f"La base de benchmarks no puede ser la de la app ({base})")
+
+    config = {k: v for k, v in database.DB_CONFIG.items() if k != 'database'}
+    conexion = mysql.connector.connect(**config)
+    cursor = conexion.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{base}`")
+    cursor.execute(f"CREATE DATABASE `{base}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cursor.execute(f"USE `{base}`")
+
+    with open(RUTA_ESQUEMA, encoding='utf-8') as f:
+        script = f.read()
+    diferidas = []
+    for sentencia in sqlite_mysql.sentencias(script):
+        inicio = sentencia.lstrip().upper()
+        if inicio.startswith(('CREATE DATABASE', 'USE ', 'INSERT', 'SELECT')):
+            continue
+        if inicio.startswith('CREATE TRIGGER'):
+            diferidas.append(sentencia)
+            continue
+        cursor.execute(sentencia)
+    cursor.close()
+
+    try:
+        cantidades = sembrar(conexion, escala, semilla)
+        cursor = conexion.cursor()
+        for sentencia in diferidas:
+            cursor.execute(sentencia)
+        cursor.close()
+    finally:
+        conexion.close()
+    return cantidades
+
+
+def preparar(backend, escala, semilla=42):
+    if backend == 'sqlite':
+        return preparar_sqlite(escala, semilla)
+    return preparar_mysql(escala, semilla)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Siembra datos sintéticos para benchmarks')
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='1k')
+    parser.add_argument('--backend', choices=('sqlite', 'mysql'), default='sqlite')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    cantidades = preparar(args.backend, args.escala, args.semilla)
+    print(f"✅ Base sembrada ({args.backend}, escala {args.escala}) en {time.perf_counter() - inicio:.1f} s")
+    for tabla, cantidad in cantidades.items():
+        print(f"   {tabla}: {cantidad}")
@@ -0,0 +1,31 @@
+"""
+KINDERFIESTA - La base de benchmarks en SQLite
+El motor está en motor_sqlite.py (KINDERFIESTA_DB_MOTOR=sqlite); acá solo
+se apunta la app a benchmarks/bench.db antes de importarla:
+
+    sqlite_mysql.usar('benchmarks/bench.db')
+
+Los tiempos NO son comparables con MySQL en valor absoluto; sirven para
+comparar versiones del código entre sí.
+"""
+
+import os
+import sys
+
+import motor_sqlite
+from motor_sqlite import Conexion, crear_base, instalar_triggers, sentencias  # noqa: F401
+
+
+def usar(ruta, replicas=None):
+    """
+    database.py con el motor SQLite sobre `ruta` (llamar antes de importar
+    database o app). replicas={host: ruta}: para probar enrutador.py con
+    dos archivos (KINDERFIESTA_DB_REPLICAS=<host>).
+    """
+    if 'database' in sys.modules and sys.modules['database'].MOTOR != 'sqlite':
+        raise RuntimeError("database ya se importó con MySQL: llamar a usar() antes")
+    os.environ['KINDERFIESTA_DB_MOTOR'] = 'sqlite'
+    os.environ['KINDERFIESTA_DB_SQLITE'] = ruta
+    motor_sqlite.RUTA = ruta
+    motor_sqlite.RUTAS_POR_HOST.clear()
+    motor_sqlite.RUTAS_POR_HOST.update(replicas or {})
@@ -0,0 +1,126 @@
+"""
+KINDERFIESTA - Presupuesto de tiempo de importación de app.py
+Corre `python -X importtime -c "import app"` varias veces en procesos
+nuevos y mira dos cosas:
+
+- el costo PROPIO de importar la app (todo menos Flask y las otras
+  dependencias que app.py importa directamente): tiene que entrar en
+  PRESUPUESTO_MS. Es lo que paga cada worker que arranca y cada script
+  que hace `from app import ...`.
+- que las dependencias de DIFERIDOS no se carguen al importar: se
+  cargan recién al usarlas (perezoso.py) o dentro de crear_app().
+
+    python benchmarks/tiempo_importacion.py
+    python benchmarks/tiempo_importacion.py --corridas 10 --salida /tmp/importacion.json
+
+Termina con código 1 si se pasa del presupuesto o se carga algo diferido.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ~2x lo medido en una máquina de desarrollo modesta (antes: ~50 ms, ahora: ~18 ms).
+# Casi todo lo que queda es Flask compilando las reglas de @app.route.
+PRESUPUESTO_MS = 35
+DIFERIDOS = ('mysql.connector', 'bcrypt', 'flask_cors', 'aiomysql', 'PIL', 'brotli')
+
+CODIGO = ("import json, app, perezoso; "
+          f"print(json.dumps([m for m in {DIFERIDOS!r} if perezoso.cargado(m)]))")
+
+
+def _modulos_propios():
+    return {nombre[:-3] for nombre in os.listdir(RAIZ) if nombre.endswith('.py')}
+
+
+def parsear(salida, raiz='app'):
+    """
+    Lee la salida de -X importtime. Devuelve (total_us, propio_us, modulos):
+    propio descuenta los imports directos de `raiz` que no son del repo
+    (cada uno con todo lo que arrastra); modulos es el acumulado de cada
+    módulo del repo importado directamente.
+    """
+    propios = _modulos_propios()
+    hijos = []
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        nivel = (len(nombre) - len(nombre.lstrip(' ')) - 1) // 2
+        nombre = nombre.strip()
+        if nivel == 0:
+            if nombre == raiz:
+                total = int(acumulado)
+                ajenos = sum(us for hijo, us in hijos if hijo not in propios)
+                return total, total - ajenos, {hijo: us for hijo, us in hijos if hijo in propios}
+            hijos = []
+        elif nivel == 1:
+            hijos.append((nombre, int(acumulado)))
+    raise ValueError(f"No se encontró '{raiz}' en la salida de -X importtime")
+
+
+def medir(corridas):
+    # Sin .pyc cada corrida mediría también la compilación: la primera los escribe
+    entorno = {clave: valor for clave, valor in os.environ.items() if clave != 'PYTHONDONTWRITEBYTECODE'}
+    entorno['KINDERFIESTA_LOG_NIVEL'] = 'ERROR'
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=RAIZ, env=entorno, check=True)
+
+    totales, propios, modulos, cargados = [], [], {}, set()
+    for _ in range(corridas):
+        proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', CODIGO], cwd=RAIZ, env=entorno,
+                                 capture_output=True, text=True, check=True)
+        total, propio, por_modulo = parsear(proceso.stderr)
+        totales.append(total)
+        propios.append(propio)
+        for nombre, us in por_modulo.items():
+            modulos.setdefault(nombre, []).append(us)
+        cargados.update(json.loads(proceso.stdout.strip().splitlines()[-1]))
+
+    return {
+        'total_ms': round(statistics.median(totales) / 1000, 2),
+        'propio_ms': round(statistics.median(propios) / 1000, 2),
+        'modulos_ms': {nombre: round(statistics.median(us) / 1000, 2)
+                       for nombre, us in sorted(modulos.items(), key=lambda m: -statistics.median(m[1]))},
+        'diferidos_cargados': sorted(cargados),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Presupuesto de tiempo de importación de app.py')
+    parser.add_argument('--corridas', type=int, default=5)
+    parser.add_argument('--salida', help='Guardar los resultados en este JSON')
+    args = parser.parse_args(argv)
+
+    resultado = medir(args.corridas)
+    print(f"import app: {resultado['total_ms']} ms en total, "
+          f"{resultado['propio_ms']} ms propios (presupuesto {PRESUPUESTO_MS} ms)")
+    for nombre, ms in list(resultado['modulos_ms'].items())[:8]:
+        print(f"  {nombre:<24}{ms:>8}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({'fecha': datetime.now().isoformat(timespec='seconds'),
+                       'python': platform.python_version(), 'presupuesto_ms': PRESUPUESTO_MS, **resultado},
+                      f, ensure_ascii=False, indent=2)
+
+    errores = []
+    if resultado['propio_ms'] > PRESUPUESTO_MS:
+        errores.append(f"importar app tarda {resultado['propio_ms']} ms propios (presupuesto {PRESUPUESTO_MS} ms)")
+    if resultado['diferidos_cargados']:
+        errores.append(f"se cargan al importar: {', '.join(resultado['diferidos_cargados'])}")
+    if errores:
+        print("\n❌ " + "\n❌ ".join(errores))
+        return 1
+    print("\n✅ Importación dentro del presupuesto")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
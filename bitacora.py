@@ -0,0 +1,142 @@
+"""
+KINDERFIESTA - Logging
+Loggers por módulo (kinderfiesta.database, kinderfiesta.app, ...) que
+escriben a través de una cola: la request solo encola el registro y un
+hilo aparte lo formatea y lo escribe a stderr.
+
+    log = bitacora.obtener_logger('database')
+    log.info("Salones en BD: %d", len(salones))      # se formatea solo si se emite
+    log.debug("Salón %s", nombre, extra=bitacora.muestreo(100))   # 1 de cada 100
+
+Nivel: variable KINDERFIESTA_LOG_NIVEL (WARNING por defecto, o sea
+producción). El servidor de desarrollo (python app.py) usa INFO.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+RAIZ = 'kinderfiesta'
+NIVEL_POR_DEFECTO = os.environ.get('KINDERFIESTA_LOG_NIVEL', 'WARNING').upper()
+FORMATO = '%(asctime)s %(levelname)-7s [%(process)d] %(name)s: %(message)s'
+
+# Una "salida" = handler con cola + listener (hilo) + handlers de destino
+_salidas = []
+_instalado = False
+_lock = threading.Lock()
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Deja pasar 1 de cada N registros que traen extra={'muestreo': N}.
+    Se cuenta por mensaje (la plantilla, no el texto formateado).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._contadores = {}
+
+    def filter(self, record):
+        cada = getattr(record, 'muestreo', None)
+        if not cada or cada <= 1:
+            return True
+        clave = (record.name, record.msg)
+        visto = self._contadores.get(clave, 0)
+        self._contadores[clave] = visto + 1
+        return visto % cada == 0
+
+
+class _HandlerCola(logging.handlers.QueueHandler):
+    """
+    La cola es del mismo proceso, así que no hace falta formatear ni copiar
+    el registro antes de encolarlo: el hilo del listener lo hace.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def muestreo(cada):
+    """extra= para registrar solo 1 de cada `cada` mensajes iguales"""
+    return {'muestreo': cada}
+
+
+def _conectar_salida(logger, *destinos):
+    """Agrega a `logger` un handler con cola; un hilo aparte escribe en `destinos`"""
+    handler = _HandlerCola(queue.SimpleQueue())
+    handler.addFilter(FiltroMuestreo())
+    logger.addHandler(handler)
+    salida = {'handler': handler, 'destinos': destinos, 'listener': None}
+    _arrancar(salida)
+    _salidas.append(salida)
+
+
+def _arrancar(salida):
+    salida['listener'] = logging.handlers.QueueListener(salida['handler'].queue, *salida['destinos'])
+    salida['listener'].start()
+
+
+def _detener():
+    for salida in _salidas:
+        salida['listener'].stop()
+
+
+def _despues_de_fork():
+    """Los hilos de los listeners no sobreviven al fork de gunicorn: se crean otros en el hijo"""
+    for salida in _salidas:
+        salida['handler'].queue = queue.SimpleQueue()
+        _arrancar(salida)
+
+
+def configurar(nivel=None):
+    """
+    Instala el handler con cola en el logger raíz de la app (solo la
+    primera vez). Con `nivel` cambia el nivel de todos los loggers.
+    """
+    global _instalado
+    raiz = logging.getLogger(RAIZ)
+
+    with _lock:
+        if not _instalado:
+            _instalado = True
+            raiz.setLevel(NIVEL_POR_DEFECTO)
+            raiz.propagate = False
+            consola = logging.StreamHandler()
+            consola.setFormatter(logging.Formatter(FORMATO))
+            _conectar_salida(raiz, consola)
+            atexit.register(_detener)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=_despues_de_fork)
+
+    if nivel:
+        raiz.setLevel(nivel.upper() if isinstance(nivel, str) else nivel)
+    return raiz
+
+
+def obtener_logger(modulo):
+    """Logger del módulo: kinderfiesta.<modulo>"""
+    configurar()
+    return logging.getLogger(f"{RAIZ}.{modulo}")
+
+
+def obtener_logger_archivo(modulo, ruta, max_bytes=5 * 1024 * 1024, copias=5):
+    """
+    Logger que escribe SOLO a un archivo rotativo (una línea por mensaje,
+    sin prefijo). También pasa por una cola: la request no espera al disco.
+    """
+    configurar()
+    logger = logging.getLogger(f"{RAIZ}.{modulo}")
+    with _lock:
+        if not logger.handlers:
+            directorio = os.path.dirname(ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            archivo = logging.handlers.RotatingFileHandler(ruta, maxBytes=max_bytes, backupCount=copias,
+                                                           encoding='utf-8', delay=True)
+            archivo.setFormatter(logging.Formatter('%(message)s'))
+            logger.propagate = False
+            _conectar_salida(logger, archivo)
+    return logger
@@ -0,0 +1,451 @@
+"""
+KINDERFIESTA - Servicio de catálogo
+Punto único de lectura de salones, reseñas y estadísticas.
+Lo usan tanto las rutas /api/* como las páginas HTML.
+
+Las lecturas públicas de salones salen de la instantánea compartida por
+los workers (ver instantanea.py) cuando hay una; si no, de MySQL.
+
+Si MySQL no responde (ver disyuntor.py), las lecturas públicas devuelven
+la última copia buena (ver respaldo.py) en lugar de listas vacías.
+"""
+
+import itertools
+
+import cercania
+import database as db
+import disyuntor
+import fotos
+import horarios
+import instantanea
+import respaldo
+from modelos import Salon, desde_fila
+
+# Campos virtuales: no son columnas de `salones`
+CAMPO_REVIEWS = 'reviews'   # una consulta aparte para todos los salones
+CAMPO_GALERIA = 'galeria'   # manifiesto de fotos reales en disco (ver fotos.py)
+CAMPOS_VIRTUALES = (CAMPO_REVIEWS, CAMPO_GALERIA)
+
+CAMPOS_VALIDOS = db.COLUMNAS_SALON + CAMPOS_VIRTUALES
+
+# Lo que devuelve /api/salones cuando no se pide ?fields=
+CAMPOS_POR_DEFECTO = CAMPOS_VALIDOS
+
+# Proyecciones de las páginas HTML: solo lo que cada plantilla muestra
+CAMPOS_DETALLE = ('id', 'name', 'phone', 'whatsapp', 'address', 'locationCode',
+                  'category', 'rating', 'folder', 'reviews', 'galeria')
+CAMPOS_DASHBOARD = ('id', 'visible', 'reviews')
+CAMPOS_PANEL_ADMIN = ('id', 'name', 'category', 'address', 'phone', 'rating',
+                      'visible', 'folder', 'reviews')
+
+# /api/salones/cerca: radio en km y cantidad de salones
+RADIO_CERCA_KM, RADIO_CERCA_MAXIMO_KM = 5.0, 50.0
+LIMITE_CERCA, LIMITE_CERCA_MAXIMO = 10, 50
+
+
+# Versión del catálogo: sube con cada alta, baja, cambio de visibilidad o
+# reseña. Las cachés (fragmentos de plantillas, etc.) la usan en su clave.
+_contador_version = itertools.count(1)
+_version = 0
+
+
+def version():
+    """
+    (generación de la instantánea, cambios de este proceso). La generación
+    está en el archivo que comparten todos los workers: lo que se cambia en
+    otro worker cambia la clave apenas él publica la instantánea. El
+    contador local hace que quien escribió vea su cambio sin esperar eso.
+    """
+    foto = instantanea.actual()
+    return (foto.generacion if foto is not None else 0), _version
+
+
+def invalidar():
+    """Avisar que el catálogo cambió (llamar después de cada escritura)"""
+    global _version
+    _version = next(_contador_version)
+    instantanea.republicar()
+
+
+def parsear_campos(valor):
+    """
+    Convierte el parámetro ?fields=a,b,c en una tupla de campos válidos.
+    Retorna None si no se pidió proyección.
+    Lanza ValueError si algún campo no existe.
+    """
+    if not valor:
+        return None
+
+    campos = []
+    for campo in valor.split(','):
+        campo = campo.strip()
+        if not campo:
+            continue
+        if campo not in CAMPOS_VALIDOS:
+            raise ValueError(f"Campo desconocido: '{campo}'. Válidos: {', '.join(CAMPOS_VALIDOS)}")
+        if campo not in campos:
+            campos.append(campo)
+
+    return tuple(campos) if campos else None
+
+
+def parsear_cercania(args):
+    """
+    ?lat=&lng=&radio=&limite= de /api/salones/cerca -> (lat, lng, radio_km, limite).
+    Lanza ValueError si falta el punto o algún valor no tiene sentido.
+    """
+    try:
+        lat = float(args.get('lat', ''))
+        lng = float(args.get('lng', ''))
+    except ValueError:
+        raise ValueError("Faltan lat y lng (números, ej. ?lat=-16.5&lng=-68.16)")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("lat debe estar entre -90 y 90 y lng entre -180 y 180")
+
+    try:
+        radio_km = float(args.get('radio') or RADIO_CERCA_KM)
+        limite = int(args.get('limite') or LIMITE_CERCA)
+    except ValueError:
+        raise ValueError("radio (km) y limite deben ser números")
+    if not 0 < radio_km <= RADIO_CERCA_MAXIMO_KM:
+        raise ValueError(f"radio debe estar entre 0 y {RADIO_CERCA_MAXIMO_KM:g} km")
+    if not 0 < limite <= LIMITE_CERCA_MAXIMO:
+        raise ValueError(f"limite debe estar entre 1 y {LIMITE_CERCA_MAXIMO}")
+
+    return lat, lng, radio_km, limite
+
+
+def parsear_horario(args):
+    """
+    ?abierto_ahora=1 o ?abierto_en=sábado,15:00 -> franja de horarios.py.
+    Retorna None si no se pidió filtro. Lanza ValueError si no se entiende.
+    """
+    if args.get('abierto_en'):
+        return horarios.parsear_momento(args['abierto_en'])
+    if args.get('abierto_ahora', '').lower() in ('1', 'true', 'si', 'sí'):
+        return horarios.franja_actual()
+    return None
+
+
+def _columnas_sql(campos):
+    """Columnas reales a seleccionar para los campos pedidos"""
+    columnas = [c for c in campos if c not in CAMPOS_VIRTUALES]
+    # La galería y las fotos por defecto dependen de la carpeta
+    if (CAMPO_GALERIA in campos or 'fotos' in campos) and 'folder' not in columnas:
+        columnas.append('folder')
+    return columnas
+
+
+def _completar_salon(salon, campos, reviews_por_salon):
+    """Campos virtuales y valores por defecto que esperan las plantillas y el JavaScript"""
+    if not salon.get('folder'):
+        salon['folder'] = f"salon{salon['id']}"
+
+    if CAMPO_REVIEWS in campos:
+        salon[CAMPO_REVIEWS] = reviews_por_salon.get(salon['id'], [])
+    if CAMPO_GALERIA in campos:
+        salon[CAMPO_GALERIA] = fotos.obtener_manifiesto(salon['folder'])
+    if 'fotos' in campos and not salon.get('fotos'):
+        # Solo los archivos que existen, no una lista inventada
+        salon['fotos'] = fotos.nombres_fotos(salon['folder'])
+    if 'rating' in salon:
+        salon['rating'] = float(salon['rating']) if salon['rating'] is not None else 0.0
+    for coordenada in ('lat', 'lng'):
+        if salon.get(coordenada) is not None:
+            salon[coordenada] = float(salon[coordenada])
+
+    if 'folder' not in campos:
+        del salon['folder']
+    return salon
+
+
+def _abiertos(salones, abiertos):
+    return salones if abiertos is None else [s for s in salones if s['id'] in abiertos]
+
+
+def _instantanea(incluir_ocultos):
+    """La instantánea para lecturas públicas (los ocultos solo están en MySQL)"""
+    return None if incluir_ocultos else instantanea.actual()
+
+
+def _desde_instantanea(foto, campos, ids=None, franja=None):
+    salones, reviews_por_salon = foto.salones(_columnas_sql(campos), ids=ids, franja=franja,
+                                              con_reviews=CAMPO_REVIEWS in campos)
+    return [_completar_salon(s, campos, reviews_por_salon) for s in salones]
+
+
+# ============ SIN MYSQL: ÚLTIMA COPIA BUENA ============
+
+PREFIJO_SALONES = 'salones:'
+
+
+def _clave_salones(campos):
+    """Una copia por proyección; el orden de ?fields= no importa"""
+    return PREFIJO_SALONES + ','.join(c for c in CAMPOS_VALIDOS if c in campos)
+
+
+def _salones_de_respaldo(campos, ids=None):
+    """
+    Los salones públicos de la última copia que tenga todos los campos
+    pedidos (de esa proyección o de una más completa), solo los de `ids`
+    si se pasan. None si no hay ninguna copia que sirva.
+    """
+    clave = _clave_salones(campos)
+    guardadas = respaldo.claves(PREFIJO_SALONES)
+    if clave not in guardadas:
+        pedidos = set(campos)
+        clave = next((c for c in guardadas if pedidos <= set(c[len(PREFIJO_SALONES):].split(','))), None)
+        if clave is None:
+            return None
+
+    salones = respaldo.servir(clave)
+    if ids is not None:
+        salones = [s for s in salones if s['id'] in ids]
+    return [dict({'id': s['id']}, **{c: s[c] for c in campos if c in s}) for s in salones]
+
+
+def _con_respaldo(clave, leer, *argumentos):
+    """leer(*argumentos); si le faltó MySQL, la última copia buena de `clave`"""
+    with disyuntor.observar() as observacion:
+        datos = leer(*argumentos)
+    if not observacion.fallo:
+        respaldo.guardar(clave, datos)
+        return datos
+    copia = respaldo.servir(clave)
+    return datos if copia is None else copia
+
+
+def listar_salones(campos=None, incluir_ocultos=False, franja=None):
+    """
+    Lista el catálogo seleccionando solo las columnas pedidas.
+    Las reviews (si se piden) se cargan en UNA consulta para todos los salones.
+    El campo 'id' siempre se incluye.
+    Con `franja` (ver parsear_horario) solo los salones abiertos en ese momento.
+    """
+    campos = campos or CAMPOS_POR_DEFECTO
+
+    foto = _instantanea(incluir_ocultos)
+    if foto is not None:
+        return _desde_instantanea(foto, campos, franja=franja)
+
+    abiertos = None
+    if franja is not None:
+        abiertos = horarios.abiertos_en(franja)
+        if not abiertos:
+            return []
+
+    with disyuntor.observar() as observacion:
+        salones = _abiertos(db.obtener_salones_catalogo(_columnas_sql(campos), solo_visibles=not incluir_ocultos),
+                            abiertos)
+
+        reviews_por_salon = {}
+        if CAMPO_REVIEWS in campos:
+            reviews_por_salon = db.obtener_reviews_por_salones([s['id'] for s in salones])
+
+    return _listado(salones, campos, reviews_por_salon, observacion.fallo, incluir_ocultos, abiertos)
+
+
+def _listado(salones, campos, reviews_por_salon, fallo, incluir_ocultos, abiertos):
+    """Completa el listado y lo guarda como copia, o usa la copia si faltó MySQL"""
+    if fallo and not incluir_ocultos:
+        copia = _salones_de_respaldo(campos, abiertos)
+        if copia is not None:
+            return copia
+
+    salones = [_completar_salon(s, campos, reviews_por_salon) for s in salones]
+    if not fallo and not incluir_ocultos and abiertos is None:
+        respaldo.guardar(_clave_salones(campos), salones)
+    return salones
+
+
+def obtener_salon(salon_id, campos=None, incluir_ocultos=False):
+    """Obtiene un salón del catálogo (None si no existe o está oculto)"""
+    campos = campos or CAMPOS_POR_DEFECTO
+
+    foto = _instantanea(incluir_ocultos)
+    if foto is not None:
+        salones = _desde_instantanea(foto, campos, ids=(salon_id,))
+        return salones[0] if salones else None
+
+    with disyuntor.observar() as observacion:
+        salones = db.obtener_salones_catalogo(_columnas_sql(campos), solo_visibles=not incluir_ocultos,
+                                              salon_id=salon_id)
+
+        reviews_por_salon = {}
+        if salones and CAMPO_REVIEWS in campos:
+            reviews_por_salon = db.obtener_reviews_por_salones([salon_id])
+
+    return _salon(salones, salon_id, campos, reviews_por_salon, observacion.fallo, incluir_ocultos)
+
+
+def _salon(salones, salon_id, campos, reviews_por_salon, fallo, incluir_ocultos):
+    """El salón pedido; sin MySQL, el de la copia del catálogo"""
+    if fallo and not incluir_ocultos:
+        copia = _salones_de_respaldo(campos, {salon_id})
+        if copia is not None:
+            return copia[0] if copia else None
+
+    if not salones:
+        return None
+    return _completar_salon(salones[0], campos, reviews_por_salon)
+
+
+def salones_cerca(lat, lng, radio_km, limite, campos=None):
+    """
+    Los salones visibles más cercanos al punto, del más cercano al más
+    lejano, con 'distancia_km'. El índice espacial (cercania.py) elige los
+    ids; acá se cargan solo esos, con los campos pedidos.
+    """
+    campos = campos or CAMPOS_POR_DEFECTO
+
+    distancias = dict(cercania.cercanos(lat, lng, radio_km, limite))
+    if not distancias:
+        return []
+
+    foto = instantanea.actual()
+    salones = _desde_instantanea(foto, campos, ids=distancias) if foto is not None else None
+    # El índice ya tiene un salón recién aprobado que la instantánea todavía no: MySQL
+    if salones is not None and len(salones) == len(distancias):
+        salones.sort(key=lambda s: distancias[s['id']])
+        for salon in salones:
+            salon['distancia_km'] = round(distancias[salon['id']], 2)
+        return salones
+
+    with disyuntor.observar() as observacion:
+        salones = db.obtener_salones_catalogo(_columnas_sql(campos), salon_ids=list(distancias))
+
+        reviews_por_salon = {}
+        if CAMPO_REVIEWS in campos:
+            reviews_por_salon = db.obtener_reviews_por_salones([s['id'] for s in salones])
+
+    copia = _salones_de_respaldo(campos, distancias) if observacion.fallo else None
+    if copia is not None:
+        salones = copia
+    else:
+        for salon in salones:
+            _completar_salon(salon, campos, reviews_por_salon)
+
+    salones.sort(key=lambda s: distancias[s['id']])
+    for salon in salones:
+        salon['distancia_km'] = round(distancias[salon['id']], 2)
+    return salones
+
+
+def textos_horarios(salon_id):
+    """Horarios formateados de la página de detalle"""
+    foto = instantanea.actual()
+    if foto is not None:
+        return foto.textos_horarios(salon_id)
+    return horarios.textos(salon_id)
+
+
+def como_salones(salones):
+    """Dicts del catálogo -> [Salon] para las plantillas (alias en español incluidos)"""
+    return [desde_fila(Salon, salon) for salon in salones]
+
+
+def obtener_estadisticas():
+    """Estadísticas de la página de inicio (una sola consulta)"""
+    return _con_respaldo('estadisticas', db.obtener_estadisticas)
+
+
+def obtener_testimonios(limite=10):
+    """Testimonios aprobados, los más recientes primero"""
+    return _con_respaldo(f'testimonios:{limite}', db.obtener_testimonios_aprobados, limite)
+
+
+# Lo que responde /api/stats si falla la consulta
+ESTADISTICAS_API_ERROR = {
+    'familias': '0',
+    'salones': '0+',
+    'satisfaccion': '98%',
+    'tiempo': '24h'
+}
+
+
+def formato_estadisticas(stats):
+    """Las cifras como las muestra /api/stats"""
+    return {
+        'familias': f"{stats['familias']}+" if stats['familias'] > 0 else "0",
+        'salones': f"{stats['salones']}+",
+        'satisfaccion': f"{stats['satisfaccion']}%",
+        'tiempo': '24h'
+    }
+
+
+def buscar(query):
+    """Búsqueda de texto sobre los salones visibles"""
+    return db.buscar_salones(query)
+
+
+# ============ VERSIONES ASYNC (modo ASGI, ver asgi.py) ============
+# Mismos campos y mismo resultado que las de arriba; solo cambia el acceso
+# a MySQL. database_async se importa acá adentro: aiomysql solo hace falta
+# si se corre en modo ASGI.
+
+async def listar_salones_async(campos=None, incluir_ocultos=False, franja=None):
+    import database_async as dba
+
+    campos = campos or CAMPOS_POR_DEFECTO
+
+    # Leer la instantánea no espera a nadie: es memoria compartida
+    foto = _instantanea(incluir_ocultos)
+    if foto is not None:
+        return _desde_instantanea(foto, campos, franja=franja)
+
+    abiertos = None
+    if franja is not None:
+        abiertos = await horarios.abiertos_en_async(franja)
+        if not abiertos:
+            return []
+
+    with disyuntor.observar() as observacion:
+        salones = _abiertos(await dba.obtener_salones_catalogo(_columnas_sql(campos),
+                                                               solo_visibles=not incluir_ocultos), abiertos)
+
+        reviews_por_salon = {}
+        if CAMPO_REVIEWS in campos:
+            reviews_por_salon = await dba.obtener_reviews_por_salones([s['id'] for s in salones])
+
+    return _listado(salones, campos, reviews_por_salon, observacion.fallo, incluir_ocultos, abiertos)
+
+
+async def obtener_salon_async(salon_id, campos=None, incluir_ocultos=False):
+    import database_async as dba
+
+    campos = campos or CAMPOS_POR_DEFECTO
+
+    foto = _instantanea(incluir_ocultos)
+    if foto is not None:
+        salones = _desde_instantanea(foto, campos, ids=(salon_id,))
+        return salones[0] if salones else None
+
+    with disyuntor.observar() as observacion:
+        salones = await dba.obtener_salones_catalogo(_columnas_sql(campos), solo_visibles=not incluir_ocultos,
+                                                     salon_id=salon_id)
+
+        reviews_por_salon = {}
+        if salones and CAMPO_REVIEWS in campos:
+            reviews_por_salon = await dba.obtener_reviews_por_salones([salon_id])
+
+    return _salon(salones, salon_id, campos, reviews_por_salon, observacion.fallo, incluir_ocultos)
+
+
+async def _con_respaldo_async(clave, leer, *argumentos):
+    with disyuntor.observar() as observacion:
+        datos = await leer(*argumentos)
+    if not observacion.fallo:
+        respaldo.guardar(clave, datos)
+        return datos
+    copia = respaldo.servir(clave)
+    return datos if copia is None else copia
+
+
+async def obtener_estadisticas_async():
+    import database_async as dba
+    return await _con_respaldo_async('estadisticas', dba.obtener_estadisticas)
+
+
+async def obtener_testimonios_async(limite=10):
+    import database_async as dba
+    return await _con_respaldo_async(f'testimonios:{limite}', dba.obtener_testimonios_aprobados, limite)
@@ -0,0 +1,207 @@
+"""
+KINDERFIESTA - Salones cerca de un punto (/api/salones/cerca)
+Índice espacial en memoria sobre salones.lat / salones.lng: una grilla de
+celdas de CELDA_GRADOS (~1 km) con los salones visibles de cada una.
+
+- cercanos(): los más cercanos dentro de un radio, recorriendo anillos de
+  celdas desde el punto hacia afuera. Se frena apenas ningún anillo más
+  lejano puede mejorar el resultado: el costo depende de cuántos salones
+  hay alrededor, no del total.
+- Se carga entero en la primera búsqueda (una consulta) y después se
+  actualiza de a un salón: actualizar_salon() al aprobar o cambiar la
+  visibilidad, quitar() al eliminar.
+- Cada worker tiene su índice: se recarga entero cada REFRESCO segundos
+  para ver los cambios hechos desde otros workers. Si MySQL no responde
+  se sigue usando el que había (ver disyuntor.py).
+
+    python cercania.py     # completa lat/lng de los salones que no las tienen
+"""
+
+import heapq
+import math
+import os
+import threading
+import time
+
+import bitacora
+import database as db
+import disyuntor
+import geo
+import instantanea
+
+log = bitacora.obtener_logger('cercania')
+
+CELDA_GRADOS = 0.01
+KM_POR_GRADO = math.pi * geo.RADIO_TIERRA_KM / 180
+REFRESCO = int(os.environ.get('KINDERFIESTA_GEO_REFRESCO', '300'))
+
+
+class IndiceGrilla:
+    """Grilla (fila, columna) -> {salon_id: (lat, lng)}"""
+
+    def __init__(self, celda=CELDA_GRADOS):
+        self.celda = celda
+        self._celdas = {}
+        self._claves = {}   # salon_id -> celda donde está
+
+    def __len__(self):
+        return len(self._claves)
+
+    def _clave(self, lat, lng):
+        return math.floor(lat / self.celda), math.floor(lng / self.celda)
+
+    def agregar(self, salon_id, lat, lng):
+        self.quitar(salon_id)
+        clave = self._clave(lat, lng)
+        self._celdas.setdefault(clave, {})[salon_id] = (lat, lng)
+        self._claves[salon_id] = clave
+
+    def quitar(self, salon_id):
+        clave = self._claves.pop(salon_id, None)
+        if clave is not None:
+            celda = self._celdas[clave]
+            del celda[salon_id]
+            if not celda:
+                del self._celdas[clave]
+
+    @staticmethod
+    def _anillo(fila, columna, r):
+        """Las celdas a distancia r (en celdas) de la central"""
+        if r == 0:
+            yield fila, columna
+            return
+        for c in range(columna - r, columna + r + 1):
+            yield fila - r, c
+            yield fila + r, c
+        for f in range(fila - r + 1, fila + r):
+            yield f, columna - r
+            yield f, columna + r
+
+    def cercanos(self, lat, lng, radio_km, limite):
+        """[(salon_id, km)] de los `limite` salones más cercanos a menos de radio_km"""
+        if limite <= 0 or not self._celdas:
+            return []
+
+        # Lado más corto de una celda en la franja de la búsqueda (las
+        # celdas se angostan hacia los polos): cada anillo aleja al menos eso
+        lat_extrema = min(abs(lat) + radio_km / KM_POR_GRADO, 89.0)
+        lado_km = self.celda * KM_POR_GRADO * math.cos(math.radians(lat_extrema))
+        anillos = math.ceil(radio_km / lado_km) + 1
+
+        mejores = []   # heap de (-km, salon_id) con los `limite` más cercanos
+
+        def considerar(salones):
+            for salon_id, (lat_salon, lng_salon) in salones.items():
+                km = geo.distancia_km(lat, lng, lat_salon, lng_salon)
+                if km > radio_km:
+                    continue
+                if len(mejores) < limite:
+                    heapq.heappush(mejores, (-km, salon_id))
+                elif km < -mejores[0][0]:
+                    heapq.heapreplace(mejores, (-km, salon_id))
+
+        if (2 * anillos + 1) ** 2 > len(self._celdas):
+            # Radio enorme para lo poblada que está la grilla: más barato ver todo
+            for salones in self._celdas.values():
+                considerar(salones)
+        else:
+            fila, columna = self._clave(lat, lng)
+            for r in range(anillos + 1):
+                # Todo lo del anillo r está a más de (r - 1) lados del punto
+                if len(mejores) == limite and -mejores[0][0] <= (r - 1) * lado_km:
+                    break
+                for clave in self._anillo(fila, columna, r):
+                    salones = self._celdas.get(clave)
+                    if salones:
+                        considerar(salones)
+
+        return sorted(((salon_id, -km) for km, salon_id in mejores), key=lambda par: par[1])
+
+
+# ============ ÍNDICE DEL PROCESO ============
+
+_indice = None
+_cargado_en = None   # None = hay que (re)intentar la carga
+_lock = threading.Lock()
+
+
+def _cargar():
+    """Arma el índice con todos los salones visibles (de la instantánea, o una consulta)"""
+    global _indice, _cargado_en
+    foto = instantanea.actual()
+    with disyuntor.observar() as observacion:
+        coordenadas = foto.coordenadas() if foto is not None else db.obtener_coordenadas_salones()
+    if observacion.fallo:
+        # Queda el índice anterior (vencido: se reintenta en la próxima búsqueda)
+        if _indice is None:
+            _indice = IndiceGrilla()
+        return
+    nuevo = IndiceGrilla()
+    for salon_id, lat, lng in coordenadas:
+        nuevo.agregar(salon_id, lat, lng)
+    _indice, _cargado_en = nuevo, time.monotonic()
+    log.info("🗺️ Índice de cercanía: %s salones", len(nuevo))
+
+
+def cercanos(lat, lng, radio_km, limite):
+    """[(salon_id, km)] ordenados por distancia"""
+    with _lock:
+        if _indice is None or _cargado_en is None or time.monotonic() - _cargado_en > REFRESCO:
+            _cargar()
+        return _indice.cercanos(lat, lng, radio_km, limite)
+
+
+def actualizar_salon(salon_id):
+    """Después de crear un salón o cambiar su visibilidad"""
+    if _indice is None:
+        return   # se carga entero en la primera búsqueda
+    with disyuntor.observar() as observacion:
+        filas = db.obtener_coordenadas_salones(salon_id)
+    if observacion.fallo:
+        return   # lo corrige la próxima recarga entera
+    with _lock:
+        if filas:
+            _, lat, lng = filas[0]
+            _indice.agregar(salon_id, lat, lng)
+        else:
+            _indice.quitar(salon_id)
+
+
+def quitar(salon_id):
+    """Después de eliminar un salón"""
+    if _indice is None:
+        return
+    with _lock:
+        _indice.quitar(salon_id)
+
+
+def invalidar():
+    global _indice, _cargado_en
+    with _lock:
+        _indice, _cargado_en = None, None
+
+
+# ============ COORDENADAS FALTANTES ============
+
+def completar_coordenadas():
+    """
+    Decodifica el plus code (o el link de Maps) de los salones creados
+    antes de guardar coordenadas. Devuelve (completados, sin_ubicacion).
+    """
+    completados, sin_ubicacion = 0, []
+    for salon in db.obtener_salones_sin_coordenadas():
+        lat, lng = geo.coordenadas(salon.get('locationCode'), salon.get('google_maps'))
+        if lat is not None and db.guardar_coordenadas(salon['id'], lat, lng):
+            completados += 1
+        else:
+            sin_ubicacion.append(salon['id'])
+    invalidar()
+    return completados, sin_ubicacion
+
+
+if __name__ == '__main__':
+    bitacora.configurar('INFO')
+    completados, sin_ubicacion = completar_coordenadas()
+    print(f"✅ {completados} salones con coordenadas nuevas")
+    if sin_ubicacion:
+        print(f"⚠️ Sin plus code ni link de Maps válido: {', '.join(map(str, sin_ubicacion))}")
@@ -0,0 +1,333 @@
+"""
+KINDERFIESTA - Compresión de respuestas (middleware WSGI)
+Comprime HTML, JSON, CSS y JS con brotli o gzip según Accept-Encoding.
+- Respuestas chicas (< TAMANO_MINIMO) salen sin comprimir.
+- Respuestas grandes o sin Content-Length se comprimen en streaming.
+- Las respuestas cacheables guardan sus bytes comprimidos en un LRU,
+  así /api/salones repetido no vuelve a comprimir lo mismo.
+"""
+
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+TAMANO_MINIMO = 1024
+# Por encima de esto no se bufferiza: se comprime en streaming
+LIMITE_BUFFER = 1024 * 1024
+# Memoria máxima de la caché de respuestas comprimidas
+LIMITE_CACHE_BYTES = 8 * 1024 * 1024
+
+NIVEL_GZIP = 6
+CALIDAD_BROTLI = 5
+
+TIPOS_COMPRIMIBLES = (
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/json', 'application/javascript', 'image/svg+xml',
+    'application/x-ndjson', 'text/csv'
+)
+
+_NOMBRES = {'br': 'br', 'gzip': 'gzip'}
+
+
+# ============ NEGOCIACIÓN ============
+
+def negociar(accept_encoding, disponibles=None):
+    """
+    Elige la codificación a partir de Accept-Encoding (respeta q=0).
+    Prefiere br sobre gzip cuando el cliente acepta ambas con igual peso.
+    disponibles: solo entre estas (p. ej. las variantes .br/.gz que hay en disco).
+    """
+    pesos = {}
+    for parte in accept_encoding.split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        nombre, _, parametros = parte.partition(';')
+        nombre = nombre.strip().lower()
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith('q='):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nombre] = peso
+
+    comodin = pesos.get('*', 0.0)
+    if disponibles is None:
+        disponibles = ('br', 'gzip') if brotli is not None else ('gzip',)
+    candidatas = []
+    if 'br' in disponibles:
+        candidatas.append(('br', pesos.get('br', comodin)))
+    if 'gzip' in disponibles:
+        candidatas.append(('gzip', pesos.get('gzip', pesos.get('x-gzip', comodin))))
+
+    mejor = None
+    for nombre, peso in candidatas:
+        if peso > 0 and (mejor is None or peso > mejor[1]):
+            mejor = (nombre, peso)
+    return mejor[0] if mejor else None
+
+
+def comprimir(datos, codificacion):
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=CALIDAD_BROTLI)
+    return gzip.compress(datos, compresslevel=NIVEL_GZIP, mtime=0)
+
+
+class _CompresorStreaming:
+    """Misma interfaz para gzip y brotli: comprimir(chunk) / terminar()"""
+
+    def __init__(self, codificacion):
+        if codificacion == 'br':
+            self._brotli = brotli.Compressor(quality=CALIDAD_BROTLI)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31 produce formato gzip (cabecera + crc)
+            self._zlib = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 31)
+
+    def comprimir(self, chunk):
+        if self._brotli:
+            return self._brotli.process(chunk)
+        return self._zlib.compress(chunk)
+
+    def vaciar(self):
+        if self._brotli:
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self):
+        if self._brotli:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+# ============ CACHÉ ============
+
+class CacheCompresion:
+    """LRU de bytes comprimidos, indexado por hash del cuerpo + codificación"""
+
+    def __init__(self, limite_bytes=LIMITE_CACHE_BYTES):
+        self.limite_bytes = limite_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor):
+        if len(valor) > self.limite_bytes:
+            return
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= len(anterior)
+            self._datos[clave] = valor
+            self.bytes_usados += len(valor)
+            while self.bytes_usados > self.limite_bytes:
+                _, expulsado = self._datos.popitem(last=False)
+                self.bytes_usados -= len(expulsado)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.bytes_usados = 0
+
+
+# ============ MIDDLEWARE ============
+
+def _cabecera(cabeceras, nombre):
+    nombre = nombre.lower()
+    for clave, valor in cabeceras:
+        if clave.lower() == nombre:
+            return valor
+    return None
+
+
+def _sin_cabeceras(cabeceras, *nombres):
+    nombres = {n.lower() for n in nombres}
+    return [(k, v) for k, v in cabeceras if k.lower() not in nombres]
+
+
+def _agregar_vary(cabeceras):
+    vary = _cabecera(cabeceras, 'Vary')
+    if vary is None:
+        return cabeceras + [('Vary', 'Accept-Encoding')]
+    if 'accept-encoding' in vary.lower():
+        return cabeceras
+    return _sin_cabeceras(cabeceras, 'Vary') + [('Vary', f"{vary}, Accept-Encoding")]
+
+
+def _etag_codificado(etag, codificacion):
+    """La representación comprimida necesita su propio ETag"""
+    sufijo = '-br' if codificacion == 'br' else '-gz'
+    if etag.endswith('"'):
+        return etag[:-1] + sufijo + '"'
+    return etag + sufijo
+
+
+class _Respuesta:
+    """Iterable WSGI que garantiza close() del iterable original"""
+
+    def __init__(self, generador, original):
+        self._generador = generador
+        self._original = original
+
+    def __iter__(self):
+        return self._generador
+
+    def close(self):
+        if hasattr(self._original, 'close'):
+            self._original.close()
+
+
+class MiddlewareCompresion:
+    """
+    Envuelve la app WSGI:  app.wsgi_app = MiddlewareCompresion(app.wsgi_app)
+    """
+
+    def __init__(self, app, tamano_minimo=TAMANO_MINIMO, limite_buffer=LIMITE_BUFFER,
+                 cache=None):
+        self.app = app
+        self.tamano_minimo = tamano_minimo
+        self.limite_buffer = limite_buffer
+        self.cache = cache if cache is not None else CacheCompresion()
+
+    def __call__(self, environ, start_response):
+        codificacion = negociar(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacion is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+
+        capturado = {}
+
+        def _start_response(status, headers, exc_info=None):
+            capturado['status'] = status
+            capturado['headers'] = list(headers)
+            capturado['exc_info'] = exc_info
+            return lambda datos: (_ for _ in ()).throw(
+                RuntimeError('write() no está soportado con compresión'))
+
+        original = self.app(environ, _start_response)
+        iterador = iter(original)
+
+        # WSGI permite llamar start_response recién al primer chunk
+        pendientes = []
+        if 'status' not in capturado:
+            for chunk in iterador:
+                pendientes.append(chunk)
+                break
+        if 'status' not in capturado:
+            # Iterable vacío sin start_response: nada que comprimir, sale tal cual
+            return _Respuesta(self._encadenar(pendientes, iterador), original)
+
+        status = capturado['status']
+        cabeceras = capturado['headers']
+
+        if not self._comprimible(status, cabeceras):
+            start_response(status, cabeceras, capturado['exc_info'])
+            return _Respuesta(self._encadenar(pendientes, iterador), original)
+
+        longitud = _cabecera(cabeceras, 'Content-Length')
+        longitud = int(longitud) if longitud and longitud.isdigit() else None
+
+        if longitud is not None and longitud < self.tamano_minimo:
+            start_response(status, _agregar_vary(cabeceras), capturado['exc_info'])
+            return _Respuesta(self._encadenar(pendientes, iterador), original)
+
+        if longitud is not None and longitud <= self.limite_buffer:
+            try:
+                cuerpo = b''.join(pendientes) + b''.join(iterador)
+            finally:
+                if hasattr(original, 'close'):
+                    original.close()
+            comprimido = self._comprimir_con_cache(cuerpo, codificacion, status, cabeceras, environ)
+            start_response(status, self._cabeceras_comprimidas(cabeceras, codificacion, len(comprimido)),
+                           capturado['exc_info'])
+            return [comprimido]
+
+        # Tamaño desconocido o enorme: streaming
+        start_response(status, self._cabeceras_comprimidas(cabeceras, codificacion, None),
+                       capturado['exc_info'])
+        return _Respuesta(self._streaming(pendientes, iterador, codificacion), original)
+
+    # ---------- decisiones ----------
+
+    def _comprimible(self, status, cabeceras):
+        codigo = int(status.split(' ', 1)[0])
+        if codigo < 200 or codigo in (204, 206, 304):
+            return False
+        if _cabecera(cabeceras, 'Content-Encoding'):
+            return False
+        tipo = (_cabecera(cabeceras, 'Content-Type') or '').split(';')[0].strip().lower()
+        if tipo not in TIPOS_COMPRIMIBLES:
+            return False
+        cache_control = (_cabecera(cabeceras, 'Cache-Control') or '').lower()
+        return 'no-transform' not in cache_control
+
+    def _cacheable(self, status, cabeceras, environ):
+        if environ.get('REQUEST_METHOD') != 'GET' or not status.startswith('200'):
+            return False
+        if _cabecera(cabeceras, 'Set-Cookie'):
+            return False
+        cache_control = (_cabecera(cabeceras, 'Cache-Control') or '').lower()
+        return 'no-store' not in cache_control and 'private' not in cache_control
+
+    # ---------- compresión ----------
+
+    def _comprimir_con_cache(self, cuerpo, codificacion, status, cabeceras, environ):
+        if not self._cacheable(status, cabeceras, environ):
+            return comprimir(cuerpo, codificacion)
+
+        # Hashear es mucho más barato que volver a comprimir
+        clave = (codificacion, hashlib.blake2b(cuerpo, digest_size=16).digest())
+        comprimido = self.cache.obtener(clave)
+        if comprimido is None:
+            comprimido = comprimir(cuerpo, codificacion)
+            self.cache.guardar(clave, comprimido)
+        return comprimido
+
+    def _cabeceras_comprimidas(self, cabeceras, codificacion, longitud):
+        etag = _cabecera(cabeceras, 'ETag')
+        nuevas = _sin_cabeceras(cabeceras, 'Content-Length', 'ETag')
+        nuevas.append(('Content-Encoding', _NOMBRES[codificacion]))
+        if etag:
+            nuevas.append(('ETag', _etag_codificado(etag, codificacion)))
+        if longitud is not None:
+            nuevas.append(('Content-Length', str(longitud)))
+        return _agregar_vary(nuevas)
+
+    @staticmethod
+    def _encadenar(pendientes, iterador):
+        yield from pendientes
+        yield from iterador
+
+    @staticmethod
+    def _streaming(pendientes, iterador, codificacion):
+        compresor = _CompresorStreaming(codificacion)
+        for chunk in MiddlewareCompresion._encadenar(pendientes, iterador):
+            if not chunk:
+                continue
+            datos = compresor.comprimir(chunk) + compresor.vaciar()
+            if datos:
+                yield datos
+        final = compresor.terminar()
+        if final:
+            yield final
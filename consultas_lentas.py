@@ -0,0 +1,197 @@
+"""
+KINDERFIESTA - Log de consultas lentas
+Toda consulta que tarde más de UMBRAL_MS queda en logs/consultas_lentas.log
+(archivo rotativo, una línea JSON por consulta) con:
+- la función de database.py que la ejecutó,
+- el SQL normalizado,
+- la FORMA de los parámetros (tipos y largos, nunca los valores),
+- la duración.
+
+En modo desarrollo (KINDERFIESTA_ENTORNO=desarrollo o python app.py)
+además se corre EXPLAIN una vez por cada SQL distinto y se marcan los
+escaneos completos de tabla (type=ALL), aunque la consulta haya sido rápida.
+Con el motor SQLite (KINDERFIESTA_DB_MOTOR=sqlite) se corre EXPLAIN QUERY
+PLAN y cada 'SCAN <tabla>' sin índice cuenta como type=ALL.
+
+Lo llama metricas.CursorInstrumentado después de cada execute().
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+import bitacora
+
+UMBRAL_MS = float(os.environ.get('KINDERFIESTA_CONSULTA_LENTA_MS', '100'))
+ARCHIVO = os.path.join('logs', 'consultas_lentas.log')
+LARGO_MAXIMO_SQL = 2000
+
+# EXPLAIN solo tiene sentido para lecturas y escrituras con WHERE
+SENTENCIAS_EXPLICABLES = ('SELECT', 'UPDATE', 'DELETE')
+
+# 'SCAN salones', 'SEARCH reviews USING INDEX idx_salon (salon_id=?)'
+# (SQLite < 3.36 escribe 'SCAN TABLE salones')
+_PASO_SQLITE = re.compile(r'^(SCAN|SEARCH) (?:TABLE )?(\w+)')
+_INDICE_SQLITE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+_modo_desarrollo = os.environ.get('KINDERFIESTA_ENTORNO', '').lower() == 'desarrollo'
+_explicados = set()
+_lock = threading.Lock()
+
+log = bitacora.obtener_logger('consultas')
+_archivo = None
+
+
+def activar_modo_desarrollo(activo=True):
+    global _modo_desarrollo
+    _modo_desarrollo = activo
+
+
+def modo_desarrollo():
+    return _modo_desarrollo
+
+
+def _salida():
+    global _archivo
+    if _archivo is None:
+        _archivo = bitacora.obtener_logger_archivo('consultas_lentas', ARCHIVO)
+    return _archivo
+
+
+# ============ NORMALIZACIÓN ============
+
+def normalizar_sql(sql):
+    """Una sola línea, espacios colapsados y largo acotado"""
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    return sql[:LARGO_MAXIMO_SQL]
+
+
+def _forma_valor(valor):
+    if valor is None:
+        return 'None'
+    if isinstance(valor, (str, bytes)):
+        return f"{type(valor).__name__}[{len(valor)}]"
+    if isinstance(valor, (list, tuple, set)):
+        return f"{type(valor).__name__}[{len(valor)}]"
+    return type(valor).__name__
+
+
+def forma_parametros(parametros):
+    """(5, 'Merlin') -> ['int', 'str[6]']: describe sin exponer datos"""
+    if parametros is None:
+        return None
+    if isinstance(parametros, dict):
+        return {clave: _forma_valor(valor) for clave, valor in parametros.items()}
+    return [_forma_valor(valor) for valor in parametros]
+
+
+# ============ EXPLAIN ============
+
+def _explicar(sql, parametros):
+    """
+    Corre EXPLAIN en una conexión aparte (la original puede tener
+    resultados sin leer), pedida a database.conectar(): pool, disyuntor y
+    réplicas como cualquier lectura, sin contar en el presupuesto.
+    Devuelve la lista de filas del plan (None si no hay conexión).
+    """
+    import database
+
+    sqlite = database.MOTOR == 'sqlite'
+    conexion = database.conectar(lectura=True, instrumentada=False)
+    if conexion is None:
+        return None
+    try:
+        cursor = conexion.cursor(dictionary=True)
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}" if sqlite else f"EXPLAIN {sql}", parametros)
+        plan = cursor.fetchall()
+        cursor.close()
+    finally:
+        conexion.close()
+    return plan_sqlite(plan) if sqlite else plan
+
+
+def plan_sqlite(filas):
+    """
+    Filas de EXPLAIN QUERY PLAN -> filas con las columnas de EXPLAIN de
+    MySQL: 'SCAN t' es type=ALL, 'SCAN t USING INDEX i' recorre el índice
+    (type=index) y 'SEARCH t ...' busca por clave (type=ref). Los pasos que
+    no leen una tabla (USE TEMP B-TREE, SCAN CONSTANT ROW) quedan sin table.
+    """
+    plan = []
+    for fila in filas:
+        detalle = fila['detail']
+        tabla = tipo = clave = None
+        paso = _PASO_SQLITE.match(detalle)
+        if paso and paso.group(2) != 'CONSTANT':
+            tabla = paso.group(2)
+            indice = _INDICE_SQLITE.search(detalle)
+            clave = indice.group(1) if indice else ('PRIMARY' if 'PRIMARY KEY' in detalle else None)
+            if paso.group(1) == 'SEARCH':
+                tipo = 'ref'
+            else:
+                tipo = 'index' if clave else 'ALL'
+        plan.append({'table': tabla, 'type': tipo, 'key': clave, 'rows': None, 'Extra': detalle})
+    return plan
+
+
+def escaneos_completos(plan):
+    """Tablas que el plan recorre enteras (type=ALL)"""
+    return [fila.get('table') for fila in plan if str(fila.get('type', '')).upper() == 'ALL']
+
+
+def _plan_resumido(plan):
+    columnas = ('table', 'type', 'key', 'rows', 'Extra')
+    return [{c: fila.get(c) for c in columnas} for fila in plan]
+
+
+def _primera_vez(sql):
+    with _lock:
+        if sql in _explicados:
+            return False
+        _explicados.add(sql)
+        return True
+
+
+# ============ REGISTRO ============
+
+def registrar(consulta, sql, parametros, duracion):
+    """
+    Punto de entrada desde el cursor instrumentado.
+    Cuesta una comparación si la consulta fue rápida y no estamos en desarrollo.
+    """
+    duracion_ms = duracion * 1000
+    lenta = duracion_ms >= UMBRAL_MS
+    if not lenta and not _modo_desarrollo:
+        return False
+
+    sql_normalizado = normalizar_sql(sql)
+    plan = None
+    if _modo_desarrollo and sql_normalizado.split(' ', 1)[0].upper() in SENTENCIAS_EXPLICABLES \
+            and _primera_vez(sql_normalizado):
+        try:
+            plan = _explicar(sql, parametros)
+        except Exception as e:
+            log.warning("⚠️ No se pudo correr EXPLAIN para %s: %s", consulta, e)
+
+    completos = escaneos_completos(plan) if plan else []
+    if not lenta and not completos:
+        return False
+
+    entrada = {
+        'fecha': datetime.now().isoformat(timespec='milliseconds'),
+        'consulta': consulta,
+        'duracion_ms': round(duracion_ms, 2),
+        'lenta': lenta,
+        'sql': sql_normalizado,
+        'parametros': forma_parametros(parametros),
+    }
+    if plan:
+        entrada['explain'] = _plan_resumido(plan)
+    if completos:
+        entrada['escaneo_completo'] = completos
+        log.warning("⚠️ Escaneo completo de %s en %s", ', '.join(map(str, completos)), consulta)
+
+    _salida().warning(json.dumps(entrada, ensure_ascii=False, default=str))
+    return True
@@ -1,37 +1,123 @@
 """
 KINDERFIESTA - Módulo de conexión a MySQL
 Gestiona todas las operaciones con la base de datos
+Con KINDERFIESTA_DB_MOTOR=sqlite, las mismas consultas van a un archivo
+SQLite en lugar de MySQL (ver motor_sqlite.py)
 """
 
-import mysql.connector
-from mysql.connector import Error
+import os
+
+import perezoso
+MOTOR = os.environ.get('KINDERFIESTA_DB_MOTOR', 'mysql').lower()
+# mysql.connector y bcrypt no se cargan al importar (importar la app no los
+# paga) sino en cargar_dependencias(), antes de que arranquen los hilos
+conector = perezoso.modulo('motor_sqlite' if MOTOR == 'sqlite' else 'mysql.connector')
+bcrypt = perezoso.modulo('bcrypt')
 from datetime import datetime
+import time
+
+import bitacora
+import disyuntor
+import enrutador
+import geo
+import metricas
+from modelos import Horario, Review, Salon, desde_fila
+
+log = bitacora.obtener_logger('database')
 
 # Configuración de la BD
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'root',
     'password': '',
-    'database': 'kinderfiesta'
+    'database': 'kinderfiesta',
+    # Sin esto, con MySQL caído cada request espera el timeout del sistema
+    'connection_timeout': int(os.environ.get('KINDERFIESTA_DB_TIMEOUT', '5'))
 }
 
-def conectar():
-    """Conecta a la base de datos"""
+# Réplicas de lectura (KINDERFIESTA_DB_REPLICAS): mismo usuario y base, otro host
+enrutador.configurar(DB_CONFIG, conector)
+
+# Pool de conexiones del proceso. Lo crea gunicorn en cada worker después
+# del fork (ver gunicorn.conf.py); sin pool, cada conectar() abre una conexión.
+_pool = None
+
+def cargar_dependencias():
+    """
+    Carga el conector y bcrypt. Llamar antes de arrancar hilos (crear_app,
+    iniciar_pool): dos hilos que los usan por primera vez a la vez pueden
+    encontrarlos a medio cargar (ver perezoso.py).
+    """
+    perezoso.cargar(conector, bcrypt)
+
+def iniciar_pool(tamano):
+    """
+    Crea el pool de este proceso (llamar DESPUÉS del fork: los sockets no se
+    comparten entre procesos). Con un hilo por conexión nunca se agota.
+    """
+    global _pool
+    cargar_dependencias()
+    tamano = max(1, min(tamano, conector.pooling.CNX_POOL_MAXSIZE))
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except Error as e:
-        print(f"❌ Error de conexión: {e}")
+        _pool = conector.pooling.MySQLConnectionPool(
+            pool_name='kinderfiesta', pool_size=tamano, **DB_CONFIG)
+        log.info("✅ Pool de MySQL listo (%s conexiones)", tamano)
+    except conector.Error as e:
+        _pool = None
+        log.error("❌ No se pudo crear el pool, se conecta sin pool: %s", e)
+    enrutador.iniciar_pools(tamano)
+    return _pool
+
+def conectar(lectura=False, instrumentada=True):
+    """
+    Conecta a la base de datos (cursor instrumentado: ver metricas.py).
+    None si falla o si el disyuntor está abierto (ver disyuntor.py).
+    lectura=True: puede ser una réplica (ver enrutador.py); si no, es la
+    primaria y quien escribe lee de la primaria los próximos segundos.
+    instrumentada=False: sin medir ni contar (el EXPLAIN de consultas_lentas.py)
+    """
+    envolver = metricas.ConexionInstrumentada if instrumentada else (lambda conn: conn)
+    if lectura:
+        conn = enrutador.conectar_lectura()
+        if conn is not None:
+            return envolver(conn)
+    else:
+        enrutador.escritura()
+    if not disyuntor.permitir():
         return None
+    inicio = time.perf_counter()
+    try:
+        conn = None
+        if _pool is not None:
+            try:
+                # close() de una conexión del pool la devuelve al pool
+                conn = _pool.get_connection()
+            except conector.errors.PoolError:
+                log.warning("⚠️ Pool de MySQL agotado, abriendo una conexión extra")
+        if conn is None:
+            conn = conector.connect(**DB_CONFIG)
+        metricas.DB_CONEXION.observar(time.perf_counter() - inicio)
+        disyuntor.exito()
+        return envolver(conn)
+    except conector.Error as e:
+        metricas.DB_CONEXION_ERRORES.inc()
+        disyuntor.fallo()
+        log.error("❌ Error de conexión: %s", e)
+        return None
+    except Exception:
+        # Cualquier otro error también es un fallo: si era la prueba del
+        # disyuntor semiabierto, sin esto quedaría probando para siempre
+        disyuntor.fallo()
+        raise
 
 # ============ SALONES ============
 
 def obtener_todos_salones():
-    """Obtiene TODOS los salones de la BD (visible e invisible)"""
+    """Obtiene TODOS los salones de la BD (visible e invisible) como [Salon]"""
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
         if not conn:
-            print("❌ No se pudo conectar a la BD")
+            log.error("❌ No se pudo conectar a la BD")
             return []
         
         cursor = conn.cursor(dictionary=True)
@@ -48,35 +134,30 @@ def obtener_todos_salones():
         cursor.close()
         conn.close()
         
-        print(f"✅ Salones en BD: {len(salones)}")
-        
-        # Procesar datos y mapear para JavaScript
-        for salon in salones:
-            salon['salon_id'] = salon.get('id')
-            salon['nombre'] = salon.get('name', 'Sin nombre')
-            salon['telefono'] = salon.get('phone', 'N/A')
-            salon['direccion'] = salon.get('address', 'Sin dirección')
-            salon['zona'] = salon.get('locationCode', '')
-            salon['categoria'] = salon.get('category', 'Salón Infantil')
-            salon['promedio'] = float(salon.get('rating', 0)) if salon.get('rating') else 0
-            salon['carpeta_fotos'] = salon.get('folder', f"salon{salon['id']}")
-            salon['fotos'] = '1.jpg,2.jpg,3.jpg'
-            salon['reviews'] = obtener_reviews_salon(salon['id'])
-            salon['whatsapp'] = salon.get('whatsapp')
-            salon['google_maps'] = salon.get('google_maps')
+        log.info("✅ Salones en BD: %s", len(salones))
 
+        # Reviews de todos los salones en una sola consulta (evita N+1)
+        reviews_por_salon = obtener_reviews_por_salones([s['id'] for s in salones])
+
+        # Un Salon por fila: los alias de las plantillas son propiedades (ver modelos.py)
+        resultado = []
+        for fila in salones:
+            fila['reviews'] = reviews_por_salon.get(fila['id'], [])
+            salon = desde_fila(Salon, fila)
+            resultado.append(salon)
+
+            log.debug("  ✅ %s - %s comentarios - Rating: %s", salon.nombre, len(salon.reviews), salon.promedio,
+                      extra=bitacora.muestreo(100))
             
-            print(f"  ✅ {salon['nombre']} - {len(salon['reviews'])} comentarios - Rating: {salon['promedio']}")
-            
-        return salones if salones else []
-    except Error as e:
-        print(f"❌ Error al obtener salones: {e}")
+        return resultado
+    except conector.Error as e:
+        log.error("❌ Error al obtener salones: %s", e)
         return []
 
 def obtener_salon_por_id(salon_id):
-    """Obtiene un salón específico por ID"""
+    """Obtiene un salón específico por ID (Salon o None)"""
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
         if not conn:
             return None
         
@@ -89,43 +170,160 @@ def obtener_salon_por_id(salon_id):
             WHERE id = %s
         """, (salon_id,))
         
-        salon = cursor.fetchone()
+        fila = cursor.fetchone()
         cursor.close()
         conn.close()
         
-        if salon:
-            salon['salon_id'] = salon.get('id')
-            salon['nombre'] = salon.get('name', 'Sin nombre')
-            salon['telefono'] = salon.get('phone', 'N/A')
-            salon['direccion'] = salon.get('address', 'Sin dirección')
-            salon['zona'] = salon.get('locationCode', '')
-            salon['categoria'] = salon.get('category', 'Salón Infantil')
-            salon['promedio'] = float(salon.get('rating', 0)) if salon.get('rating') else 0
-            salon['carpeta_fotos'] = salon.get('folder', f"salon{salon['id']}")
-            salon['fotos'] = '1.jpg,2.jpg,3.jpg'
-            salon['reviews'] = obtener_reviews_salon(salon['id'])
-            salon['whatsapp'] = salon.get('whatsapp')
-            salon['google_maps'] = salon.get('google_maps')
-            print(f"✅ Salón obtenido: {salon['nombre']}")
-        
+        if not fila:
+            return None
+
+        fila['reviews'] = obtener_reviews_salon(fila['id'])
+        salon = desde_fila(Salon, fila)
+        log.info("✅ Salón obtenido: %s", salon.nombre)
         return salon
-    except Error as e:
-        print(f"❌ Error al obtener salón: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al obtener salón: %s", e)
         return None
+
         
     except Exception as e:
-        print(f"❌ Error en buscar_salones: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Error en buscar_salones: %s", e)
         return []
 
         
     except Exception as e:
-        print(f"❌ Error en buscar_salones: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Error en buscar_salones: %s", e)
         return []
 
+# ============ CATÁLOGO ============
+
+# Columnas de `salones` que el catálogo puede seleccionar (lista blanca para ?fields=)
+COLUMNAS_SALON = (
+    'id', 'name', 'phone', 'whatsapp', 'google_maps', 'address',
+    'locationCode', 'category', 'rating', 'visible', 'folder', 'fotos',
+    'lat', 'lng'
+)
+
+def sql_salones_catalogo(columnas, solo_visibles=True, salon_id=None, salon_ids=None):
+    """SQL y parámetros de obtener_salones_catalogo (también lo usa database_async)"""
+    columnas = [c for c in columnas if c in COLUMNAS_SALON]
+    if 'id' not in columnas:
+        columnas.insert(0, 'id')
+
+    condiciones = []
+    parametros = []
+    if solo_visibles:
+        condiciones.append("visible = 1")
+    if salon_id is not None:
+        condiciones.append("id = %s")
+        parametros.append(salon_id)
+    if salon_ids is not None:
+        condiciones.append(f"id IN ({', '.join(['%s'] * len(salon_ids))})")
+        parametros.extend(salon_ids)
+
+    query_sql = f"SELECT {', '.join(columnas)} FROM salones"
+    if condiciones:
+        query_sql += " WHERE " + " AND ".join(condiciones)
+    query_sql += " ORDER BY rating DESC, name ASC"
+    return query_sql, tuple(parametros)
+
+def obtener_salones_catalogo(columnas, solo_visibles=True, salon_id=None, salon_ids=None):
+    """
+    Obtiene salones seleccionando SOLO las columnas pedidas.
+    El filtro de visibilidad se hace en SQL, no en Python.
+    """
+    query_sql, parametros = sql_salones_catalogo(columnas, solo_visibles, salon_id, salon_ids)
+
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return []
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query_sql, parametros)
+        salones = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        return salones
+    except conector.Error as e:
+        log.error("❌ Error al obtener catálogo: %s", e)
+        return []
+
+def sql_reviews_por_salones(salon_ids):
+    """SQL de obtener_reviews_por_salones (también lo usa database_async)"""
+    marcadores = ', '.join(['%s'] * len(salon_ids))
+    return f"""
+        SELECT id, salon_id, nombre, comentario, rating, fecha
+        FROM reviews
+        WHERE salon_id IN ({marcadores})
+        ORDER BY fecha DESC
+    """
+
+def agrupar_reviews(filas):
+    """Filas de reviews -> {salon_id: [reviews]} con la fecha en ISO"""
+    reviews_por_salon = {}
+    for review in filas:
+        salon_id = review.pop('salon_id')
+        if review['fecha'] and hasattr(review['fecha'], 'isoformat'):
+            review['fecha'] = review['fecha'].isoformat()
+        reviews_por_salon.setdefault(salon_id, []).append(review)
+    return reviews_por_salon
+
+def obtener_reviews_por_salones(salon_ids):
+    """
+    Obtiene las reviews de varios salones en UNA consulta.
+    Retorna un dict {salon_id: [reviews]} ordenadas por fecha descendente.
+    """
+    if not salon_ids:
+        return {}
+
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return {}
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql_reviews_por_salones(salon_ids), tuple(salon_ids))
+
+        filas = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        return agrupar_reviews(filas)
+    except conector.Error as e:
+        log.error("❌ Error al obtener reviews del catálogo: %s", e)
+        return {}
+
+# Las reviews de todos los salones visibles (para instantanea.py): un JOIN
+# en lugar de un IN con miles de ids
+SQL_REVIEWS_VISIBLES = """
+    SELECT r.id, r.salon_id, r.nombre, r.comentario, r.rating, r.fecha
+    FROM reviews r
+    JOIN salones s ON s.id = r.salon_id
+    WHERE s.visible = 1
+    ORDER BY r.fecha DESC
+"""
+
+def obtener_reviews_visibles():
+    """{salon_id: [reviews]} de todos los salones visibles, por fecha descendente"""
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return {}
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(SQL_REVIEWS_VISIBLES)
+
+        filas = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        return agrupar_reviews(filas)
+    except conector.Error as e:
+        log.error("❌ Error al obtener reviews visibles: %s", e)
+        return {}
+
 
 def buscar_salones(query):
     """
@@ -133,9 +331,9 @@ def buscar_salones(query):
     INSENSIBLE A MAYÚSCULAS/MINÚSCULAS
     """
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
         if not conn:
-            print("❌ No se pudo conectar a la BD")
+            log.error("❌ No se pudo conectar a la BD")
             return []
         
         cursor = conn.cursor(dictionary=True)
@@ -166,36 +364,24 @@ def buscar_salones(query):
         cursor.close()
         conn.close()
         
-        print(f"✅ Búsqueda '{query}': {len(salones)} resultados encontrados")
+        log.info("✅ Búsqueda '%s': %s resultados encontrados", query, len(salones))
         
-        # Mapear datos para compatibilidad
+        # [Salon]: nombre, direccion, foto_principal... son propiedades
         resultados = []
-        for salon in salones:
-            resultados.append({
-                'id': salon['id'],
-                'nombre': salon['name'],
-                'telefono': salon['phone'],
-                'direccion': salon['address'],
-                'zona': salon['locationCode'],
-                'categoria': salon['category'],
-                'promedio': float(salon['rating']) if salon['rating'] else 0,
-                'foto_principal': f"{salon['folder']}/1.jpg",
-                'carpeta_fotos': salon['folder']
-            })
-            print(f"   - {salon['name']}")
+        for fila in salones:
+            resultados.append(desde_fila(Salon, fila))
+            log.debug("   - %s", fila['name'], extra=bitacora.muestreo(100))
         
         return resultados
         
     except Exception as e:
-        print(f"❌ Error en buscar_salones: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Error en buscar_salones: %s", e)
         return []
 
 def obtener_horarios_salon(salon_id):
     """Obtiene los horarios de un salón"""
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
         if not conn:
             return {}
         
@@ -207,44 +393,52 @@ def obtener_horarios_salon(salon_id):
             ORDER BY FIELD(dia, 'lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo')
         """, (salon_id,))
         
-        horarios_lista = cursor.fetchall()
+        horarios_lista = [desde_fila(Horario, fila) for fila in cursor.fetchall()]
         cursor.close()
         conn.close()
         
         horarios_dict = {}
-        for h in horarios_lista:
-            if h['cerrado']:
-                horarios_dict[h['dia']] = 'Cerrado'
-            else:
-                apertura = ''
-                cierre = ''
-                
-                if h['hora_apertura']:
-                    if hasattr(h['hora_apertura'], 'strftime'):
-                        apertura = h['hora_apertura'].strftime('%H:%M')
-                    else:
-                        apertura = str(h['hora_apertura'])
-                
-                if h['hora_cierre']:
-                    if hasattr(h['hora_cierre'], 'strftime'):
-                        cierre = h['hora_cierre'].strftime('%H:%M')
-                    else:
-                        cierre = str(h['hora_cierre'])
-                
-                if apertura and cierre:
-                    horarios_dict[h['dia']] = f"{apertura} - {cierre}"
+        for horario in horarios_lista:
+            texto = horario.texto
+            if texto:
+                horarios_dict[horario.dia] = texto
         
         return horarios_dict if horarios_dict else {}
-    except Error as e:
-        print(f"❌ Error al obtener horarios: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al obtener horarios: %s", e)
         return {}
 
+# Todos los horarios de una vez, para la semana en bits de horarios.py
+SQL_HORARIOS = "SELECT salon_id, dia, hora_apertura, hora_cierre, cerrado FROM horarios"
+
+def obtener_horarios(salon_id=None):
+    """Filas crudas de horarios (de todos los salones, o de uno)"""
+    query_sql, parametros = SQL_HORARIOS, ()
+    if salon_id is not None:
+        query_sql, parametros = SQL_HORARIOS + " WHERE salon_id = %s", (salon_id,)
+
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return []
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query_sql, parametros)
+        filas = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        return filas
+    except conector.Error as e:
+        log.error("❌ Error al obtener horarios: %s", e)
+        return []
+
 # ============ REVIEWS ============
 
 def obtener_reviews_salon(salon_id):
-    """Obtiene reviews de un salón"""
+    """Obtiene reviews de un salón como [Review] (fecha en ISO)"""
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
         if not conn:
             return []
         
@@ -256,17 +450,13 @@ def obtener_reviews_salon(salon_id):
             ORDER BY fecha DESC
         """, (salon_id,))
         
-        reviews = cursor.fetchall()
+        reviews = [desde_fila(Review, fila) for fila in cursor.fetchall()]
         cursor.close()
         conn.close()
         
-        for review in reviews:
-            if review['fecha']:
-                review['fecha'] = review['fecha'].strftime('%Y-%m-%d %H:%M:%S')
-        
-        return reviews if reviews else []
-    except Error as e:
-        print(f"❌ Error al obtener reviews: {e}")
+        return reviews
+    except conector.Error as e:
+        log.error("❌ Error al obtener reviews: %s", e)
         return []
 
 def agregar_review(salon_id, nombre, comentario, rating):
@@ -304,10 +494,10 @@ def agregar_review(salon_id, nombre, comentario, rating):
         cursor.close()
         conn.close()
         
-        print(f"✅ Review agregado al salón {salon_id}")
+        log.info("✅ Review agregado al salón %s", salon_id)
         return review, nuevo_rating
-    except Error as e:
-        print(f"❌ Error al agregar review: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al agregar review: %s", e)
         return None, None
 
 def eliminar_review(salon_id, review_id):
@@ -329,11 +519,11 @@ def eliminar_review(salon_id, review_id):
         conn.close()
         
         if resultado:
-            print(f"✅ Review {review_id} eliminado")
+            log.info("✅ Review %s eliminado", review_id)
         
         return resultado
-    except Error as e:
-        print(f"❌ Error al eliminar review: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al eliminar review: %s", e)
         return False
 
 def actualizar_review(salon_id, review_id, nuevo_comentario, nuevo_rating, nuevo_nombre=None):
@@ -382,7 +572,7 @@ def actualizar_review(salon_id, review_id, nuevo_comentario, nuevo_rating, nuevo
             }
         return None
     except Exception as e:
-        print(f"❌ Error al actualizar review: {e}")
+        log.error("❌ Error al actualizar review: %s", e)
         return None
 
 def recalcular_promedio_salon(salon_id):
@@ -409,8 +599,8 @@ def recalcular_promedio_salon(salon_id):
         conn.close()
         
         return nuevo_promedio
-    except Error as e:
-        print(f"❌ Error al recalcular promedio: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al recalcular promedio: %s", e)
         return 0
 
 # ============ SALONES ADMIN ============
@@ -433,10 +623,10 @@ def cambiar_visibilidad_salon(salon_id, visible):
         conn.close()
         
         estado = "visible" if visible else "oculto"
-        print(f"✅ Salón {salon_id} ahora está {estado}")
+        log.info("✅ Salón %s ahora está %s", salon_id, estado)
         return resultado
-    except Error as e:
-        print(f"❌ Error al cambiar visibilidad: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al cambiar visibilidad: %s", e)
         return False
 
 def eliminar_salon(salon_id):
@@ -457,11 +647,11 @@ def eliminar_salon(salon_id):
         conn.close()
         
         if resultado:
-            print(f"✅ Salón {salon_id} eliminado permanentemente")
+            log.info("✅ Salón %s eliminado permanentemente", salon_id)
         
         return resultado
-    except Error as e:
-        print(f"❌ Error al eliminar salón: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al eliminar salón: %s", e)
         return False
 
 def agregar_salon_desde_solicitud(datos, carpeta_fotos):
@@ -473,11 +663,14 @@ def agregar_salon_desde_solicitud(datos, carpeta_fotos):
         
         cursor = conn.cursor()
         
+        # Coordenadas del plus code (o del link de Maps), una sola vez
+        lat, lng = geo.coordenadas(datos.get('zona'), datos.get('google_maps'))
+        
         # Insertar salón con whatsapp y google_maps
         cursor.execute("""
             INSERT INTO salones 
-            (name, phone, whatsapp, google_maps, address, locationCode, category, rating, visible, folder)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, 0, 1, %s)
+            (name, phone, whatsapp, google_maps, address, locationCode, lat, lng, category, rating, visible, folder)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 0, 1, %s)
         """, (
             datos.get('nombre', 'Sin nombre'),
             datos.get('telefono', ''),
@@ -485,6 +678,8 @@ def agregar_salon_desde_solicitud(datos, carpeta_fotos):
             datos.get('google_maps', ''),
             datos.get('direccion', ''),
             datos.get('zona', ''),
+            lat,
+            lng,
             datos.get('categoria', 'Salón Infantil'),
             carpeta_fotos
         ))
@@ -518,19 +713,261 @@ def agregar_salon_desde_solicitud(datos, carpeta_fotos):
         cursor.close()
         conn.close()
         
-        print(f"✅ Salón {salon_id} creado desde solicitud")
+        log.info("✅ Salón %s creado desde solicitud", salon_id)
         return salon_id
-    except Error as e:
-        print(f"❌ Error al agregar salón desde solicitud: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al agregar salón desde solicitud: %s", e)
         return None
 
 
+# ============ IMPORTACIÓN MASIVA (ver importacion.py) ============
+
+def obtener_contactos_salones():
+    """[(id, phone, address)] de todos los salones, para detectar duplicados"""
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return None
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, phone, address FROM salones")
+        filas = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        return filas
+    except conector.Error as e:
+        log.error("❌ Error al obtener contactos de salones: %s", e)
+        return None
+
+def insertar_salones_lote(salones):
+    """
+    Inserta un lote de salones y sus horarios en UNA transacción, con tres
+    sentencias en total (no una por fila). Cada salón es un dict con las
+    columnas de `salones` más 'horarios': [(dia, apertura, cierre, cerrado)].
+    'folder' tiene que ser único: con él se recuperan los ids del lote.
+    Devuelve los ids en el mismo orden, o None si el lote no se guardó.
+    """
+    conn = None
+    try:
+        conn = conectar()
+        if not conn:
+            return None
+
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO salones
+            (name, phone, whatsapp, google_maps, address, locationCode, lat, lng, category, rating, visible, folder)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 0, 1, %s)
+        """, [(s['name'], s['phone'], s['whatsapp'], s['google_maps'], s['address'], s['locationCode'],
+               s['lat'], s['lng'], s['category'], s['folder']) for s in salones])
+
+        # lastrowid de un INSERT de varias filas no alcanza para saber todos los ids
+        carpetas = [s['folder'] for s in salones]
+        cursor.execute(f"SELECT id, folder FROM salones WHERE folder IN ({', '.join(['%s'] * len(carpetas))})",
+                       tuple(carpetas))
+        id_por_carpeta = {folder: salon_id for salon_id, folder in cursor.fetchall()}
+        ids = [id_por_carpeta[carpeta] for carpeta in carpetas]
+
+        filas_horarios = [(salon_id, dia, apertura, cierre, cerrado)
+                          for salon_id, s in zip(ids, salones)
+                          for dia, apertura, cierre, cerrado in s['horarios']]
+        if filas_horarios:
+            cursor.executemany("""
+                INSERT INTO horarios (salon_id, dia, hora_apertura, hora_cierre, cerrado)
+                VALUES (%s, %s, %s, %s, %s)
+            """, filas_horarios)
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        return ids
+    except (conector.Error, KeyError) as e:
+        log.error("❌ Error al insertar un lote de %s salones: %s", len(salones), e)
+        if conn:
+            try:
+                conn.rollback()
+                conn.close()
+            except conector.Error:
+                pass
+        return None
+
+
+# ============ COORDENADAS ============
+
+def obtener_coordenadas_salones(salon_id=None):
+    """[(id, lat, lng)] de los salones visibles con coordenadas (para cercania.py)"""
+    query_sql = "SELECT id, lat, lng FROM salones WHERE visible = 1 AND lat IS NOT NULL AND lng IS NOT NULL"
+    parametros = ()
+    if salon_id is not None:
+        query_sql += " AND id = %s"
+        parametros = (salon_id,)
+
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return []
+
+        cursor = conn.cursor()
+        cursor.execute(query_sql, parametros)
+        filas = [(salon_id, float(lat), float(lng)) for salon_id, lat, lng in cursor.fetchall()]
+        cursor.close()
+        conn.close()
+
+        return filas
+    except conector.Error as e:
+        log.error("❌ Error al obtener coordenadas: %s", e)
+        return []
+
+def obtener_sugerencias_salones(salon_id=None):
+    """[(id, name, address, category, rating, reviews)] de los salones visibles (para autocompletar.py)"""
+    query_sql = """
+        SELECT s.id, s.name, s.address, s.category, s.rating, COUNT(r.id)
+        FROM salones s
+        LEFT JOIN reviews r ON r.salon_id = s.id
+        WHERE s.visible = 1{}
+        GROUP BY s.id, s.name, s.address, s.category, s.rating
+    """
+    parametros = ()
+    if salon_id is not None:
+        query_sql = query_sql.format(" AND s.id = %s")
+        parametros = (salon_id,)
+    else:
+        query_sql = query_sql.format("")
+
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return []
+
+        cursor = conn.cursor()
+        cursor.execute(query_sql, parametros)
+        filas = [(salon_id, name, address, category, float(rating) if rating is not None else None, reviews)
+                 for salon_id, name, address, category, rating, reviews in cursor.fetchall()]
+        cursor.close()
+        conn.close()
+
+        return filas
+    except conector.Error as e:
+        log.error("❌ Error al obtener sugerencias: %s", e)
+        return []
+
+def obtener_salones_sin_coordenadas():
+    """Salones cargados antes de guardar coordenadas (ver cercania.completar_coordenadas)"""
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return []
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT id, locationCode, google_maps FROM salones WHERE lat IS NULL OR lng IS NULL")
+        salones = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        return salones
+    except conector.Error as e:
+        log.error("❌ Error al obtener salones sin coordenadas: %s", e)
+        return []
+
+def guardar_coordenadas(salon_id, lat, lng):
+    try:
+        conn = conectar()
+        if not conn:
+            return False
+
+        cursor = conn.cursor()
+        cursor.execute("UPDATE salones SET lat = %s, lng = %s WHERE id = %s", (lat, lng, salon_id))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        return True
+    except conector.Error as e:
+        log.error("❌ Error al guardar coordenadas: %s", e)
+        return False
+
+
+# ============ EXPORTACIÓN ============
+
+# Filas por fetchmany(): lo único de la tabla que la exportación tiene en memoria
+LOTE_EXPORTACION = int(os.environ.get('KINDERFIESTA_EXPORTAR_LOTE', '500'))
+
+COLUMNAS_EXPORTAR_REVIEWS = ('id', 'salon_id', 'nombre', 'comentario', 'rating', 'fecha')
+
+class Exportacion:
+    """
+    Lotes (listas de dicts) de un cursor sin buffer. close() devuelve la
+    conexión y lo llama la respuesta al terminar, se haya leído todo o no.
+    """
+
+    def __init__(self, conn, cursor, tabla):
+        self._conn = conn
+        self._cursor = cursor
+        self.tabla = tabla
+        self._abierta = True
+
+    def __iter__(self):
+        try:
+            while True:
+                filas = self._cursor.fetchmany(LOTE_EXPORTACION)
+                if not filas:
+                    return
+                yield filas
+        except conector.Error as e:
+            log.error("❌ Exportación de %s cortada: %s", self.tabla, e)
+            raise
+        finally:
+            self.close()
+
+    def close(self):
+        if not self._abierta:
+            return
+        self._abierta = False
+        try:
+            # Si el cliente cortó la descarga quedan filas: una conexión del
+            # pool no puede volver con un resultado a medio leer
+            while self._cursor.fetchmany(LOTE_EXPORTACION):
+                pass
+            self._cursor.close()
+            self._conn.close()
+        except conector.Error as e:
+            log.warning("⚠️ No se pudo cerrar la exportación de %s: %s", self.tabla, e)
+
+def _exportar(tabla, query_sql):
+    """Exportacion de query_sql, o None si no hay conexión"""
+    conn = None
+    try:
+        conn = conectar(lectura=True)
+        if not conn:
+            return None
+
+        # Sin buffered=True: mysql.connector trae las filas a medida que se piden
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query_sql)
+        return Exportacion(conn, cursor, tabla)
+    except conector.Error as e:
+        log.error("❌ Error al exportar %s: %s", tabla, e)
+        if conn:
+            conn.close()
+        return None
+
+def exportar_salones():
+    """Todos los salones (visibles y ocultos) por id, en lotes. None si no hay conexión."""
+    return _exportar('salones', f"SELECT {', '.join(COLUMNAS_SALON)} FROM salones ORDER BY id")
+
+def exportar_reviews():
+    """Todas las reviews por id, en lotes. None si no hay conexión."""
+    return _exportar('reviews', f"SELECT {', '.join(COLUMNAS_EXPORTAR_REVIEWS)} FROM reviews ORDER BY id")
+
+
 # ============ ADMIN ============
 
 def verificar_credenciales_admin(email, password):
     """Verifica las credenciales de un administrador"""
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
         if not conn:
             return False
         
@@ -546,11 +983,11 @@ def verificar_credenciales_admin(email, password):
         conn.close()
         
         if resultado:
-            print(f"✅ Admin {email} autenticado")
+            log.info("✅ Admin %s autenticado", email)
         
         return resultado
-    except Error as e:
-        print(f"❌ Error al verificar credenciales: {e}")
+    except conector.Error as e:
+        log.error("❌ Error al verificar credenciales: %s", e)
         return False
 
 # ============================================
@@ -560,7 +997,6 @@ def verificar_credenciales_admin(email, password):
 def registrar_usuario(nombre, email, password):
     """Registrar nuevo usuario"""
     try:
-        import bcrypt
         conn = conectar()  # ✅ CORREGIDO: era get_connection()
         if not conn:
             return None, "No se pudo conectar a la base de datos"
@@ -574,8 +1010,8 @@ def registrar_usuario(nombre, email, password):
             conn.close()
             return None, "El email ya está registrado"
         
-        # Encriptar contraseña
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        # Encriptar contraseña (como texto: SQLite guardaría los bytes como BLOB)
+        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         
         # Insertar usuario
         cursor.execute("""
@@ -589,17 +1025,16 @@ def registrar_usuario(nombre, email, password):
         cursor.close()
         conn.close()
         
-        print(f"✅ Usuario registrado: {email}")
+        log.info("✅ Usuario registrado: %s", email)
         return user_id, "Usuario registrado exitosamente"
     except Exception as e:
-        print(f"❌ Error al registrar usuario: {e}")
+        log.error("❌ Error al registrar usuario: %s", e)
         return None, str(e)
 
 def verificar_login(email, password):
     """Verificar credenciales de login"""
     try:
-        import bcrypt
-        conn = conectar()  # ✅ CORREGIDO: era get_connection()
+        conn = conectar(lectura=True)  # ✅ CORREGIDO: era get_connection()
         if not conn:
             return None, "No se pudo conectar a la base de datos"
         
@@ -621,8 +1056,11 @@ def verificar_login(email, password):
         if not usuario['activo']:
             return None, "Usuario desactivado"
         
-        # Verificar contraseña
-        if bcrypt.checkpw(password.encode('utf-8'), usuario['password'].encode('utf-8')):
+        # Verificar contraseña (en bases SQLite viejas el hash quedó en bytes)
+        password_hash = usuario['password']
+        if isinstance(password_hash, str):
+            password_hash = password_hash.encode('utf-8')
+        if bcrypt.checkpw(password.encode('utf-8'), bytes(password_hash)):
             return {
                 'id': usuario['id'],
                 'nombre': usuario['nombre'],
@@ -631,7 +1069,7 @@ def verificar_login(email, password):
         else:
             return None, "Contraseña incorrecta"
     except Exception as e:
-        print(f"❌ Error al verificar login: {e}")
+        log.error("❌ Error al verificar login: %s", e)
         return None, str(e)
 
 def agregar_testimonio(usuario_id, nombre_usuario, rating, comentario):
@@ -655,57 +1093,57 @@ def agregar_testimonio(usuario_id, nombre_usuario, rating, comentario):
         cursor.close()
         conn.close()
         
-        print(f"✅ Testimonio agregado por usuario {nombre_usuario}")
+        log.info("✅ Testimonio agregado por usuario %s", nombre_usuario)
         return testimonio_id, "Testimonio agregado exitosamente"
     except Exception as e:
-        print(f"❌ Error al agregar testimonio: {e}")
+        log.error("❌ Error al agregar testimonio: %s", e)
         return None, str(e)
 
+SQL_TESTIMONIOS_APROBADOS = """
+    SELECT t.id, t.usuario_id, t.nombre_usuario, t.rating, 
+           t.comentario, t.fecha, t.aprobado
+    FROM testimonios t
+    WHERE t.aprobado = 1
+    ORDER BY t.fecha DESC
+    LIMIT %s
+"""
+
+def formatear_testimonios(testimonios):
+    """Formatear fechas para JSON"""
+    for t in testimonios:
+        if t.get('fecha'):
+            if hasattr(t['fecha'], 'strftime'):
+                t['fecha'] = t['fecha'].strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                t['fecha'] = str(t['fecha'])
+    return testimonios
+
 def obtener_testimonios_aprobados(limite=10):
     """Obtener testimonios aprobados para mostrar en la página"""
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
         if not conn:
-            print("❌ No se pudo conectar a la BD")
+            log.error("❌ No se pudo conectar a la BD")
             return []
         
         cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT t.id, t.usuario_id, t.nombre_usuario, t.rating, 
-                   t.comentario, t.fecha, t.aprobado
-            FROM testimonios t
-            WHERE t.aprobado = 1
-            ORDER BY t.fecha DESC
-            LIMIT %s
-        """, (limite,))
-        
-        testimonios = cursor.fetchall()
-        
-        # Formatear fechas para JSON
-        for t in testimonios:
-            if t.get('fecha'):
-                if hasattr(t['fecha'], 'strftime'):
-                    t['fecha'] = t['fecha'].strftime('%Y-%m-%d %H:%M:%S')
-                else:
-                    t['fecha'] = str(t['fecha'])
+        cursor.execute(SQL_TESTIMONIOS_APROBADOS, (limite,))
+        testimonios = formatear_testimonios(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
-        print(f"✅ Obtenidos {len(testimonios)} testimonios de la BD")
+        log.info("✅ Obtenidos %s testimonios de la BD", len(testimonios))
         return testimonios
         
     except Exception as e:
-        print(f"❌ Error al obtener testimonios: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Error al obtener testimonios: %s", e)
         return []
 
 def verificar_usuario_ya_comento(usuario_id):
     """Verificar si el usuario ya dejó un testimonio"""
     try:
-        conn = conectar()  # ✅ CORREGIDO: era get_connection()
+        conn = conectar(lectura=True)  # ✅ CORREGIDO: era get_connection()
         if not conn:
             return False
         
@@ -721,7 +1159,7 @@ def verificar_usuario_ya_comento(usuario_id):
         
         return resultado is not None
     except Exception as e:
-        print(f"❌ Error al verificar testimonio: {e}")
+        log.error("❌ Error al verificar testimonio: %s", e)
         return False
 
 # ============ PRUEBA DE CONEXIÓN ============
@@ -731,55 +1169,73 @@ def test_connection():
     try:
         conn = conectar()
         if conn and conn.is_connected():
-            print("✅ Conectado a MySQL correctamente")
+            log.info("✅ Conectado a MySQL correctamente")
             
             cursor = conn.cursor()
             cursor.execute("SELECT DATABASE();")
             db_name = cursor.fetchone()[0]
-            print(f"✅ Base de datos: {db_name}")
+            log.info("✅ Base de datos: %s", db_name)
             
             cursor.execute("SELECT COUNT(*) FROM salones")
             total_salones = cursor.fetchone()[0]
-            print(f"✅ Total de salones: {total_salones}")
+            log.info("✅ Total de salones: %s", total_salones)
             
             cursor.close()
             conn.close()
             return True
     except Exception as e:
-        print(f"❌ Error de conexión: {e}")
+        log.error("❌ Error de conexión: %s", e)
     
     return False
 
+# Todas las cifras en una sola consulta (antes: una por cifra y por ruta)
+SQL_ESTADISTICAS = """
+    SELECT
+        (SELECT COUNT(*) FROM usuarios WHERE activo = 1) AS familias,
+        (SELECT COUNT(*) FROM salones WHERE visible = 1) AS salones,
+        (SELECT AVG(rating) FROM testimonios WHERE aprobado = 1) AS promedio
+"""
+
+ESTADISTICAS_POR_DEFECTO = {
+    'familias': 0,
+    'salones': 0,
+    'satisfaccion': 98,
+    'tiempo_respuesta': '24h'
+}
+
+def armar_estadisticas(resultado):
+    """Fila de SQL_ESTADISTICAS -> cifras de la página de inicio"""
+    resultado = resultado or {}
+    estadisticas = {}
+    
+    # 1. Familias Conectadas (usuarios registrados)
+    estadisticas['familias'] = resultado.get('familias') or 0
+    
+    # 2. Salones Verificados (salones visibles)
+    estadisticas['salones'] = resultado.get('salones') or 0
+    
+    # 3. Satisfacción de Clientes (promedio de testimonios aprobados)
+    if resultado.get('promedio'):
+        estadisticas['satisfaccion'] = int((float(resultado['promedio']) / 5) * 100)
+    else:
+        estadisticas['satisfaccion'] = 98
+    
+    # 4. Tiempo de respuesta
+    estadisticas['tiempo_respuesta'] = "24h"
+    return estadisticas
+
 def obtener_estadisticas():
     """
     Obtener estadísticas para la página de inicio
     """
     try:
-        conn = conectar()
+        conn = conectar(lectura=True)
+        if not conn:
+            log.error("❌ No se pudo conectar a la BD")
+            return dict(ESTADISTICAS_POR_DEFECTO)
         cursor = conn.cursor(dictionary=True)
-        
-        estadisticas = {}
-        
-        # 1. Familias Conectadas (usuarios registrados)
-        cursor.execute("SELECT COUNT(*) as total FROM usuarios WHERE activo = 1")
-        resultado = cursor.fetchone()
-        estadisticas['familias'] = resultado['total'] if resultado else 0
-        
-        # 2. Salones Verificados (salones visibles)
-        cursor.execute("SELECT COUNT(*) as total FROM salones WHERE visible = 1")
-        resultado = cursor.fetchone()
-        estadisticas['salones'] = resultado['total'] if resultado else 0
-        
-        # 3. Satisfacción de Clientes
-        cursor.execute("SELECT AVG(rating) as promedio FROM reviews")
-        resultado = cursor.fetchone()
-        if resultado and resultado['promedio']:
-            estadisticas['satisfaccion'] = round((resultado['promedio'] / 5) * 100)
-        else:
-            estadisticas['satisfaccion'] = 98
-        
-        # 4. Tiempo de respuesta
-        estadisticas['tiempo_respuesta'] = "24h"
+        cursor.execute(SQL_ESTADISTICAS)
+        estadisticas = armar_estadisticas(cursor.fetchone())
         
         cursor.close()
         conn.close()
@@ -787,15 +1243,11 @@ def obtener_estadisticas():
         return estadisticas
         
     except Exception as e:
-        print(f"❌ Error en obtener_estadisticas: {e}")
-        return {
-            'familias': 0,
-            'salones': 0,
-            'satisfaccion': 98,
-            'tiempo_respuesta': '24h'
-        }
+        log.error("❌ Error en obtener_estadisticas: %s", e)
+        return dict(ESTADISTICAS_POR_DEFECTO)
 
 if __name__ == "__main__":
+    bitacora.configurar('INFO')
     print("\n" + "=" * 70)
     print("🧪 PROBANDO CONEXIÓN A LA BASE DE DATOS KINDERFIESTA")
     print("=" * 70)
@@ -806,7 +1258,7 @@ if __name__ == "__main__":
         print("=" * 70)
         salones = obtener_todos_salones()
         for s in salones:
-            print(f"  ID: {s['id']} | Nombre: {s['nombre']} | Rating: {s['promedio']} ⭐ | Visible: {'Sí' if s['visible'] else 'No'}")
+            print(f"  ID: {s.id} | Nombre: {s.nombre} | Rating: {s.promedio} ⭐ | Visible: {'Sí' if s.visible else 'No'}")
         print("=" * 70 + "\n")
     else:
         print("\n❌ No se pudo conectar a la base de datos")
@@ -0,0 +1,158 @@
+"""
+KINDERFIESTA - Acceso async a MySQL (modo ASGI, ver asgi.py)
+Pool de aiomysql con las MISMAS consultas que database.py para las
+lecturas de las APIs públicas. Mientras una consulta espera a MySQL, el
+event loop sigue atendiendo otros requests.
+
+Dependencia opcional: pip install aiomysql
+"""
+
+import os
+import time
+
+import aiomysql
+
+import bitacora
+import consultas_lentas
+import database as db
+import disyuntor
+import metricas
+import presupuesto_consultas
+
+log = bitacora.obtener_logger('database_async')
+
+POOL_MIN = int(os.environ.get('KINDERFIESTA_POOL_MIN', '1'))
+POOL_MAX = int(os.environ.get('KINDERFIESTA_POOL_MAX', '10'))
+
+_pool = None
+
+
+# ============ POOL ============
+
+async def iniciar_pool():
+    """Crea el pool (al arrancar el servidor, o en la primera consulta si MySQL no estaba)"""
+    global _pool
+    if _pool is not None:
+        return _pool
+    inicio = time.perf_counter()
+    try:
+        _pool = await aiomysql.create_pool(
+            host=db.DB_CONFIG['host'],
+            user=db.DB_CONFIG['user'],
+            password=db.DB_CONFIG['password'],
+            db=db.DB_CONFIG['database'],
+            minsize=POOL_MIN,
+            maxsize=POOL_MAX,
+            autocommit=True,
+            charset='utf8mb4',
+            connect_timeout=db.DB_CONFIG['connection_timeout'],
+        )
+        metricas.DB_CONEXION.observar(time.perf_counter() - inicio)
+        log.info("✅ Pool async de MySQL listo (%s-%s conexiones)", POOL_MIN, POOL_MAX)
+    except Exception as e:
+        metricas.DB_CONEXION_ERRORES.inc()
+        log.error("❌ Error al crear el pool async: %s", e)
+    return _pool
+
+
+async def cerrar_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+async def _consultar(consulta, sql, parametros=(), una=False):
+    """
+    Ejecuta una lectura con una conexión del pool. Mide y cuenta igual que
+    el cursor instrumentado de metricas.py (mismas métricas, mismo presupuesto).
+    Comparte el disyuntor con database.conectar().
+    """
+    if not disyuntor.permitir():
+        raise aiomysql.OperationalError("MySQL no disponible (disyuntor abierto)")
+    try:
+        pool = _pool or await iniciar_pool()
+    except BaseException:
+        # Cualquier error (o una cancelación) también es un fallo: si era la
+        # prueba del disyuntor semiabierto, sin esto quedaría probando para siempre
+        disyuntor.fallo()
+        raise
+    if pool is None:
+        disyuntor.fallo()
+        raise aiomysql.OperationalError("No hay conexión con MySQL")
+
+    inicio = time.perf_counter()
+    try:
+        try:
+            conn = await pool.acquire()
+        except BaseException:
+            disyuntor.fallo()
+            raise
+        disyuntor.exito()
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, parametros)
+                filas = await (cursor.fetchone() if una else cursor.fetchall())
+        finally:
+            pool.release(conn)
+    finally:
+        duracion = time.perf_counter() - inicio
+        metricas.DB_CONSULTA.observar(duracion, consulta)
+        presupuesto_consultas.contar(consulta)
+        # En desarrollo el EXPLAIN es sync (bloquea el loop); en producción no corre
+        if consultas_lentas.registrar(consulta, sql, parametros, duracion):
+            metricas.DB_LENTAS.inc(consulta)
+
+    if not una:
+        metricas.DB_FILAS.observar(len(filas), consulta)
+    return filas
+
+
+# ============ LECTURAS ============
+
+async def obtener_salones_catalogo(columnas, solo_visibles=True, salon_id=None):
+    query_sql, parametros = db.sql_salones_catalogo(columnas, solo_visibles, salon_id)
+    try:
+        return list(await _consultar('obtener_salones_catalogo', query_sql, parametros))
+    except aiomysql.Error as e:
+        log.error("❌ Error al obtener catálogo: %s", e)
+        return []
+
+
+async def obtener_reviews_por_salones(salon_ids):
+    if not salon_ids:
+        return {}
+    try:
+        filas = await _consultar('obtener_reviews_por_salones', db.sql_reviews_por_salones(salon_ids),
+                                 tuple(salon_ids))
+        return db.agrupar_reviews(filas)
+    except aiomysql.Error as e:
+        log.error("❌ Error al obtener reviews del catálogo: %s", e)
+        return {}
+
+
+async def obtener_horarios():
+    try:
+        return list(await _consultar('obtener_horarios', db.SQL_HORARIOS))
+    except aiomysql.Error as e:
+        log.error("❌ Error al obtener horarios: %s", e)
+        return []
+
+
+async def obtener_testimonios_aprobados(limite=10):
+    try:
+        filas = await _consultar('obtener_testimonios_aprobados', db.SQL_TESTIMONIOS_APROBADOS, (limite,))
+        return db.formatear_testimonios(list(filas))
+    except Exception as e:
+        log.exception("❌ Error al obtener testimonios: %s", e)
+        return []
+
+
+async def obtener_estadisticas():
+    try:
+        resultado = await _consultar('obtener_estadisticas', db.SQL_ESTADISTICAS, una=True)
+        return db.armar_estadisticas(resultado)
+    except Exception as e:
+        log.error("❌ Error en obtener_estadisticas: %s", e)
+        return dict(db.ESTADISTICAS_POR_DEFECTO)
@@ -18,14 +18,22 @@ CREATE TABLE IF NOT EXISTS salones (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(200) NOT NULL,
     phone VARCHAR(20),
+    whatsapp VARCHAR(20),
+    google_maps VARCHAR(500),
     address VARCHAR(300) NOT NULL,
     locationCode VARCHAR(50),
+    lat DECIMAL(9,6) DEFAULT NULL,
+    lng DECIMAL(9,6) DEFAULT NULL,
     category VARCHAR(100),
     rating DECIMAL(2,1) DEFAULT NULL,
+    visible BOOLEAN DEFAULT TRUE,
+    folder VARCHAR(100),
+    fotos TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_name (name),
-    INDEX idx_rating (rating)
+    INDEX idx_rating (rating),
+    INDEX idx_visible (visible)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ================================================
@@ -74,6 +82,37 @@ CREATE TABLE IF NOT EXISTS administradores (
     INDEX idx_email (email)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ================================================
+-- TABLA: usuarios
+-- Familias registradas (pueden dejar testimonios)
+-- ================================================
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    activo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_activo (activo)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================
+-- TABLA: testimonios
+-- Opiniones de las familias sobre KinderFiesta
+-- ================================================
+CREATE TABLE IF NOT EXISTS testimonios (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    usuario_id INT NOT NULL,
+    nombre_usuario VARCHAR(100) NOT NULL,
+    rating INT NOT NULL CHECK (rating >= 1 AND rating <= 5),
+    comentario TEXT NOT NULL,
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    aprobado BOOLEAN DEFAULT FALSE,
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    INDEX idx_usuario (usuario_id),
+    INDEX idx_aprobado_fecha (aprobado, fecha)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- ================================================
 -- INSERTAR DATOS INICIALES
 -- ================================================
@@ -83,12 +122,13 @@ INSERT INTO administradores (email, password, nombre)
 VALUES ('admin@kinderfiesta.com', '123456', 'Administrador Principal');
 
 -- Insertar los 5 salones iniciales
-INSERT INTO salones (id, name, phone, address, locationCode, category, rating) VALUES
-(1, 'Salón Infantil MERLÍN', '65567153', 'Zona Elizardo, Alejandro Pérez, El Alto', 'FR88+66 El Alto', NULL, NULL),
-(2, 'Salón de Eventos Infantiles Pequeño Gigante', '78915146', 'Av. 16 de Julio 500, El Alto', 'GR4F+7G El Alto', NULL, NULL),
-(3, 'Salón ANGELITO', '78780824', 'Lado Promuyjer, Plaza Ballivián, Av. Pucararini 140, El Alto', 'GR6H+V3 El Alto', NULL, NULL),
-(4, 'Salón Infantil Leoncito Valiente', '', 'Alvarez Plata 15, El Alto', '4R8Q+66 El Alto', 'Bufé para fiestas infantiles', 5.0),
-(5, 'Salón de fiestas infantiles y familiares SAKURA FLOR DE CEREZO', '70551410', '0000, El Alto', '', NULL, NULL);
+-- (lat/lng: el plus code ya decodificado, como lo haría geo.coordenadas)
+INSERT INTO salones (id, name, phone, address, locationCode, lat, lng, category, rating) VALUES
+(1, 'Salón Infantil MERLÍN', '65567153', 'Zona Elizardo, Alejandro Pérez, El Alto', 'FR88+66 El Alto', -16.534438, -68.184438, NULL, NULL),
+(2, 'Salón de Eventos Infantiles Pequeño Gigante', '78915146', 'Av. 16 de Julio 500, El Alto', 'GR4F+7G El Alto', -16.494313, -68.176188, NULL, NULL),
+(3, 'Salón ANGELITO', '78780824', 'Lado Promuyjer, Plaza Ballivián, Av. Pucararini 140, El Alto', 'GR6H+V3 El Alto', -16.487813, -68.172313, NULL, NULL),
+(4, 'Salón Infantil Leoncito Valiente', '', 'Alvarez Plata 15, El Alto', '4R8Q+66 El Alto', -16.884438, -68.161938, 'Bufé para fiestas infantiles', 5.0),
+(5, 'Salón de fiestas infantiles y familiares SAKURA FLOR DE CEREZO', '70551410', '0000, El Alto', '', NULL, NULL, NULL, NULL);
 
 -- Insertar horarios para Salón Leoncito Valiente (id=4)
 INSERT INTO horarios (salon_id, dia, hora_apertura, hora_cierre, cerrado) VALUES
@@ -202,6 +242,10 @@ DELIMITER ;
 -- Ver todos los salones con su información
 SELECT * FROM vista_salones_completa;
 
+-- Bases creadas antes de las coordenadas (después: python cercania.py)
+-- ALTER TABLE salones ADD COLUMN lat DECIMAL(9,6) DEFAULT NULL AFTER locationCode,
+--                     ADD COLUMN lng DECIMAL(9,6) DEFAULT NULL AFTER lat;
+
 -- Ver horarios de un salón específico
 -- SELECT * FROM horarios WHERE salon_id = 4;
 
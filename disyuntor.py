@@ -0,0 +1,132 @@
+"""
+KINDERFIESTA - Disyuntor (circuit breaker) de la conexión a MySQL
+Si MySQL se cae, cada request esperaba el timeout de conexión y después
+mostraba el sitio vacío. Con el disyuntor:
+
+- cerrado: todo normal, se cuentan los fallos seguidos de conectar().
+- abierto: después de FALLOS_PARA_ABRIR fallos seguidos, conectar()
+  devuelve None al instante durante ESPERA segundos (no ocupa hilos).
+- semiabierto: pasada la espera, UN request prueba conectarse; si anda
+  se cierra, si no vuelve a abrirse.
+
+Además cada lectura puede saber si le faltó la base (observar()): así
+catalogo.py sirve la última copia buena (respaldo.py) en vez de una
+lista vacía.
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+import bitacora
+import metricas
+
+log = bitacora.obtener_logger('disyuntor')
+
+FALLOS_PARA_ABRIR = int(os.environ.get('KINDERFIESTA_DISYUNTOR_FALLOS', '3'))
+ESPERA = float(os.environ.get('KINDERFIESTA_DISYUNTOR_ESPERA', '30'))
+
+CERRADO, ABIERTO, SEMIABIERTO = 'cerrado', 'abierto', 'semiabierto'
+
+
+class Disyuntor:
+    def __init__(self, nombre, fallos_para_abrir=FALLOS_PARA_ABRIR, espera=ESPERA):
+        self.nombre = nombre
+        self.fallos_para_abrir = fallos_para_abrir
+        self.espera = espera
+        self._fallos = 0
+        self._abierto_hasta = None
+        self._probando = False
+        self._lock = threading.Lock()
+
+    def estado(self):
+        with self._lock:
+            if self._abierto_hasta is None:
+                return CERRADO
+            return SEMIABIERTO if self._probando or time.monotonic() >= self._abierto_hasta else ABIERTO
+
+    def permitir(self):
+        """¿Se puede intentar? Con el disyuntor abierto solo pasa una prueba por espera"""
+        with self._lock:
+            if self._abierto_hasta is None:
+                return True
+            if not self._probando and time.monotonic() >= self._abierto_hasta:
+                self._probando = True
+                return True
+            return False
+
+    def exito(self):
+        with self._lock:
+            estaba_abierto = self._abierto_hasta is not None
+            self._fallos = 0
+            self._abierto_hasta = None
+            self._probando = False
+        if estaba_abierto:
+            log.info("✅ %s respondió: disyuntor cerrado", self.nombre)
+
+    def fallo(self):
+        with self._lock:
+            self._fallos += 1
+            if not self._probando and self._fallos < self.fallos_para_abrir:
+                return
+            self._probando = False
+            self._abierto_hasta = time.monotonic() + self.espera
+        metricas.DB_DISYUNTOR_APERTURAS.inc()
+        log.warning("⚠️ %s no responde (%s fallos seguidos): disyuntor abierto %ss",
+                    self.nombre, self._fallos, self.espera)
+
+
+# ============ DISYUNTOR DE MYSQL ============
+
+mysql = Disyuntor('MySQL')
+
+
+class Observacion:
+    """Lo que pasó con la base durante un bloque observar()"""
+
+    def __init__(self):
+        self.fallo = False
+
+
+_observacion = ContextVar('disyuntor_observacion', default=None)
+
+
+class observar:
+    """
+        with disyuntor.observar() as observacion:
+            salones = db.obtener_salones_catalogo(...)
+        if observacion.fallo: ...   # la lista vacía es por falta de base
+    """
+
+    def __enter__(self):
+        self._observacion = Observacion()
+        self._token = _observacion.set(self._observacion)
+        return self._observacion
+
+    def __exit__(self, *error):
+        _observacion.reset(self._token)
+
+
+def _marcar_fallo():
+    observacion = _observacion.get()
+    if observacion is not None:
+        observacion.fallo = True
+
+
+def permitir():
+    """Antes de conectar: False (y la lectura en curso queda marcada) si está abierto"""
+    if mysql.permitir():
+        return True
+    metricas.DB_DISYUNTOR_RECHAZOS.inc()
+    _marcar_fallo()
+    return False
+
+
+def exito():
+    mysql.exito()
+
+
+def fallo():
+    mysql.fallo()
+    _marcar_fallo()
@@ -0,0 +1,230 @@
+"""
+KINDERFIESTA - Lecturas a réplicas, escrituras a la primaria
+Con KINDERFIESTA_DB_REPLICAS="10.0.0.2,10.0.0.3:3307" las lecturas de
+database.py (obtener_*, buscar_salones, verificar_*: las que llaman
+conectar(lectura=True)) van a una réplica, por turnos, y todo lo demás a
+la primaria (DB_CONFIG). Sin la variable todo va a la primaria, como antes.
+
+Una lectura va a la primaria aunque haya réplicas cuando:
+- el usuario escribió hace menos de PEGADO segundos: lee lo que acaba de
+  escribir (agregar_review, agregar_testimonio...). La marca viaja en
+  una cookie, así vale aunque el próximo request lo atienda otro worker;
+- este proceso escribió hace menos de PEGADO segundos: lo que se rearma
+  después de catalogo.invalidar() (caché, instantánea, índices) no se
+  llena con lo que la réplica todavía no tiene. Vale solo para el worker
+  que escribió: con varios workers de gunicorn, un request sin la cookie
+  (otro usuario, un cliente sin cookies) que atiende otro worker puede
+  leer de la réplica algo anterior a la escritura, hasta RETRASO_MAXIMO
+  segundos;
+- ninguna réplica está al día: cada CHEQUEO segundos se mide el retraso
+  (SHOW REPLICA STATUS) y una réplica atrasada más de RETRASO_MAXIMO
+  segundos, caída o con la replicación cortada no se usa.
+
+Una réplica que falla no abre el disyuntor de la primaria (disyuntor.py).
+"""
+
+import itertools
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+import bitacora
+import metricas
+
+log = bitacora.obtener_logger('enrutador')
+
+# Segundos que un usuario (o el proceso) lee de la primaria después de escribir
+PEGADO = float(os.environ.get('KINDERFIESTA_DB_PEGADO', '5'))
+RETRASO_MAXIMO = float(os.environ.get('KINDERFIESTA_DB_RETRASO_MAXIMO', '2'))
+CHEQUEO = float(os.environ.get('KINDERFIESTA_DB_RETRASO_CHEQUEO', '5'))
+SQL_RETRASO = os.environ.get('KINDERFIESTA_DB_RETRASO_SQL', 'SHOW REPLICA STATUS')
+
+COOKIE = 'kf_primaria'
+
+# Hasta cuándo (epoch) el usuario del request en curso lee de la primaria
+_pegado_hasta = ContextVar('enrutador_pegado_hasta', default=None)
+# ... y si cambió en este request (hay que mandar la cookie)
+_escribio = ContextVar('enrutador_escribio', default=False)
+_escritura_local = None   # monotonic de la última escritura de este proceso
+
+
+def _direcciones():
+    """'host[:puerto],...' -> [(host, puerto o None)]"""
+    direcciones = []
+    for parte in os.environ.get('KINDERFIESTA_DB_REPLICAS', '').split(','):
+        host, _, puerto = parte.strip().partition(':')
+        if host:
+            direcciones.append((host, int(puerto) if puerto else None))
+    return direcciones
+
+
+# ============ RÉPLICAS ============
+
+class Replica:
+    """Una réplica: su configuración, su pool y el último retraso medido"""
+
+    def __init__(self, host, puerto, base):
+        self.nombre = f"{host}:{puerto}" if puerto else host
+        self.config = {**base, 'host': host}
+        if puerto:
+            self.config['port'] = puerto
+        self.pool = None
+        self.retraso = 0.0
+        self.medido_en = None   # None = medir en la próxima conexión
+        self.caida_hasta = 0.0
+
+    def iniciar_pool(self, tamano, nombre):
+        try:
+            self.pool = conector.pooling.MySQLConnectionPool(pool_name=nombre, pool_size=tamano, **self.config)
+        except conector.Error as e:
+            self.pool = None
+            log.error("❌ No se pudo crear el pool de la réplica %s: %s", self.nombre, e)
+
+    def disponible(self):
+        """Sin medición vieja que diga que está atrasada o caída"""
+        if time.monotonic() < self.caida_hasta:
+            return False
+        return self.medido_en is None or time.monotonic() - self.medido_en > CHEQUEO \
+            or self.retraso <= RETRASO_MAXIMO
+
+    def conectar(self):
+        """Conexión a la réplica si está al día, o None"""
+        inicio = time.perf_counter()
+        conn = None
+        try:
+            if self.pool is not None:
+                try:
+                    conn = self.pool.get_connection()
+                except conector.errors.PoolError:
+                    pass
+            if conn is None:
+                conn = conector.connect(**self.config)
+            metricas.DB_CONEXION.observar(time.perf_counter() - inicio)
+            if self.medido_en is None or time.monotonic() - self.medido_en > CHEQUEO:
+                self._medir(conn)
+            if self.retraso > RETRASO_MAXIMO:
+                conn.close()
+                return None
+            return conn
+        except conector.Error as e:
+            metricas.DB_CONEXION_ERRORES.inc()
+            log.warning("⚠️ Réplica %s no disponible (%ss a la primaria): %s", self.nombre, CHEQUEO, e)
+            self.caida_hasta = time.monotonic() + CHEQUEO
+            if conn is not None:
+                try:
+                    conn.close()
+                except conector.Error:
+                    pass
+            return None
+
+    def _medir(self, conn):
+        """Segundos de atraso según SQL_RETRASO (sin filas = no replica de nadie: 0)"""
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(SQL_RETRASO)
+        estado = cursor.fetchone()
+        cursor.close()
+        anterior = self.retraso
+        if not estado:
+            self.retraso = 0.0
+        else:
+            segundos = estado.get('Seconds_Behind_Source', estado.get('Seconds_Behind_Master'))
+            # NULL: la replicación está detenida, lo que tenga puede ser muy viejo
+            self.retraso = math.inf if segundos is None else float(segundos)
+        self.medido_en = time.monotonic()
+        if self.retraso > RETRASO_MAXIMO >= anterior:
+            log.warning("⚠️ Réplica %s atrasada %ss: lecturas a la primaria", self.nombre, self.retraso)
+        elif anterior > RETRASO_MAXIMO >= self.retraso:
+            log.info("✅ Réplica %s al día otra vez", self.nombre)
+
+
+_replicas = []
+conector = None   # el de database.py: mysql.connector o motor_sqlite
+_turno = itertools.count()
+_lock = threading.Lock()
+
+
+def configurar(base, conector_bd):
+    """
+    Las réplicas de KINDERFIESTA_DB_REPLICAS, con el usuario y la base de
+    `base` (DB_CONFIG), a las que se conecta con `conector_bd`
+    """
+    global _replicas, conector
+    with _lock:
+        conector = conector_bd
+        _replicas = [Replica(host, puerto, base) for host, puerto in _direcciones()]
+    if _replicas:
+        log.info("🔀 Lecturas repartidas en %s réplica(s): %s", len(_replicas),
+                 ', '.join(r.nombre for r in _replicas))
+    return _replicas
+
+
+def iniciar_pools(tamano):
+    """Un pool por réplica (después del fork, como el de la primaria)"""
+    for i, replica in enumerate(_replicas):
+        replica.iniciar_pool(tamano, f"kinderfiesta_replica{i}")
+
+
+# ============ DECISIÓN ============
+
+def _motivo_primaria():
+    """Por qué esta lectura no puede ir a una réplica (None si puede)"""
+    hasta = _pegado_hasta.get()
+    if hasta is not None and time.time() < hasta:
+        return 'usuario'
+    if _escritura_local is not None and time.monotonic() - _escritura_local < PEGADO:
+        return 'proceso'
+    return None
+
+
+def conectar_lectura():
+    """
+    Conexión (sin instrumentar) a una réplica al día, o None: la lectura
+    va a la primaria.
+    """
+    if not _replicas:
+        return None
+    motivo = _motivo_primaria()
+    if motivo is None:
+        inicio = next(_turno)
+        for i in range(len(_replicas)):
+            replica = _replicas[(inicio + i) % len(_replicas)]
+            if replica.disponible():
+                conn = replica.conectar()
+                if conn is not None:
+                    metricas.DB_LECTURAS.inc('replica')
+                    return conn
+        motivo = 'retraso'
+    metricas.DB_LECTURAS.inc(f"primaria_{motivo}")
+    return None
+
+
+def escritura():
+    """Cada conexión de escritura: este usuario y este proceso leen de la primaria un rato"""
+    global _escritura_local
+    if not _replicas:
+        return
+    _escritura_local = time.monotonic()
+    _pegado_hasta.set(time.time() + PEGADO)
+    _escribio.set(True)
+
+
+# ============ POR REQUEST ============
+
+def iniciar(cookie=None):
+    """Al empezar cada request, con el valor de la cookie COOKIE (si vino)"""
+    try:
+        # No más allá de PEGADO: una cookie editada no fija la primaria para siempre
+        hasta = min(float(cookie), time.time() + PEGADO) if cookie else None
+    except ValueError:
+        hasta = None
+    _pegado_hasta.set(hasta)
+    _escribio.set(False)
+
+
+def cookie():
+    """(valor, segundos) de la cookie a mandar si el usuario escribió en este request; None si no"""
+    if not _escribio.get():
+        return None
+    return f"{_pegado_hasta.get():.3f}", math.ceil(PEGADO)
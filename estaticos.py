@@ -0,0 +1,302 @@
+"""
+KINDERFIESTA - Archivos estáticos con huella de contenido
+Genera URLs con hash (/recursos/imagenes/salon1/1.3fa2b1c4d5e6.jpg) que se
+sirven con Cache-Control immutable, variantes precomprimidas .br/.gz y un
+manifiesto JSON para que un proxy (nginx) sirva los archivos directamente.
+
+Ejemplo nginx usando la misma convención de nombres:
+    location ~ ^/recursos/(.+)\\.[0-9a-f]{12}(\\.\\w+)$ {
+        alias /ruta/al/proyecto/static/$1$2;
+        gzip_static on; brotli_static on;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
+
+Uso en despliegue: python estaticos.py  (reconstruye manifiesto y variantes)
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+
+import bitacora
+import compresion
+
+log = bitacora.obtener_logger('estaticos')
+
+CARPETA_ESTATICA = 'static'
+PREFIJO_URL = '/recursos'
+ARCHIVO_MANIFIESTO = os.path.join(CARPETA_ESTATICA, 'manifest.json')
+
+# Carpetas bajo static/ que reciben huella
+DIRECTORIOS = ('css', 'js', 'imagenes', 'solicitudes')
+
+# Solo vale la pena precomprimir texto; las fotos ya vienen comprimidas
+EXTENSIONES_COMPRIMIBLES = {'.css', '.js', '.svg', '.json', '.txt', '.html'}
+TAMANO_MINIMO_COMPRESION = 1024
+
+LONGITUD_HUELLA = 12
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+# variante en disco (archivo.br / archivo.gz) -> Content-Encoding
+VARIANTES = {'br': 'br', 'gz': 'gzip'}
+EXTENSIONES = {nombre: variante for variante, nombre in VARIANTES.items()}
+
+PATRON_HUELLA = re.compile(r'^(?P<base>.+)\.(?P<huella>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % LONGITUD_HUELLA)
+
+# ruta relativa -> {'huella', 'mtime', 'bytes', 'variantes'}
+_manifiesto = {}
+_lock = threading.Lock()
+
+
+# ============ HUELLAS ============
+
+def _ruta_segura(relativa):
+    """Ruta física dentro de static/ (None si intenta salir de la carpeta)"""
+    base = os.path.abspath(CARPETA_ESTATICA)
+    ruta = os.path.abspath(os.path.join(base, relativa))
+    if not ruta.startswith(base + os.sep):
+        return None
+    return ruta
+
+
+def _calcular_huella(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(65536), b''):
+            sha.update(bloque)
+    return sha.hexdigest()[:LONGITUD_HUELLA]
+
+
+def _variantes_existentes(ruta):
+    """Variantes .br/.gz presentes y al día (nunca servir una compresión vieja)"""
+    mtime = os.path.getmtime(ruta)
+    return [c for c in ('br', 'gz')
+            if os.path.exists(f"{ruta}.{c}") and os.path.getmtime(f"{ruta}.{c}") >= mtime]
+
+
+def registrar(relativa):
+    """
+    Calcula (o reutiliza) la huella de un archivo.
+    Solo se vuelve a leer el archivo si cambió su mtime o su tamaño.
+    """
+    relativa = relativa.replace('\\', '/')
+    ruta = _ruta_segura(relativa)
+    if not ruta or not os.path.isfile(ruta):
+        return None
+
+    info = os.stat(ruta)
+    entrada = _manifiesto.get(relativa)
+    if entrada and entrada['mtime'] == info.st_mtime_ns and entrada['bytes'] == info.st_size:
+        return entrada
+
+    entrada = {
+        'huella': _calcular_huella(ruta),
+        'mtime': info.st_mtime_ns,
+        'bytes': info.st_size,
+        'variantes': _variantes_existentes(ruta)
+    }
+    with _lock:
+        _manifiesto[relativa] = entrada
+    return entrada
+
+
+def url_con_huella(relativa, entrada):
+    base, extension = os.path.splitext(relativa)
+    return f"{PREFIJO_URL}/{base}.{entrada['huella']}{extension}"
+
+
+def url_estatico(relativa):
+    """
+    URL con huella para un archivo bajo static/.
+    Si el archivo no existe, devuelve la URL normal de /static.
+    """
+    entrada = registrar(relativa)
+    if not entrada:
+        return f"/{CARPETA_ESTATICA}/{relativa}"
+    return url_con_huella(relativa, entrada)
+
+
+# ============ PRECOMPRESIÓN ============
+
+def comprimir_variantes(relativa):
+    """Genera archivo.gz y archivo.br (si hay módulo brotli) junto al original"""
+    ruta = _ruta_segura(relativa)
+    if not ruta or os.path.splitext(ruta)[1].lower() not in EXTENSIONES_COMPRIMIBLES:
+        return []
+    if os.path.getsize(ruta) < TAMANO_MINIMO_COMPRESION:
+        return []
+
+    with open(ruta, 'rb') as f:
+        contenido = f.read()
+    mtime = os.path.getmtime(ruta)
+
+    def _desactualizado(destino):
+        return not os.path.exists(destino) or os.path.getmtime(destino) < mtime
+
+    if _desactualizado(ruta + '.gz'):
+        with open(ruta + '.gz', 'wb') as f:
+            f.write(gzip.compress(contenido, compresslevel=9, mtime=0))
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    if brotli and _desactualizado(ruta + '.br'):
+        with open(ruta + '.br', 'wb') as f:
+            f.write(brotli.compress(contenido, quality=11))
+
+    return _variantes_existentes(ruta)
+
+
+# ============ MANIFIESTO ============
+
+def _recorrer():
+    for directorio in DIRECTORIOS:
+        raiz = os.path.join(CARPETA_ESTATICA, directorio)
+        for carpeta, _, archivos in os.walk(raiz):
+            for nombre in archivos:
+                if nombre.endswith(('.br', '.gz')):
+                    continue
+                ruta = os.path.join(carpeta, nombre)
+                yield os.path.relpath(ruta, CARPETA_ESTATICA).replace(os.sep, '/')
+
+
+def construir_manifiesto(comprimir=True):
+    """Recorre static/, precomprime el texto, calcula huellas y escribe manifest.json"""
+    total = 0
+    for relativa in _recorrer():
+        if comprimir:
+            comprimir_variantes(relativa)
+        entrada = registrar(relativa)
+        if entrada:
+            entrada['variantes'] = _variantes_existentes(_ruta_segura(relativa))
+            total += 1
+
+    guardar_manifiesto()
+    log.info("✅ Manifiesto de estáticos: %s archivos", total)
+    return total
+
+
+def guardar_manifiesto():
+    """
+    Escribe static/manifest.json. Formato pensado para el proxy:
+    URL con huella -> archivo físico y variantes precomprimidas.
+    """
+    with _lock:
+        archivos = {
+            url_con_huella(relativa, entrada): {
+                'archivo': f"{CARPETA_ESTATICA}/{relativa}",
+                'original': relativa,
+                'bytes': entrada['bytes'],
+                'mtime': entrada['mtime'],
+                'variantes': entrada['variantes']
+            }
+            for relativa, entrada in sorted(_manifiesto.items())
+        }
+
+    os.makedirs(CARPETA_ESTATICA, exist_ok=True)
+    temporal = ARCHIVO_MANIFIESTO + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'prefijo': PREFIJO_URL, 'cache_control': CACHE_INMUTABLE, 'archivos': archivos},
+                  f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ARCHIVO_MANIFIESTO)
+
+
+def cargar_manifiesto():
+    """Carga manifest.json existente (arranque rápido sin rehashear todo)"""
+    try:
+        with open(ARCHIVO_MANIFIESTO, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    cargados = {}
+    for url, info in datos.get('archivos', {}).items():
+        relativa = info['original']
+        ruta = _ruta_segura(relativa)
+        coincide = PATRON_HUELLA.match(os.path.basename(url))
+        if not ruta or not coincide or not os.path.isfile(ruta):
+            continue
+        stat = os.stat(ruta)
+        if stat.st_size != info['bytes'] or stat.st_mtime_ns != info.get('mtime'):
+            continue
+        cargados[relativa] = {
+            'huella': coincide.group('huella'),
+            'mtime': stat.st_mtime_ns,
+            'bytes': info['bytes'],
+            'variantes': _variantes_existentes(ruta)
+        }
+
+    with _lock:
+        _manifiesto.update(cargados)
+    return True
+
+
+def registrar_carpeta(relativa):
+    """Agrega al manifiesto todos los archivos de una carpeta (p. ej. al aprobar un salón)"""
+    raiz = _ruta_segura(relativa)
+    if not raiz or not os.path.isdir(raiz):
+        return 0
+    total = 0
+    for nombre in sorted(os.listdir(raiz)):
+        if not nombre.endswith(('.br', '.gz')) and registrar(f"{relativa}/{nombre}"):
+            total += 1
+    guardar_manifiesto()
+    return total
+
+
+# ============ SERVIDO ============
+
+def servir(archivo_con_huella, request):
+    """
+    Sirve /recursos/<archivo>. Con la huella correcta responde con caché
+    inmutable de un año y, si el cliente lo acepta, la variante .br/.gz.
+    """
+    from flask import abort, redirect, send_file
+
+    coincide = PATRON_HUELLA.match(archivo_con_huella)
+    if not coincide:
+        abort(404)
+
+    relativa = coincide.group('base') + coincide.group('ext')
+    entrada = registrar(relativa)
+    if not entrada:
+        abort(404)
+
+    # El archivo cambió: la URL vieja apunta a la nueva versión
+    if entrada['huella'] != coincide.group('huella'):
+        return redirect(url_con_huella(relativa, entrada))
+
+    ruta = _ruta_segura(relativa)
+    tipo = mimetypes.guess_type(ruta)[0] or 'application/octet-stream'
+    # Solo las variantes que hay en disco, respetando q=0 (ver compresion.negociar)
+    disponibles = [nombre for variante, nombre in VARIANTES.items() if variante in entrada['variantes']]
+    codificacion = compresion.negociar(request.headers.get('Accept-Encoding', ''), disponibles)
+
+    etag = entrada['huella']
+    if codificacion:
+        ruta = f"{ruta}.{EXTENSIONES[codificacion]}"
+        # Cada representación su ETag: un caché no debe dar la .br a quien pidió la original
+        etag = f"{etag}-{codificacion}"
+
+    respuesta = send_file(ruta, mimetype=tipo, conditional=True, etag=etag)
+    respuesta.headers['Cache-Control'] = CACHE_INMUTABLE
+    respuesta.headers['Vary'] = 'Accept-Encoding'
+    if codificacion:
+        respuesta.headers['Content-Encoding'] = codificacion
+    return respuesta
+
+
+def iniciar():
+    """Al arrancar: reutiliza manifest.json si existe; si no, lo construye"""
+    if not cargar_manifiesto():
+        construir_manifiesto()
+
+
+if __name__ == "__main__":
+    bitacora.configurar('INFO')
+    construir_manifiesto()
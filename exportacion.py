@@ -0,0 +1,78 @@
+"""
+KINDERFIESTA - Exportación del catálogo y las reviews (admin)
+/api/admin/export/salones y /api/admin/export/reviews responden en
+streaming: database.py lee con un cursor sin buffer de a LOTE_EXPORTACION
+filas (fetchmany) y acá cada lote se convierte en líneas NDJSON o CSV y
+sale. En ningún momento hay más de un lote en memoria, tenga la tabla
+mil filas o un millón.
+
+    ?formato=ndjson  (por defecto) un objeto JSON por línea
+    ?formato=csv     con fila de cabecera
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+# formato -> Content-Type
+FORMATOS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Una celda que empieza así, Excel la ejecuta como fórmula (los comentarios
+# y nombres los escriben los usuarios)
+_INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _valor(valor):
+    """Lo que devuelve mysql.connector -> algo que JSON y CSV escriben tal cual"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, timedelta):
+        return str(valor)
+    return valor
+
+
+def _celda(valor):
+    valor = _valor(valor)
+    if isinstance(valor, str) and valor.startswith(_INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+# ============ FORMATOS ============
+
+def ndjson(lotes):
+    """Un chunk de bytes por lote, una fila por línea"""
+    for filas in lotes:
+        yield ''.join(
+            json.dumps({columna: _valor(v) for columna, v in fila.items()}, ensure_ascii=False) + '\n'
+            for fila in filas
+        ).encode('utf-8')
+
+
+def csv_(lotes, columnas):
+    """La cabecera y después un chunk de bytes por lote"""
+    # csv se carga recién al exportar (importar la app no lo paga)
+    import csv
+    import io
+
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(columnas)
+    yield buffer.getvalue().encode('utf-8')
+    for filas in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows([_celda(fila.get(columna)) for columna in columnas] for fila in filas)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def generar(lotes, formato, columnas):
+    """Los chunks de la respuesta en el formato pedido (ver FORMATOS)"""
+    if formato == 'csv':
+        return csv_(lotes, columnas)
+    return ndjson(lotes)
@@ -0,0 +1,169 @@
+"""
+KINDERFIESTA - Manifiesto de fotos por salón
+Escanea static/imagenes/<carpeta>/ UNA vez y cachea los archivos que
+realmente existen, con sus dimensiones y tamaño en bytes.
+"""
+
+import os
+import re
+import threading
+
+import bitacora
+import estaticos
+
+log = bitacora.obtener_logger('fotos')
+
+CARPETA_IMAGENES = os.path.join('static', 'imagenes')
+EXTENSIONES = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
+
+# Variantes reducidas para srcset: "1-400w.jpg" es la versión de 400px de "1.jpg"
+ANCHOS_VARIANTES = (400, 800)
+PATRON_VARIANTE = re.compile(r'^(?P<base>.+)-(?P<ancho>\d+)w$')
+
+_manifiestos = {}
+_lock = threading.Lock()
+
+
+def _orden_natural(nombre):
+    """'2.jpg' va antes que '10.jpg'"""
+    return [int(p) if p.isdigit() else p for p in re.split(r'(\d+)', nombre)]
+
+
+def _carpeta_segura(carpeta):
+    """Evita que un valor de la BD salga de static/imagenes"""
+    return bool(carpeta) and carpeta == os.path.basename(carpeta) and carpeta not in ('.', '..')
+
+
+def _dimensiones(ruta):
+    """Ancho y alto de la imagen (None, None si Pillow no está instalado)"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None, None
+
+    try:
+        # Image.open solo lee la cabecera, no decodifica la imagen
+        with Image.open(ruta) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+def _escanear(carpeta):
+    """Lee el directorio y arma el manifiesto (originales + variantes)"""
+    directorio = os.path.join(CARPETA_IMAGENES, carpeta)
+    if not os.path.isdir(directorio):
+        return []
+
+    originales = {}
+    variantes = {}
+
+    for entrada in os.scandir(directorio):
+        if not entrada.is_file():
+            continue
+        base, extension = os.path.splitext(entrada.name)
+        if extension.lower() not in EXTENSIONES:
+            continue
+
+        ancho, alto = _dimensiones(entrada.path)
+        info = {
+            'archivo': entrada.name,
+            'url': estaticos.url_estatico(f"imagenes/{carpeta}/{entrada.name}"),
+            'ancho': ancho,
+            'alto': alto,
+            'bytes': entrada.stat().st_size
+        }
+
+        variante = PATRON_VARIANTE.match(base)
+        if variante:
+            clave = variante.group('base') + extension.lower()
+            info['ancho'] = info['ancho'] or int(variante.group('ancho'))
+            variantes.setdefault(clave, []).append(info)
+        else:
+            originales[base + extension.lower()] = info
+
+    manifiesto = []
+    for clave in sorted(originales, key=_orden_natural):
+        foto = originales[clave]
+        candidatas = sorted(variantes.get(clave, []), key=lambda v: v['ancho'])
+        if foto['ancho']:
+            candidatas.append(foto)
+        foto['srcset'] = ', '.join(f"{v['url']} {v['ancho']}w" for v in candidatas if v['ancho'])
+        manifiesto.append(foto)
+
+    return manifiesto
+
+
+def obtener_manifiesto(carpeta):
+    """
+    Lista de fotos reales de un salón (cacheada por proceso).
+    Cada foto: archivo, url, ancho, alto, bytes, srcset.
+    """
+    if not _carpeta_segura(carpeta):
+        return []
+
+    manifiesto = _manifiestos.get(carpeta)
+    if manifiesto is None:
+        manifiesto = _escanear(carpeta)
+        with _lock:
+            _manifiestos[carpeta] = manifiesto
+    return manifiesto
+
+
+def nombres_fotos(carpeta):
+    """Nombres separados por coma (formato de la columna `fotos`)"""
+    return ', '.join(f['archivo'] for f in obtener_manifiesto(carpeta))
+
+
+def invalidar(carpeta=None):
+    """Olvida el manifiesto de una carpeta (o de todas)"""
+    with _lock:
+        if carpeta is None:
+            _manifiestos.clear()
+        else:
+            _manifiestos.pop(carpeta, None)
+
+
+def generar_variantes(carpeta, anchos=ANCHOS_VARIANTES):
+    """
+    Crea las versiones reducidas (1-400w.jpg, ...) que alimentan srcset.
+    Se llama al aprobar una solicitud. Sin Pillow no hace nada.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        log.warning("⚠️ Pillow no está instalado: no se generan variantes de fotos")
+        invalidar(carpeta)
+        return 0
+
+    if not _carpeta_segura(carpeta):
+        return 0
+
+    directorio = os.path.join(CARPETA_IMAGENES, carpeta)
+    if not os.path.isdir(directorio):
+        return 0
+
+    generadas = 0
+    for nombre in os.listdir(directorio):
+        base, extension = os.path.splitext(nombre)
+        if extension.lower() not in EXTENSIONES or PATRON_VARIANTE.match(base):
+            continue
+
+        ruta = os.path.join(directorio, nombre)
+        try:
+            with Image.open(ruta) as img:
+                for ancho in anchos:
+                    if img.width <= ancho:
+                        continue
+                    destino = os.path.join(directorio, f"{base}-{ancho}w{extension}")
+                    if os.path.exists(destino):
+                        continue
+                    alto = round(img.height * ancho / img.width)
+                    copia = img.convert('RGB') if extension.lower() in ('.jpg', '.jpeg') else img.copy()
+                    copia.resize((ancho, alto)).save(destino, optimize=True)
+                    generadas += 1
+        except Exception as e:
+            log.warning("⚠️ No se pudo generar variantes de %s: %s", ruta, e)
+
+    invalidar(carpeta)
+    return generadas
@@ -0,0 +1,108 @@
+"""
+KINDERFIESTA - Caché de fragmentos de plantillas
+Extensión de Jinja que guarda bloques ya renderizados:
+
+    {% cache 'impacto', stats.familias, stats.salones %}
+        ... HTML que solo depende de stats ...
+    {% endcache %}
+
+La clave es: plantilla + nombre del bloque + las partes que se pasen
+(p. ej. la versión del catálogo). Si cambia una parte, cambia la clave y
+el bloque se vuelve a renderizar; las entradas viejas salen por LRU.
+Cada proceso (worker) tiene su propia caché: catalogo.version() incluye
+la generación de la instantánea (instantanea.py), que comparten todos los
+workers, así que un cambio hecho en otro worker se ve cuando se publica.
+Sin instantánea (KINDERFIESTA_INSTANTANEA vacío) no hay nada compartido y
+las entradas vencen a los TTL_SEGUNDOS: ese es el atraso máximo.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+LIMITE_BYTES = 4 * 1024 * 1024
+TTL_SEGUNDOS = 300
+
+
+class CacheFragmentos:
+    """LRU de HTML renderizado con límite en bytes y vencimiento"""
+
+    def __init__(self, limite_bytes=LIMITE_BYTES, ttl=TTL_SEGUNDOS):
+        self.limite_bytes = limite_bytes
+        self.ttl = ttl
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()   # clave -> (html, bytes, vence)
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[2] < time.monotonic():
+                if entrada is not None:
+                    self._quitar(clave)
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[0]
+
+    def guardar(self, clave, html):
+        tamano = len(html.encode('utf-8'))
+        if tamano > self.limite_bytes:
+            return
+        with self._lock:
+            self._quitar(clave)
+            self._datos[clave] = (html, tamano, time.monotonic() + self.ttl)
+            self.bytes_usados += tamano
+            while self.bytes_usados > self.limite_bytes:
+                _, (_, expulsado, _) = self._datos.popitem(last=False)
+                self.bytes_usados -= expulsado
+
+    def _quitar(self, clave):
+        entrada = self._datos.pop(clave, None)
+        if entrada is not None:
+            self.bytes_usados -= entrada[1]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.bytes_usados = 0
+
+
+class ExtensionFragmentos(Extension):
+    """Etiqueta {% cache 'nombre', parte1, parte2 %} ... {% endcache %}"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(cache_fragmentos=CacheFragmentos())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        partes = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            partes.append(parser.parse_expression())
+
+        cuerpo = parser.parse_statements(['name:endcache'], drop_needle=True)
+        argumentos = [nodes.Const(parser.name), nodes.List(partes)]
+        return nodes.CallBlock(self.call_method('_renderizar', argumentos), [], [], cuerpo).set_lineno(lineno)
+
+    def _renderizar(self, plantilla, partes, caller):
+        # Con recarga automática (modo debug) las plantillas cambian en caliente
+        if self.environment.auto_reload:
+            return caller()
+
+        cache = self.environment.cache_fragmentos
+        clave = (plantilla,) + tuple(partes)
+        html = cache.obtener(clave)
+        if html is None:
+            html = caller()
+            cache.guardar(clave, html)
+        return html
@@ -0,0 +1,148 @@
+"""
+KINDERFIESTA - Coordenadas de los salones
+Convierte el locationCode (plus code de Google, ej. "FR88+66 El Alto") o
+el link de google_maps en latitud/longitud. Se calcula UNA vez, al crear
+o aprobar el salón, y se guarda en salones.lat / salones.lng.
+
+Los plus codes cortos ("FR88+66") no dicen en qué ciudad están: se
+completan con la referencia más cercana (REFERENCIA, El Alto por defecto).
+Algoritmo: https://github.com/google/open-location-code (sin dependencias).
+"""
+
+import math
+import os
+import re
+from urllib.parse import unquote
+
+ALFABETO = '23456789CFGHJMPQRVWX'
+SEPARADOR = '+'
+POSICION_SEPARADOR = 8
+RELLENO = '0'
+# Grados de cada par de dígitos: 20°, 1°, 0.05°, 0.0025°, 0.000125°
+RESOLUCIONES = (20.0, 1.0, 0.05, 0.0025, 0.000125)
+FILAS_GRILLA, COLUMNAS_GRILLA = 5, 4
+
+# Centro de El Alto: "lat,lng" en KINDERFIESTA_GEO_REFERENCIA para otra ciudad
+REFERENCIA = tuple(float(x) for x in os.environ.get('KINDERFIESTA_GEO_REFERENCIA', '-16.5047,-68.1633').split(','))
+
+RADIO_TIERRA_KM = 6371.0088
+
+_VALOR = {letra: i for i, letra in enumerate(ALFABETO)}
+_PATRON_CODIGO = re.compile(r'(?<![0-9A-Z+])([0-9A-Z]{2,8}\+[0-9A-Z]*)', re.IGNORECASE)
+# maps.google.com/?q=-16.5,-68.1  |  .../@-16.5,-68.1,17z  |  ?ll=  ?query=  ?destination=
+_PATRON_URL = re.compile(r'(?:[?&](?:q|query|ll|destination)=|@)\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)')
+
+
+# ============ PLUS CODES ============
+
+def _es_valido(codigo):
+    posicion = codigo.find(SEPARADOR)
+    if posicion == -1 or posicion != codigo.rfind(SEPARADOR) or posicion > POSICION_SEPARADOR or posicion % 2:
+        return False
+    digitos = codigo[:posicion].rstrip(RELLENO)
+    if RELLENO in digitos or len(digitos) % 2:
+        return False
+    if len(digitos) < posicion and len(codigo) > posicion + 1:
+        return False   # con relleno no puede haber nada después del '+'
+    return len(codigo) != posicion + 2 and all(c in _VALOR for c in digitos + codigo[posicion + 1:])
+
+
+def _decodificar_completo(codigo):
+    """Centro (lat, lng) de un código completo ("57RR4R8Q+66")"""
+    digitos = codigo.replace(SEPARADOR, '').rstrip(RELLENO)
+    lat, lng = -90.0, -180.0
+    alto = ancho = RESOLUCIONES[0]
+    for i in range(0, min(len(digitos), 10), 2):
+        alto = ancho = RESOLUCIONES[i // 2]
+        lat += _VALOR[digitos[i]] * alto
+        lng += _VALOR[digitos[i + 1]] * ancho
+    for letra in digitos[10:]:
+        alto /= FILAS_GRILLA
+        ancho /= COLUMNAS_GRILLA
+        fila, columna = divmod(_VALOR[letra], COLUMNAS_GRILLA)
+        lat += fila * alto
+        lng += columna * ancho
+    return min(lat + alto / 2, 90.0), lng + ancho / 2
+
+
+def _codificar(lat, lng, largo):
+    """Los primeros `largo` dígitos (par, <= 8) del código de un punto"""
+    lat = min(max(lat, -90.0), 90.0 - 1e-10) + 90
+    lng = (lng + 180) % 360
+    codigo = ''
+    for resolucion in RESOLUCIONES[:largo // 2]:
+        digito_lat, lat = divmod(lat, resolucion)
+        digito_lng, lng = divmod(lng, resolucion)
+        codigo += ALFABETO[int(digito_lat)] + ALFABETO[int(digito_lng)]
+    return codigo
+
+
+def decodificar_plus_code(codigo, referencia=None):
+    """
+    (lat, lng) del centro del plus code, o None si no es válido.
+    Los códigos cortos se completan con el punto más cercano a `referencia`.
+    """
+    codigo = codigo.strip().upper()
+    if not _es_valido(codigo):
+        return None
+
+    faltan = POSICION_SEPARADOR - codigo.find(SEPARADOR)
+    if faltan and RELLENO in codigo:
+        return None   # un código corto no lleva relleno
+    if not faltan:
+        if _VALOR[codigo[0]] > 8 or _VALOR[codigo[1]] > 17:
+            return None   # fuera de -90..90 / -180..180
+        return _decodificar_completo(codigo)
+
+    ref_lat, ref_lng = referencia or REFERENCIA
+    ref_lng = (ref_lng + 180) % 360 - 180
+    resolucion = 20.0 ** (2 - faltan / 2)
+    lat, lng = _decodificar_completo(_codificar(ref_lat, ref_lng, faltan) + codigo)
+
+    # El prefijo de la referencia puede caer en la celda vecina equivocada
+    if ref_lat + resolucion / 2 < lat and lat - resolucion >= -90:
+        lat -= resolucion
+    elif ref_lat - resolucion / 2 > lat and lat + resolucion <= 90:
+        lat += resolucion
+    if ref_lng + resolucion / 2 < lng:
+        lng -= resolucion
+    elif ref_lng - resolucion / 2 > lng:
+        lng += resolucion
+    return lat, (lng + 180) % 360 - 180
+
+
+# ============ COORDENADAS DE UN SALÓN ============
+
+def coordenadas(location_code=None, google_maps=None):
+    """
+    (lat, lng) redondeadas a 6 decimales (~10 cm), o (None, None).
+    Primero el plus code del locationCode ("FR88+66 El Alto"); si no hay,
+    las coordenadas del link de Google Maps.
+    """
+    if location_code:
+        encontrado = _PATRON_CODIGO.search(location_code)
+        punto = decodificar_plus_code(encontrado.group(1)) if encontrado else None
+        if punto:
+            return round(punto[0], 6), round(punto[1], 6)
+
+    if google_maps:
+        enlace = unquote(google_maps)
+        encontrado = _PATRON_URL.search(enlace)
+        if encontrado:
+            lat, lng = float(encontrado.group(1)), float(encontrado.group(2))
+            if -90 <= lat <= 90 and -180 <= lng <= 180:
+                return round(lat, 6), round(lng, 6)
+        encontrado = _PATRON_CODIGO.search(enlace)
+        punto = decodificar_plus_code(encontrado.group(1)) if encontrado else None
+        if punto:
+            return round(punto[0], 6), round(punto[1], 6)
+
+    return None, None
+
+
+def distancia_km(lat1, lng1, lat2, lng2):
+    """Distancia sobre la superficie de la Tierra (haversine)"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,58 @@
+"""
+KINDERFIESTA - Perfil de gunicorn para producción
+Lo usa el Procfile:  gunicorn -c gunicorn.conf.py 'app:crear_app()'
+
+- Workers gthread: cada worker atiende KINDERFIESTA_HILOS requests a la
+  vez y tiene un pool con una conexión a MySQL por hilo (nunca se agota).
+- Cantidad de workers según los CPU, acotada para que
+  workers x hilos no pase de KINDERFIESTA_MAX_CONEXIONES en MySQL.
+- preload_app: la app se importa UNA vez en el master y los workers la
+  heredan (arrancan más rápido y comparten memoria). El pool se crea
+  recién en post_fork, así ningún socket queda compartido entre procesos.
+- max_requests con jitter: los workers se reciclan de a uno, no todos juntos.
+- timeout / graceful_timeout: un request colgado no bloquea el worker para
+  siempre y un deploy deja terminar los requests en curso.
+
+Todo se puede pisar con variables de entorno (WEB_CONCURRENCY, PORT, ...).
+"""
+
+import multiprocessing
+import os
+
+
+def _entero(nombre, por_defecto):
+    return int(os.environ.get(nombre, por_defecto))
+
+
+HILOS = _entero('KINDERFIESTA_HILOS', 4)
+MAX_CONEXIONES = _entero('KINDERFIESTA_MAX_CONEXIONES', 100)   # max_connections de MySQL es 151
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+worker_class = 'gthread'
+threads = HILOS
+workers = _entero('WEB_CONCURRENCY', max(1, min(multiprocessing.cpu_count() * 2 + 1, MAX_CONEXIONES // HILOS)))
+
+preload_app = True
+
+max_requests = _entero('KINDERFIESTA_MAX_REQUESTS', 1000)
+max_requests_jitter = _entero('KINDERFIESTA_MAX_REQUESTS_JITTER', 100)
+
+timeout = _entero('KINDERFIESTA_TIMEOUT', 30)
+graceful_timeout = _entero('KINDERFIESTA_GRACEFUL_TIMEOUT', 30)
+keepalive = _entero('KINDERFIESTA_KEEPALIVE', 5)
+
+# Evita que el heartbeat de los workers escriba en un disco lento (Docker, Heroku)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+# ============ HOOKS ============
+
+def when_ready(server):
+    server.log.info("KinderFiesta: %s workers x %s hilos", workers, threads)
+
+
+def post_fork(server, worker):
+    """En cada worker: su propio pool de MySQL, una conexión por hilo"""
+    import database
+    database.iniciar_pool(threads)
@@ -0,0 +1,269 @@
+"""
+KINDERFIESTA - Horarios precalculados ("¿quién está abierto el sábado a las 15:00?")
+La semana de cada salón es un entero de 672 bits: un bit por franja de 15
+minutos desde el lunes 00:00. A partir de esos bits se arma, para cada
+franja, el conjunto de salones abiertos: filtrar el catálogo por
+?abierto_ahora o ?abierto_en=sábado,15:00 es una búsqueda en una lista,
+sin SQL y sin recorrer los salones.
+
+También se guardan los textos que muestra la página de detalle
+("08:00 - 17:00", "Cerrado"), formateados una sola vez.
+
+Se carga todo en el primer uso (una consulta) y se recarga cada REFRESCO
+segundos para ver los cambios de otros workers; al aprobar o eliminar un
+salón se actualiza solo ese. Si MySQL no responde se siguen usando los
+horarios que había (ver disyuntor.py) y se reintenta en el próximo uso.
+"""
+
+import math
+import os
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+
+import bitacora
+import database as db
+import disyuntor
+
+log = bitacora.obtener_logger('horarios')
+
+DIAS = ('lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo')
+MINUTOS_FRANJA = 15
+FRANJAS_DIA = 24 * 60 // MINUTOS_FRANJA       # 96
+FRANJAS_SEMANA = 7 * FRANJAS_DIA              # 672
+SEMANA_COMPLETA = (1 << FRANJAS_SEMANA) - 1
+
+REFRESCO = int(os.environ.get('KINDERFIESTA_HORARIOS_REFRESCO', '300'))
+ZONA_HORARIA = os.environ.get('KINDERFIESTA_ZONA_HORARIA', 'America/La_Paz')
+
+_DIA_POR_NOMBRE = {unicodedata.normalize('NFKD', dia).encode('ascii', 'ignore').decode(): i
+                   for i, dia in enumerate(DIAS)}
+
+
+# ============ FRANJAS ============
+
+def _minutos(valor):
+    """TIME de MySQL (timedelta), time o 'HH:MM[:SS]' -> minutos desde las 00:00"""
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, timedelta):
+        return int(valor.total_seconds()) // 60
+    if hasattr(valor, 'hour'):
+        return valor.hour * 60 + valor.minute
+    horas, minutos = str(valor).split(':')[:2]
+    return int(horas) * 60 + int(minutos)
+
+
+def _texto(minutos):
+    return f"{minutos // 60 % 24:02d}:{minutos % 60:02d}"
+
+
+def texto_dia(cerrado, hora_apertura, hora_cierre):
+    """'08:00 - 17:00', 'Cerrado' o None (sin horario cargado) de un día"""
+    if cerrado:
+        return 'Cerrado'
+    apertura, cierre = _minutos(hora_apertura), _minutos(hora_cierre)
+    if apertura is None or cierre is None:
+        return None
+    return f"{_texto(apertura)} - {_texto(cierre)}"
+
+
+def franja(dia, minutos):
+    """Número de franja (0-671) del día (0 = lunes) y la hora en minutos"""
+    return dia * FRANJAS_DIA + minutos // MINUTOS_FRANJA
+
+
+def franja_actual(ahora=None):
+    """La franja de este momento en la hora de los salones (ZONA_HORARIA)"""
+    if ahora is None:
+        try:
+            from zoneinfo import ZoneInfo
+            ahora = datetime.now(ZoneInfo(ZONA_HORARIA))
+        except Exception:
+            # Sin base de zonas horarias en el sistema: Bolivia es UTC-4 todo el año
+            ahora = datetime.now(timezone(timedelta(hours=-4)))
+    return franja(ahora.weekday(), ahora.hour * 60 + ahora.minute)
+
+
+def parsear_dia(valor):
+    """'sábado', 'Sabado', 'SÁBADO' -> 5. Lanza ValueError si no es un día."""
+    nombre = unicodedata.normalize('NFKD', str(valor).strip().lower()).encode('ascii', 'ignore').decode()
+    if nombre not in _DIA_POR_NOMBRE:
+        raise ValueError(f"Día desconocido: '{valor}'. Válidos: {', '.join(DIAS)}")
+    return _DIA_POR_NOMBRE[nombre]
+
+
+def parsear_hora(valor):
+    """'15:00' o '15' -> minutos desde las 00:00. Lanza ValueError si no se entiende."""
+    try:
+        horas, _, minutos = str(valor).strip().partition(':')
+        horas, minutos = int(horas), int(minutos or 0)
+    except ValueError:
+        raise ValueError(f"Hora inválida: '{valor}' (formato HH:MM)")
+    if not (0 <= horas < 24 and 0 <= minutos < 60):
+        raise ValueError(f"Hora inválida: '{valor}' (formato HH:MM)")
+    return horas * 60 + minutos
+
+
+def parsear_momento(valor):
+    """
+    'sábado,15:00' (o 'sabado,15', 'Sábado 15:30') -> franja.
+    Lanza ValueError si no se entiende.
+    """
+    partes = valor.replace(',', ' ').split()
+    if len(partes) != 2:
+        raise ValueError("abierto_en debe ser <día>,<hora>, ej. sábado,15:00")
+    return franja(parsear_dia(partes[0]), parsear_hora(partes[1]))
+
+
+def semana(filas):
+    """
+    Filas de horarios de UN salón -> (bits de la semana, textos por día).
+    Una franja cuenta como abierta si el salón atiende en alguna parte de
+    ella; si cierra después de medianoche sigue en el día siguiente.
+    """
+    bits = 0
+    textos = {}
+    for fila in filas:
+        if fila['dia'] not in DIAS:
+            continue
+        dia = DIAS.index(fila['dia'])
+        texto = texto_dia(fila['cerrado'], fila['hora_apertura'], fila['hora_cierre'])
+        if texto is None:
+            continue
+        textos[fila['dia']] = texto
+        if fila['cerrado']:
+            continue
+        apertura, cierre = _minutos(fila['hora_apertura']), _minutos(fila['hora_cierre'])
+
+        if cierre <= apertura:
+            cierre += 24 * 60
+        primera = franja(dia, apertura)
+        cantidad = math.ceil(cierre / MINUTOS_FRANJA) - apertura // MINUTOS_FRANJA
+        tramo = ((1 << cantidad) - 1) << primera
+        # El domingo a la noche sigue el lunes a la madrugada
+        bits |= (tramo | tramo >> FRANJAS_SEMANA) & SEMANA_COMPLETA
+
+    return bits, {dia: textos[dia] for dia in DIAS if dia in textos}
+
+
+class Semanas:
+    """Bits y textos por salón + conjunto de salones abiertos por franja"""
+
+    def __init__(self):
+        self.bits = {}
+        self.textos = {}
+        self.por_franja = [set() for _ in range(FRANJAS_SEMANA)]
+
+    def poner(self, salon_id, filas):
+        self.quitar(salon_id)
+        bits, textos = semana(filas)
+        self.bits[salon_id] = bits
+        self.textos[salon_id] = textos
+        while bits:
+            menor = bits & -bits
+            self.por_franja[menor.bit_length() - 1].add(salon_id)
+            bits ^= menor
+
+    def quitar(self, salon_id):
+        bits = self.bits.pop(salon_id, 0)
+        self.textos.pop(salon_id, None)
+        while bits:
+            menor = bits & -bits
+            self.por_franja[menor.bit_length() - 1].discard(salon_id)
+            bits ^= menor
+
+    @classmethod
+    def desde_filas(cls, filas):
+        por_salon = {}
+        for fila in filas:
+            por_salon.setdefault(fila['salon_id'], []).append(fila)
+        semanas = cls()
+        for salon_id, filas_salon in por_salon.items():
+            semanas.poner(salon_id, filas_salon)
+        return semanas
+
+
+# ============ SEMANAS DEL PROCESO ============
+
+_semanas = None
+_cargado_en = None   # None = hay que (re)intentar la carga
+_lock = threading.Lock()
+
+
+def _vencidas():
+    return _semanas is None or _cargado_en is None or time.monotonic() - _cargado_en > REFRESCO
+
+
+def _instalar(filas, fallo=False):
+    """Las filas leídas; si faltó MySQL quedan las anteriores (vencidas, para reintentar)"""
+    global _semanas, _cargado_en
+    if fallo:
+        if _semanas is None:
+            _semanas = Semanas()
+        return
+    _semanas, _cargado_en = Semanas.desde_filas(filas), time.monotonic()
+    log.info("🕒 Horarios en memoria: %s salones", len(_semanas.bits))
+
+
+def _cargadas():
+    with _lock:
+        if _vencidas():
+            with disyuntor.observar() as observacion:
+                filas = db.obtener_horarios()
+            _instalar(filas, observacion.fallo)
+        return _semanas
+
+
+def abiertos_en(numero_franja):
+    """frozenset con los ids de los salones abiertos en esa franja"""
+    semanas = _cargadas()
+    with _lock:
+        return frozenset(semanas.por_franja[numero_franja % FRANJAS_SEMANA])
+
+
+async def abiertos_en_async(numero_franja):
+    """Igual, pero la (re)carga va por el pool async (modo ASGI)"""
+    if _vencidas():
+        import database_async
+        with disyuntor.observar() as observacion:
+            filas = await database_async.obtener_horarios()
+        with _lock:
+            if _vencidas():
+                _instalar(filas, observacion.fallo)
+    with _lock:
+        return frozenset(_semanas.por_franja[numero_franja % FRANJAS_SEMANA])
+
+
+def textos(salon_id):
+    """{'lunes': '08:00 - 17:00', ...} del salón ({} si no tiene horarios cargados)"""
+    semanas = _cargadas()
+    with _lock:
+        return semanas.textos.get(salon_id, {})
+
+
+def actualizar_salon(salon_id):
+    """Después de crear un salón (o cambiar sus horarios)"""
+    if _semanas is None:
+        return   # se carga todo en el primer uso
+    with disyuntor.observar() as observacion:
+        filas = db.obtener_horarios(salon_id)
+    if observacion.fallo:
+        return   # lo corrige la próxima recarga entera
+    with _lock:
+        _semanas.poner(salon_id, filas)
+
+
+def quitar(salon_id):
+    if _semanas is None:
+        return
+    with _lock:
+        _semanas.quitar(salon_id)
+
+
+def invalidar():
+    """Después de cargar muchos salones de una vez: se relee todo en el próximo uso"""
+    global _cargado_en
+    with _lock:
+        _cargado_en = None
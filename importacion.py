@@ -0,0 +1,391 @@
+"""
+KINDERFIESTA - Importación masiva de salones (planillas de socios)
+Hasta ahora un salón entraba de a uno: /registrar-local -> aprobar la
+solicitud -> agregar_salon_desde_solicitud. Esto carga cientos de una vez:
+
+    python importacion.py socios.csv             # valida e inserta
+    python importacion.py socios.csv --probar    # solo valida, no escribe nada
+    POST /api/admin/importar   (archivo=<.csv|.json|.ndjson>, probar=1)
+
+Columnas (CSV) o claves (JSON):
+    nombre, telefono, direccion           obligatorias
+    whatsapp, google_maps, zona, categoria
+    lunes ... domingo                     '09:00-18:00', 'cerrado' o vacío
+En JSON también vale 'horarios' como en las solicitudes de /registrar-local:
+[{"dia": "sábado", "apertura": "10:00", "cierre": "20:00", "cerrado": false}].
+
+- El archivo se lee fila por fila (CSV y NDJSON no se cargan enteros).
+  Si a mitad del archivo aparece algo ilegible (bytes que no son UTF-8,
+  CSV roto) se informa como error de esa fila y no se lee el resto: lo
+  que ya se leyó se guarda igual.
+- Cada fila se valida con security.py. Una fila con errores se informa
+  y se sigue con la siguiente: nunca se corta la importación entera.
+- Duplicados: teléfono o dirección que ya están en la BD o en una fila
+  anterior del archivo, con un índice en memoria (una consulta al empezar).
+- Las filas válidas se insertan de a LOTE con executemany, una
+  transacción por lote (database.insertar_salones_lote). Si un lote
+  falla se informan sus filas y se sigue con el próximo.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import secrets
+import unicodedata
+from datetime import datetime
+
+import autocompletar
+import bitacora
+import catalogo
+import cercania
+import database as db
+import geo
+import horarios
+from security import detectar_sql_injection, validar_longitud, validar_numero_telefono
+
+log = bitacora.obtener_logger('importacion')
+
+LOTE = int(os.environ.get('KINDERFIESTA_IMPORTAR_LOTE', '200'))
+# El reporte no crece sin límite si alguien sube un archivo que no es una planilla
+MAXIMO_ERRORES = 500
+
+FORMATOS = {'.csv': 'csv', '.json': 'json', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+# campo -> (columna en salones, largo máximo, obligatorio)
+CAMPOS = {
+    'nombre': ('name', 200, True),
+    'telefono': ('phone', 20, True),
+    'direccion': ('address', 300, True),
+    'whatsapp': ('whatsapp', 20, False),
+    'google_maps': ('google_maps', 500, False),
+    'zona': ('locationCode', 50, False),
+    'categoria': ('category', 100, False),
+}
+
+CATEGORIA_POR_DEFECTO = 'Salón Infantil'
+
+
+class ArchivoInvalido(ValueError):
+    """El archivo entero no se puede leer (formato desconocido, JSON roto, ...)"""
+
+
+def formato_de(nombre_archivo):
+    """'socios.csv' -> 'csv'. Lanza ArchivoInvalido si la extensión no es conocida."""
+    extension = os.path.splitext(nombre_archivo or '')[1].lower()
+    if extension not in FORMATOS:
+        raise ArchivoInvalido(f"Formato desconocido: '{extension}'. Válidos: {', '.join(FORMATOS)}")
+    return FORMATOS[extension]
+
+
+# ============ LECTURA ============
+
+def _clave(columna):
+    return unicodedata.normalize('NFKD', str(columna).strip().lower()).encode('ascii', 'ignore').decode()
+
+
+def leer(archivo, formato):
+    """
+    (número de fila, dict con claves normalizadas o None, error) de un
+    archivo binario abierto. Las filas se numeran como en la planilla:
+    en CSV la 1 es la cabecera. Lanza ArchivoInvalido si no se puede leer
+    ni el principio (JSON roto, cabecera ilegible o sin las columnas).
+    """
+    if formato == 'json':
+        try:
+            filas = json.load(io.TextIOWrapper(archivo, encoding='utf-8-sig'))
+        except ValueError as e:
+            raise ArchivoInvalido(f"JSON inválido: {e}")
+        if not isinstance(filas, list):
+            raise ArchivoInvalido("El JSON tiene que ser una lista de salones")
+        for numero, fila in enumerate(filas, 1):
+            if isinstance(fila, dict):
+                yield numero, {_clave(k): v for k, v in fila.items()}, None
+            else:
+                yield numero, None, "no es un objeto"
+        return
+
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    if formato == 'ndjson':
+        numero = 0
+        try:
+            for numero, linea in enumerate(texto, 1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except ValueError as e:
+                    yield numero, None, f"JSON inválido: {e}"
+                    continue
+                if isinstance(fila, dict):
+                    yield numero, {_clave(k): v for k, v in fila.items()}, None
+                else:
+                    yield numero, None, "no es un objeto"
+        except UnicodeDecodeError as e:
+            yield numero + 1, None, f"archivo ilegible desde acá, no se leyó el resto: {e}"
+        return
+
+    lector = csv.DictReader(texto)
+    try:
+        # Con un archivo chico leer la cabecera ya decodifica todo
+        cabecera = lector.fieldnames
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ArchivoInvalido(f"CSV ilegible: {e}")
+    if cabecera is None:
+        return
+    columnas = [_clave(c) for c in cabecera]
+    faltan = [c for c, (_, _, obligatorio) in CAMPOS.items() if obligatorio and c not in columnas]
+    if faltan:
+        raise ArchivoInvalido(f"Faltan columnas: {', '.join(faltan)}")
+    try:
+        for fila in lector:
+            yield lector.line_num, dict(zip(columnas, fila.values())), None
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Las filas anteriores ya se informaron (y pueden estar guardadas): se corta acá
+        yield lector.line_num + 1, None, f"CSV ilegible desde acá, no se leyó el resto: {e}"
+
+
+# ============ VALIDACIÓN ============
+
+def _horario_dia(valor):
+    """'09:00-18:00' / 'cerrado' / '' -> (apertura, cierre, cerrado) o None"""
+    texto = str(valor or '').strip().lower()
+    if not texto:
+        return None
+    if texto == 'cerrado':
+        return None, None, 1
+    partes = re.split(r'\s*(?:-|–|\sa\s)\s*', texto)
+    if len(partes) != 2:
+        raise ValueError(f"Horario inválido: '{valor}' (formato 09:00-18:00 o cerrado)")
+    apertura, cierre = partes
+    apertura, cierre = horarios.parsear_hora(apertura), horarios.parsear_hora(cierre)
+    if apertura == cierre:
+        raise ValueError(f"Horario inválido: '{valor}' (abre y cierra a la misma hora)")
+    return f"{apertura // 60:02d}:{apertura % 60:02d}:00", f"{cierre // 60:02d}:{cierre % 60:02d}:00", 0
+
+
+def _horarios(datos):
+    """[(dia, apertura, cierre, cerrado)] de las columnas por día o de 'horarios'"""
+    por_dia = {}
+    lista = datos.get('horarios')
+    if isinstance(lista, list):
+        for h in lista:
+            if not isinstance(h, dict) or not h.get('dia'):
+                continue
+            dia = horarios.DIAS[horarios.parsear_dia(h['dia'])]
+            if h.get('cerrado') or not h.get('apertura') or not h.get('cierre'):
+                por_dia[dia] = (None, None, 1)
+            else:
+                por_dia[dia] = _horario_dia(f"{h['apertura']}-{h['cierre']}")
+    elif isinstance(lista, dict):
+        datos = {**datos, **{_clave(k): v for k, v in lista.items()}}
+
+    for dia in horarios.DIAS:
+        valor = datos.get(_clave(dia))
+        if valor not in (None, ''):
+            horario = _horario_dia(valor)
+            if horario is not None:
+                por_dia[dia] = horario
+    return [(dia, *horario) for dia, horario in por_dia.items()]
+
+
+def validar(datos):
+    """
+    Fila -> (salón listo para insertar_salones_lote, [errores]).
+    Los textos se validan con security.py igual que en los formularios.
+    """
+    errores = []
+    salon = {}
+    for campo, (columna, largo, obligatorio) in CAMPOS.items():
+        valor = datos.get(campo)
+        valor = '' if valor is None else str(valor).strip()
+        if not valor:
+            if obligatorio:
+                errores.append(f"{campo}: obligatorio")
+            salon[columna] = None
+            continue
+        if not validar_longitud(valor, 1, largo):
+            errores.append(f"{campo}: más de {largo} caracteres")
+        elif campo in ('telefono', 'whatsapp'):
+            if not validar_numero_telefono(valor):
+                errores.append(f"{campo}: número inválido '{valor}'")
+        elif campo == 'google_maps':
+            if not valor.startswith(('https://', 'http://')):
+                errores.append(f"{campo}: tiene que ser un link")
+        elif campo != 'direccion' and detectar_sql_injection(valor):
+            # En direcciones '#' es normal ('Calle 5 #123'); igual van parametrizadas
+            errores.append(f"{campo}: contenido no permitido")
+        salon[columna] = valor
+
+    try:
+        salon['horarios'] = _horarios(datos)
+    except ValueError as e:
+        errores.append(f"horario: {e}")
+
+    if errores:
+        return None, errores
+
+    salon['category'] = salon['category'] or CATEGORIA_POR_DEFECTO
+    salon['lat'], salon['lng'] = geo.coordenadas(salon['locationCode'], salon['google_maps'])
+    return salon, []
+
+
+# ============ DUPLICADOS ============
+
+def _telefono(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def _direccion(valor):
+    texto = unicodedata.normalize('NFKD', (valor or '').lower()).encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', texto).split())
+
+
+class IndiceDuplicados:
+    """Teléfono y dirección normalizados -> de dónde vienen (salón de la BD o fila del archivo)"""
+
+    def __init__(self):
+        self.telefonos = {}
+        self.direcciones = {}
+
+    @classmethod
+    def desde_bd(cls):
+        """None si no hay conexión (sin el índice no se sabe qué está repetido)"""
+        filas = db.obtener_contactos_salones()
+        if filas is None:
+            return None
+        indice = cls()
+        for salon_id, telefono, direccion in filas:
+            indice.agregar(telefono, direccion, f"salón {salon_id}")
+        return indice
+
+    def buscar(self, telefono, direccion):
+        """Mensaje de error si ya existe, None si es nuevo"""
+        origen = self.telefonos.get(_telefono(telefono))
+        if origen:
+            return f"duplicado: teléfono ya registrado ({origen})"
+        origen = self.direcciones.get(_direccion(direccion))
+        if origen:
+            return f"duplicado: dirección ya registrada ({origen})"
+        return None
+
+    def agregar(self, telefono, direccion, origen):
+        telefono, direccion = _telefono(telefono), _direccion(direccion)
+        if telefono:
+            self.telefonos.setdefault(telefono, origen)
+        if direccion:
+            self.direcciones.setdefault(direccion, origen)
+
+    def quitar(self, telefono, direccion, origen):
+        """Deshace agregar() de una fila que al final no se guardó"""
+        telefono, direccion = _telefono(telefono), _direccion(direccion)
+        if self.telefonos.get(telefono) == origen:
+            del self.telefonos[telefono]
+        if self.direcciones.get(direccion) == origen:
+            del self.direcciones[direccion]
+
+
+# ============ IMPORTACIÓN ============
+
+def importar(archivo, formato, probar=False, lote=LOTE):
+    """
+    Valida (y si no es una prueba, inserta) los salones de `archivo`.
+    Devuelve el reporte: {'filas', 'validas', 'insertados', 'duplicados',
+    'salon_ids', 'errores': [{'fila', 'nombre', 'errores'}], 'errores_omitidos', 'probar'}.
+    Lanza ArchivoInvalido si el archivo entero no se puede leer y
+    ConnectionError si no hay MySQL para armar el índice de duplicados.
+    """
+    indice = IndiceDuplicados.desde_bd()
+    if indice is None:
+        raise ConnectionError("Base de datos no disponible")
+
+    reporte = {'filas': 0, 'validas': 0, 'insertados': 0, 'duplicados': 0,
+               'salon_ids': [], 'errores': [], 'errores_omitidos': 0, 'probar': probar}
+    marca = f"{datetime.now():%Y%m%d_%H%M%S}_{secrets.token_hex(3)}"
+    pendientes = []
+
+    def _error(numero, datos, errores):
+        if len(reporte['errores']) >= MAXIMO_ERRORES:
+            reporte['errores_omitidos'] += 1
+            return
+        nombre = (datos or {}).get('nombre')
+        reporte['errores'].append({'fila': numero, 'nombre': str(nombre)[:200] if nombre else None,
+                                   'errores': errores})
+
+    def _guardar():
+        ids = db.insertar_salones_lote([salon for _, _, salon in pendientes])
+        if ids is None:
+            for numero, datos, salon in pendientes:
+                _error(numero, datos, ["no se pudo guardar (error de base de datos)"])
+                # No está en la BD: una fila posterior igual no es un duplicado
+                indice.quitar(salon['phone'], salon['address'], f"fila {numero}")
+        else:
+            reporte['insertados'] += len(ids)
+            reporte['salon_ids'].extend(ids)
+        pendientes.clear()
+
+    for numero, datos, error in leer(archivo, formato):
+        reporte['filas'] += 1
+        if error:
+            _error(numero, datos, [error])
+            continue
+
+        salon, errores = validar(datos)
+        if errores:
+            _error(numero, datos, errores)
+            continue
+
+        duplicado = indice.buscar(salon['phone'], salon['address'])
+        if duplicado:
+            reporte['duplicados'] += 1
+            _error(numero, datos, [duplicado])
+            continue
+        indice.agregar(salon['phone'], salon['address'], f"fila {numero}")
+        reporte['validas'] += 1
+
+        if probar:
+            continue
+        salon['folder'] = f"importacion_{marca}_{numero}"
+        pendientes.append((numero, datos, salon))
+        if len(pendientes) >= lote:
+            _guardar()
+
+    if pendientes:
+        _guardar()
+
+    if reporte['insertados']:
+        # Muchos salones nuevos: se recargan enteros en vez de uno por uno
+        catalogo.invalidar()
+        cercania.invalidar()
+        horarios.invalidar()
+        autocompletar.invalidar()
+
+    log.info("📥 Importación%s: %s filas, %s válidas, %s insertadas, %s duplicadas, %s con errores",
+             ' (prueba)' if probar else '', reporte['filas'], reporte['validas'], reporte['insertados'],
+             reporte['duplicados'], len(reporte['errores']) + reporte['errores_omitidos'])
+    return reporte
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Importa salones desde un CSV, JSON o NDJSON')
+    parser.add_argument('archivo')
+    parser.add_argument('--probar', action='store_true', help='solo valida, no escribe nada')
+    parser.add_argument('--lote', type=int, default=LOTE, help='salones por transacción')
+    args = parser.parse_args()
+
+    bitacora.configurar('INFO')
+    try:
+        with open(args.archivo, 'rb') as f:
+            reporte = importar(f, formato_de(args.archivo), args.probar, args.lote)
+    except (ArchivoInvalido, ConnectionError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    print(f"{'🔎 Prueba' if args.probar else '✅ Importación'}: {reporte['filas']} filas, "
+          f"{reporte['validas']} válidas, {reporte['insertados']} insertadas, {reporte['duplicados']} duplicadas")
+    for error in reporte['errores']:
+        print(f"   fila {error['fila']} ({error['nombre'] or 'sin nombre'}): {'; '.join(error['errores'])}")
+    if reporte['errores_omitidos']:
+        print(f"   ... y {reporte['errores_omitidos']} filas más con errores")
@@ -0,0 +1,445 @@
+"""
+KINDERFIESTA - Instantánea binaria del catálogo, compartida por los workers
+El catálogo público (salones visibles, sus reviews y sus horarios) se
+publica en UN archivo binario que cada worker de gunicorn mapea en memoria
+de solo lectura (mmap). Las páginas del archivo las comparte el sistema
+operativo: la memoria no crece al agregar workers, y después de un cambio
+la instantánea se arma una vez por máquina, no una vez por worker.
+
+Formato (little-endian, FORMATO = 1):
+- cabecera: CABECERA (magic, formato, generación, fecha, cantidades, offsets)
+- salones: registros de ancho fijo (SALON + 84 bytes con los bits de la
+  semana de horarios.py), en el orden del catálogo (rating, nombre)
+- índice: (id, posición) ordenado por id, para buscar con bisect
+- reviews: registros de ancho fijo (REVIEW), contiguas por salón
+- cadenas: todos los textos en UTF-8, sin repetir; los registros guardan
+  (offset, largo) y largo = NULA es NULL
+
+Publicación: publicar() lee MySQL, escribe a un temporal y lo renombra
+encima (atómico: un worker ve el archivo viejo o el nuevo, nunca uno a
+medias). La llama catalogo.invalidar() después de cada escritura, y
+cualquier worker cuando la instantánea tiene más de REFRESCO segundos
+(cambios de otras máquinas). Un candado de archivo evita que dos workers
+la armen a la vez.
+
+Lectura: actual() revisa el archivo como mucho cada CHEQUEO segundos y, si
+cambió, mapea el nuevo. Sin instantánea (recién instalado, o
+KINDERFIESTA_INSTANTANEA vacío) catalogo.py lee de MySQL como siempre.
+Con /dev/shm/kinderfiesta-catalogo.bin el archivo ni siquiera toca disco.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+
+import bitacora
+import database as db
+import disyuntor
+import horarios
+import metricas
+import respaldo
+
+log = bitacora.obtener_logger('instantanea')
+
+RUTA = os.environ.get('KINDERFIESTA_INSTANTANEA', os.path.join('data', 'catalogo.bin'))
+REFRESCO = int(os.environ.get('KINDERFIESTA_INSTANTANEA_REFRESCO', '300'))
+CHEQUEO = 1.0       # segundos entre os.stat() del archivo
+REINTENTO = 30.0    # segundos entre intentos de publicar si falla o la arma otro
+
+MAGIC = b'KFCS'
+FORMATO = 1
+NULA = 0xFFFFFFFF          # largo de una cadena NULL
+SIN_COORDENADA = -2 ** 31  # lat/lng NULL (se guardan en millonésimas de grado)
+BYTES_SEMANA = horarios.FRANJAS_SEMANA // 8
+
+# magic, formato, reservado, generación, creada (epoch), salones, reviews,
+# offset del índice, offset de las reviews, offset de las cadenas
+CABECERA = struct.Struct('<4sHHQdIIIII')
+
+# Textos de cada salón; '_horarios' son los textos de horarios.semana() en JSON
+CADENAS_SALON = ('name', 'phone', 'whatsapp', 'google_maps', 'address',
+                 'locationCode', 'category', 'folder', 'fotos', '_horarios')
+# id, rating en décimas (-1 = NULL), lat, lng, primera review, cantidad de reviews
+SALON = struct.Struct('<IhiiII' + 'II' * len(CADENAS_SALON))
+TAMANO_SALON = SALON.size + BYTES_SEMANA
+INDICE = struct.Struct('<II')
+# id, rating, nombre, comentario, fecha
+REVIEW = struct.Struct('<IB' + 'II' * 3)
+
+_POSICION_CADENA = {columna: 6 + 2 * i for i, columna in enumerate(CADENAS_SALON)}
+
+
+# ============ ESCRITURA ============
+
+class _Cadenas:
+    """Tabla de textos sin repetir -> (offset, largo)"""
+
+    def __init__(self):
+        self.datos = bytearray()
+        self._vistas = {}
+
+    def ref(self, texto):
+        if texto is None:
+            return 0, NULA
+        texto = str(texto)
+        ref = self._vistas.get(texto)
+        if ref is None:
+            codificado = texto.encode('utf-8')
+            ref = self._vistas[texto] = (len(self.datos), len(codificado))
+            self.datos += codificado
+        return ref
+
+
+def _entero(valor, escala, nulo):
+    return nulo if valor is None else int(round(float(valor) * escala))
+
+
+def serializar(salones, reviews_por_salon, horarios_por_salon, generacion, creada=None):
+    """
+    Arma el archivo. salones: filas con COLUMNAS_SALON en el orden del
+    catálogo; reviews_por_salon: como db.agrupar_reviews; horarios_por_salon:
+    {salon_id: filas de horarios}.
+    """
+    cadenas = _Cadenas()
+    registros = bytearray(len(salones) * TAMANO_SALON)
+    reviews = bytearray()
+    total_reviews = 0
+
+    for posicion, salon in enumerate(salones):
+        propias = reviews_por_salon.get(salon['id'], [])
+        for review in propias:
+            reviews += REVIEW.pack(review['id'], review['rating'],
+                                   *cadenas.ref(review['nombre']), *cadenas.ref(review['comentario']),
+                                   *cadenas.ref(review['fecha']))
+
+        bits, textos = horarios.semana(horarios_por_salon.get(salon['id'], []))
+        textos = json.dumps(textos, ensure_ascii=False) if textos else None
+        refs = []
+        for columna in CADENAS_SALON:
+            refs.extend(cadenas.ref(textos if columna == '_horarios' else salon.get(columna)))
+
+        inicio = posicion * TAMANO_SALON
+        SALON.pack_into(registros, inicio, salon['id'], _entero(salon.get('rating'), 10, -1),
+                        _entero(salon.get('lat'), 1e6, SIN_COORDENADA),
+                        _entero(salon.get('lng'), 1e6, SIN_COORDENADA),
+                        total_reviews, len(propias), *refs)
+        registros[inicio + SALON.size:inicio + TAMANO_SALON] = bits.to_bytes(BYTES_SEMANA, 'little')
+        total_reviews += len(propias)
+
+    indice = b''.join(INDICE.pack(salon_id, posicion) for salon_id, posicion in
+                      sorted((salon['id'], posicion) for posicion, salon in enumerate(salones)))
+
+    offset_indice = CABECERA.size + len(registros)
+    offset_reviews = offset_indice + len(indice)
+    offset_cadenas = offset_reviews + len(reviews)
+    cabecera = CABECERA.pack(MAGIC, FORMATO, 0, generacion, creada or time.time(), len(salones),
+                             total_reviews, offset_indice, offset_reviews, offset_cadenas)
+    return b''.join((cabecera, registros, indice, bytes(reviews), bytes(cadenas.datos)))
+
+
+# ============ LECTURA ============
+
+class _Ids:
+    """Los ids del índice como secuencia (para bisect) sin copiarlos"""
+
+    def __init__(self, mm, offset, cantidad):
+        self._mm, self._offset, self._cantidad = mm, offset, cantidad
+
+    def __len__(self):
+        return self._cantidad
+
+    def __getitem__(self, i):
+        return INDICE.unpack_from(self._mm, self._offset + i * INDICE.size)[0]
+
+
+class Instantanea:
+    """Un archivo publicado, mapeado en memoria de solo lectura"""
+
+    def __init__(self, ruta):
+        import mmap
+        with open(ruta, 'rb') as archivo:
+            self._mm = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, formato, _, self.generacion, self.creada, self.cantidad, self.cantidad_reviews,
+         self._offset_indice, self._offset_reviews, self._offset_cadenas) = CABECERA.unpack_from(self._mm)
+        if magic != MAGIC or formato != FORMATO:
+            raise ValueError(f"{ruta} no es una instantánea del catálogo (formato {FORMATO})")
+        self._ids = _Ids(self._mm, self._offset_indice, self.cantidad)
+
+    def __len__(self):
+        return self.cantidad
+
+    def _cadena(self, offset, largo):
+        if largo == NULA:
+            return None
+        inicio = self._offset_cadenas + offset
+        return self._mm[inicio:inicio + largo].decode('utf-8')
+
+    def posicion(self, salon_id):
+        """Posición en el catálogo del salón (None si no es visible)"""
+        i = bisect_left(self._ids, salon_id)
+        if i < self.cantidad:
+            encontrado, posicion = INDICE.unpack_from(self._mm, self._offset_indice + i * INDICE.size)
+            if encontrado == salon_id:
+                return posicion
+        return None
+
+    def abierto(self, posicion, franja):
+        """¿El salón atiende en esa franja de horarios.py?"""
+        franja %= horarios.FRANJAS_SEMANA
+        byte = self._mm[CABECERA.size + posicion * TAMANO_SALON + SALON.size + franja // 8]
+        return bool(byte >> franja % 8 & 1)
+
+    def _fila(self, valores, columnas):
+        fila = {}
+        for columna in columnas:
+            if columna == 'id':
+                fila['id'] = valores[0]
+            elif columna == 'rating':
+                fila['rating'] = None if valores[1] < 0 else valores[1] / 10
+            elif columna in ('lat', 'lng'):
+                valor = valores[2 if columna == 'lat' else 3]
+                fila[columna] = None if valor == SIN_COORDENADA else valor / 1e6
+            elif columna == 'visible':
+                fila['visible'] = 1
+            else:
+                k = _POSICION_CADENA[columna]
+                fila[columna] = self._cadena(valores[k], valores[k + 1])
+        return fila
+
+    def _reviews(self, primera, cantidad):
+        reviews = []
+        for i in range(primera, primera + cantidad):
+            (review_id, rating, *refs) = REVIEW.unpack_from(self._mm, self._offset_reviews + i * REVIEW.size)
+            reviews.append({
+                'id': review_id,
+                'nombre': self._cadena(refs[0], refs[1]),
+                'comentario': self._cadena(refs[2], refs[3]),
+                'rating': rating,
+                'fecha': self._cadena(refs[4], refs[5]),
+            })
+        return reviews
+
+    def salones(self, columnas, ids=None, franja=None, con_reviews=False):
+        """
+        (filas, reviews_por_salon) como db.obtener_salones_catalogo +
+        db.obtener_reviews_por_salones, en el orden del catálogo.
+        Solo los de `ids` si se pasan; solo los abiertos en `franja` si se pasa.
+        """
+        columnas = [c for c in columnas if c in db.COLUMNAS_SALON]
+        if 'id' not in columnas:
+            columnas.insert(0, 'id')
+
+        if ids is None:
+            posiciones = range(self.cantidad)
+        else:
+            posiciones = sorted(p for p in map(self.posicion, ids) if p is not None)
+
+        filas, reviews_por_salon = [], {}
+        for posicion in posiciones:
+            if franja is not None and not self.abierto(posicion, franja):
+                continue
+            valores = SALON.unpack_from(self._mm, CABECERA.size + posicion * TAMANO_SALON)
+            filas.append(self._fila(valores, columnas))
+            if con_reviews and valores[5]:
+                reviews_por_salon[valores[0]] = self._reviews(valores[4], valores[5])
+        return filas, reviews_por_salon
+
+    def textos_horarios(self, salon_id):
+        """{'lunes': '08:00 - 17:00', ...} como horarios.textos()"""
+        posicion = self.posicion(salon_id)
+        if posicion is None:
+            return {}
+        valores = SALON.unpack_from(self._mm, CABECERA.size + posicion * TAMANO_SALON)
+        k = _POSICION_CADENA['_horarios']
+        textos = self._cadena(valores[k], valores[k + 1])
+        return json.loads(textos) if textos else {}
+
+    def coordenadas(self):
+        """[(salon_id, lat, lng)] como db.obtener_coordenadas_salones()"""
+        resultado = []
+        for posicion in range(self.cantidad):
+            salon_id, _, lat, lng = struct.unpack_from('<Ihii', self._mm, CABECERA.size + posicion * TAMANO_SALON)
+            if lat != SIN_COORDENADA and lng != SIN_COORDENADA:
+                resultado.append((salon_id, lat / 1e6, lng / 1e6))
+        return resultado
+
+    def sugerencias(self):
+        """[(salon_id, name, address, category, rating, reviews)] como db.obtener_sugerencias_salones()"""
+        resultado = []
+        for posicion in range(self.cantidad):
+            valores = SALON.unpack_from(self._mm, CABECERA.size + posicion * TAMANO_SALON)
+            fila = self._fila(valores, ('name', 'address', 'category', 'rating'))
+            resultado.append((valores[0], fila['name'], fila['address'], fila['category'], fila['rating'],
+                              valores[5]))
+        return resultado
+
+
+# ============ INSTANTÁNEA DEL PROCESO ============
+
+_actual = None
+_firma = None            # (inode, mtime, tamaño) del archivo mapeado
+_revisado_en = float('-inf')
+_desactualizada = False  # la última publicación falló por falta de MySQL
+_lock = threading.Lock()
+
+_hilo = None
+_pendiente = None        # None = nada pendiente; True/False = forzar
+_intentado_en = float('-inf')
+_lock_publicar = threading.Lock()
+
+
+def _abrir_si_cambio():
+    global _actual, _firma
+    try:
+        estado = os.stat(RUTA)
+    except OSError:
+        return
+    firma = (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+    if firma == _firma:
+        return
+    try:
+        nueva = Instantanea(RUTA)
+    except (OSError, ValueError, struct.error) as e:
+        log.error("❌ No se pudo abrir la instantánea %s: %s", RUTA, e)
+        return
+    # La anterior se desmapea sola cuando la suelta el último request que la usa
+    _actual, _firma = nueva, firma
+    log.info("📦 Instantánea del catálogo: generación %s, %s salones", nueva.generacion, len(nueva))
+
+
+def actual():
+    """La instantánea vigente (None si no hay: leer de MySQL)"""
+    global _revisado_en
+    if not RUTA:
+        return None
+    ahora = time.monotonic()
+    if ahora - _revisado_en >= CHEQUEO:
+        with _lock:
+            if ahora - _revisado_en >= CHEQUEO:
+                _revisado_en = ahora
+                _abrir_si_cambio()
+                if _actual is None or time.time() - _actual.creada > REFRESCO:
+                    republicar(forzar=False)
+    foto = _actual
+    if foto is not None and _desactualizada:
+        # MySQL no está y no se pudo renovar: avisar como con respaldo.py
+        respaldo.marcar(foto.creada)
+    return foto
+
+
+# ============ PUBLICACIÓN ============
+
+def _tomar_candado(candado, esperar):
+    try:
+        import fcntl
+    except ImportError:   # Windows: un solo proceso en desarrollo, no hace falta candado
+        return True
+    try:
+        fcntl.flock(candado.fileno(), fcntl.LOCK_EX | (0 if esperar else fcntl.LOCK_NB))
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _generacion_en_disco():
+    try:
+        with open(RUTA, 'rb') as archivo:
+            cabecera = archivo.read(CABECERA.size)
+        magic, formato, _, generacion, creada = CABECERA.unpack(cabecera)[:5]
+        return (generacion, creada) if magic == MAGIC else (0, 0.0)
+    except (OSError, struct.error):
+        return 0, 0.0
+
+
+def publicar(forzar=True):
+    """
+    Lee el catálogo de MySQL y reemplaza el archivo. Con forzar=False no
+    hace nada si otro worker la está armando o si ya está al día.
+    Devuelve True si publicó.
+    """
+    global _desactualizada, _revisado_en
+    if not RUTA:
+        return False
+    inicio = time.perf_counter()
+    os.makedirs(os.path.dirname(RUTA) or '.', exist_ok=True)
+
+    with open(RUTA + '.lock', 'a+b') as candado:
+        if not _tomar_candado(candado, esperar=forzar):
+            return False
+        generacion, creada = _generacion_en_disco()
+        if not forzar and time.time() - creada <= REFRESCO:
+            return False
+
+        with disyuntor.observar() as observacion:
+            salones = db.obtener_salones_catalogo(db.COLUMNAS_SALON)
+            reviews_por_salon = db.obtener_reviews_visibles()
+            horarios_por_salon = {}
+            for fila in db.obtener_horarios():
+                horarios_por_salon.setdefault(fila['salon_id'], []).append(fila)
+        if observacion.fallo:
+            _desactualizada = True
+            log.warning("⚠️ MySQL no disponible: la instantánea del catálogo queda como está")
+            return False
+
+        datos = serializar(salones, reviews_por_salon, horarios_por_salon, generacion + 1)
+        temporal = f"{RUTA}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, 'wb') as archivo:
+                archivo.write(datos)
+            os.replace(temporal, RUTA)
+        except OSError as e:
+            log.error("❌ No se pudo publicar la instantánea %s: %s", RUTA, e)
+            return False
+
+    _desactualizada = False
+    _revisado_en = float('-inf')   # este worker la mapea en el próximo actual()
+    metricas.INSTANTANEA_PUBLICACIONES.inc()
+    log.info("📦 Catálogo publicado: generación %s, %s salones, %s KB en %.0f ms", generacion + 1,
+             len(salones), len(datos) // 1024, (time.perf_counter() - inicio) * 1000)
+    return True
+
+
+def _publicador():
+    global _hilo, _pendiente, _intentado_en
+    while True:
+        with _lock_publicar:
+            forzar = _pendiente
+            if forzar is None:
+                _hilo = None
+                return
+            _pendiente = None
+            _intentado_en = time.monotonic()
+        try:
+            publicar(forzar)
+        except Exception as e:
+            log.exception("❌ Error al publicar la instantánea: %s", e)
+
+
+def republicar(forzar=True):
+    """
+    Publica en un hilo aparte (no en el request). Las llamadas que llegan
+    mientras se publica se juntan en UNA publicación más.
+    """
+    global _hilo, _pendiente
+    if not RUTA:
+        return
+    with _lock_publicar:
+        if not forzar and time.monotonic() - _intentado_en < REINTENTO:
+            return
+        _pendiente = bool(_pendiente) or forzar
+        if _hilo is None:
+            _hilo = threading.Thread(target=_publicador, daemon=True, name='instantanea')
+            _hilo.start()
+
+
+if __name__ == '__main__':
+    bitacora.configurar('INFO')
+    if publicar():
+        foto = Instantanea(RUTA)
+        print(f"✅ {RUTA}: generación {foto.generacion}, {len(foto)} salones, "
+              f"{foto.cantidad_reviews} reviews, {os.path.getsize(RUTA) // 1024} KB")
+    else:
+        print("❌ No se pudo publicar la instantánea (¿MySQL está disponible?)")
@@ -0,0 +1,257 @@
+"""
+KINDERFIESTA - Métricas de rendimiento
+Histogramas y contadores en memoria, expuestos en formato de texto de
+Prometheus en /admin/metrics. Registrar un valor cuesta un lock y unas
+sumas, así que pueden quedar activas en producción.
+
+Cada worker de gunicorn tiene sus propias métricas (Prometheus las suma
+por instancia al hacer scrape).
+"""
+
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+import consultas_lentas
+import presupuesto_consultas
+
+# Segundos: de 1 ms a 5 s
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_FILAS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_metricas = []
+_caches = {}
+
+
+def _formatear_etiquetas(nombres, valores, extra=None):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+# ============ TIPOS ============
+
+class Contador:
+    """Contador monotónico con etiquetas: CONTADOR.inc('login')"""
+
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def inc(self, *valores, cantidad=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def lineas(self):
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for etiquetas, valor in valores:
+            yield f"{self.nombre}{_formatear_etiquetas(self.etiquetas, etiquetas)} {_numero(valor)}"
+
+
+class Histograma:
+    """Histograma con buckets fijos: HISTOGRAMA.observar(0.012, 'index', 'GET')"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        # etiquetas -> [conteo por bucket (no acumulado) + desborde, suma, total]
+        self._series = {}
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def observar(self, valor, *valores):
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def total(self):
+        """Cantidad de observaciones sumando todas las series"""
+        with self._lock:
+            return sum(serie[2] for serie in self._series.values())
+
+    def lineas(self):
+        with self._lock:
+            series = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._series.items())
+        for etiquetas, (conteos, suma, total) in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float('inf'),), conteos):
+                acumulado += conteo
+                le = f'le="{_numero(float(limite))}"'
+                yield f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, etiquetas, le)} {acumulado}"
+            yield f"{self.nombre}_sum{_formatear_etiquetas(self.etiquetas, etiquetas)} {_numero(suma)}"
+            yield f"{self.nombre}_count{_formatear_etiquetas(self.etiquetas, etiquetas)} {total}"
+
+
+# ============ MÉTRICAS DE LA APP ============
+
+HTTP_DURACION = Histograma('kinderfiesta_http_request_duration_seconds',
+                           'Latencia por ruta', ('endpoint', 'metodo'))
+HTTP_RESPUESTAS = Contador('kinderfiesta_http_responses_total',
+                           'Respuestas por ruta y código', ('endpoint', 'codigo'))
+
+DB_CONEXION = Histograma('kinderfiesta_db_connect_seconds',
+                         'Tiempo para obtener una conexión a MySQL')
+DB_CONEXION_ERRORES = Contador('kinderfiesta_db_connect_errors_total',
+                               'Conexiones a MySQL fallidas')
+DB_CONSULTA = Histograma('kinderfiesta_db_query_duration_seconds',
+                         'Duración de cada execute() por función de database.py', ('consulta',))
+DB_FILAS = Histograma('kinderfiesta_db_query_rows',
+                      'Filas leídas o afectadas por consulta', ('consulta',), buckets=BUCKETS_FILAS)
+DB_LENTAS = Contador('kinderfiesta_db_slow_queries_total',
+                     'Consultas registradas en logs/consultas_lentas.log', ('consulta',))
+DB_LECTURAS = Contador('kinderfiesta_db_reads_total',
+                       'Conexiones de lectura por destino (réplica o primaria y por qué, ver enrutador.py)', ('destino',))
+DB_DISYUNTOR_APERTURAS = Contador('kinderfiesta_db_breaker_opens_total',
+                                  'Veces que se abrió el disyuntor de MySQL (ver disyuntor.py)')
+DB_DISYUNTOR_RECHAZOS = Contador('kinderfiesta_db_breaker_rejections_total',
+                                 'Conexiones no intentadas por el disyuntor abierto')
+RESPALDO_SERVIDO = Contador('kinderfiesta_stale_responses_total',
+                            'Lecturas respondidas con la última copia buena (ver respaldo.py)', ('copia',))
+INSTANTANEA_PUBLICACIONES = Contador('kinderfiesta_snapshot_publications_total',
+                                     'Instantáneas del catálogo publicadas por este worker (ver instantanea.py)')
+
+RATE_LIMIT_BLOQUEOS = Contador('kinderfiesta_rate_limit_blocks_total',
+                               'Intentos de login rechazados por el rate limiter', ('login',))
+FILTRO_PALABRAS = Contador('kinderfiesta_filtered_words_total',
+                           'Palabras censuradas por filtrar_palabras')
+
+
+def registrar_cache(nombre, cache):
+    """
+    Publica los aciertos/fallos de una caché (cualquier objeto con
+    atributos aciertos, fallos y bytes_usados). Se leen al hacer scrape.
+    """
+    _caches[nombre] = cache
+
+
+def _lineas_caches():
+    if not _caches:
+        return
+    for metrica, atributo, tipo, ayuda in (
+            ('kinderfiesta_cache_hits_total', 'aciertos', 'counter', 'Aciertos de caché'),
+            ('kinderfiesta_cache_misses_total', 'fallos', 'counter', 'Fallos de caché'),
+            ('kinderfiesta_cache_bytes', 'bytes_usados', 'gauge', 'Bytes ocupados por la caché')):
+        yield f"# HELP {metrica} {ayuda}"
+        yield f"# TYPE {metrica} {tipo}"
+        for nombre, cache in sorted(_caches.items()):
+            yield f'{metrica}{{cache="{_escapar(nombre)}"}} {getattr(cache, atributo, 0)}'
+
+
+def exponer():
+    """Todas las métricas en formato de texto de Prometheus"""
+    lineas = []
+    for metrica in _metricas:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        lineas.extend(metrica.lineas())
+    lineas.extend(_lineas_caches())
+    return '\n'.join(lineas) + '\n'
+
+
+# ============ INSTRUMENTACIÓN DE MYSQL ============
+
+class CursorInstrumentado:
+    """
+    Envuelve el cursor de mysql.connector: mide cada execute() y cuenta las
+    filas leídas. La consulta se etiqueta con la función que la ejecutó
+    (obtener_horarios_salon, buscar_salones, ...), así la cardinalidad queda fija.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._consulta = 'desconocida'
+
+    def execute(self, operacion, *args, **kwargs):
+        self._consulta = sys._getframe(1).f_code.co_name
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.execute(operacion, *args, **kwargs)
+        finally:
+            duracion = time.perf_counter() - inicio
+            DB_CONSULTA.observar(duracion, self._consulta)
+            presupuesto_consultas.contar(self._consulta)
+            parametros = args[0] if args else kwargs.get('params')
+            if consultas_lentas.registrar(self._consulta, operacion, parametros, duracion):
+                DB_LENTAS.inc(self._consulta)
+            # En escrituras las filas son las afectadas; en SELECT se cuentan al hacer fetch
+            afectadas = self._cursor.rowcount
+            if afectadas is not None and afectadas >= 0 and operacion.lstrip()[:6].upper() != 'SELECT':
+                DB_FILAS.observar(afectadas, self._consulta)
+
+    def executemany(self, operacion, secuencia, *args, **kwargs):
+        self._consulta = sys._getframe(1).f_code.co_name
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.executemany(operacion, secuencia, *args, **kwargs)
+        finally:
+            duracion = time.perf_counter() - inicio
+            DB_CONSULTA.observar(duracion, self._consulta)
+            presupuesto_consultas.contar(self._consulta)
+            # La forma del primer juego de parámetros representa a todo el lote
+            primeros = secuencia[0] if isinstance(secuencia, (list, tuple)) and secuencia else None
+            if consultas_lentas.registrar(self._consulta, operacion, primeros, duracion):
+                DB_LENTAS.inc(self._consulta)
+
+    def fetchall(self):
+        filas = self._cursor.fetchall()
+        DB_FILAS.observar(len(filas), self._consulta)
+        return filas
+
+    def fetchmany(self, *args, **kwargs):
+        filas = self._cursor.fetchmany(*args, **kwargs)
+        DB_FILAS.observar(len(filas), self._consulta)
+        return filas
+
+    def fetchone(self):
+        fila = self._cursor.fetchone()
+        DB_FILAS.observar(0 if fila is None else 1, self._consulta)
+        return fila
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class ConexionInstrumentada:
+    """Envuelve la conexión para que cursor() devuelva un CursorInstrumentado"""
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    def cursor(self, *args, **kwargs):
+        return CursorInstrumentado(self._conexion.cursor(*args, **kwargs))
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
@@ -0,0 +1,127 @@
+"""
+KINDERFIESTA - Modelo de datos para las plantillas
+Salon, Review y Horario son dataclasses con __slots__: sin __dict__ por
+objeto, cada fila ocupa lo que ocupan sus valores. desde_fila() es el
+ÚNICO mapeo de una fila (de cursor(dictionary=True) o del catálogo) a un
+objeto: las columnas que no son campos se ignoran.
+
+Los nombres en español que usan las plantillas (nombre, telefono,
+direccion, ...) son propiedades que leen el campo en inglés: no se copia
+ningún valor a una segunda clave.
+
+Las APIs JSON siguen usando dicts (se serializan directo); esto es para
+las páginas HTML. Flask serializa estas dataclasses con |tojson.
+"""
+
+from dataclasses import dataclass, field, fields
+from decimal import Decimal
+
+_CAMPOS = {}
+
+
+def desde_fila(cls, fila):
+    """Fila (dict) -> objeto de cls, solo con las columnas que son campos"""
+    campos = _CAMPOS.get(cls)
+    if campos is None:
+        campos = _CAMPOS[cls] = frozenset(f.name for f in fields(cls))
+    return cls(**{columna: valor for columna, valor in fila.items() if columna in campos})
+
+
+def _numero(valor):
+    return float(valor) if isinstance(valor, (Decimal, str)) else valor
+
+
+@dataclass(slots=True)
+class Review:
+    id: int
+    nombre: str
+    comentario: str
+    rating: int
+    fecha: str = None
+
+    def __post_init__(self):
+        if self.fecha is not None and hasattr(self.fecha, 'isoformat'):
+            self.fecha = self.fecha.isoformat()
+
+
+@dataclass(slots=True)
+class Horario:
+    dia: str
+    hora_apertura: object = None   # TIME de MySQL (timedelta) o 'HH:MM'
+    hora_cierre: object = None
+    cerrado: bool = False
+
+    @property
+    def texto(self):
+        """'08:00 - 17:00', 'Cerrado' o None si no tiene horario"""
+        import horarios
+        return horarios.texto_dia(self.cerrado, self.hora_apertura, self.hora_cierre)
+
+
+@dataclass(slots=True)
+class Salon:
+    id: int
+    name: str = None
+    phone: str = None
+    whatsapp: str = None
+    google_maps: str = None
+    address: str = None
+    locationCode: str = None
+    category: str = None
+    rating: float = 0.0
+    visible: int = 1
+    folder: str = None
+    fotos: str = None
+    lat: float = None
+    lng: float = None
+    reviews: list = field(default_factory=list)
+    galeria: list = None
+
+    def __post_init__(self):
+        # Lo que antes se rellenaba en cada copia del dict
+        self.name = self.name or 'Sin nombre'
+        self.phone = self.phone or 'N/A'
+        self.address = self.address or 'Sin dirección'
+        self.locationCode = self.locationCode or ''
+        self.category = self.category or 'Salón Infantil'
+        self.rating = float(self.rating) if self.rating is not None else 0.0
+        self.lat, self.lng = _numero(self.lat), _numero(self.lng)
+        self.reviews = [r if isinstance(r, Review) else desde_fila(Review, r) for r in self.reviews or ()]
+
+    # ============ ALIAS DE LAS PLANTILLAS ============
+
+    @property
+    def salon_id(self):
+        return self.id
+
+    @property
+    def nombre(self):
+        return self.name
+
+    @property
+    def telefono(self):
+        return self.phone
+
+    @property
+    def direccion(self):
+        return self.address
+
+    @property
+    def zona(self):
+        return self.locationCode
+
+    @property
+    def categoria(self):
+        return self.category
+
+    @property
+    def promedio(self):
+        return self.rating or 0
+
+    @property
+    def carpeta_fotos(self):
+        return self.folder or f"salon{self.id}"
+
+    @property
+    def foto_principal(self):
+        return f"{self.carpeta_fotos}/1.jpg"
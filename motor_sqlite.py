@@ -0,0 +1,391 @@
+"""
+KINDERFIESTA - Motor SQLite embebido (sin servidor MySQL)
+Para una instalación de un solo nodo, CI y pruebas de carga en proceso:
+
+    KINDERFIESTA_DB_MOTOR=sqlite gunicorn -c gunicorn.conf.py 'app:crear_app()'
+    KINDERFIESTA_DB_SQLITE=/ruta/kinderfiesta.db   (por defecto data/kinderfiesta.db)
+
+Tiene lo que database.py usa de mysql.connector (connect, Error,
+errors.PoolError, pooling.MySQLConnectionPool, cursor(dictionary=True)),
+así que database.py es el mismo con los dos motores:
+- la base se crea sola la primera vez desde database_setup.sql: mismas
+  tablas, índices y datos iniciales
+- modo WAL: las lecturas no esperan a la escritura en curso
+- una conexión por hilo (y por proceso: después del fork se abre otra);
+  close() la deja abierta para el próximo conectar() del mismo hilo
+- %s -> ?, y FIELD() y LOWER() (con acentos) como funciones de Python
+- los triggers de MySQL que recalculan salones.rating, como triggers SQLite
+- todo error de sqlite3 (abrir, consultar, commit) llega como Error
+
+Sin réplicas de verdad (enrutador.py) ni modo ASGI (aiomysql es de MySQL).
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import bitacora
+
+log = bitacora.obtener_logger('motor_sqlite')
+
+RUTA = os.environ.get('KINDERFIESTA_DB_SQLITE', os.path.join('data', 'kinderfiesta.db'))
+ESQUEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database_setup.sql')
+
+# host -> archivo: otra base en lugar de RUTA (para probar enrutador.py con dos archivos)
+RUTAS_POR_HOST = {}
+
+
+# ============ ERRORES (los de mysql.connector que usa database.py) ============
+
+class Error(Exception):
+    def __init__(self, msg=None, errno=None):
+        super().__init__(msg)
+        self.msg = msg
+        self.errno = errno
+
+
+class PoolError(Error):
+    pass
+
+
+errors = SimpleNamespace(Error=Error, PoolError=PoolError)
+
+
+@contextmanager
+def _errores(error=Error, ruta=None):
+    """sqlite3.Error -> `error`: database.py solo atrapa conector.Error"""
+    try:
+        yield
+    except sqlite3.Error as e:
+        raise error(msg=f"{ruta}: {e}" if ruta else str(e)) from e
+
+
+# ============ ESQUEMA ============
+
+# Los triggers de database_setup.sql llaman a un procedimiento: SQLite no tiene
+TRIGGERS_RATING = tuple(
+    f"""CREATE TRIGGER IF NOT EXISTS after_{evento.lower()}_review AFTER {evento} ON reviews
+BEGIN
+    UPDATE salones SET rating = (SELECT ROUND(AVG(rating), 1) FROM reviews WHERE salon_id = {fila}.salon_id)
+    WHERE id = {fila}.salon_id;
+END"""
+    for evento, fila in (('INSERT', 'NEW'), ('DELETE', 'OLD'), ('UPDATE', 'NEW'))
+)
+
+
+def sentencias(script):
+    """Parte un script MySQL en sentencias, respetando los bloques DELIMITER"""
+    delimitador = ';'
+    actual = []
+    for linea in script.splitlines():
+        limpia = linea.strip()
+        if limpia.upper().startswith('DELIMITER '):
+            delimitador = limpia.split()[1]
+            continue
+        if not actual and (not limpia or limpia.startswith('--')):
+            continue
+        actual.append(linea)
+        if limpia.endswith(delimitador):
+            sentencia = '\n'.join(actual).strip()[:-len(delimitador)].strip()
+            if sentencia:
+                yield sentencia
+            actual = []
+
+
+def _traducir_tabla(sentencia):
+    """CREATE TABLE de MySQL -> (CREATE TABLE de SQLite, [CREATE INDEX ...])"""
+    tabla = re.search(r'CREATE TABLE IF NOT EXISTS (\w+)', sentencia).group(1)
+    cuerpo = sentencia[sentencia.index('(') + 1:sentencia.rindex(')')]
+    columnas, indices = [], []
+
+    for linea in cuerpo.splitlines():
+        linea = linea.strip().rstrip(',')
+        if not linea:
+            continue
+        indice = re.match(r'INDEX (\w+) \((.+)\)$', linea)
+        if indice:
+            # En SQLite los nombres de índice son globales (idx_rating existe en dos tablas)
+            indices.append(f"CREATE INDEX IF NOT EXISTS {tabla}_{indice.group(1)} "
+                           f"ON {tabla} ({indice.group(2)})")
+            continue
+        linea = re.sub(r'^UNIQUE KEY \w+ ', 'UNIQUE ', linea)
+        linea = re.sub(r'INT AUTO_INCREMENT PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT', linea)
+        linea = re.sub(r"ENUM\([^)]*\)", 'TEXT', linea)
+        linea = linea.replace(' ON UPDATE CURRENT_TIMESTAMP', '')
+        columnas.append('    ' + linea)
+
+    crear = f"CREATE TABLE IF NOT EXISTS {tabla} (\n" + ',\n'.join(columnas) + "\n)"
+    return crear, indices
+
+
+def traducir_esquema(script):
+    """
+    Lista de sentencias SQLite equivalentes a database_setup.sql:
+    AUTO_INCREMENT, ENUM e INDEX dentro de CREATE TABLE se traducen;
+    ENGINE/CHARSET/ON UPDATE se descartan.
+    """
+    traducidas = []
+    for sentencia in sentencias(script):
+        inicio = sentencia.lstrip().upper()
+        if inicio.startswith('CREATE TABLE'):
+            crear, indices = _traducir_tabla(sentencia)
+            traducidas.append(crear)
+            traducidas.extend(indices)
+        elif inicio.startswith('CREATE OR REPLACE VIEW'):
+            traducidas.append(re.sub(r'CREATE OR REPLACE VIEW', 'CREATE VIEW IF NOT EXISTS',
+                                     sentencia, flags=re.IGNORECASE))
+        elif inicio.startswith('INSERT'):
+            traducidas.append(sentencia)
+        # CREATE DATABASE, USE, PROCEDURE, TRIGGER y SELECT de verificación no aplican
+    return traducidas
+
+
+def crear_base(ruta, ruta_esquema=ESQUEMA, datos_iniciales=True, triggers=True):
+    """
+    Crea la base en `ruta` con el esquema de la app, si todavía no existe
+    (en una transacción: dos workers que arrancan juntos no la crean dos
+    veces). Para sembrar muchas filas conviene triggers=False e
+    instalar_triggers() al final. Devuelve True si la creó.
+    """
+    with open(ruta_esquema, encoding='utf-8') as f:
+        script = f.read()
+
+    directorio = os.path.dirname(ruta)
+    try:
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+    except OSError as e:
+        raise Error(msg=f"{ruta}: {e}") from e
+    with _errores(ruta=ruta):
+        conexion = sqlite3.connect(ruta, timeout=30, isolation_level=None)
+        try:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('BEGIN IMMEDIATE')
+            existe = conexion.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'salones'").fetchone()
+            if existe:
+                conexion.execute('ROLLBACK')
+                return False
+            for sentencia in traducir_esquema(script):
+                if not datos_iniciales and sentencia.lstrip().upper().startswith('INSERT'):
+                    continue
+                conexion.execute(sentencia)
+            if triggers:
+                for trigger in TRIGGERS_RATING:
+                    conexion.execute(trigger)
+            conexion.execute('COMMIT')
+            return True
+        finally:
+            conexion.close()
+
+
+def instalar_triggers(ruta):
+    """Triggers que recalculan salones.rating (equivalentes a los de MySQL)"""
+    with _errores(ruta=ruta):
+        conexion = sqlite3.connect(ruta)
+        try:
+            for trigger in TRIGGERS_RATING:
+                conexion.execute(trigger)
+            conexion.commit()
+        finally:
+            conexion.close()
+
+
+# ============ CONSULTAS ============
+
+_traducciones = {}
+
+
+def traducir_consulta(sql):
+    """%s -> ? (memorizado: las consultas de la app son fijas)"""
+    traducida = _traducciones.get(sql)
+    if traducida is None:
+        if re.match(r'\s*SHOW\s+(REPLICA|SLAVE)\s+STATUS', sql, re.IGNORECASE):
+            # El retraso de una réplica (enrutador.py): SQLite no replica, sin filas = al día
+            traducida = "SELECT NULL AS Seconds_Behind_Source WHERE 0"
+        else:
+            traducida = sql.replace('%s', '?')
+        _traducciones[sql] = traducida
+    return traducida
+
+
+def _field(valor, *lista):
+    """FIELD() de MySQL: posición (desde 1) de valor en la lista, 0 si no está"""
+    try:
+        return lista.index(valor) + 1
+    except ValueError:
+        return 0
+
+
+def _lower(valor):
+    # El lower() de SQLite solo pasa a minúsculas ASCII: 'SALÓN' quedaría 'salÓn'
+    return valor.lower() if isinstance(valor, str) else valor
+
+
+def _convertir_timestamp(valor):
+    texto = valor.decode()
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        return texto
+
+
+sqlite3.register_converter('TIMESTAMP', _convertir_timestamp)
+
+
+# ============ CONEXIÓN ============
+
+class Cursor:
+    """Cursor con la interfaz de mysql.connector que usa database.py"""
+
+    def __init__(self, conexion, dictionary=False, error=Error):
+        self._cursor = conexion.cursor()
+        self._diccionario = dictionary
+        self._error = error
+
+    def execute(self, sql, parametros=()):
+        with _errores(self._error):
+            self._cursor.execute(traducir_consulta(sql), tuple(parametros or ()))
+
+    def executemany(self, sql, secuencia):
+        with _errores(self._error):
+            self._cursor.executemany(traducir_consulta(sql), [tuple(p) for p in secuencia])
+
+    def _fila(self, fila):
+        if fila is None or not self._diccionario:
+            return fila
+        return dict(zip((c[0] for c in self._cursor.description), fila))
+
+    def fetchone(self):
+        with _errores(self._error):
+            return self._fila(self._cursor.fetchone())
+
+    def fetchall(self):
+        with _errores(self._error):
+            return [self._fila(fila) for fila in self._cursor.fetchall()]
+
+    def fetchmany(self, size=1):
+        with _errores(self._error):
+            return [self._fila(fila) for fila in self._cursor.fetchmany(size)]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class Conexion:
+    """Conexión con la interfaz de mysql.connector que usa database.py"""
+
+    def __init__(self, ruta, timeout=30, error=Error):
+        self._error = error
+        with _errores(error, ruta):
+            self._conexion = sqlite3.connect(ruta, timeout=timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                                             check_same_thread=False)
+            try:
+                self._conexion.execute('PRAGMA foreign_keys=ON')
+                # Con WAL, NORMAL no pierde datos si se cae el proceso (solo si se cae el sistema)
+                self._conexion.execute('PRAGMA synchronous=NORMAL')
+                self._conexion.create_function('FIELD', -1, _field, deterministic=True)
+                self._conexion.create_function('LOWER', 1, _lower, deterministic=True)
+            except sqlite3.Error:
+                self._conexion.close()
+                raise
+
+    def cursor(self, dictionary=False, **kwargs):
+        with _errores(self._error):
+            return Cursor(self._conexion, dictionary=dictionary, error=self._error)
+
+    def commit(self):
+        with _errores(self._error):
+            self._conexion.commit()
+
+    def rollback(self):
+        with _errores(self._error):
+            self._conexion.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._conexion.close()
+
+
+class ConexionDelHilo(Conexion):
+    """
+    La conexión de un hilo. close() no la cierra: deshace lo que quedó sin
+    commit (como un pool de MySQL al recibir una conexión) cuando la
+    devuelve el último que la pidió.
+    """
+
+    def __init__(self, ruta, timeout=30, error=Error):
+        super().__init__(ruta, timeout, error)
+        self.usos = 0
+
+    def close(self):
+        self.usos = max(0, self.usos - 1)
+        if self.usos == 0 and self._conexion.in_transaction:
+            self.rollback()
+
+
+_hilo = threading.local()
+_creadas = set()
+_lock = threading.Lock()
+
+
+def abrir(ruta, timeout=30, error=Error):
+    """La conexión de este hilo a `ruta` (la base se crea si no existe)"""
+    if ruta not in _creadas:
+        with _lock:
+            if ruta not in _creadas:
+                if crear_base(ruta):
+                    log.info("✅ Base SQLite creada: %s", ruta)
+                _creadas.add(ruta)
+
+    pid = os.getpid()
+    if getattr(_hilo, 'pid', None) != pid:
+        # Hilo nuevo, o proceso hijo de un fork: sus conexiones no sirven acá
+        _hilo.pid, _hilo.conexiones = pid, {}
+    conexion = _hilo.conexiones.get(ruta)
+    if conexion is None:
+        conexion = _hilo.conexiones[ruta] = ConexionDelHilo(ruta, timeout, error)
+    conexion.usos += 1
+    return conexion
+
+
+def connect(**config):
+    """mysql.connector.connect: host elige el archivo (RUTAS_POR_HOST), el resto se ignora"""
+    ruta = RUTAS_POR_HOST.get(config.get('host'), RUTA)
+    return abrir(ruta, config.get('connection_timeout') or 30)
+
+
+class MySQLConnectionPool:
+    """Cada hilo ya tiene su conexión: el "pool" solo recuerda la configuración"""
+
+    def __init__(self, pool_name=None, pool_size=5, **config):
+        self.pool_name = pool_name
+        self.pool_size = pool_size
+        self._config = config
+
+    def get_connection(self):
+        return connect(**self._config)
+
+
+pooling = SimpleNamespace(MySQLConnectionPool=MySQLConnectionPool, CNX_POOL_MAXSIZE=32)
@@ -0,0 +1,196 @@
+"""
+KINDERFIESTA - Paquetes de CSS/JS
+El CSS y JS de las páginas vive en assets/ y se compila (concatena +
+minifica) a static/css y static/js. Las plantillas los referencian con
+{{ paquete('js/salones.js') }}, que devuelve la URL con huella, así el
+navegador los cachea y el HTML solo lleva el markup dinámico.
+
+Uso en despliegue: python paquetes.py  (compila y precomprime)
+"""
+
+import os
+import re
+
+import bitacora
+import estaticos
+
+log = bitacora.obtener_logger('paquetes')
+
+CARPETA_FUENTES = 'assets'
+
+# Paquete (ruta bajo static/) -> fuentes en assets/, en orden
+PAQUETES = {
+    'css/index.css': ['css/index.css'],
+    'css/salones.css': ['css/salones.css'],
+    'css/admin_panel.css': ['css/admin_panel.css'],
+    'js/index.js': ['js/index.js'],
+    'js/salones.js': ['js/salones.js'],
+    'js/admin_panel.js': ['js/admin_panel.js'],
+}
+
+
+# ============ MINIFICACIÓN ============
+
+def minificar_css(texto):
+    """Quita comentarios y espacios sobrantes"""
+    texto = re.sub(r'/\*.*?\*/', '', texto, flags=re.S)
+    texto = re.sub(r'\s+', ' ', texto)
+    texto = re.sub(r'\s*([{};,>])\s*', r'\1', texto)
+    # Solo el espacio DESPUÉS de ':' (antes puede ser un selector: ".a :hover")
+    texto = re.sub(r':\s+', ':', texto)
+    texto = texto.replace(';}', '}')
+    return texto.strip()
+
+
+# Después de estos caracteres (o palabras) un '/' empieza una regex, no una división
+_ANTES_DE_REGEX = frozenset('(,=:[!&|?{};+-*%<>~^')
+_PALABRAS_ANTES_DE_REGEX = frozenset({'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                                      'delete', 'void', 'throw', 'instanceof', 'yield', 'await'})
+_CODIGO = (None, '{', '${')
+
+
+def _es_palabra(c):
+    return c.isalnum() or c in '_$'
+
+
+def minificar_js(texto):
+    """
+    Minificación conservadora: quita indentación, espacios al final, líneas
+    vacías y comentarios de línea completa, solo donde la línea es código.
+    Lo que está dentro de strings, template literals (que pueden ocupar
+    varias líneas), comentarios /* */ y regex queda tal cual.
+    """
+    pila = []            # contextos abiertos: "'", '"', '`', '${', '{', '/*', 'regex', 'clase'
+    ultimo, palabra = None, ''
+    lineas = []
+
+    for linea in texto.split('\n'):
+        empieza_en_codigo = (pila[-1] if pila else None) in _CODIGO
+        i, largo = 0, len(linea)
+        while i < largo:
+            c = linea[i]
+            actual = pila[-1] if pila else None
+            if actual in ("'", '"', '`', 'regex', 'clase') and c == '\\':
+                i += 2
+                continue
+            if actual == '`':
+                if c == '`':
+                    pila.pop()
+                elif c == '$' and linea.startswith('{', i + 1):
+                    pila.append('${')
+                    i += 1
+                    ultimo = '{'
+            elif actual in ("'", '"'):
+                if c == actual:
+                    pila.pop()
+            elif actual == '/*':
+                if c == '*' and linea.startswith('/', i + 1):
+                    pila.pop()
+                    i += 1
+            elif actual == 'regex':
+                if c == '[':
+                    pila.append('clase')
+                elif c == '/':
+                    pila.pop()
+                    ultimo = 'a'   # después de una regex, '/' es división
+            elif actual == 'clase':
+                if c == ']':
+                    pila.pop()
+            else:
+                if c.isspace():
+                    i += 1
+                    continue
+                if c == '/' and linea.startswith('/', i + 1):
+                    break        # comentario hasta el final de la línea
+                if c == '/' and linea.startswith('*', i + 1):
+                    pila.append('/*')
+                    i += 1
+                elif c == '/' and (ultimo is None or ultimo in _ANTES_DE_REGEX
+                                   or (_es_palabra(ultimo) and palabra in _PALABRAS_ANTES_DE_REGEX)):
+                    pila.append('regex')
+                elif c in ('\'', '"', '`'):
+                    pila.append(c)
+                elif c == '{':
+                    pila.append('{')
+                elif c == '}' and actual in ('{', '${'):
+                    pila.pop()
+                palabra = palabra + c if _es_palabra(c) else ''
+                ultimo = c
+            i += 1
+
+        termina_en_codigo = (pila[-1] if pila else None) in _CODIGO
+        if empieza_en_codigo:
+            linea = linea.lstrip()
+            if linea.startswith('//') or (not linea and termina_en_codigo):
+                continue
+        if termina_en_codigo:
+            linea = linea.rstrip()
+        lineas.append(linea)
+    return '\n'.join(lineas)
+
+
+MINIFICADORES = {
+    '.css': minificar_css,
+    '.js': minificar_js,
+}
+
+
+# ============ COMPILACIÓN ============
+
+def _ruta_fuente(fuente):
+    return os.path.join(CARPETA_FUENTES, fuente)
+
+
+def _ruta_salida(nombre):
+    return os.path.join(estaticos.CARPETA_ESTATICA, nombre)
+
+
+def _desactualizado(nombre, fuentes):
+    salida = _ruta_salida(nombre)
+    if not os.path.exists(salida):
+        return True
+    mtime = os.path.getmtime(salida)
+    return any(os.path.getmtime(_ruta_fuente(f)) > mtime for f in fuentes)
+
+
+def compilar(nombre, forzar=False):
+    """Compila un paquete si alguna fuente cambió. Devuelve True si lo reescribió."""
+    fuentes = PAQUETES[nombre]
+    if not forzar and not _desactualizado(nombre, fuentes):
+        return False
+
+    minificar = MINIFICADORES.get(os.path.splitext(nombre)[1], lambda t: t)
+    partes = []
+    for fuente in fuentes:
+        with open(_ruta_fuente(fuente), 'r', encoding='utf-8') as f:
+            partes.append(minificar(f.read()))
+
+    salida = _ruta_salida(nombre)
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    temporal = salida + '.tmp'
+    with open(temporal, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(partes))
+    os.replace(temporal, salida)
+
+    estaticos.comprimir_variantes(nombre)
+    estaticos.registrar(nombre)
+    return True
+
+
+def compilar_todos(forzar=False):
+    """Compila los paquetes desactualizados (al arrancar o en el despliegue)"""
+    compilados = [nombre for nombre in PAQUETES if compilar(nombre, forzar)]
+    if compilados:
+        estaticos.guardar_manifiesto()
+        log.info("✅ Paquetes compilados: %s", ', '.join(compilados))
+    return compilados
+
+
+def paquete(nombre):
+    """Helper de Jinja: URL con huella del paquete"""
+    return estaticos.url_estatico(nombre)
+
+
+if __name__ == "__main__":
+    bitacora.configurar('INFO')
+    compilar_todos(forzar=True)
@@ -0,0 +1,54 @@
+"""
+KINDERFIESTA - Imports diferidos
+Para dependencias pesadas que no hacen falta para arrancar:
+
+    conector = perezoso.modulo('mysql.connector')   # todavía no se cargó nada
+    conector.connect(**DB_CONFIG)                    # acá se importa de verdad
+
+El módulo queda en sys.modules desde el principio, así que un
+`import mysql.connector` posterior recibe el mismo objeto.
+
+Solo para módulos que se empiezan a usar desde un único hilo: en Python
+< 3.12 el LazyLoader no es seguro entre hilos (mientras un hilo carga el
+módulo, otro lo ve vacío: AttributeError). Si después lo usan varios
+hilos, cargar() antes de arrancarlos.
+"""
+
+import importlib.util
+import sys
+
+
+def modulo(nombre):
+    """Devuelve `nombre` sin ejecutarlo: se carga al usar el primer atributo"""
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+
+    spec = importlib.util.find_spec(nombre)
+    if spec is None:
+        raise ModuleNotFoundError(f"No se encontró el módulo {nombre}", name=nombre)
+
+    cargador = importlib.util.LazyLoader(spec.loader)
+    spec.loader = cargador
+    diferido = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = diferido
+    cargador.exec_module(diferido)
+
+    # Igual que el import normal: mysql.connector queda como atributo de mysql
+    padre, _, hijo = nombre.rpartition('.')
+    if padre:
+        setattr(sys.modules[padre], hijo, diferido)
+    return diferido
+
+
+def cargar(*modulos):
+    """Termina de cargar ya los módulos diferidos (antes de arrancar hilos)"""
+    for diferido in modulos:
+        if isinstance(diferido, importlib.util._LazyModule):
+            # Cualquier atributo dispara la carga
+            diferido.__name__
+
+
+def cargado(nombre):
+    """True si `nombre` ya se importó de verdad (no solo registrado como diferido)"""
+    actual = sys.modules.get(nombre)
+    return actual is not None and not isinstance(actual, importlib.util._LazyModule)
@@ -0,0 +1,92 @@
+"""
+KINDERFIESTA - Presupuesto de consultas por request
+Cada ruta declara cuántas consultas SQL puede hacer como máximo (con la
+caché de catalogo.py fría, o sea el peor caso). El cursor instrumentado de
+metricas.py cuenta cada execute() del request en curso y al terminar:
+- en modo desarrollo (ver consultas_lentas.modo_desarrollo) se registra un
+  warning con el detalle por función de database.py,
+- con app.testing se lanza PresupuestoExcedido y el test falla,
+- en producción no se cuenta nada.
+
+Así un N+1 (una consulta por salón dentro de un bucle) salta antes de
+llegar a producción. Si una ruta necesita más consultas a propósito, se
+sube su presupuesto acá, en el mismo commit.
+"""
+
+from collections import Counter
+from contextvars import ContextVar
+
+import bitacora
+import consultas_lentas
+
+# Regla de Flask (request.url_rule.rule) -> máximo de consultas
+PRESUPUESTOS = {
+    '/': 1,
+    '/salones': 1,
+    '/buscar': 1,
+    '/salon/<int:salon_id>': 3,   # la 3ª es la carga de horarios.py
+    '/nosotros': 1,
+    '/contacto': 1,
+    '/api/salones': 3,   # + la carga de horarios.py con ?abierto_ahora / ?abierto_en
+    '/api/salones/cerca': 3,   # + la carga del índice espacial (cercania.py)
+    '/api/autocomplete': 1,   # la carga del índice de sugerencias (autocompletar.py)
+    '/api/stats': 1,
+    '/api/testimonios': 1,
+    '/api/salon/<int:salon_id>': 2,
+    '/api/comentario': 4,   # + el rating nuevo en las sugerencias (autocompletar.py)
+    '/api/agregar-testimonio': 2,
+    '/login': 1,
+    '/registro': 2,
+    '/admin/dashboard': 2,
+    '/admin/panel': 2,
+    '/api/admin/export/salones': 1,
+    '/api/admin/export/reviews': 1,
+}
+
+# (contador por función, estricto) del request en curso; None = no se cuenta
+_request = ContextVar('presupuesto_consultas', default=None)
+
+log = bitacora.obtener_logger('presupuestos')
+
+
+class PresupuestoExcedido(AssertionError):
+    """Un request hizo más consultas que las declaradas en PRESUPUESTOS"""
+
+
+def iniciar(estricto=False):
+    """Al empezar cada request. estricto=True (tests) cuenta aunque no sea desarrollo."""
+    if estricto or consultas_lentas.modo_desarrollo():
+        _request.set((Counter(), estricto))
+    else:
+        _request.set(None)
+
+
+def contar(consulta):
+    """Desde el cursor instrumentado, en cada execute()"""
+    actual = _request.get()
+    if actual is not None:
+        actual[0][consulta] += 1
+
+
+def terminar(ruta):
+    """
+    Al terminar el request: compara con el presupuesto de `ruta`.
+    Devuelve la cantidad de consultas (None si no se estaba contando).
+    """
+    actual = _request.get()
+    if actual is None:
+        return None
+    _request.set(None)
+    consultas, estricto = actual
+    total = sum(consultas.values())
+
+    limite = PRESUPUESTOS.get(ruta)
+    if limite is None or total <= limite:
+        return total
+
+    detalle = ', '.join(f"{nombre} x{veces}" for nombre, veces in consultas.most_common())
+    mensaje = f"{ruta} hizo {total} consultas (presupuesto: {limite}): {detalle}"
+    if estricto:
+        raise PresupuestoExcedido(mensaje)
+    log.warning("⚠️ Presupuesto de consultas excedido: %s", mensaje)
+    return total
@@ -0,0 +1,157 @@
+"""
+KINDERFIESTA - Última copia buena del catálogo (para cuando MySQL no está)
+Cada lectura pública que sale bien (catálogo, estadísticas, testimonios)
+deja su resultado acá: en memoria y, cada GUARDAR_CADA segundos, en
+data/respaldo/*.json. Si después MySQL se cae (ver disyuntor.py),
+catalogo.py responde con esa copia en lugar de una lista vacía.
+
+Las respuestas armadas con una copia llevan las cabeceras
+    Warning: 110 - "Response is Stale"
+    X-KinderFiesta-Respaldo: <fecha de la copia, ISO 8601>
+(las agrega app.py / asgi.py con cabeceras()).
+
+Los archivos se reemplazan de forma atómica y se leen al arrancar, así
+un worker que arranca con MySQL caído igual tiene qué mostrar.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+import bitacora
+import metricas
+
+log = bitacora.obtener_logger('respaldo')
+
+DIRECTORIO = os.environ.get('KINDERFIESTA_RESPALDO_DIR', os.path.join('data', 'respaldo'))
+GUARDAR_CADA = int(os.environ.get('KINDERFIESTA_RESPALDO_CADA', '60'))
+# Las proyecciones de ?fields= son claves distintas: no más que esto
+MAXIMO_CLAVES = 32
+
+# clave -> (datos, guardado_en epoch, escrito_en_disco monotonic)
+_copias = {}
+_leido_disco = False
+_avisadas = set()   # claves ya servidas desde la última lectura buena (se avisa una vez)
+_lock = threading.Lock()
+
+# Fecha (epoch) de la copia más vieja usada en el request en curso
+_servido = ContextVar('respaldo_servido', default=None)
+
+
+def _archivo(clave):
+    return os.path.join(DIRECTORIO, re.sub(r'[^\w.-]', '_', clave) + '.json')
+
+
+def _leer_disco():
+    """Las copias que dejó el proceso anterior (una vez por proceso)"""
+    global _leido_disco
+    if _leido_disco:
+        return
+    _leido_disco = True
+    try:
+        nombres = os.listdir(DIRECTORIO)
+    except OSError:
+        return
+    for nombre in nombres:
+        if not nombre.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(DIRECTORIO, nombre), 'r', encoding='utf-8') as f:
+                copia = json.load(f)
+            _copias.setdefault(copia['clave'], (copia['datos'], copia['guardado'], time.monotonic()))
+        except (OSError, ValueError, KeyError) as e:
+            log.warning("⚠️ Copia de respaldo ilegible %s: %s", nombre, e)
+
+
+def _escribir(clave, datos, guardado):
+    """Escribe a un temporal y lo renombra: nunca queda un archivo a medias"""
+    try:
+        os.makedirs(DIRECTORIO, exist_ok=True)
+        destino = _archivo(clave)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'clave': clave, 'guardado': guardado, 'datos': datos}, f,
+                      ensure_ascii=False, default=str)
+        os.replace(temporal, destino)
+    except (OSError, TypeError, ValueError) as e:
+        log.error("❌ No se pudo guardar la copia de respaldo '%s': %s", clave, e)
+
+
+# ============ GUARDAR ============
+
+def guardar(clave, datos):
+    """
+    Después de una lectura exitosa. En memoria siempre; en disco como mucho
+    cada GUARDAR_CADA segundos por clave (en un hilo aparte, no en el request).
+    """
+    ahora = time.monotonic()
+    with _lock:
+        _leer_disco()
+        anterior = _copias.get(clave)
+        if anterior is None and len(_copias) >= MAXIMO_CLAVES:
+            return
+        escribir = anterior is None or ahora - anterior[2] >= GUARDAR_CADA
+        guardado = time.time()
+        _copias[clave] = (datos, guardado, ahora if escribir else anterior[2])
+        _avisadas.discard(clave)
+    if escribir:
+        threading.Thread(target=_escribir, args=(clave, datos, guardado), daemon=True,
+                         name='respaldo').start()
+
+
+# ============ SERVIR ============
+
+def claves(prefijo=''):
+    """Claves con copia (en memoria o en disco) que empiezan con `prefijo`"""
+    with _lock:
+        _leer_disco()
+        return [clave for clave in _copias if clave.startswith(prefijo)]
+
+
+def servir(clave):
+    """
+    Los datos de la última copia buena, o None si nunca hubo una.
+    Marca el request en curso como respondido con datos viejos.
+    """
+    with _lock:
+        _leer_disco()
+        copia = _copias.get(clave)
+        avisar = copia is not None and clave not in _avisadas
+        _avisadas.add(clave)
+    if copia is None:
+        return None
+    datos, guardado, _ = copia
+    marcar(guardado)
+    metricas.RESPALDO_SERVIDO.inc(clave.split(':')[0])
+    if avisar:
+        log.warning("⚠️ MySQL no disponible: sirviendo la copia '%s' del %s", clave, _fecha(guardado))
+    return datos
+
+
+# ============ MARCA EN LA RESPUESTA ============
+
+def _fecha(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec='seconds')
+
+
+def marcar(guardado):
+    """Marca el request en curso como respondido con datos del momento `guardado` (epoch)"""
+    anterior = _servido.get()
+    _servido.set(guardado if anterior is None else min(anterior, guardado))
+
+
+def iniciar():
+    """Al empezar cada request (los hilos y las tareas se reutilizan)"""
+    _servido.set(None)
+
+
+def cabeceras():
+    """[(nombre, valor)] a agregar a la respuesta ([] si no se usó ninguna copia)"""
+    guardado = _servido.get()
+    if guardado is None:
+        return []
+    return [('Warning', '110 - "Response is Stale"'), ('X-KinderFiesta-Respaldo', _fecha(guardado))]
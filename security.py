@@ -10,6 +10,10 @@ import html
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+import bitacora
+
+log = bitacora.obtener_logger('security')
+
 # ============================================
 # 1. VALIDACIÓN Y SANITIZACIÓN DE ENTRADAS
 # ============================================
@@ -238,9 +242,9 @@ def log_intento_sql_injection(ip_address, endpoint, datos):
             f.write(f"Datos: {datos}\n")
             f.write(f"{'='*80}\n")
         
-        print(f"🚨 [SECURITY] SQL Injection detectado desde {ip_address}")
+        log.warning("🚨 [SECURITY] SQL Injection detectado desde %s", ip_address)
     except Exception as e:
-        print(f"Error al escribir log: {e}")
+        log.error("Error al escribir log: %s", e)
 
 
 def log_login_fallido(ip_address, email, razon='Credenciales incorrectas'):
@@ -258,7 +262,7 @@ def log_login_fallido(ip_address, email, razon='Credenciales incorrectas'):
         with open('security_logs.txt', 'a', encoding='utf-8') as f:
             f.write(f"[{timestamp}] ❌ Login fallido - IP: {ip_address} - Email: {email} - Razón: {razon}\n")
     except Exception as e:
-        print(f"Error al escribir log: {e}")
+        log.error("Error al escribir log: %s", e)
 
 
 def log_login_exitoso(ip_address, email, tipo_usuario='usuario'):
@@ -276,7 +280,7 @@ def log_login_exitoso(ip_address, email, tipo_usuario='usuario'):
         with open('security_logs.txt', 'a', encoding='utf-8') as f:
             f.write(f"[{timestamp}] ✅ Login exitoso - IP: {ip_address} - Email: {email} - Tipo: {tipo_usuario}\n")
     except Exception as e:
-        print(f"Error al escribir log: {e}")
+        log.error("Error al escribir log: %s", e)
 
 
 # ============================================
@@ -0,0 +1,68 @@
+"""
+KINDERFIESTA - Configuración de los tests (pytest)
+La app corre con el motor SQLite (motor_sqlite.py) sobre una base sembrada
+con benchmarks/sembrado.py en un directorio temporal: no hace falta MySQL.
+
+    python -m pytest -q
+
+Las variables se fijan ANTES de importar la app: database.py elige el
+motor al importarse.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+TEMPORAL = tempfile.mkdtemp(prefix='kinderfiesta-tests-')
+RUTA_BASE = os.path.join(TEMPORAL, 'kinderfiesta.db')
+
+os.environ.update(
+    KINDERFIESTA_LOG_NIVEL='CRITICAL',
+    # Sin instantánea: las lecturas van a la base (el peor caso de PRESUPUESTOS)
+    KINDERFIESTA_INSTANTANEA='',
+    KINDERFIESTA_RESPALDO_DIR=os.path.join(TEMPORAL, 'respaldo'),
+)
+
+from benchmarks import sembrado, sqlite_mysql  # noqa: E402
+
+sqlite_mysql.usar(RUTA_BASE)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEMPORAL, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def base():
+    """La base de la escala '1k' (50 salones, 1000 reviews, 200 usuarios)"""
+    sembrado.preparar_sqlite('1k', ruta=RUTA_BASE)
+    return RUTA_BASE
+
+
+@pytest.fixture(scope='session')
+def app(base):
+    # crear_app() compila los paquetes relativos a la raíz del repo
+    os.chdir(RAIZ)
+    from app import crear_app
+    aplicacion = crear_app()
+    aplicacion.testing = True
+    return aplicacion
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin(cliente):
+    """Cliente con sesión de administrador"""
+    with cliente.session_transaction() as sesion:
+        sesion['admin_logged_in'] = True
+    return cliente
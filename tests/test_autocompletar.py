@@ -0,0 +1,92 @@
+"""
+KINDERFIESTA - Tests de las sugerencias (autocompletar.py)
+El índice actualizado de a un salón (agregar_salon / quitar_salon) tiene
+que sugerir lo mismo que uno cargado de cero con los mismos salones.
+"""
+
+import random
+
+import pytest
+
+import autocompletar
+from autocompletar import IndiceSugerencias
+from benchmarks import sembrado
+
+CONSULTAS = ('s', 'sa', 'sal', 'salon', 'v', 'vi', 'villa', 'villa a', 'villa d', 'a', 'ar', 'c', 'ce',
+             'l', 'le', 'me', 'p', 'pe', 'ri', 'se', 'b', 'bufe', 'fiestas', 'infantil', 'salon inf',
+             'salon de', 'de', 'eventos', 'arcoiris', '1', '12', 'zz')
+
+
+def _salon(azar, salon_id):
+    """(salon_id, nombre, dirección, categoría, rating, reviews) con el vocabulario del sembrado"""
+    nombre = f"Salón {azar.choice(sembrado.NOMBRES_SALON)} {salon_id}"
+    direccion = f"Calle {azar.randint(1, 200)}, {azar.choice(sembrado.ZONAS)}, El Alto"
+    reviews = azar.randint(0, 30)
+    rating = round(azar.uniform(1, 5), 1) if reviews else None
+    return salon_id, nombre, direccion, azar.choice(sembrado.CATEGORIAS), rating, reviews
+
+
+def _claves(indice, consulta, limite):
+    return [sugerencia.clave for sugerencia in indice.sugerir(consulta, limite)]
+
+
+@pytest.mark.parametrize('semilla,candidatos', [(0, 3), (1, 3), (2, 10), (3, autocompletar.CANDIDATOS)])
+def test_incremental_igual_que_cargar(semilla, candidatos):
+    azar = random.Random(semilla)
+    salones = {salon_id: _salon(azar, salon_id) for salon_id in range(1, 21)}
+    indice = IndiceSugerencias.cargar(list(salones.values()), candidatos)
+
+    for paso in range(300):
+        salon_id = azar.randint(1, 40)
+        if azar.random() < 0.6:
+            # Nuevo o reemplazo (otro nombre, zona, categoría o rating)
+            salones[salon_id] = _salon(azar, salon_id)
+            indice.agregar_salon(*salones[salon_id])
+        else:
+            salones.pop(salon_id, None)
+            indice.quitar_salon(salon_id)
+
+        if paso % 10 == 0:
+            nuevo = IndiceSugerencias.cargar(list(salones.values()), candidatos)
+            assert len(indice) == len(nuevo)
+            for consulta in CONSULTAS:
+                for limite in (1, autocompletar.LIMITE, autocompletar.LIMITE_MAXIMO):
+                    assert _claves(indice, consulta, limite) == _claves(nuevo, consulta, limite), \
+                        (paso, consulta, limite)
+
+    # Sin salones no quedan sugerencias ni nodos
+    for salon_id in list(salones):
+        indice.quitar_salon(salon_id)
+    assert len(indice) == 0
+    assert indice._raiz.hijos == {}
+
+
+def test_sin_acentos_ni_mayusculas():
+    indice = IndiceSugerencias.cargar([
+        (1, 'Salón Ñandú', 'Calle 5, Río Seco, El Alto', 'Salón infantil', 4.5, 10),
+        (2, 'Pequeño Gigante', 'Calle 9, Villa Adela, El Alto', None, 4.0, 3),
+    ])
+    def textos(consulta):
+        return [sugerencia.texto for sugerencia in indice.sugerir(consulta)]
+
+    assert sorted(textos('salon')) == ['Salón infantil', 'Salón Ñandú']
+    assert textos('SALÓN') == textos('salon') == textos('Salon')
+    assert textos('nandu') == textos('salon ñan') == ['Salón Ñandú']
+    assert textos('pequeno') == ['Pequeño Gigante']
+    assert textos('rio s') == ['Río Seco']
+
+
+def test_api_autocomplete(cliente):
+    autocompletar.invalidar()
+    respuesta = cliente.get('/api/autocomplete?q=salon&limite=5')
+    assert respuesta.status_code == 200
+    assert respuesta.headers['Cache-Control'] == autocompletar.CACHE_CONTROL
+
+    sugerencias = respuesta.get_json()
+    assert 0 < len(sugerencias) <= 5
+    for sugerencia in sugerencias:
+        assert any(p.startswith('salon') for p in autocompletar.palabras(sugerencia['texto']))
+        if sugerencia['tipo'] == 'salon':
+            assert sugerencia['url'] == f"/salon/{sugerencia['id']}"
+
+    assert cliente.get('/api/autocomplete?q=salon&limite=0').status_code == 400
@@ -0,0 +1,93 @@
+"""
+KINDERFIESTA - Tests del índice espacial (cercania.py)
+Cada búsqueda se compara con la fuerza bruta: distancia a todos los
+salones, filtro por radio y orden.
+"""
+
+import random
+
+import pytest
+
+import geo
+from cercania import IndiceGrilla
+
+CENTRO = (-16.5047, -68.1633)
+
+
+def _fuerza_bruta(salones, lat, lng, radio_km, limite):
+    distancias = sorted((geo.distancia_km(lat, lng, *punto), salon_id) for salon_id, punto in salones.items())
+    return [(salon_id, km) for km, salon_id in distancias if km <= radio_km][:limite]
+
+
+def _iguales(obtenido, esperado):
+    return [s for s, _ in obtenido] == [s for s, _ in esperado] and \
+        all(abs(a - b) < 1e-9 for (_, a), (_, b) in zip(obtenido, esperado))
+
+
+def _salones(azar, cantidad, dispersion=0.2):
+    return {i: (CENTRO[0] + azar.gauss(0, dispersion), CENTRO[1] + azar.gauss(0, dispersion))
+            for i in range(1, cantidad + 1)}
+
+
+@pytest.mark.parametrize('semilla', range(5))
+def test_igual_que_fuerza_bruta(semilla):
+    azar = random.Random(semilla)
+    salones = _salones(azar, 500)
+    indice = IndiceGrilla()
+    for salon_id, (lat, lng) in salones.items():
+        indice.agregar(salon_id, lat, lng)
+    assert len(indice) == 500
+
+    for _ in range(50):
+        lat, lng = CENTRO[0] + azar.uniform(-0.5, 0.5), CENTRO[1] + azar.uniform(-0.5, 0.5)
+        # Radios chicos (anillos) y enormes (se recorre toda la grilla)
+        radio_km = azar.choice((0.5, 2, 5, 20, 200))
+        limite = azar.choice((1, 5, 10, 50))
+        assert _iguales(indice.cercanos(lat, lng, radio_km, limite),
+                        _fuerza_bruta(salones, lat, lng, radio_km, limite))
+
+
+def test_cerca_del_polo():
+    azar = random.Random(1)
+    salones = {i: (azar.uniform(85, 89.9), azar.uniform(-180, 180)) for i in range(1, 300)}
+    indice = IndiceGrilla()
+    for salon_id, (lat, lng) in salones.items():
+        indice.agregar(salon_id, lat, lng)
+    for _ in range(20):
+        lat, lng = azar.uniform(85, 89), azar.uniform(-179, 179)
+        assert _iguales(indice.cercanos(lat, lng, 50, 10), _fuerza_bruta(salones, lat, lng, 50, 10))
+
+
+def test_agregar_y_quitar():
+    azar = random.Random(3)
+    salones = _salones(azar, 200)
+    indice = IndiceGrilla()
+    for salon_id, (lat, lng) in salones.items():
+        indice.agregar(salon_id, lat, lng)
+
+    for paso in range(300):
+        salon_id = azar.randint(1, 250)
+        if azar.random() < 0.3:
+            indice.quitar(salon_id)
+            salones.pop(salon_id, None)
+        else:
+            # Nuevo, o uno que se mueve (otra celda)
+            salones[salon_id] = (CENTRO[0] + azar.gauss(0, 0.2), CENTRO[1] + azar.gauss(0, 0.2))
+            indice.agregar(salon_id, *salones[salon_id])
+        assert len(indice) == len(salones)
+        if paso % 10 == 0:
+            lat, lng = CENTRO[0] + azar.uniform(-0.3, 0.3), CENTRO[1] + azar.uniform(-0.3, 0.3)
+            assert _iguales(indice.cercanos(lat, lng, 5, 10), _fuerza_bruta(salones, lat, lng, 5, 10))
+
+    for salon_id in list(salones):
+        indice.quitar(salon_id)
+    indice.quitar(12345)   # uno que no está: no pasa nada
+    assert len(indice) == 0
+    assert indice.cercanos(*CENTRO, 50, 10) == []
+
+
+def test_limite_cero():
+    indice = IndiceGrilla()
+    indice.agregar(1, *CENTRO)
+    assert indice.cercanos(*CENTRO, 5, 0) == []
+    assert indice.cercanos(*CENTRO, 5, 1) == [(1, 0.0)]
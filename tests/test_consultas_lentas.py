@@ -0,0 +1,102 @@
+"""
+KINDERFIESTA - Tests del log de consultas lentas (consultas_lentas.py)
+"""
+
+import json
+
+import pytest
+
+import consultas_lentas
+import database as db
+
+SQL = "SELECT id FROM salones WHERE visible = %s"
+
+
+class ConexionFalsa:
+    def __init__(self, plan):
+        self.plan = plan
+        self.ejecutadas = []
+        self.cerrada = False
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, sql, parametros=None):
+        self.ejecutadas.append(sql)
+
+    def fetchall(self):
+        return self.plan
+
+    def close(self):
+        self.cerrada = True
+
+
+class Salida(list):
+    """Las líneas que irían a logs/consultas_lentas.log"""
+
+    def warning(self, linea):
+        self.append(linea)
+
+
+@pytest.fixture
+def desarrollo(monkeypatch):
+    """Modo desarrollo, sin SQL ya explicados y con el log en una lista"""
+    salida = Salida()
+    monkeypatch.setattr(consultas_lentas, '_modo_desarrollo', True)
+    monkeypatch.setattr(consultas_lentas, '_explicados', set())
+    monkeypatch.setattr(consultas_lentas, '_salida', lambda: salida)
+    return salida
+
+
+def test_explain_por_database_conectar(desarrollo, monkeypatch):
+    monkeypatch.setattr(db, 'MOTOR', 'mysql')
+    pedidas = []
+    conexion = ConexionFalsa([{'table': 'salones', 'type': 'ALL', 'rows': 50}])
+
+    def conectar(**opciones):
+        pedidas.append(opciones)
+        return conexion
+
+    monkeypatch.setattr(db, 'conectar', conectar)
+    assert consultas_lentas.registrar('obtener_salones', SQL, (1,), 0.001)
+    assert pedidas == [{'lectura': True, 'instrumentada': False}]
+    assert conexion.ejecutadas == [f"EXPLAIN {SQL}"] and conexion.cerrada
+    assert json.loads(desarrollo[0])['escaneo_completo'] == ['salones']
+
+    # Una vez por SQL distinto
+    assert not consultas_lentas.registrar('obtener_salones', SQL, (1,), 0.001)
+    assert len(pedidas) == 1
+
+
+def test_sin_conexion_no_hay_plan(desarrollo, monkeypatch):
+    monkeypatch.setattr(db, 'conectar', lambda **opciones: None)
+    assert not consultas_lentas.registrar('obtener_salones', SQL, (1,), 0.001)
+    assert desarrollo == []
+
+
+def test_sqlite_marca_los_scan_como_escaneo_completo(desarrollo, base):
+    assert db.MOTOR == 'sqlite'
+    assert consultas_lentas.registrar(
+        'buscar_reviews', "SELECT id FROM reviews WHERE comentario = %s", ('Muy bien',), 0.001)
+    entrada = json.loads(desarrollo[0])
+    assert entrada['escaneo_completo'] == ['reviews']
+    assert entrada['explain'][0]['Extra'].startswith('SCAN reviews')
+
+    # Por índice (SEARCH): ni plan en el log ni aviso
+    assert not consultas_lentas.registrar(
+        'obtener_reviews_salon', "SELECT id FROM reviews WHERE salon_id = %s", (3,), 0.001)
+    assert len(desarrollo) == 1
+
+
+def test_plan_sqlite():
+    filas = [{'detail': d} for d in (
+        'SCAN s', 'SCAN TABLE s', 'SCAN r USING COVERING INDEX reviews_idx_salon',
+        'SEARCH r USING INDEX reviews_idx_salon (salon_id=?)',
+        'SEARCH s USING INTEGER PRIMARY KEY (rowid=?)',
+        'USE TEMP B-TREE FOR ORDER BY', 'SCAN CONSTANT ROW')]
+    plan = consultas_lentas.plan_sqlite(filas)
+    assert [(f['table'], f['type'], f['key']) for f in plan] == [
+        ('s', 'ALL', None), ('s', 'ALL', None), ('r', 'index', 'reviews_idx_salon'),
+        ('r', 'ref', 'reviews_idx_salon'), ('s', 'ref', 'PRIMARY'),
+        (None, None, None), (None, None, None)]
+    assert consultas_lentas.escaneos_completos(plan) == ['s', 's']
@@ -0,0 +1,45 @@
+"""
+KINDERFIESTA - Tests del disyuntor de la conexión (disyuntor.py)
+"""
+
+import pytest
+
+import database as db
+import disyuntor
+
+
+@pytest.fixture
+def mysql(monkeypatch, base):
+    """Un disyuntor nuevo que se abre al primer fallo y prueba enseguida"""
+    nuevo = disyuntor.Disyuntor('MySQL', fallos_para_abrir=1, espera=0)
+    monkeypatch.setattr(disyuntor, 'mysql', nuevo)
+    return nuevo
+
+
+def test_una_prueba_que_lanza_otra_excepcion_no_traba_el_disyuntor(mysql, monkeypatch):
+    def roto(**config):
+        raise RuntimeError('driver roto')
+
+    conectar = db.conector.connect
+    monkeypatch.setattr(db.conector, 'connect', roto)
+    with pytest.raises(RuntimeError):
+        db.conectar()
+    assert mysql.estado() == disyuntor.SEMIABIERTO   # abierto, espera cumplida
+
+    # La prueba también lanza: cuenta como fallida y la siguiente puede probar
+    with pytest.raises(RuntimeError):
+        db.conectar()
+    assert mysql.permitir()
+    mysql.fallo()
+
+    monkeypatch.setattr(db.conector, 'connect', conectar)
+    conn = db.conectar()
+    assert conn is not None
+    conn.close()
+    assert mysql.estado() == disyuntor.CERRADO
+
+
+def test_estadisticas_con_el_disyuntor_abierto(mysql):
+    mysql.espera = 60
+    mysql.fallo()
+    assert db.obtener_estadisticas() == db.ESTADISTICAS_POR_DEFECTO
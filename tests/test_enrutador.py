@@ -0,0 +1,83 @@
+"""
+KINDERFIESTA - Tests de lecturas a réplicas (enrutador.py)
+Dos archivos SQLite: la base de los tests como primaria y una copia como
+réplica (motor_sqlite.RUTAS_POR_HOST), con el salón 3 renombrado en la
+copia para saber de dónde vino cada lectura.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+import database as db
+import enrutador
+import motor_sqlite
+
+NOMBRE_EN_REPLICA = 'Salón de la réplica'
+
+
+@pytest.fixture
+def replica(base, tmp_path, monkeypatch):
+    ruta = str(tmp_path / 'replica.db')
+    with sqlite3.connect(base) as origen, sqlite3.connect(ruta) as copia:
+        origen.backup(copia)
+        copia.execute("UPDATE salones SET name = ? WHERE id = 3", (NOMBRE_EN_REPLICA,))
+
+    monkeypatch.setitem(motor_sqlite.RUTAS_POR_HOST, 'replica1', ruta)
+    monkeypatch.setenv('KINDERFIESTA_DB_REPLICAS', 'replica1')
+    monkeypatch.setattr(enrutador, 'CHEQUEO', 0)   # medir el retraso en cada conexión
+    monkeypatch.setattr(enrutador, '_escritura_local', None)
+    enrutador.configurar(db.DB_CONFIG, db.conector)
+    enrutador.iniciar(None)
+    yield ruta
+
+    monkeypatch.delenv('KINDERFIESTA_DB_REPLICAS')
+    enrutador.configurar(db.DB_CONFIG, db.conector)
+
+
+def _nombre():
+    return db.obtener_salon_por_id(3).name
+
+
+def test_las_lecturas_van_a_la_replica(replica):
+    assert _nombre() == NOMBRE_EN_REPLICA
+
+
+@pytest.mark.parametrize('segundos', ['10', 'NULL'])
+def test_replica_atrasada_o_cortada_lee_de_la_primaria(replica, monkeypatch, segundos):
+    monkeypatch.setattr(enrutador, 'SQL_RETRASO', f"SELECT {segundos} AS Seconds_Behind_Source")
+    assert _nombre() != NOMBRE_EN_REPLICA
+
+    monkeypatch.setattr(enrutador, 'SQL_RETRASO', 'SHOW REPLICA STATUS')
+    assert _nombre() == NOMBRE_EN_REPLICA
+
+
+def test_despues_de_escribir_lee_de_la_primaria(replica):
+    review, _ = db.agregar_review(3, 'Ana', 'Lo escrito se lee enseguida', 5)
+    assert any(r.id == review['id'] for r in db.obtener_reviews_salon(3))
+    assert _nombre() != NOMBRE_EN_REPLICA
+    valor, _ = enrutador.cookie()
+
+    # Otro request del mismo usuario (con la cookie), aunque lo atienda otro worker
+    enrutador._escritura_local = None
+    enrutador.iniciar(valor)
+    assert _nombre() != NOMBRE_EN_REPLICA
+
+    # Sin la cookie, en un worker que no escribió: la réplica
+    enrutador.iniciar(None)
+    assert _nombre() == NOMBRE_EN_REPLICA
+
+
+def test_la_cookie_no_fija_la_primaria_mas_alla_de_pegado(replica):
+    enrutador.iniciar(str(time.time() + 10 ** 9))
+    assert enrutador._pegado_hasta.get() <= time.time() + enrutador.PEGADO
+    enrutador.iniciar('basura')
+    assert _nombre() == NOMBRE_EN_REPLICA
+
+
+def test_comentar_manda_la_cookie(replica, cliente):
+    respuesta = cliente.post('/api/comentario', json={
+        'salon_id': 3, 'nombre': 'Beto', 'comentario': 'Muy bien', 'rating': 4})
+    assert respuesta.status_code == 200
+    assert enrutador.COOKIE in respuesta.headers.get('Set-Cookie', '')
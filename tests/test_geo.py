@@ -0,0 +1,80 @@
+"""
+KINDERFIESTA - Tests de plus codes y coordenadas (geo.py)
+"""
+
+import random
+
+import pytest
+
+import geo
+
+
+def _cerca(punto, esperado, tolerancia=1e-7):
+    return abs(punto[0] - esperado[0]) < tolerancia and abs(punto[1] - esperado[1]) < tolerancia
+
+
+@pytest.mark.parametrize('codigo, esperado', [
+    ('849VCWC8+R9', (37.4220625, -122.0840625)),     # Googleplex
+    ('8FVC9G8F+6X', (47.3655625, 8.5249375)),        # Zúrich
+    ('8fvc9g8f+6x', (47.3655625, 8.5249375)),        # minúsculas
+    ('8FVC9G8F+6XQ', (47.3655875, 8.524984375)),     # 11 dígitos: la grilla de 5x4
+    ('8FVC0000+', (47.5, 8.5)),                      # con relleno: la celda de 1°
+])
+def test_codigos_completos(codigo, esperado):
+    assert _cerca(geo.decodificar_plus_code(codigo), esperado)
+
+
+def test_codigo_corto_con_referencia():
+    assert _cerca(geo.decodificar_plus_code('CWC8+R9', referencia=(37.4, -122.1)),
+                  (37.4220625, -122.0840625))
+
+
+@pytest.mark.parametrize('codigo', [
+    '', 'FR88', 'FR88+6', 'FR88+66+', 'FR8+66', 'FR88+6Z', '8FVC0000+12', '8F0C0000+',
+    'X2222222+22',   # latitud fuera de rango
+    'C000+',         # un código corto no lleva relleno
+])
+def test_codigos_invalidos(codigo):
+    assert geo.decodificar_plus_code(codigo) is None
+
+
+def _completo(lat, lng):
+    digitos = geo._codificar(lat, lng, 10)
+    return digitos[:8] + '+' + digitos[8:]
+
+
+def test_codificar_y_decodificar():
+    azar = random.Random(7)
+    for _ in range(200):
+        lat, lng = azar.uniform(-89, 89), azar.uniform(-179, 179)
+        punto = geo.decodificar_plus_code(_completo(lat, lng))
+        # El centro de una celda de 0.000125°
+        assert abs(punto[0] - lat) <= 0.0000625 + 1e-9 and abs(punto[1] - lng) <= 0.0000625 + 1e-9
+
+
+@pytest.mark.parametrize('largo_corto', [4, 6])
+def test_codigos_cortos_del_otro_lado_del_borde(largo_corto):
+    """La referencia cae en otra celda que el punto: hay que corregir el prefijo"""
+    azar = random.Random(largo_corto)
+    quitar = 10 - largo_corto
+    resolucion = geo.RESOLUCIONES[quitar // 2 - 1]
+    for _ in range(100):
+        lat, lng = azar.uniform(-60, 60), azar.uniform(-170, 170)
+        completo = _completo(lat, lng)
+        # Referencia a menos de media celda del prefijo quitado, en cualquier dirección
+        referencia = (lat + azar.uniform(-0.45, 0.45) * resolucion, lng + azar.uniform(-0.45, 0.45) * resolucion)
+        corto = completo[quitar:]
+        assert _cerca(geo.decodificar_plus_code(corto, referencia), geo.decodificar_plus_code(completo))
+
+
+def test_coordenadas_de_un_salon():
+    assert geo.coordenadas('FR88+66 El Alto') == (-16.534438, -68.184438)
+    assert geo.coordenadas(None, 'https://maps.google.com/?q=-16.5,-68.16') == (-16.5, -68.16)
+    assert geo.coordenadas(None, 'https://www.google.com/maps/@-16.51,-68.17,17z') == (-16.51, -68.17)
+    assert geo.coordenadas('sin código', 'https://maps.google.com/?q=999,0') == (None, None)
+
+
+def test_distancia():
+    assert geo.distancia_km(0, 0, 0, 0) == 0
+    # Un grado de meridiano: ~111.2 km
+    assert abs(geo.distancia_km(0, 0, 1, 0) - 111.195) < 0.01
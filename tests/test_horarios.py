@@ -0,0 +1,176 @@
+"""
+KINDERFIESTA - Tests de los horarios precalculados (horarios.py)
+"""
+
+import sqlite3
+
+import pytest
+
+import catalogo
+import horarios
+from horarios import DIAS, FRANJAS_DIA, FRANJAS_SEMANA, Semanas, franja, semana
+
+
+def _fila(dia, apertura, cierre, cerrado=False):
+    return {'dia': dia, 'hora_apertura': apertura, 'hora_cierre': cierre, 'cerrado': cerrado}
+
+
+def _franjas(bits):
+    return [i for i in range(FRANJAS_SEMANA) if bits >> i & 1]
+
+
+# ============ semana() ============
+
+def test_un_dia():
+    bits, textos = semana([_fila('lunes', '09:00:00', '17:00:00')])
+    assert _franjas(bits) == list(range(36, 68))   # 09:00 a 16:45
+    assert textos == {'lunes': '09:00 - 17:00'}
+
+
+def test_franjas_parciales_cuentan_como_abiertas():
+    bits, _ = semana([_fila('martes', '09:10', '17:05')])
+    inicio = FRANJAS_DIA
+    assert _franjas(bits) == list(range(inicio + 36, inicio + 69))   # 09:00 a 17:00
+
+
+def test_cierra_despues_de_medianoche():
+    bits, textos = semana([_fila('sábado', '20:00', '02:00')])
+    assert _franjas(bits) == list(range(franja(5, 20 * 60), franja(6, 2 * 60)))
+    assert textos == {'sábado': '20:00 - 02:00'}
+
+
+def test_domingo_a_la_noche_sigue_el_lunes():
+    bits, _ = semana([_fila('domingo', '22:00', '03:00')])
+    assert _franjas(bits) == list(range(12)) + list(range(franja(6, 22 * 60), FRANJAS_SEMANA))
+
+
+def test_cerrados_sin_horario_y_dias_desconocidos():
+    bits, textos = semana([
+        _fila('lunes', None, None, cerrado=True),
+        _fila('martes', None, None),
+        _fila('feriado', '09:00', '12:00'),
+        _fila('jueves', '10:00', '11:00'),
+    ])
+    assert _franjas(bits) == list(range(franja(3, 600), franja(3, 660)))
+    assert textos == {'lunes': 'Cerrado', 'jueves': '10:00 - 11:00'}
+
+
+def test_todo_el_dia_y_los_tipos_de_mysql():
+    from datetime import time, timedelta
+    bits, textos = semana([_fila('miércoles', timedelta(hours=8), timedelta(hours=8)),
+                           _fila('jueves', time(8, 0), time(9, 30))])
+    # Apertura == cierre: las 24 horas
+    assert _franjas(bits) == list(range(franja(2, 480), franja(3, 570)))
+    assert textos == {'miércoles': '08:00 - 08:00', 'jueves': '08:00 - 09:30'}
+
+
+def test_semanas_por_franja():
+    semanas = Semanas.desde_filas([
+        {'salon_id': 1, **_fila('lunes', '09:00', '10:00')},
+        {'salon_id': 2, **_fila('lunes', '09:30', '11:00')},
+    ])
+    assert semanas.por_franja[franja(0, 9 * 60)] == {1}
+    assert semanas.por_franja[franja(0, 9 * 60 + 45)] == {1, 2}
+    assert semanas.por_franja[franja(0, 10 * 60)] == {2}
+
+    semanas.poner(1, [_fila('martes', '09:00', '10:00')])
+    assert semanas.por_franja[franja(0, 9 * 60)] == set()
+    assert semanas.por_franja[franja(1, 9 * 60)] == {1}
+    semanas.quitar(2)
+    assert not any(2 in abiertos for abiertos in semanas.por_franja)
+    assert set(semanas.bits) == {1}
+
+
+# ============ parsear_momento() ============
+
+@pytest.mark.parametrize('valor, esperado', [
+    ('sábado,15:00', franja(5, 900)),
+    ('sabado,15', franja(5, 900)),
+    ('Sábado 15:30', franja(5, 930)),
+    ('SABADO,15:44', franja(5, 930)),
+    ('lunes,00:00', 0),
+    ('domingo,23:59', FRANJAS_SEMANA - 1),
+    ('Miércoles,7:05', franja(2, 420)),
+])
+def test_parsear_momento(valor, esperado):
+    assert horarios.parsear_momento(valor) == esperado
+
+
+@pytest.mark.parametrize('valor', ['sábado', 'sábado,15:00,extra', 'feriado,15:00', 'sábado,24:00',
+                                   'sábado,15:60', 'sábado,quince', ''])
+def test_parsear_momento_invalido(valor):
+    with pytest.raises(ValueError):
+        horarios.parsear_momento(valor)
+
+
+# ============ /api/salones?abierto_en= ============
+
+HORARIOS_NOCTURNOS = [('lunes', None, None, 1), ('sábado', '20:00:00', '02:00:00', 0),
+                      ('domingo', '22:00:00', '03:00:00', 0)]
+
+
+@pytest.fixture
+def salon_nocturno(base):
+    """El salón 2 abre hasta la madrugada el sábado y el domingo (y cierra el lunes)"""
+    with sqlite3.connect(base) as conexion:
+        anteriores = conexion.execute(
+            "SELECT dia, hora_apertura, hora_cierre, cerrado FROM horarios WHERE salon_id = 2").fetchall()
+        conexion.execute("DELETE FROM horarios WHERE salon_id = 2")
+        conexion.executemany("INSERT INTO horarios (salon_id, dia, hora_apertura, hora_cierre, cerrado) "
+                             "VALUES (2, ?, ?, ?, ?)", HORARIOS_NOCTURNOS)
+    horarios.invalidar()
+    catalogo.invalidar()
+    yield 2
+    with sqlite3.connect(base) as conexion:
+        conexion.execute("DELETE FROM horarios WHERE salon_id = 2")
+        conexion.executemany("INSERT INTO horarios (salon_id, dia, hora_apertura, hora_cierre, cerrado) "
+                             "VALUES (2, ?, ?, ?, ?)", anteriores)
+    horarios.invalidar()
+    catalogo.invalidar()
+
+
+def _abiertos_segun_la_base(base, dia, minutos):
+    """Fuerza bruta: salones visibles con algún tramo que se superpone con la franja pedida"""
+    inicio = dia * 24 * 60 + minutos // 15 * 15
+    semana_minutos = 7 * 24 * 60
+    abiertos = set()
+    with sqlite3.connect(base) as conexion:
+        filas = conexion.execute(
+            "SELECT h.salon_id, h.dia, h.hora_apertura, h.hora_cierre FROM horarios h "
+            "JOIN salones s ON s.id = h.salon_id WHERE s.visible AND NOT h.cerrado").fetchall()
+    for salon_id, nombre_dia, apertura, cierre in filas:
+        desde = DIAS.index(nombre_dia) * 24 * 60 + horarios._minutos(apertura)
+        hasta = DIAS.index(nombre_dia) * 24 * 60 + horarios._minutos(cierre)
+        if hasta <= desde:
+            hasta += 24 * 60
+        # El tramo del domingo que pasa al lunes también se mira una semana antes
+        for corrimiento in (0, -semana_minutos):
+            if desde + corrimiento < inicio + 15 and hasta + corrimiento > inicio:
+                abiertos.add(salon_id)
+    return abiertos
+
+
+@pytest.mark.parametrize('dia, hora', [(5, '15:00'), (2, '09:30'), (6, '01:00'), (0, '02:45'),
+                                       (0, '03:00'), (6, '21:50'), (3, '17:59')])
+def test_api_abierto_en(cliente, base, salon_nocturno, dia, hora):
+    respuesta = cliente.get(f'/api/salones?fields=id&abierto_en={DIAS[dia]},{hora}')
+    assert respuesta.status_code == 200
+    ids = {salon['id'] for salon in respuesta.get_json()}
+    assert ids == _abiertos_segun_la_base(base, dia, horarios.parsear_hora(hora))
+
+
+def test_api_abierto_en_la_madrugada(cliente, salon_nocturno):
+    def abierto(momento):
+        salones = cliente.get(f'/api/salones?fields=id&abierto_en={momento}').get_json()
+        return salon_nocturno in {salon['id'] for salon in salones}
+
+    assert abierto('domingo,01:00')      # del sábado
+    assert abierto('lunes,02:45')        # del domingo
+    assert not abierto('lunes,03:00')
+    assert not abierto('sábado,19:45')
+
+
+def test_api_abierto_en_invalido(cliente):
+    respuesta = cliente.get('/api/salones?abierto_en=feriado,15:00')
+    assert respuesta.status_code == 400
+    assert 'Día desconocido' in respuesta.get_json()['error']
@@ -0,0 +1,104 @@
+"""
+KINDERFIESTA - Tests de la importación masiva (importacion.py)
+"""
+
+import io
+
+import pytest
+
+import catalogo
+import importacion
+
+COLUMNAS = 'nombre,telefono,direccion,zona,sábado\n'
+
+
+def _csv(filas, prefijo):
+    """`filas` salones válidos, con teléfonos y direcciones que no están en la base"""
+    lineas = [f"Salón Importado {prefijo}-{i},{prefijo}{i:04d},Calle Importada {prefijo} {i},FR88+66,10:00-20:00\n"
+              for i in range(filas)]
+    return (COLUMNAS + ''.join(lineas)).encode('utf-8')
+
+
+def _importar(datos, formato='csv', **opciones):
+    return importacion.importar(io.BytesIO(datos), formato, **opciones)
+
+
+@pytest.fixture
+def admin_importar(admin):
+    def importar(datos, nombre='socios.csv'):
+        return admin.post('/api/admin/importar', data={'archivo': (io.BytesIO(datos), nombre)},
+                          content_type='multipart/form-data')
+    return importar
+
+
+def test_importa_y_detecta_duplicados(base):
+    datos = _csv(5, 6100) + 'Repetido,61000003,Otra calle 1,,\nOtro,61009999,calle importada 6100 4,,\n'.encode()
+    reporte = _importar(datos)
+    assert (reporte['filas'], reporte['validas'], reporte['insertados'], reporte['duplicados']) == (7, 5, 5, 2)
+    assert [e['fila'] for e in reporte['errores']] == [7, 8]
+    assert 'fila 5' in reporte['errores'][0]['errores'][0]
+    # Ahora ya están en la base
+    assert _importar(_csv(5, 6100))['duplicados'] == 5
+
+
+def test_byte_ilegible_a_mitad_del_archivo(base, cliente):
+    datos = bytearray(_csv(600, 6200))
+    # Un byte que no es UTF-8 cerca de la fila 571
+    datos[datos.index(b'Importado 6200-570,')] = 0xFF
+    reporte = _importar(bytes(datos), lote=200)
+
+    ilegible = reporte['errores'][-1]
+    assert 'no se leyó el resto' in ilegible['errores'][0]
+    assert reporte['insertados'] == reporte['validas'] == len(reporte['salon_ids']) > 200
+    assert reporte['filas'] == reporte['validas'] + 1
+    assert ilegible['fila'] <= 572
+    # Lo que se guardó ya se ve (el catálogo se invalidó)
+    assert cliente.get(f"/api/salon/{reporte['salon_ids'][-1]}").status_code == 200
+
+
+def test_ndjson_ilegible_a_mitad_del_archivo(base):
+    lineas = [f'{{"nombre": "Salón NDJSON {i}", "telefono": "6300{i:04d}", "direccion": "Calle NDJSON {i}"}}\n'
+              for i in range(1000)]
+    datos = bytearray(''.join(lineas).encode('utf-8'))
+    datos[datos.index(b'NDJSON 900"')] = 0xFF
+    reporte = _importar(bytes(datos), 'ndjson')
+    assert 'no se leyó el resto' in reporte['errores'][-1]['errores'][0]
+    assert reporte['insertados'] == reporte['validas'] > 0
+
+
+def test_lote_que_falla_no_deja_duplicados_fantasma(base, monkeypatch):
+    insertar = importacion.db.insertar_salones_lote
+    llamadas = []
+
+    def falla_el_primero(salones):
+        llamadas.append(len(salones))
+        return None if len(llamadas) == 1 else insertar(salones)
+
+    monkeypatch.setattr(importacion.db, 'insertar_salones_lote', falla_el_primero)
+    # La fila 3 repite el teléfono de la 2, que no se pudo guardar
+    datos = COLUMNAS.encode() + 'Primero,64000001,Calle Fantasma 1,,\nSegundo,64000001,Calle Fantasma 2,,\n'.encode()
+    reporte = _importar(datos, lote=1)
+    assert reporte['duplicados'] == 0
+    assert reporte['insertados'] == 1
+    assert reporte['errores'][0]['fila'] == 2 and 'no se pudo guardar' in reporte['errores'][0]['errores'][0]
+
+
+def test_cabecera_ilegible_es_400(admin_importar):
+    respuesta = admin_importar(COLUMNAS.encode() + b'Sal\xf3n,65000001,Calle 1,,\n')
+    assert respuesta.status_code == 400
+    assert 'CSV ilegible' in respuesta.get_json()['message']
+
+
+def test_reporte_por_http(admin_importar):
+    respuesta = admin_importar(_csv(3, 6600) + b'Sin telefono,,Calle 9,,\n')
+    reporte = respuesta.get_json()
+    assert respuesta.status_code == 200 and reporte['success']
+    assert reporte['insertados'] == 3
+    assert reporte['errores'] == [{'fila': 5, 'nombre': 'Sin telefono', 'errores': ['telefono: obligatorio']}]
+    visibles = {salon['id'] for salon in catalogo.listar_salones(['id'])}
+    assert set(reporte['salon_ids']) <= visibles
+
+
+def test_columnas_faltantes():
+    with pytest.raises(importacion.ArchivoInvalido, match='Faltan columnas: telefono'):
+        _importar(b'nombre,direccion\nA,B\n')
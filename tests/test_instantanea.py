@@ -0,0 +1,133 @@
+"""
+KINDERFIESTA - Tests del formato binario de la instantánea (instantanea.py)
+serializar() -> archivo -> Instantanea: lo que se lee tiene que ser lo
+mismo que se escribió, NULL incluidos.
+"""
+
+import struct
+
+import pytest
+
+import database as db
+import horarios
+import instantanea
+from instantanea import Instantanea, serializar
+
+
+def _salon(salon_id, **valores):
+    fila = {columna: None for columna in db.COLUMNAS_SALON}
+    fila.update(id=salon_id, visible=1, **valores)
+    return fila
+
+
+# En el orden del catálogo (no el de los ids): el índice tiene que ordenarlos
+SALONES = [
+    _salon(10, name='Salón Ñandú 🎈', phone='71234567', address='Av. 6 de Marzo, Ciudad Satélite',
+           category='Salón infantil', rating=4.8, lat=-16.534438, lng=-68.184438,
+           locationCode='FR88+66 El Alto', folder='salon_10', fotos='["a.jpg", "b.jpg"]'),
+    # rating, coordenadas y casi todos los textos NULL
+    _salon(3, name='Pequeño Gigante'),
+    _salon(7, name='Angelito', phone='', whatsapp='79999999', rating=3.0, lat=0.0, lng=0.0,
+           google_maps='https://maps.google.com/?q=-16.5,-68.16', category='Salón infantil'),
+]
+REVIEWS = {
+    10: [{'id': 1, 'nombre': 'María', 'comentario': 'Los niños se divirtieron mucho ¡gracias!', 'rating': 5,
+          'fecha': '2025-01-01T10:00:00'},
+         {'id': 2, 'nombre': 'Juan', 'comentario': 'Los niños se divirtieron mucho ¡gracias!', 'rating': 4,
+          'fecha': None}],
+    7: [{'id': 3, 'nombre': 'Ana', 'comentario': '', 'rating': 1, 'fecha': '2024-12-31T23:59:59'}],
+}
+HORARIOS = {
+    10: [{'dia': 'sábado', 'hora_apertura': '20:00', 'hora_cierre': '02:00', 'cerrado': 0},
+         {'dia': 'lunes', 'hora_apertura': None, 'hora_cierre': None, 'cerrado': 1}],
+    7: [{'dia': 'miércoles', 'hora_apertura': '09:10', 'hora_cierre': '17:05', 'cerrado': 0}],
+}
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    ruta = tmp_path / 'catalogo.bin'
+    ruta.write_bytes(serializar(SALONES, REVIEWS, HORARIOS, generacion=42, creada=1700000000.5))
+    return ruta
+
+
+@pytest.fixture
+def foto(archivo):
+    return Instantanea(str(archivo))
+
+
+def test_cabecera(foto):
+    assert (foto.generacion, foto.creada, len(foto), foto.cantidad_reviews) == (42, 1700000000.5, 3, 3)
+
+
+def test_salones_ida_y_vuelta(foto):
+    filas, reviews = foto.salones(db.COLUMNAS_SALON, con_reviews=True)
+    assert filas == SALONES
+    assert reviews == REVIEWS
+
+
+def test_columnas_pedidas(foto):
+    filas, reviews = foto.salones(['name', 'rating', 'no_existe'])
+    assert filas == [{'id': 10, 'name': 'Salón Ñandú 🎈', 'rating': 4.8},
+                     {'id': 3, 'name': 'Pequeño Gigante', 'rating': None},
+                     {'id': 7, 'name': 'Angelito', 'rating': 3.0}]
+    assert reviews == {}
+
+
+def test_posicion(foto):
+    assert [foto.posicion(salon_id) for salon_id in (10, 3, 7)] == [0, 1, 2]
+    assert [foto.posicion(salon_id) for salon_id in (1, 5, 8, 11, 10 ** 6)] == [None] * 5
+
+
+def test_abierto_igual_que_horarios(foto):
+    for posicion, salon in enumerate(SALONES):
+        bits, _ = horarios.semana(HORARIOS.get(salon['id'], []))
+        for franja in range(horarios.FRANJAS_SEMANA):
+            assert foto.abierto(posicion, franja) == bool(bits >> franja & 1), (salon['id'], franja)
+    # Las franjas dan la vuelta a la semana
+    assert foto.abierto(0, horarios.franja(6, 60) + horarios.FRANJAS_SEMANA)
+
+
+def test_filtros_por_ids_y_franja(foto):
+    filas, _ = foto.salones(['id'], ids=[7, 3, 99])
+    assert filas == [{'id': 3}, {'id': 7}]
+    filas, _ = foto.salones(['id'], franja=horarios.parsear_momento('domingo,01:30'))
+    assert filas == [{'id': 10}]
+    filas, _ = foto.salones(['id'], franja=horarios.parsear_momento('miércoles,17:00'))
+    assert filas == [{'id': 7}]
+
+
+def test_textos_coordenadas_y_sugerencias(foto):
+    assert foto.textos_horarios(10) == {'lunes': 'Cerrado', 'sábado': '20:00 - 02:00'}
+    assert foto.textos_horarios(3) == {}
+    assert foto.textos_horarios(99) == {}
+    assert foto.coordenadas() == [(10, -16.534438, -68.184438), (7, 0.0, 0.0)]
+    assert foto.sugerencias() == [
+        (10, 'Salón Ñandú 🎈', 'Av. 6 de Marzo, Ciudad Satélite', 'Salón infantil', 4.8, 2),
+        (3, 'Pequeño Gigante', None, None, None, 0),
+        (7, 'Angelito', None, 'Salón infantil', 3.0, 1),
+    ]
+
+
+def test_textos_repetidos_se_guardan_una_vez():
+    una = serializar([_salon(1, name='Merlín')], {}, {}, generacion=1)
+    dos = serializar([_salon(1, name='Merlín'), _salon(2, name='Merlín')], {}, {}, generacion=1)
+    assert len(dos) - len(una) == instantanea.TAMANO_SALON + instantanea.INDICE.size
+
+
+def test_catalogo_vacio(tmp_path):
+    ruta = tmp_path / 'vacio.bin'
+    ruta.write_bytes(serializar([], {}, {}, generacion=1))
+    foto = Instantanea(str(ruta))
+    assert len(foto) == 0
+    assert foto.salones(['id']) == ([], {})
+    assert foto.posicion(1) is None
+
+
+@pytest.mark.parametrize('magic, formato', [(b'XXXX', instantanea.FORMATO), (instantanea.MAGIC, 99)])
+def test_archivo_de_otro_formato(archivo, magic, formato):
+    datos = bytearray(archivo.read_bytes())
+    struct.pack_into('<4sH', datos, 0, magic, formato)
+    archivo.write_bytes(bytes(datos))
+    with pytest.raises(ValueError):
+        Instantanea(str(archivo))
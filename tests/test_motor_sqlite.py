@@ -0,0 +1,42 @@
+"""
+KINDERFIESTA - Tests del motor SQLite (motor_sqlite.py)
+database.py solo atrapa conector.Error: ningún sqlite3.Error tiene que
+escaparse sin envolver.
+"""
+
+import sqlite3
+
+import pytest
+
+import motor_sqlite
+
+
+def test_base_que_no_se_puede_abrir(tmp_path):
+    (tmp_path / 'archivo').write_text('no soy un directorio')
+    for ruta in (tmp_path, tmp_path / 'archivo' / 'kf.db'):
+        with pytest.raises(motor_sqlite.Error, match=str(ruta)):
+            motor_sqlite.abrir(str(ruta))
+
+
+def test_error_en_el_commit(tmp_path):
+    ruta = str(tmp_path / 'kf.db')
+    motor_sqlite.crear_base(ruta)
+    conexion = motor_sqlite.Conexion(ruta)
+    cursor = conexion.cursor()
+    # La clave foránea se verifica recién en el commit
+    cursor.execute('PRAGMA defer_foreign_keys=ON')
+    cursor.execute("INSERT INTO reviews (salon_id, nombre, comentario, rating) VALUES (%s, %s, %s, %s)",
+                   (999999, 'Ana', 'Salón que no existe', 5))
+    with pytest.raises(motor_sqlite.Error, match='FOREIGN KEY') as error:
+        conexion.commit()
+    assert isinstance(error.value.__cause__, sqlite3.IntegrityError)
+    conexion.rollback()
+    conexion.close()
+
+
+def test_error_en_una_consulta(tmp_path):
+    conexion = motor_sqlite.abrir(str(tmp_path / 'kf.db'))
+    cursor = conexion.cursor(dictionary=True)
+    with pytest.raises(motor_sqlite.Error, match='no such table'):
+        cursor.execute("SELECT * FROM tabla_que_no_existe")
+    conexion.close()
@@ -0,0 +1,37 @@
+"""
+KINDERFIESTA - Tests de las páginas públicas (app.py)
+"""
+
+import sqlite3
+
+import pytest
+
+import catalogo
+
+
+@pytest.fixture
+def salon_oculto(base):
+    with sqlite3.connect(base) as conexion:
+        conexion.execute("UPDATE salones SET visible = 0 WHERE id = 1")
+    catalogo.invalidar()
+    yield 1
+    with sqlite3.connect(base) as conexion:
+        conexion.execute("UPDATE salones SET visible = 1 WHERE id = 1")
+    catalogo.invalidar()
+
+
+def test_detalle_de_un_salon(cliente):
+    assert cliente.get('/salon/2').status_code == 200
+
+
+@pytest.mark.parametrize('url', ['/salon/99999', '/buscar?q='])
+def test_redirige_a_salones(cliente, url):
+    respuesta = cliente.get(url)
+    assert respuesta.status_code == 302
+    assert respuesta.headers['Location'].endswith('/salones')
+
+
+def test_salon_oculto_redirige_a_salones(cliente, salon_oculto):
+    respuesta = cliente.get(f'/salon/{salon_oculto}')
+    assert respuesta.status_code == 302
+    assert respuesta.headers['Location'].endswith('/salones')
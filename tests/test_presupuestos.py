@@ -0,0 +1,108 @@
+"""
+KINDERFIESTA - Tests de los presupuestos de consultas (presupuesto_consultas.py)
+Cada ruta de PRESUPUESTOS, con la caché del catálogo fría y sin
+instantánea, hace a lo sumo las consultas declaradas; con app.testing
+una ruta que se pasa hace fallar el request.
+"""
+
+import sqlite3
+
+import pytest
+
+import catalogo
+import presupuesto_consultas
+from benchmarks import sembrado
+from presupuesto_consultas import PRESUPUESTOS, PresupuestoExcedido
+
+# Regla de Flask -> (método, URL, argumentos del cliente, sesión: None, 'usuario' o 'admin')
+REQUESTS = {
+    '/': ('get', '/', {}, None),
+    '/salones': ('get', '/salones', {}, None),
+    '/buscar': ('get', '/buscar?q=villa', {}, None),
+    '/salon/<int:salon_id>': ('get', '/salon/3', {}, None),
+    '/nosotros': ('get', '/nosotros', {}, None),
+    '/contacto': ('get', '/contacto', {}, None),
+    '/api/salones': ('get', '/api/salones?abierto_ahora=1', {}, None),
+    '/api/salones/cerca': ('get', '/api/salones/cerca?lat=-16.5&lng=-68.16&radio=50', {}, None),
+    '/api/autocomplete': ('get', '/api/autocomplete?q=sal', {}, None),
+    '/api/stats': ('get', '/api/stats', {}, None),
+    '/api/testimonios': ('get', '/api/testimonios', {}, None),
+    '/api/salon/<int:salon_id>': ('get', '/api/salon/3', {}, None),
+    '/api/comentario': ('post', '/api/comentario',
+                        {'json': {'salon_id': 3, 'nombre': 'Ana', 'comentario': 'Muy lindo todo', 'rating': 5}},
+                        None),
+    '/api/agregar-testimonio': ('post', '/api/agregar-testimonio',
+                                {'json': {'rating': 5, 'comentario': 'Excelente la página'}}, 'usuario'),
+    '/login': ('post', '/login',
+               {'data': {'email': sembrado.USUARIO_EMAIL, 'password': sembrado.USUARIO_PASSWORD}}, None),
+    '/registro': ('post', '/registro',
+                  {'data': {'nombre': 'Familia Presupuesto', 'email': 'presupuesto@kinderfiesta.com',
+                            'password': 'clave123', 'password2': 'clave123'}}, None),
+    '/admin/dashboard': ('get', '/admin/dashboard', {}, 'admin'),
+    '/admin/panel': ('get', '/admin/panel', {}, 'admin'),
+    '/api/admin/export/salones': ('get', '/api/admin/export/salones', {}, 'admin'),
+    '/api/admin/export/reviews': ('get', '/api/admin/export/reviews', {}, 'admin'),
+}
+
+
+@pytest.fixture
+def contadas(monkeypatch):
+    """[(regla, consultas)] de cada request, según presupuesto_consultas.terminar()"""
+    totales = []
+    terminar = presupuesto_consultas.terminar
+
+    def contar(ruta):
+        total = terminar(ruta)
+        totales.append((ruta, total))
+        return total
+
+    monkeypatch.setattr(presupuesto_consultas, 'terminar', contar)
+    return totales
+
+
+@pytest.fixture
+def usuario_sin_testimonio(base):
+    """Un usuario sembrado que todavía no dejó testimonio"""
+    with sqlite3.connect(base) as conexion:
+        fila = conexion.execute(
+            "SELECT id, nombre FROM usuarios WHERE id NOT IN (SELECT usuario_id FROM testimonios) "
+            "ORDER BY id LIMIT 1").fetchone()
+    return {'user_logged_in': True, 'user_id': fila[0], 'user_nombre': fila[1]}
+
+
+def test_cada_presupuesto_tiene_su_request():
+    assert set(REQUESTS) == set(PRESUPUESTOS)
+
+
+@pytest.mark.parametrize('regla', list(REQUESTS))
+def test_ruta_dentro_del_presupuesto(regla, cliente, contadas, usuario_sin_testimonio):
+    metodo, url, argumentos, sesion = REQUESTS[regla]
+    if sesion:
+        with cliente.session_transaction() as datos:
+            if sesion == 'admin':
+                datos['admin_logged_in'] = True
+            else:
+                datos.update(usuario_sin_testimonio)
+
+    catalogo.invalidar()   # el presupuesto es con la caché fría
+    respuesta = getattr(cliente, metodo)(url, **argumentos)
+
+    assert respuesta.status_code < 400, respuesta.get_data(as_text=True)[:200]
+    assert [ruta for ruta, _ in contadas] == [regla]
+    total = contadas[0][1]
+    assert total is not None
+    assert total <= PRESUPUESTOS[regla]
+
+
+def test_ruta_que_se_pasa_del_presupuesto_falla(cliente, monkeypatch):
+    monkeypatch.setitem(PRESUPUESTOS, '/salon/<int:salon_id>', 0)
+    catalogo.invalidar()
+    with pytest.raises(PresupuestoExcedido, match=r'/salon/<int:salon_id> hizo \d+ consultas \(presupuesto: 0\)'):
+        cliente.get('/salon/3')
+
+
+def test_fuera_de_testing_solo_avisa(app, cliente, monkeypatch):
+    monkeypatch.setitem(PRESUPUESTOS, '/salon/<int:salon_id>', 0)
+    monkeypatch.setattr(app, 'testing', False)
+    catalogo.invalidar()
+    assert cliente.get('/salon/3').status_code == 200
@@ -0,0 +1,50 @@
+"""
+KINDERFIESTA - Tests de registro y login de usuarios (database.py)
+"""
+
+import sqlite3
+
+import bcrypt
+
+import database as db
+
+
+def test_registro_y_login(base):
+    user_id, mensaje = db.registrar_usuario('Familia Quispe', 'quispe@kinderfiesta.com', 'clave123')
+    assert user_id, mensaje
+
+    usuario, mensaje = db.verificar_login('quispe@kinderfiesta.com', 'clave123')
+    assert usuario == {'id': user_id, 'nombre': 'Familia Quispe', 'email': 'quispe@kinderfiesta.com'}, mensaje
+    assert db.verificar_login('quispe@kinderfiesta.com', 'otra-clave') == (None, "Contraseña incorrecta")
+    assert db.registrar_usuario('Otra', 'quispe@kinderfiesta.com', 'clave123') == \
+        (None, "El email ya está registrado")
+
+
+def test_el_hash_se_guarda_como_texto(base):
+    db.registrar_usuario('Familia Choque', 'choque@kinderfiesta.com', 'clave123')
+    with sqlite3.connect(base) as conexion:
+        guardado, = conexion.execute(
+            "SELECT password FROM usuarios WHERE email = 'choque@kinderfiesta.com'").fetchone()
+    assert isinstance(guardado, str) and guardado.startswith('$2')
+
+
+def test_login_con_hash_guardado_en_bytes(base):
+    # Como quedaron los registrados en SQLite antes de guardar el hash como texto
+    with sqlite3.connect(base) as conexion:
+        conexion.execute("INSERT INTO usuarios (nombre, email, password, activo) VALUES (?, ?, ?, 1)",
+                         ('Familia Rojas', 'rojas@kinderfiesta.com',
+                          bcrypt.hashpw(b'clave123', bcrypt.gensalt())))
+    usuario, mensaje = db.verificar_login('rojas@kinderfiesta.com', 'clave123')
+    assert usuario and usuario['email'] == 'rojas@kinderfiesta.com', mensaje
+
+
+def test_registro_y_login_por_http(cliente):
+    respuesta = cliente.post('/registro', data={'nombre': 'Familia Mamani', 'email': 'mamani@kinderfiesta.com',
+                                                'password': 'clave123', 'password2': 'clave123'})
+    assert respuesta.status_code == 302
+    cliente.get('/logout')
+
+    respuesta = cliente.post('/login', data={'email': 'mamani@kinderfiesta.com', 'password': 'clave123'})
+    assert respuesta.status_code == 302
+    with cliente.session_transaction() as sesion:
+        assert sesion['user_email'] == 'mamani@kinderfiesta.com'